@@ -13,6 +13,7 @@ import os
 import base64
 from app.db.models import IntegrationSettings, Tenant, User
 from app.core.settings import settings
+from app.core.auth_cache import identity_cache
 from app.services.auth_service import AuthService
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.errors import UnauthorizedError
@@ -24,13 +25,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """Get current authenticated user"""
     try:
         token = credentials.credentials
-        payload = AuthService.verify_token(token)
+        payload = AuthService.decode_token(token)
         
-        user_id = payload.get("sub")
-        if not user_id:
+        user = await identity_cache.get_user(payload.sub)
+        if user is None:
             raise UnauthorizedError("Invalid token")
-        
-        user = await User.objects.aget(id=user_id)
         return user
     except Exception as e:
         raise UnauthorizedError(f"Authentication failed: {str(e)}")
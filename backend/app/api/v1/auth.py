@@ -20,7 +20,7 @@ from app.schemas.auth import (
     TenantUserInfo
 )
 from app.services.auth_service import AuthService
-from app.core.errors import UnauthorizedError, ConflictError, NotFoundError
+from app.core.errors import UnauthorizedError, ConflictError, NotFoundError, RateLimitError
 from app.db.models import User, TenantUser
 
 
@@ -112,6 +112,9 @@ async def register(request: RegisterRequest):
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         )
+    except RateLimitError:
+        # Password pool full: 429 with Retry-After via the app handler
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -147,6 +150,8 @@ async def login(request: LoginRequest):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    except RateLimitError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
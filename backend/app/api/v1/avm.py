@@ -18,7 +18,6 @@ from app.schemas.common import PropertyType
 from app.services.avm_service import AVMService
 from app.services.geocoding_service import GeocodingService
 from app.services.market_data_service import MarketDataService
-from app.services.avm_pdf_service import AVMPDFService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -444,6 +443,8 @@ async def export_pdf_report(
         avm_response = cached_data['response']
         
         # Generate PDF
+        from app.services.avm_pdf_service import AVMPDFService  # loads reportlab
+
         pdf_service = AVMPDFService()
         pdf_bytes = pdf_service.generate_avm_report_pdf(
             avm_request=avm_request,
@@ -2,20 +2,24 @@
 Billing API Endpoints für Stripe Integration
 """
 
-import stripe
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Dict, Any
 from django.conf import settings
 from asgiref.sync import sync_to_async
 
 from app.services.billing_service import BillingService
+from app.services.usage_ledger import get_usage
+from app.services.usage_service import UsageService
 from app.services.auth_service import AuthService
 from app.core.billing_config import PLAN_LIMITS, STRIPE_PRICE_MAP
 from app.db.models import User, BillingAccount
 from app.core.errors import UnauthorizedError, NotFoundError
+from app.core.lazy_import import lazy_module
 from django.utils import timezone
 
+stripe = lazy_module("stripe")
+
 router = APIRouter(prefix="/billing", tags=["Billing"])
 security = HTTPBearer()
 
@@ -177,21 +181,12 @@ async def get_billing_info(
         # Hole Limits für aktuellen Plan
         limits = PLAN_LIMITS[billing.plan_key]
         
-        # Hole aktuelle Usage (vereinfacht - später durch UsageService ersetzen)
-        from app.db.models import UserProfile, Property
-        users_count = await sync_to_async(UserProfile.objects.filter(
-            tenant_id=tenant_id, 
-            is_active=True
-        ).count)()
-        
-        properties_count = await sync_to_async(Property.objects.filter(
-            tenant_id=tenant_id
-        ).count)()
-        
+        # Hole aktuelle Usage aus dem Usage-Ledger
+        ledger = await sync_to_async(get_usage)(tenant_id)
         usage = {
-            'users': users_count,
-            'properties': properties_count,
-            'storage_mb': 0,  # TODO: Implementieren
+            'users': ledger['users'],
+            'properties': ledger['properties'],
+            'storage_mb': round(ledger['storage_bytes'] / (1024 * 1024), 2),
         }
         
         return {
@@ -348,29 +343,17 @@ async def get_billing_info(
         # Hole aktuelle Limits
         limits = PLAN_LIMITS.get(billing.plan_key, PLAN_LIMITS['free'])
         
-        # Berechne aktuelle Usage (vereinfacht)
-        from app.db.models import UserProfile, Property
-        
-        current_users = await sync_to_async(UserProfile.objects.filter(
-            tenant_id=tenant_id,
-            is_active=True
-        ).count)()
-        
-        current_properties = await sync_to_async(Property.objects.filter(
-            tenant_id=tenant_id
-        ).count)()
-        
-        # Storage-Berechnung (vereinfacht)
-        current_storage_mb = 0  # TODO: Implementiere echte Storage-Berechnung
+        # Aktuelle Usage aus dem Usage-Ledger
+        ledger = await sync_to_async(get_usage)(tenant_id)
         
         return {
             "plan_key": billing.plan_key,
             "status": billing.status,
             "limits": limits,
             "usage": {
-                "users": current_users,
-                "properties": current_properties,
-                "storage_mb": current_storage_mb
+                "users": ledger["users"],
+                "properties": ledger["properties"],
+                "storage_mb": round(ledger["storage_bytes"] / (1024 * 1024), 2)
             },
             "current_period_end": billing.current_period_end.isoformat() if billing.current_period_end else None,
             "cancel_at_period_end": billing.cancel_at_period_end,
@@ -437,6 +420,22 @@ async def get_trial_status(
         }
 
 
+@router.get("/usage/history")
+async def get_usage_history(
+    days: int = Query(30, ge=1, le=730),
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    tenant_id: str = Depends(get_tenant_id_from_token),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Usage-Verlauf für Billing-Dashboard und Upgrade-Hinweise
+    
+    Returns:
+        Dict mit aktueller Usage vs Limits und der verdichteten Zeitreihe
+    """
+    return await UsageService.get_usage_history(tenant_id, days, granularity)
+
+
 @router.get("/plans")
 async def get_available_plans():
     """
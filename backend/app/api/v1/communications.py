@@ -1,8 +1,10 @@
 """
 Communications API Endpoints (Channels/Messages)
 """
+import asyncio
+import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, status
 
 from app.api.deps import (
     require_read_scope,
@@ -10,8 +12,10 @@ from app.api.deps import (
     require_delete_scope,
     get_tenant_id,
 )
-from app.core.security import TokenData
-from app.core.errors import NotFoundError
+from app.core.pubsub import pubsub
+from app.core.security import TokenData, security_manager
+from app.core.errors import NotFoundError, ForbiddenError, ValidationError
+from app.core.json_response import ModelJSONResponse
 from app.schemas.communications import (
     ChannelResponse,
     ChannelMemberResponse,
@@ -24,10 +28,13 @@ from app.schemas.communications import (
     EditMessageRequest,
     ReactionRequest,
     SearchMessagesResponse,
+    MessagesSinceResponse,
 )
 from app.schemas.common import PaginatedResponse
 from app.core.pagination import PaginationParams, get_pagination_offset
-from app.services.communications_service import CommunicationsService
+from app.services.communications_service import CommunicationsService, chat_channel
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -118,7 +125,76 @@ async def list_messages(
     offset = get_pagination_offset(pagination.page, pagination.size)
     service = CommunicationsService(tenant_id)
     messages, total = await service.list_messages(channel_id, user_id=current_user.user_id, offset=offset, limit=pagination.size)
-    return PaginatedResponse.create(items=messages, total=total, page=pagination.page, size=pagination.size)
+    return ModelJSONResponse(
+        PaginatedResponse[MessageResponse].create(items=messages, total=total, page=pagination.page, size=pagination.size)
+    )
+
+
+@router.get("/channels/{channel_id}/messages/since", response_model=MessagesSinceResponse)
+async def list_messages_since(
+    channel_id: str,
+    after: Optional[str] = Query(None, description="Last message id the client has seen"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: TokenData = Depends(require_read_scope),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    """Catch-up for realtime clients after connect/reconnect"""
+    service = CommunicationsService(tenant_id)
+    return await service.list_messages_since(channel_id, user_id=current_user.user_id, after_id=after, limit=limit)
+
+
+@router.websocket("/channels/{channel_id}/ws")
+async def channel_gateway(websocket: WebSocket, channel_id: str, token: Optional[str] = Query(None)):
+    """
+    Realtime events of a channel: message.created/updated/deleted,
+    reaction.added/removed, member.removed, channel.deleted.
+    Browsers cannot set headers on WebSockets, so the JWT is passed as ?token=.
+    """
+    try:
+        token_data = security_manager.verify_token(token or "")
+        if "read" not in token_data.scopes:
+            raise ForbiddenError("Insufficient permissions. Required scope: read")
+        service = CommunicationsService(token_data.tenant_id)
+        await service.get_member_channel(channel_id, token_data.user_id)
+    except (ValidationError, ForbiddenError, NotFoundError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+
+    async def wait_for_disconnect():
+        # Client frames are not used; reading detects the disconnect
+        while True:
+            if (await websocket.receive())["type"] == "websocket.disconnect":
+                return
+
+    async with pubsub.subscribe(chat_channel(token_data.tenant_id, channel_id)) as queue:
+        disconnected = asyncio.create_task(wait_for_disconnect())
+        try:
+            while True:
+                next_event = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(
+                    {next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnected in done:
+                    next_event.cancel()
+                    return
+
+                event = next_event.result()
+                await websocket.send_json(event)
+
+                if event["event"] == "channel.deleted" or (
+                    event["event"] == "member.removed"
+                    and event["data"].get("user_id") == token_data.user_id
+                ):
+                    await websocket.close(code=status.WS_1000_NORMAL_CLOSURE)
+                    return
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.error(f"Channel gateway error for {channel_id}: {e}")
+        finally:
+            disconnected.cancel()
 
 
 @router.post("/channels/{channel_id}/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
@@ -181,9 +257,12 @@ async def remove_reaction(
 
 @router.get("/search", response_model=SearchMessagesResponse)
 async def search_messages(
-    q: str = Query(..., description="Search term"),
+    q: str = Query(
+        ..., description="Search words; every word must match the start of a word"
+    ),
+    limit: int = Query(50, ge=1, le=100),
     current_user: TokenData = Depends(require_read_scope),
     tenant_id: str = Depends(get_tenant_id),
 ):
     service = CommunicationsService(tenant_id)
-    return await service.search_messages(q, user_id=current_user.user_id)
+    return await service.search_messages(q, user_id=current_user.user_id, limit=limit)
@@ -22,6 +22,8 @@ from app.schemas.contacts import (
     AiInsightsResponse,
     NextActionRequest,
     NextActionResponse,
+    LogActivityRequest,
+    ContactTimelineResponse,
 )
 from app.schemas.common import PaginatedResponse
 from app.schemas.properties import PropertyResponse
@@ -31,7 +33,6 @@ from app.core.pagination import (
     validate_sort_field,
 )
 from app.services.contacts_service import ContactsService
-from app.services.lead_scoring import LeadScoringService
 from app.services.llm_service import LLMService
 
 router = APIRouter()
@@ -177,24 +178,9 @@ async def get_contact_lead_score(
     Returns score (0-100), category (kalt/warm/heiß), breakdown, and top signals
     """
     contacts_service = ContactsService(tenant_id)
-    lead_scoring_service = LeadScoringService(tenant_id)
 
-    # Get contact
-    contact = await contacts_service.get_contact(contact_id)
-    if not contact:
-        raise NotFoundError("Contact not found")
-
-    # Get activities for engagement scoring
-    try:
-        activities = await contacts_service.get_contact_activities(contact_id)
-    except:
-        activities = []
-
-    # Calculate score
-    score_data = lead_scoring_service.calculate_lead_score(
-        contact_data=contact.dict() if hasattr(contact, "dict") else contact,
-        activities=activities,
-    )
+    # Persisted score; only recomputed when the contact is flagged for rescoring
+    score_data = await contacts_service.get_lead_score(contact_id)
 
     return LeadScoreResponse(**score_data)
 
@@ -206,13 +192,47 @@ async def get_contact_activities(
     tenant_id: str = Depends(get_tenant_id),
 ):
     """
-    Return recent activities (appointments + tasks) for engagement/360 view.
+    Return recent activities (timeline window) for engagement/360 view.
     """
     contacts_service = ContactsService(tenant_id)
     activities = await contacts_service.get_contact_activities(contact_id)
     return activities
 
 
+@router.get("/{contact_id}/timeline", response_model=ContactTimelineResponse)
+async def get_contact_timeline(
+    contact_id: str,
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    current_user: TokenData = Depends(require_read_scope),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    """
+    Activity timeline (appointments, tasks, emails, calls, notes), newest first.
+    """
+    contacts_service = ContactsService(tenant_id)
+    items, next_cursor = await contacts_service.get_contact_timeline(
+        contact_id, limit, cursor
+    )
+    return ContactTimelineResponse(items=items, next_cursor=next_cursor)
+
+
+@router.post("/{contact_id}/activities", response_model=Dict[str, Any], status_code=201)
+async def log_contact_activity(
+    contact_id: str,
+    activity_data: LogActivityRequest,
+    current_user: TokenData = Depends(require_write_scope),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    """
+    Log an email, call or note on the contact's timeline.
+    """
+    contacts_service = ContactsService(tenant_id)
+    return await contacts_service.log_activity(
+        contact_id, activity_data, current_user.user_id
+    )
+
+
 @router.get("/{contact_id}/ai-insights", response_model=AiInsightsResponse)
 async def get_contact_ai_insights(
     contact_id: str,
@@ -225,7 +245,6 @@ async def get_contact_ai_insights(
     Returns summary, score explanation, segment, and top signals
     """
     contacts_service = ContactsService(tenant_id)
-    lead_scoring_service = LeadScoringService(tenant_id)
     llm_service = LLMService(tenant_id)
 
     # Get contact
@@ -241,8 +260,8 @@ async def get_contact_ai_insights(
 
     contact_dict = contact.dict() if hasattr(contact, "dict") else contact
 
-    # Calculate lead score
-    score_data = lead_scoring_service.calculate_lead_score(contact_dict, activities)
+    # Persisted lead score
+    score_data = await contacts_service.get_lead_score(contact_id)
 
     # Generate AI summary
     summary = await llm_service.generate_contact_summary(
@@ -327,7 +346,6 @@ async def get_contact_next_action(
     Returns recommended action type, urgency, reason, and script
     """
     contacts_service = ContactsService(tenant_id)
-    lead_scoring_service = LeadScoringService(tenant_id)
     llm_service = LLMService(tenant_id)
 
     # Get contact
@@ -343,8 +361,8 @@ async def get_contact_next_action(
 
     contact_dict = contact.dict() if hasattr(contact, "dict") else contact
 
-    # Calculate lead score
-    score_data = lead_scoring_service.calculate_lead_score(contact_dict, activities)
+    # Persisted lead score
+    score_data = await contacts_service.get_lead_score(contact_id)
 
     # Generate recommendation
     recommendation = await llm_service.suggest_next_action(
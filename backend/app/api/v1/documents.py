@@ -5,8 +5,6 @@ Documents API Endpoints
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
 from fastapi.responses import JSONResponse
-import hashlib
-from datetime import datetime
 
 from app.api.deps import (
     require_read_scope,
@@ -38,9 +36,10 @@ from app.core.pagination import (
     validate_sort_field,
 )
 from app.services.documents_service import DocumentsService
-from app.services.storage_s3 import StorageService
+from app.services.storage_s3 import spool_upload
+from app.services.blob_store import BlobStore
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(apply_rate_limit)])
 
 
 @router.get("/search", response_model=PaginatedResponse[DocumentResponse])
@@ -113,21 +112,22 @@ async def create_document_version(
     if not file.filename:
         raise ValidationError("No file provided")
 
-    # Calculate checksum
-    file_content = await file.read()
-    checksum = hashlib.sha256(file_content).hexdigest()
-
-    # Upload file to storage (stub - in real implementation, use StorageService)
-    file_url = f"https://storage.example.com/documents/{document_id}/v{datetime.utcnow().timestamp()}/{file.filename}"
+    # Stream to disk (checksum is computed while spooling) and store the blob
+    spooled = await spool_upload(file)
+    try:
+        upload_result = await BlobStore(tenant_id).store(spooled)
+    finally:
+        spooled.cleanup()
 
     documents_service = DocumentsService(tenant_id)
     version = await documents_service.create_document_version(
         document_id=document_id,
-        file_url=file_url,
-        file_size=len(file_content),
-        checksum=checksum,
+        file_url=upload_result["url"],
+        file_size=upload_result["size"],
+        checksum=upload_result["checksum"],
         user_id=current_user.user_id,
         change_notes=change_notes,
+        blob_id=upload_result["blob_id"],
     )
 
     return version
@@ -264,16 +264,13 @@ async def upload_document(
     if not file.filename:
         raise ValidationError("No filename provided")
 
-    if file.size > 50 * 1024 * 1024:  # 50MB limit
-        raise ValidationError("File too large. Maximum size is 50MB")
-
-    # Upload file to storage
-    storage_service = StorageService()
-    upload_result = await storage_service.upload_file(
-        file=file,
-        tenant_id=tenant_id,
-        folder_path=str(upload_metadata.folder_id) if upload_metadata.folder_id else "",
-    )
+    # Store file content (size limit is enforced while streaming, identical
+    # content already stored for this tenant is reused without a transfer)
+    spooled = await spool_upload(file)
+    try:
+        upload_result = await BlobStore(tenant_id).store(spooled)
+    finally:
+        spooled.cleanup()
 
     # Create document record
     documents_service = DocumentsService(tenant_id)
@@ -14,7 +14,6 @@ from app.schemas.energy_certificate import (
     EnergyCertificatePDFRequest, EnergyCertificatePDFResponse
 )
 from app.services.properties_service import PropertiesService
-from app.services.pdf_generator_service import PDFGeneratorService
 from app.db.models import Property, IntegrationSettings
 
 router = APIRouter()
@@ -128,6 +127,8 @@ async def generate_energy_certificate_pdf(
     }
     
     # Generate PDF
+    from app.services.pdf_generator_service import PDFGeneratorService  # loads reportlab
+
     pdf_service = PDFGeneratorService()
     pdf_bytes = pdf_service.generate_energy_certificate_pdf(
         property_data=property_data,
@@ -194,6 +195,8 @@ async def download_energy_certificate_pdf(
     }
     
     # Generate PDF
+    from app.services.pdf_generator_service import PDFGeneratorService  # loads reportlab
+
     pdf_service = PDFGeneratorService()
     pdf_bytes = pdf_service.generate_energy_certificate_pdf(
         property_data=property_data,
@@ -14,7 +14,6 @@ from app.schemas.expose import (
     ExposeListResponse, ExposePDFRequest, ExposePDFResponse
 )
 from app.services.expose_service import ExposeService
-from app.services.pdf_generator_service import PDFGeneratorService
 from app.db.models import ExposeVersion
 
 router = APIRouter()
@@ -247,6 +246,8 @@ async def generate_expose_pdf(
         )
     
     # Generate PDF using the same service as energy certificate
+    from app.services.pdf_generator_service import PDFGeneratorService  # loads reportlab
+
     pdf_service = PDFGeneratorService()
     
     # Prepare property data
@@ -324,6 +325,8 @@ async def download_expose_pdf(
         )
     
     # Generate PDF
+    from app.services.pdf_generator_service import PDFGeneratorService  # loads reportlab
+
     pdf_service = PDFGeneratorService()
     
     property_data = {
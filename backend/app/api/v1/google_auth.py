@@ -5,11 +5,14 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 import os
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests
+from app.core.lazy_import import lazy_module
 from app.services.auth_service import AuthService
 from app.schemas.auth import LoginRequest, RegisterRequest
 
+# google-auth loads on the first token verification
+google_id_token = lazy_module("google.oauth2.id_token")
+requests = lazy_module("google.auth.transport.requests")
+
 router = APIRouter()
 
 class GoogleAuthRequest(BaseModel):
@@ -20,7 +20,9 @@ from app.services.llm_service import LLMService
 router = APIRouter()
 
 
-@router.post("/ask", response_model=LLMResponse)
+@router.post(
+    "/ask", response_model=LLMResponse, dependencies=[Depends(apply_rate_limit)]
+)
 async def ask_llm_question(
     request: LLMRequest,
     current_user: TokenData = Depends(require_read_scope),
@@ -57,7 +59,11 @@ async def ask_llm_question(
         )
 
 
-@router.post("/dashboard_qa", response_model=DashboardQAResponse)
+@router.post(
+    "/dashboard_qa",
+    response_model=DashboardQAResponse,
+    dependencies=[Depends(apply_rate_limit)],
+)
 async def ask_dashboard_question(
     request: DashboardQARequest,
     current_user: TokenData = Depends(require_read_scope),
@@ -94,7 +100,7 @@ async def ask_dashboard_question(
         )
 
 
-@router.get("/health")
+@router.get("/health", dependencies=[Depends(apply_rate_limit)])
 async def llm_health_check(
     current_user: TokenData = Depends(require_read_scope),
     tenant_id: str = Depends(get_tenant_id)
@@ -2,15 +2,20 @@
 Notification API Endpoints - Async Version
 Vollständige CRUD-Operationen für Benachrichtigungen mit korrekter async/sync Integration
 """
+import asyncio
+import json
 from typing import Optional, List
 from datetime import datetime
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from django.db.models import Q, Count
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 
 from app.api.deps import get_current_user, get_tenant_id
-from app.core.security import TokenData
+from app.core.auth_cache import identity_cache
+from app.core.pubsub import pubsub
+from app.core.security import TokenData, get_stream_user
 from app.models import User, Tenant, Notification, NotificationPreference
 from app.schemas.notification import (
     NotificationResponse,
@@ -28,30 +33,37 @@ from app.schemas.notification import (
     NotificationPriority,
 )
 from app.core.pagination import paginate
+from app.services.notification_service import (
+    notification_channel,
+    get_unread_count_sync,
+    reset_unread_count_sync,
+)
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+
 
 async def get_tenant(tenant_id: str = Depends(get_tenant_id)) -> Tenant:
-    """Get tenant object from tenant_id"""
-    try:
-        return await sync_to_async(Tenant.objects.get)(id=tenant_id)
-    except Tenant.DoesNotExist:
+    """Get tenant object from tenant_id (identity cache)"""
+    tenant = await identity_cache.get_tenant(tenant_id)
+    if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
+    return tenant
 
 
 async def get_user_from_token(token_data: TokenData = Depends(get_current_user)) -> User:
-    """Get User object from TokenData"""
-    try:
-        return await sync_to_async(User.objects.get)(id=token_data.user_id)
-    except User.DoesNotExist:
+    """Get User object from TokenData (identity cache)"""
+    user = await identity_cache.get_user(token_data.user_id)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    return user
 
 
 @router.get("/unread-count", response_model=dict)
@@ -59,17 +71,52 @@ async def get_unread_count(
     current_user: User = Depends(get_user_from_token),
     tenant: Tenant = Depends(get_tenant),
 ):
-    """Get count of unread notifications"""
-    count = await sync_to_async(Notification.objects.filter(
-        tenant=tenant,
-        user=current_user,
-        read=False,
-        archived=False
-    ).count)()
+    """Get count of unread notifications (maintained counter, no COUNT query)"""
+    count = await sync_to_async(get_unread_count_sync)(tenant.id, current_user.id)
     
     return {"count": count}
 
 
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    token_data: TokenData = Depends(get_stream_user),
+):
+    """
+    Server-Sent Events stream with new notifications and unread count updates.
+    Ersetzt das Polling von /unread-count.
+    """
+    channel = notification_channel(token_data.tenant_id, token_data.user_id)
+
+    async def event_stream():
+        # Subscribe before reading the count so no update falls in between
+        async with pubsub.subscribe(channel) as queue:
+            count = await sync_to_async(get_unread_count_sync)(
+                token_data.tenant_id, token_data.user_id
+            )
+            yield _sse_event("unread_count", {"count": count})
+
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=SSE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse_event(message["event"], message["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("", response_model=NotificationListResponse)
 async def list_notifications(
     page: int = Query(1, ge=1),
@@ -231,6 +278,8 @@ async def mark_all_as_read(
         read_at=timezone.now(),
         updated_at=timezone.now()
     )
+    # Bulk update bypasses signals; all non-archived notifications are read now
+    await sync_to_async(reset_unread_count_sync)(tenant.id, current_user.id)
     
     return {"updated": updated, "message": f"All {updated} notifications marked as read"}
 
@@ -148,16 +148,19 @@ async def update_my_profile(
 
     @sync_to_async
     def update_profile():
+        # Current row, not the instance resolved from the token (cached)
+        user = User.objects.get(pk=current_user.pk)
+
         # Update User model fields
         if data.first_name is not None:
-            current_user.first_name = data.first_name
+            user.first_name = data.first_name
         if data.last_name is not None:
-            current_user.last_name = data.last_name
+            user.last_name = data.last_name
 
-        current_user.save(update_fields=["first_name", "last_name"])
+        user.save(update_fields=["first_name", "last_name"])
 
         # Get or create profile
-        profile, created = UserProfile.objects.get_or_create(user=current_user)
+        profile, created = UserProfile.objects.get_or_create(user=user)
 
         # Update profile fields
         if data.phone is not None:
@@ -176,17 +179,17 @@ async def update_my_profile(
         profile.save()
 
         return {
-            "id": str(current_user.id),
-            "email": current_user.email,
-            "first_name": current_user.first_name,
-            "last_name": current_user.last_name,
+            "id": str(user.id),
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
             "phone": profile.phone,
             "bio": profile.bio,
             "company": profile.company,
             "position": profile.position,
             "location": profile.location,
             "website": profile.website,
-            "avatar": profile.avatar or current_user.avatar,
+            "avatar": profile.avatar or user.avatar,
         }
 
     return await update_profile()
@@ -278,22 +281,23 @@ async def change_password(
     """Change user password"""
     from django.contrib.auth.hashers import check_password, make_password
 
-    @sync_to_async
-    def change_pwd():
-        # Verify current password
-        if not check_password(data.current_password, current_user.password):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Current password is incorrect",
-            )
+    from app.core.password_pool import password_pool
+
+    # Current hash, not the one of the instance resolved from the token (cached)
+    user = await sync_to_async(User.objects.get)(pk=current_user.pk)
 
-        # Set new password
-        current_user.password = make_password(data.new_password)
-        current_user.save(update_fields=["password"])
+    # Both hashes run in the password pool, not on the shared sync thread
+    if not await password_pool.run(check_password, data.current_password, user.password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect",
+        )
 
-        return {"message": "Password changed successfully"}
+    # Set new password
+    user.password = await password_pool.run(make_password, data.new_password)
+    await sync_to_async(user.save)(update_fields=["password"])
 
-    return await change_pwd()
+    return {"message": "Password changed successfully"}
 
 
 @router.post("/me/avatar", response_model=Dict[str, str])
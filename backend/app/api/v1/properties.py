@@ -3,7 +3,7 @@ Properties API Endpoints
 """
 
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, UploadFile, File
 
 from app.api.deps import (
     require_read_scope,
@@ -13,6 +13,7 @@ from app.api.deps import (
 )
 from app.core.security import TokenData
 from app.core.errors import NotFoundError
+from app.core.json_response import ModelJSONResponse
 from app.schemas.properties import (
     PropertyResponse,
     PropertyListResponse,
@@ -28,6 +29,8 @@ from app.core.pagination import (
     validate_sort_field,
 )
 from app.services.properties_service import PropertiesService
+from app.services.storage_s3 import spool_upload
+from app.services.image_pipeline import ImagePipeline
 
 router = APIRouter()
 
@@ -65,6 +68,9 @@ async def get_properties(
     heating_type: Optional[str] = Query(None, description="Heating type filter"),
     sort_by: Optional[str] = Query("created_at", description="Sort field"),
     sort_order: Optional[str] = Query("desc", description="Sort order"),
+    image_width: Optional[int] = Query(
+        None, ge=1, description="Return the smallest image variant at least this wide"
+    ),
     current_user: TokenData = Depends(require_read_scope),
     tenant_id: str = Depends(get_tenant_id),
 ):
@@ -104,10 +110,13 @@ async def get_properties(
         heating_type=heating_type,
         sort_by=sort_by,
         sort_order=sort_order,
+        image_width=image_width,
     )
 
-    return PaginatedResponse.create(
-        items=properties, total=total, page=pagination.page, size=pagination.size
+    return ModelJSONResponse(
+        PaginatedResponse[PropertyResponse].create(
+            items=properties, total=total, page=pagination.page, size=pagination.size
+        )
     )
 
 
@@ -127,16 +136,32 @@ async def create_property(
     return property_obj
 
 
+@router.get("/metrics/top", response_model=List[dict])
+async def get_top_listings(
+    metric: str = Query("views", pattern="^(views|inquiries|favorites)$"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(require_read_scope),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    """Top performing listings by portal activity in the last 30 days"""
+
+    properties_service = PropertiesService(tenant_id)
+    return await properties_service.get_top_listings(metric, limit)
+
+
 @router.get("/{property_id}", response_model=PropertyResponse)
 async def get_property(
     property_id: str,
+    image_width: Optional[int] = Query(
+        None, ge=1, description="Return the smallest image variant at least this wide"
+    ),
     current_user: TokenData = Depends(require_read_scope),
     tenant_id: str = Depends(get_tenant_id),
 ):
     """Get a specific property"""
 
     properties_service = PropertiesService(tenant_id)
-    property_obj = await properties_service.get_property(property_id)
+    property_obj = await properties_service.get_property(property_id, image_width)
 
     if not property_obj:
         raise NotFoundError("Property not found")
@@ -212,6 +237,7 @@ async def sync_property_metrics(
 )
 async def upload_property_images(
     property_id: str,
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(..., description="Image files to upload"),
     current_user: TokenData = Depends(require_write_scope),
     tenant_id: str = Depends(get_tenant_id),
@@ -220,29 +246,33 @@ async def upload_property_images(
 
     Accepts multiple image files in multipart/form-data format.
     Supported formats: JPG, PNG, WEBP
+
+    Thumbnails and size variants are generated in the background after
+    the response is sent.
     """
 
     properties_service = PropertiesService(tenant_id)
 
-    # Convert UploadFile to Django's UploadedFile format
-    from django.core.files.uploadedfile import InMemoryUploadedFile
-    from io import BytesIO
-
-    django_files = []
-    for file in files:
-        content = await file.read()
-        django_file = InMemoryUploadedFile(
-            file=BytesIO(content),
-            field_name="file",
-            name=file.filename or "unnamed.jpg",
-            content_type=file.content_type or "image/jpeg",
-            size=len(content),
-            charset=None,
+    # Stream uploads to disk in chunks; Django reads them back chunk-wise on save
+    spooled_files = []
+    try:
+        for file in files:
+            spooled_files.append(
+                await spool_upload(
+                    file, default_name="unnamed.jpg", default_content_type="image/jpeg"
+                )
+            )
+        django_files = [spooled.as_django_file() for spooled in spooled_files]
+
+        images = await properties_service.upload_images(
+            property_id, django_files, current_user.user_id
         )
-        django_files.append(django_file)
+    finally:
+        for spooled in spooled_files:
+            spooled.cleanup()
 
-    images = await properties_service.upload_images(
-        property_id, django_files, current_user.user_id
+    background_tasks.add_task(
+        ImagePipeline().process_images, [image.id for image in images]
     )
 
     return images
@@ -267,26 +297,25 @@ async def upload_property_documents(
 
     properties_service = PropertiesService(tenant_id)
 
-    # Convert UploadFile to Django's UploadedFile format
-    from django.core.files.uploadedfile import InMemoryUploadedFile
-    from io import BytesIO
-
-    django_files = []
-    for file in files:
-        content = await file.read()
-        django_file = InMemoryUploadedFile(
-            file=BytesIO(content),
-            field_name="file",
-            name=file.filename or "unnamed.pdf",
-            content_type=file.content_type or "application/pdf",
-            size=len(content),
-            charset=None,
+    # Stream uploads to disk in chunks; Django reads them back chunk-wise on save
+    spooled_files = []
+    try:
+        for file in files:
+            spooled_files.append(
+                await spool_upload(
+                    file,
+                    default_name="unnamed.pdf",
+                    default_content_type="application/pdf",
+                )
+            )
+        django_files = [spooled.as_django_file() for spooled in spooled_files]
+
+        documents = await properties_service.upload_documents(
+            property_id, django_files, current_user.user_id
         )
-        django_files.append(django_file)
-
-    documents = await properties_service.upload_documents(
-        property_id, django_files, current_user.user_id
-    )
+    finally:
+        for spooled in spooled_files:
+            spooled.cleanup()
 
     return documents
 
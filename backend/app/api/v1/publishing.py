@@ -13,6 +13,7 @@ from datetime import datetime
 
 from app.db.models import Property, PublishJob, User
 from app.services.immoscout_service import ImmoScout24Service
+from app.core.auth_cache import identity_cache
 from app.services.auth_service import AuthService
 from app.core.errors import NotFoundError, UnauthorizedError, ExternalServiceError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -97,13 +98,11 @@ async def get_current_user(
     """Get current authenticated user"""
     try:
         token = credentials.credentials
-        payload = AuthService.verify_token(token)
+        payload = AuthService.decode_token(token)
 
-        user_id = payload.get("sub")
-        if not user_id:
+        user = await identity_cache.get_user(payload.sub)
+        if user is None:
             raise UnauthorizedError("Invalid token")
-
-        user = await User.objects.aget(id=user_id)
         return user
     except Exception as e:
         raise UnauthorizedError(f"Authentication failed: {str(e)}")
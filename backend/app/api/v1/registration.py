@@ -18,6 +18,7 @@ load_dotenv("../env.local")
 load_dotenv("../../env.local")
 
 from app.services.auth_service import AuthService
+from app.core.password_pool import password_pool
 from app.core.billing_config import PLAN_LIMITS, STRIPE_PRICE_MAP
 from app.db.models import User, Tenant
 from app.core.errors import UnauthorizedError, NotFoundError
@@ -362,8 +363,9 @@ async def complete_registration(
                 detail=f"Failed to create billing account: {str(e)}"
             )
         
-        # Erstelle User
+        # Erstelle User (Passwort im Passwort-Pool hashen)
         try:
+            password_hash = await password_pool.run(AuthService.hash_password, password)
             user = await sync_to_async(User.objects.create)(
                 email=email,
                 first_name=first_name,
@@ -371,7 +373,7 @@ async def complete_registration(
                 phone=phone,
                 is_active=True,
                 email_verified=True,  # Email ist bereits verifiziert durch Stripe
-                password=AuthService.hash_password(password)
+                password=password_hash
             )
             print(f"DEBUG: Created user: {user.id}")
         except Exception as e:
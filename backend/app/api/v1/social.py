@@ -291,7 +291,7 @@ async def get_rate_limits(
     rate_limiter = RateLimitManager()
 
     if platform:
-        status_data = rate_limiter.get_status(platform.lower(), tenant_id)
+        status_data = await rate_limiter.get_status(platform.lower(), tenant_id)
         return [
             RateLimitStatusResponse(
                 platform=status_data["platform"],
@@ -305,7 +305,7 @@ async def get_rate_limits(
         ]
 
     # Get all platforms
-    all_status = rate_limiter.get_all_status(tenant_id)
+    all_status = await rate_limiter.get_all_status(tenant_id)
     return [
         RateLimitStatusResponse(
             platform=data["platform"],
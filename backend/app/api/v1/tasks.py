@@ -13,6 +13,7 @@ from app.api.deps import (
 )
 from app.core.security import TokenData
 from app.core.errors import ValidationError, NotFoundError
+from app.core.json_response import ModelJSONResponse
 from app.schemas.tasks import (
     TaskResponse, CreateTaskRequest, UpdateTaskRequest, MoveTaskRequest,
     EmployeeResponse, TaskStatisticsResponse
@@ -21,7 +22,7 @@ from app.schemas.common import PaginatedResponse
 from app.core.pagination import PaginationParams, get_pagination_offset, validate_sort_field
 from app.services.tasks_service import TasksService
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(apply_rate_limit)])
 
 
 @router.get("", response_model=PaginatedResponse[TaskResponse])
@@ -70,11 +71,13 @@ async def get_tasks(
         sort_order=sort_order
     )
     
-    return PaginatedResponse.create(
-        items=tasks,
-        total=total,
-        page=pagination.page,
-        size=pagination.size
+    return ModelJSONResponse(
+        PaginatedResponse[TaskResponse].create(
+            items=tasks,
+            total=total,
+            page=pagination.page,
+            size=pagination.size
+        )
     )
 
 
@@ -0,0 +1,124 @@
+"""
+Auth Caches
+
+- VerifiedTokenCache: bounded LRU of verified JWTs -> decoded claims, keyed
+  on the token signature and dropped at the token's `exp`. A hit skips the
+  HMAC check and the Pydantic model build.
+- IdentityCache: short-TTL per-process cache of User and Tenant rows looked
+  up from token claims. Signals (app.signals) invalidate entries when a
+  user, membership (role) or tenant changes; other workers pick changes up
+  after the TTL. Callers get a copy, so a request changing its instance
+  does not affect concurrent ones.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from app.core.settings import settings
+
+
+class VerifiedTokenCache:
+    """LRU of tokens that passed signature and claim validation"""
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.clock = clock
+        # signature -> (header.payload, exp, claims object)
+        self._entries: "OrderedDict[str, Tuple[str, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[Any]:
+        signing_input, _, signature = token.rpartition(".")
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return None
+            # The signature alone must not vouch for a different payload
+            if entry[0] != signing_input:
+                return None
+            if entry[1] <= self.clock():
+                del self._entries[signature]
+                return None
+            self._entries.move_to_end(signature)
+            return entry[2]
+
+    def put(self, token: str, exp: Optional[float], claims: Any) -> None:
+        """Remember verified claims until exp (tokens without exp are not cached)"""
+        if exp is None or self.max_size <= 0:
+            return
+        signing_input, _, signature = token.rpartition(".")
+        with self._lock:
+            self._entries[signature] = (signing_input, float(exp), claims)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _load_user(user_id: str):
+    from app.db.models import User
+
+    return User.objects.filter(id=user_id).first()
+
+
+def _load_tenant(tenant_id: str):
+    from app.db.models import Tenant
+
+    return Tenant.objects.filter(id=tenant_id).first()
+
+
+class IdentityCache:
+    """Users and tenants by id for a few seconds; missing rows are cached as None"""
+
+    def __init__(self, ttl: int, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._users: Dict[str, Tuple[float, Any]] = {}
+        self._tenants: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    async def _get(self, store: Dict[str, Tuple[float, Any]], key, loader):
+        key = str(key)
+        entry = store.get(key)
+        if entry and entry[0] > time.monotonic():
+            return copy.copy(entry[1])
+
+        value = await sync_to_async(loader)(key)
+        if self.ttl > 0:
+            with self._lock:
+                if len(store) >= self.max_entries:
+                    store.clear()
+                store[key] = (time.monotonic() + self.ttl, value)
+        return copy.copy(value)
+
+    async def get_user(self, user_id):
+        return await self._get(self._users, user_id, _load_user)
+
+    async def get_tenant(self, tenant_id):
+        return await self._get(self._tenants, tenant_id, _load_tenant)
+
+    def invalidate_user(self, user_id) -> None:
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def invalidate_tenant(self, tenant_id) -> None:
+        with self._lock:
+            self._tenants.pop(str(tenant_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._tenants.clear()
+
+
+identity_cache = IdentityCache(ttl=settings.AUTH_IDENTITY_CACHE_TTL)
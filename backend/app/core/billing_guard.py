@@ -2,13 +2,92 @@
 Billing Guard für serverseitiges Feature-Gating
 """
 
+import threading
+import time
 from fastapi import HTTPException, status
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.utils import timezone
 
-from app.db.models import BillingAccount, UserProfile, Property, Document
+from app.db.models import BillingAccount
 from app.core.billing_config import PLAN_LIMITS, get_required_plan_for_limit
+from app.core.settings import settings
+from app.services.usage_ledger import get_usage, storage_bytes_sync
+
+
+class BillingCache:
+    """
+    Kurzlebiger In-Process-Cache der BillingAccounts (inkl. Tenant).
+
+    Änderungen am BillingAccount (Stripe-Webhooks, Admin) invalidieren den
+    Eintrag per Signal sofort in diesem Prozess; andere Worker sehen sie
+    nach spätestens ttl Sekunden. Fehlende Accounts werden ebenfalls
+    gecacht (None).
+    """
+
+    def __init__(self, ttl: int, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, Optional[BillingAccount]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(tenant_id: str) -> Optional[BillingAccount]:
+        return (
+            BillingAccount.objects.select_related("tenant")
+            .filter(tenant_id=tenant_id)
+            .first()
+        )
+
+    async def get(self, tenant_id: str) -> Optional[BillingAccount]:
+        """BillingAccount des Tenants oder None"""
+        key = str(tenant_id)
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        billing = await sync_to_async(self._load)(key)
+        if self.ttl > 0:
+            with self._lock:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+                self._entries[key] = (time.monotonic() + self.ttl, billing)
+        return billing
+
+    def invalidate(self, tenant_id) -> None:
+        with self._lock:
+            self._entries.pop(str(tenant_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+billing_cache = BillingCache(ttl=settings.BILLING_CACHE_TTL)
+
+
+def claim_trial_expired_email(billing_id) -> bool:
+    """
+    Setzt meta["trial_expired_email_sent"] auf der aktuellen DB-Zeile.
+
+    Schreibt nur meta (gecachte Instanzen können veraltet sein und würden
+    Status/Plan aus Webhooks überschreiben). True, wenn dieser Aufruf das
+    Flag gesetzt hat und die Email senden soll.
+    """
+    with transaction.atomic():
+        row = (
+            BillingAccount.objects.select_for_update()
+            .filter(pk=billing_id, status="trialing")
+            .values("meta")
+            .first()
+        )
+        meta = dict((row or {}).get("meta") or {})
+        if row is None or meta.get("trial_expired_email_sent"):
+            return False
+        meta["trial_expired_email_sent"] = True
+        BillingAccount.objects.filter(pk=billing_id).update(meta=meta)
+    return True
 
 
 class BillingGuard:
@@ -28,11 +107,8 @@ class BillingGuard:
         Raises:
             HTTPException: 402 wenn Subscription inaktiv
         """
-        try:
-            billing = await sync_to_async(
-                BillingAccount.objects.select_related("tenant").get
-            )(tenant_id=tenant_id)
-        except BillingAccount.DoesNotExist:
+        billing = await billing_cache.get(tenant_id)
+        if billing is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail={
@@ -60,13 +136,14 @@ class BillingGuard:
         # Prüfe Trial-Ablauf
         if billing.status == "trialing" and billing.trial_end:
             if timezone.now() > billing.trial_end:
-                # Email senden (falls nicht schon gesendet)
+                # Email senden (falls nicht schon gesendet); die gecachte
+                # Instanz wird nicht verändert
                 if not billing.meta.get("trial_expired_email_sent"):
-                    from app.services.email_service import EmailService
+                    if await sync_to_async(claim_trial_expired_email)(billing.pk):
+                        from app.services.email_service import EmailService
 
-                    await EmailService.send_trial_expired_email(billing.tenant)
-                    billing.meta["trial_expired_email_sent"] = True
-                    await sync_to_async(billing.save)()
+                        await EmailService.send_trial_expired_email(billing.tenant)
+                    billing_cache.invalidate(tenant_id)
 
                 raise HTTPException(
                     status_code=status.HTTP_402_PAYMENT_REQUIRED,
@@ -137,10 +214,8 @@ class BillingGuard:
         if limit == -1:
             return
 
-        # Aktuelle Anzahl zählen
-        current_count = await sync_to_async(
-            UserProfile.objects.filter(tenant_id=tenant_id, is_active=True).count
-        )()
+        # Aktuelle Anzahl aus dem Usage-Ledger
+        current_count = (await sync_to_async(get_usage)(tenant_id))["users"]
 
         # Prüfe Limit
         if current_count + additional_count > limit:
@@ -169,10 +244,8 @@ class BillingGuard:
         if limit == -1:
             return
 
-        # Aktuelle Anzahl zählen
-        current_count = await sync_to_async(
-            Property.objects.filter(tenant_id=tenant_id).count
-        )()
+        # Aktuelle Anzahl aus dem Usage-Ledger
+        current_count = (await sync_to_async(get_usage)(tenant_id))["properties"]
 
         # Prüfe Limit
         if current_count + additional_count > limit:
@@ -195,50 +268,14 @@ class BillingGuard:
         tenant_id: str, limits: dict, additional_count: int, current_plan: str
     ) -> None:
         """Prüfe Storage-Limit"""
-        from django.db.models import Sum
-        from app.db.models import Document, PropertyImage, PropertyDocument, Attachment
-
         limit_gb = limits["storage_gb"]
 
         # Unbegrenzt
         if limit_gb == -1:
             return
 
-        # Aktuelle Storage berechnen - summiere alle Dateigrößen
-        # Documents (size in bytes)
-        docs_size = await sync_to_async(
-            lambda: Document.objects.filter(tenant_id=tenant_id).aggregate(
-                total=Sum("size")
-            )["total"]
-            or 0
-        )()
-
-        # PropertyImages (size in bytes)
-        images_size = await sync_to_async(
-            lambda: PropertyImage.objects.filter(
-                property__tenant_id=tenant_id
-            ).aggregate(total=Sum("size"))["total"]
-            or 0
-        )()
-
-        # PropertyDocuments (size in bytes)
-        prop_docs_size = await sync_to_async(
-            lambda: PropertyDocument.objects.filter(
-                property__tenant_id=tenant_id
-            ).aggregate(total=Sum("size"))["total"]
-            or 0
-        )()
-
-        # Attachments (file_size in bytes, nullable)
-        attachments_size = await sync_to_async(
-            lambda: Attachment.objects.filter(tenant_id=tenant_id).aggregate(
-                total=Sum("file_size")
-            )["total"]
-            or 0
-        )()
-
-        # Gesamtsumme in Bytes, konvertiert zu MB
-        total_bytes = docs_size + images_size + prop_docs_size + attachments_size
+        # Aktueller Storage aus dem Usage-Ledger (dedupliziert, siehe StoredBlob)
+        total_bytes = (await sync_to_async(get_usage)(tenant_id))["storage_bytes"]
         current_storage_mb = total_bytes / (1024 * 1024)  # Bytes zu MB
 
         # Prüfe Limit (additional_count ist in MB)
@@ -258,6 +295,16 @@ class BillingGuard:
                 },
             )
 
+    @staticmethod
+    def get_storage_bytes(tenant_id: str) -> int:
+        """
+        Belegter Speicher in Bytes (synchron, live gezählt).
+
+        Für Limit-Prüfungen den Usage-Ledger verwenden, siehe
+        app.services.usage_ledger.
+        """
+        return storage_bytes_sync(tenant_id)
+
     @staticmethod
     async def check_feature_access(tenant_id: str, feature: str) -> bool:
         """
@@ -270,17 +317,13 @@ class BillingGuard:
         Returns:
             True wenn verfügbar, False sonst
         """
-        try:
-            billing = await sync_to_async(BillingAccount.objects.get)(
-                tenant_id=tenant_id
-            )
-
-            limits = PLAN_LIMITS[billing.plan_key]
-            return limits.get(feature, False)
-
-        except BillingAccount.DoesNotExist:
+        billing = await billing_cache.get(tenant_id)
+        if billing is None:
             return False
 
+        limits = PLAN_LIMITS[billing.plan_key]
+        return limits.get(feature, False)
+
     @staticmethod
     async def get_plan_info(tenant_id: str) -> dict:
         """
@@ -292,26 +335,20 @@ class BillingGuard:
         Returns:
             Dict mit Plan-Info
         """
-        try:
-            billing = await sync_to_async(BillingAccount.objects.get)(
-                tenant_id=tenant_id
-            )
-
-            limits = PLAN_LIMITS[billing.plan_key]
-
+        billing = await billing_cache.get(tenant_id)
+        if billing is not None:
             return {
                 "plan_key": billing.plan_key,
                 "status": billing.status,
-                "limits": limits,
+                "limits": PLAN_LIMITS[billing.plan_key],
                 "current_period_end": billing.current_period_end,
                 "cancel_at_period_end": billing.cancel_at_period_end,
             }
 
-        except BillingAccount.DoesNotExist:
-            return {
-                "plan_key": "free",
-                "status": "active",
-                "limits": PLAN_LIMITS["free"],
-                "current_period_end": None,
-                "cancel_at_period_end": False,
-            }
+        return {
+            "plan_key": "free",
+            "status": "active",
+            "limits": PLAN_LIMITS["free"],
+            "current_period_end": None,
+            "cancel_at_period_end": False,
+        }
@@ -50,8 +50,9 @@ class UnauthorizedError(Exception):
 
 class RateLimitError(Exception):
     """Rate limit error exception"""
-    def __init__(self, detail: str):
+    def __init__(self, detail: str, headers: Optional[Dict[str, str]] = None):
         self.detail = detail
+        self.headers = headers or {}
         super().__init__(detail)
 
 
@@ -0,0 +1,443 @@
+"""
+HTTP Response Middleware (pure ASGI)
+
+- CompressionMiddleware: gzip or brotli as negotiated from Accept-Encoding,
+  for compressible content types from COMPRESSION_MIN_SIZE bytes on. A
+  single-body response is compressed in one go, a streamed one chunk by
+  chunk; Server-Sent Events pass through untouched.
+- ConditionalGetMiddleware: weak ETags on GET/HEAD 200 responses, 304 for a
+  matching If-None-Match, and Cache-Control per path prefix
+  (CACHE_POLICIES). The ETag hashes the body; on tenant-versioned routes it
+  is a stamp of the tenant data version (app.core.tenant_cache) that
+  answers 304 before the endpoint runs.
+- RateLimitHeadersMiddleware: RateLimit-* headers recorded by the
+  apply_rate_limit dependency, on every response of the request.
+
+All wrap `send` instead of subclassing BaseHTTPMiddleware, so they add no
+task, no body stream and no Request object per call.
+"""
+import asyncio
+import gzip
+import hashlib
+import time
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.errors import ValidationError
+from app.core.security import security_manager
+from app.core.settings import settings
+from app.core.tenant_cache import tenant_cache
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Kept on a 304 (RFC 9110 15.4.5)
+NOT_MODIFIED_HEADERS = (b"cache-control", b"content-location", b"date", b"etag", b"expires", b"vary")
+
+
+def _header(headers: Sequence[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _set_header(headers: Headers, name: bytes, value: bytes) -> Headers:
+    result = [(key, val) for key, val in headers if key.lower() != name]
+    result.append((name, value))
+    return result
+
+
+def _add_vary(headers: Headers, token: bytes) -> Headers:
+    vary = _header(headers, b"vary")
+    if vary is None:
+        return _set_header(headers, b"vary", token)
+    present = [part.strip().lower() for part in vary.split(b",")]
+    if b"*" in present or token.lower() in present:
+        return headers
+    return _set_header(headers, b"vary", vary + b", " + token)
+
+
+def _weaken_etag(headers: Headers) -> Headers:
+    """A re-encoded body is no longer byte-identical to a strong ETag"""
+    etag = _header(headers, b"etag")
+    if etag is None or etag.startswith(b"W/"):
+        return headers
+    return _set_header(headers, b"etag", b"W/" + etag)
+
+
+def negotiate_encoding(accept_encoding: Optional[bytes]) -> Optional[str]:
+    """'br' or 'gzip' by q-value (br first on a tie), None for identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.decode("latin-1").split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for coding in ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",):
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _compressible(content_type: Optional[bytes]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    if content_type.startswith(b"text/event-stream"):
+        return False
+    return content_type.startswith(b"text/") or any(
+        kind in content_type for kind in (b"json", b"xml", b"javascript")
+    )
+
+
+class _StreamEncoder:
+    """Incremental gzip/brotli; every chunk is flushed so streams stay live"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression negotiated from Accept-Encoding"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.gzip_level = settings.GZIP_LEVEL if gzip_level is None else gzip_level
+        self.brotli_quality = settings.BROTLI_QUALITY if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(_header(scope["headers"], b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, send, encoding))
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class _CompressingSend:
+    """send() wrapper holding the response start until the body size is known"""
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.start = None
+        self.encoder: Optional[_StreamEncoder] = None
+        self.passthrough = False
+
+    def _encoded_headers(self, headers: Headers) -> Headers:
+        headers = _set_header(headers, b"content-encoding", self.encoding.encode())
+        return _weaken_etag(_add_vary(headers, b"Accept-Encoding"))
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = message.get("headers", [])
+            status = message["status"]
+            if (
+                status < 200
+                or status in (204, 304)
+                or _header(headers, b"content-encoding") is not None
+                or not _compressible(_header(headers, b"content-type"))
+            ):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = list(start.get("headers", []))
+            if not more_body:
+                if len(body) < self.middleware.minimum_size:
+                    self.passthrough = True
+                    await self.send(start)
+                    await self.send(message)
+                    return
+                compressed = self.middleware.compress(body, self.encoding)
+                headers = _set_header(headers, b"content-length", str(len(compressed)).encode())
+                await self.send({**start, "headers": self._encoded_headers(headers)})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            self.encoder = _StreamEncoder(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = [(key, val) for key, val in headers if key.lower() != b"content-length"]
+            await self.send({**start, "headers": self._encoded_headers(headers)})
+
+        if more_body:
+            chunk = self.encoder.compress(body)
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.encoder.finish(body)})
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Cache-Control for a path prefix; versioned routes get tenant-version ETags"""
+
+    cache_control: Optional[str] = None
+    versioned: bool = False
+
+
+# First matching prefix wins. "no-cache" = store, but revalidate via ETag.
+# Versioned only where the endpoint reads through tenant_cache, so its data
+# changes are exactly what bumps the version (TENANT_VERSIONED_MODELS).
+CACHE_POLICIES: Tuple[Tuple[str, CachePolicy], ...] = (
+    ("/api/v1/analytics/", CachePolicy("private, no-cache", versioned=True)),
+    ("/api/v1/cim/", CachePolicy("private, no-cache")),
+    ("/api/v1/avm/", CachePolicy("private, no-cache")),
+    ("/api/v1/plans/", CachePolicy("public, max-age=300")),
+    ("/api/v1/auth/", CachePolicy("no-store")),
+    ("/healthz", CachePolicy("no-store")),
+    ("/metrics", CachePolicy("no-store")),
+)
+
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """Weak comparison of an If-None-Match list against one ETag"""
+    if if_none_match.strip() == b"*":
+        return True
+    opaque = etag[2:] if etag.startswith(b"W/") else etag
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate.startswith(b"W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def body_etag(body: bytes) -> bytes:
+    return b'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+async def _send_not_modified(send, headers: Sequence[Tuple[bytes, bytes]]) -> None:
+    kept = [(key, val) for key, val in headers if key.lower() in NOT_MODIFIED_HEADERS]
+    await send({"type": "http.response.start", "status": 304, "headers": kept})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class ConditionalGetMiddleware:
+    """Weak ETags, If-None-Match -> 304 and per-route Cache-Control"""
+
+    def __init__(self, app, policies: Sequence[Tuple[str, CachePolicy]] = CACHE_POLICIES):
+        self.app = app
+        self.policies = tuple(policies)
+
+    def policy_for(self, path: str) -> Optional[CachePolicy]:
+        for prefix, policy in self.policies:
+            if path.startswith(prefix):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.policy_for(scope["path"])
+        if_none_match = _header(scope["headers"], b"if-none-match")
+        stamp = None
+        if policy is not None and policy.versioned:
+            stamp = await self.version_stamp(scope)
+            if stamp is not None and if_none_match and etag_matches(if_none_match, stamp):
+                headers = [(b"etag", stamp)]
+                if policy.cache_control:
+                    headers.append((b"cache-control", policy.cache_control.encode()))
+                await _send_not_modified(send, headers)
+                return
+
+        await self.app(scope, receive, _ConditionalSend(send, policy, stamp, if_none_match))
+
+    async def version_stamp(self, scope) -> Optional[bytes]:
+        """
+        ETag from tenant data version, caller and URL, or None without a
+        valid bearer token (the endpoint then answers 401 itself). The TTL
+        window bounds staleness from writes that bypass signals, as it does
+        for tenant_cache entries.
+        """
+        ttl = settings.TENANT_CACHE_TTL
+        authorization = _header(scope["headers"], b"authorization")
+        if ttl <= 0 or not authorization:
+            return None
+        scheme, _, token = authorization.decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token.strip():
+            return None
+        try:
+            claims = security_manager.verify_token(token.strip())
+        except ValidationError:
+            return None
+
+        if tenant_cache.redis_url:
+            loop = asyncio.get_running_loop()
+            version = await loop.run_in_executor(None, tenant_cache.version, claims.tenant_id)
+        else:
+            version = tenant_cache.version(claims.tenant_id)
+        stamp = "|".join(
+            (
+                claims.tenant_id,
+                claims.user_id,
+                claims.role,
+                ",".join(sorted(claims.scopes)),
+                str(version),
+                str(int(time.time() // ttl)),
+                scope["path"],
+                scope.get("query_string", b"").decode("latin-1"),
+            )
+        )
+        return body_etag(stamp.encode())
+
+
+class _ConditionalSend:
+    """send() wrapper adding Cache-Control/ETag and turning matches into 304"""
+
+    def __init__(self, send, policy: Optional[CachePolicy], stamp: Optional[bytes], if_none_match):
+        self.send = send
+        self.policy = policy
+        self.stamp = stamp
+        self.if_none_match = if_none_match
+        self.start = None
+        self.passthrough = False
+        self.discard = False
+
+    async def __call__(self, message):
+        if self.discard:
+            return
+
+        if message["type"] == "http.response.start":
+            if message["status"] != 200:
+                self.passthrough = True
+                await self.send(message)
+                return
+            headers = list(message.get("headers", []))
+            if self.policy is not None and self.policy.cache_control:
+                if _header(headers, b"cache-control") is None:
+                    headers.append((b"cache-control", self.policy.cache_control.encode()))
+            if self.stamp is not None:
+                headers = _set_header(headers, b"etag", self.stamp)
+
+            etag = _header(headers, b"etag")
+            no_store = b"no-store" in (_header(headers, b"cache-control") or b"")
+            if etag is not None and self.if_none_match and etag_matches(self.if_none_match, etag):
+                # ETag known up front (version stamp, FileResponse, handler)
+                self.discard = True
+                await _send_not_modified(self.send, headers)
+            elif etag is not None or no_store:
+                self.passthrough = True
+                await self.send({**message, "headers": headers})
+            else:
+                self.start = {**message, "headers": headers}
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        self.passthrough = True
+        body = message.get("body", b"")
+        if message.get("more_body", False) or not body:
+            # Streamed (or HEAD without body): no ETag over a partial body
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers = start["headers"] + [(b"etag", body_etag(body))]
+        if self.if_none_match and etag_matches(self.if_none_match, headers[-1][1]):
+            await _send_not_modified(self.send, headers)
+            return
+        await self.send({**start, "headers": headers})
+        await self.send(message)
+
+
+# Request state key apply_rate_limit stores the RateLimit-* headers under
+RATE_LIMIT_STATE_KEY = "rate_limit_headers"
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Adds the RateLimit-* headers of apply_rate_limit to the response.
+
+    Dependencies can only set headers on responses FastAPI builds itself;
+    this also covers endpoints that return a Response (ModelJSONResponse,
+    StreamingResponse) and 304s.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_with_headers(message):
+            rate_limit_headers = state.get(RATE_LIMIT_STATE_KEY)
+            if message["type"] == "http.response.start" and rate_limit_headers:
+                headers = list(message.get("headers", []))
+                for name, value in rate_limit_headers.items():
+                    if _header(headers, name.lower().encode()) is None:
+                        headers.append((name.lower().encode(), value.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,391 @@
+"""
+Request Instrumentation
+
+Per request (RequestMetrics, held in a ContextVar that sync_to_async copies
+into its worker thread):
+- DB queries: count and time, through a Django execute_wrapper that every
+  connection gets when it is created
+- sync_to_async: time spent queued for the executor thread ("sync-wait")
+  and time running in it, through a timed executor
+- outbound HTTP: count and time to response headers of every httpx
+  request (this includes the openai SDK)
+- stages: named spans such as avm-geo or llm, timed by `with stage(...)`
+
+InstrumentationMiddleware reports these in a Server-Timing header and one
+JSON log line per request (logger "app.requests"). It also feeds the
+per-route histograms that /metrics exposes in the Prometheus text format.
+The metrics belong to one worker process, so scrape every worker.
+"""
+import asyncio
+import bisect
+import json
+import logging
+import math
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.settings import settings
+
+logger = logging.getLogger("app.requests")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+UNROUTED = "unrouted"  # 404s and responses sent before routing (e.g. a version-stamp 304)
+
+_current: ContextVar[Optional["RequestMetrics"]] = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Counters of one request; sync threads add to them concurrently"""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.sync_calls = 0
+        self.sync_wait = 0.0
+        self.sync_seconds = 0.0
+        self.http_calls = 0
+        self.http_seconds = 0.0
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def add_sync(self, wait: float, seconds: float) -> None:
+        with self._lock:
+            self.sync_calls += 1
+            self.sync_wait += wait
+            self.sync_seconds += seconds
+
+    def add_http(self, seconds: float) -> None:
+        with self._lock:
+            self.http_calls += 1
+            self.http_seconds += seconds
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in ms, up to the response start)"""
+        parts = [
+            f"app;dur={(perf_counter() - self.started) * 1000:.1f}",
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+            f"sync-wait;dur={self.sync_wait * 1000:.1f}",
+            f'sync;dur={self.sync_seconds * 1000:.1f};desc="{self.sync_calls} calls"',
+        ]
+        if self.http_calls:
+            parts.append(f'http;dur={self.http_seconds * 1000:.1f};desc="{self.http_calls} calls"')
+        for name, seconds in self.stages.items():
+            parts.append(f"{name};dur={seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a named step of the current request (no-op outside a request)"""
+    metrics = _current.get()
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.add_stage(re.sub(r"[^A-Za-z0-9_-]", "-", name), perf_counter() - started)
+
+
+# ---------------------------------------------------------------------------
+# Prometheus text format
+# ---------------------------------------------------------------------------
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., count above last bucket, sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            pairs = [f'{key}="{_escape(value)}"' for key, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                bucket_labels = ",".join(pairs + [f'le="{_format_value(float(bound))}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{label_text} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """The histograms this worker exports on /metrics"""
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time to the end of the response body, per route",
+            ("method", "route", "status"),
+            DURATION_BUCKETS,
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries",
+            "Database queries per request, per route (N+1 shows as a shift to the right)",
+            ("method", "route"),
+            QUERY_COUNT_BUCKETS,
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_seconds",
+            "Database time per request, per route",
+            ("method", "route"),
+            DURATION_BUCKETS,
+        )
+        self.request_sync_wait = Histogram(
+            "http_request_sync_wait_seconds",
+            "Time a request waited for the sync_to_async executor, per route",
+            ("method", "route"),
+            DURATION_BUCKETS,
+        )
+        self.outbound_duration = Histogram(
+            "http_client_request_duration_seconds",
+            "Outbound httpx requests, time to response headers, per host",
+            ("host",),
+            DURATION_BUCKETS,
+        )
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, metrics: RequestMetrics) -> None:
+        self.request_duration.observe((method, route, str(status)), seconds)
+        self.request_queries.observe((method, route), metrics.db_queries)
+        self.request_db_time.observe((method, route), metrics.db_seconds)
+        self.request_sync_wait.observe((method, route), metrics.sync_wait)
+
+    def render(self, gauges: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """Exposition text; gauges = {prefix: stats dict} for point-in-time values"""
+        lines: List[str] = []
+        for histogram in (
+            self.request_duration,
+            self.request_queries,
+            self.request_db_time,
+            self.request_sync_wait,
+            self.outbound_duration,
+        ):
+            lines.extend(histogram.render())
+        for prefix, stats in (gauges or {}).items():
+            for key, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+# ---------------------------------------------------------------------------
+# Hooks
+# ---------------------------------------------------------------------------
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(perf_counter() - started)
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+class TimedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that books queue wait and run time on the submitting request"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        # Called on the event loop, inside the request's context
+        metrics = _current.get()
+        if metrics is None:
+            return super().submit(fn, *args, **kwargs)
+        submitted = perf_counter()
+
+        def timed():
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.add_sync(started - submitted, perf_counter() - started)
+
+        return super().submit(timed)
+
+
+def _record_outbound(host: str, seconds: float) -> None:
+    metrics_registry.outbound_duration.observe((host or "",), seconds)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_http(seconds)
+
+
+def _install_httpx_timing() -> None:
+    try:
+        import httpx
+    except ImportError:
+        return
+
+    async_transport = httpx.AsyncHTTPTransport
+    if getattr(async_transport.handle_async_request, "_instrumented", False):
+        return
+    original_async = async_transport.handle_async_request
+    original_sync = httpx.HTTPTransport.handle_request
+
+    async def handle_async_request(self, request):
+        started = perf_counter()
+        try:
+            return await original_async(self, request)
+        finally:
+            _record_outbound(request.url.host, perf_counter() - started)
+
+    def handle_request(self, request):
+        started = perf_counter()
+        try:
+            return original_sync(self, request)
+        finally:
+            _record_outbound(request.url.host, perf_counter() - started)
+
+    handle_async_request._instrumented = True
+    async_transport.handle_async_request = handle_async_request
+    httpx.HTTPTransport.handle_request = handle_request
+
+
+def install() -> None:
+    """Hook DB connections, the sync_to_async thread and httpx (idempotent)"""
+    from asgiref.sync import SyncToAsync
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_install_query_wrapper, dispatch_uid="app.instrumentation")
+    # The single thread all thread_sensitive sync_to_async calls share
+    executor = getattr(SyncToAsync, "single_thread_executor", None)
+    if executor is not None and not isinstance(executor, TimedExecutor):
+        SyncToAsync.single_thread_executor = TimedExecutor(
+            max_workers=1, thread_name_prefix="sync-to-async"
+        )
+    _install_httpx_timing()
+
+
+def install_default_executor() -> None:
+    """Time thread_sensitive=False calls too (run on the loop's default executor)"""
+    asyncio.get_running_loop().set_default_executor(
+        TimedExecutor(thread_name_prefix="asyncio-default")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+
+def route_label(scope) -> str:
+    """Route template (/api/v1/properties/{property_id}), never the raw path"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNROUTED
+
+
+class InstrumentationMiddleware:
+    """Server-Timing header, request log line and per-route histograms"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry, server_timing: Optional[bool] = None):
+        self.app = app
+        self.registry = registry
+        self.server_timing = settings.SERVER_TIMING if server_timing is None else server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", metrics.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            seconds = perf_counter() - metrics.started
+            route = route_label(scope)
+            self.registry.observe_request(scope["method"], route, status, seconds, metrics)
+            logger.info(
+                json.dumps(
+                    {
+                        "method": scope["method"],
+                        "route": route,
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round(seconds * 1000, 1),
+                        "db_queries": metrics.db_queries,
+                        "db_ms": round(metrics.db_seconds * 1000, 1),
+                        "sync_calls": metrics.sync_calls,
+                        "sync_wait_ms": round(metrics.sync_wait * 1000, 1),
+                        "sync_ms": round(metrics.sync_seconds * 1000, 1),
+                        "http_calls": metrics.http_calls,
+                        "http_ms": round(metrics.http_seconds * 1000, 1),
+                        "stages_ms": {name: round(s * 1000, 1) for name, s in metrics.stages.items()},
+                    }
+                )
+            )
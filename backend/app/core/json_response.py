@@ -1,19 +1,45 @@
 """
 Custom JSON Response for datetime serialization
+
+CustomJSONResponse renders with orjson when it is installed (datetime, date,
+UUID, Enum and dataclasses natively, Decimal through a small default hook)
+and falls back to json.dumps otherwise.
+
+ModelJSONResponse is the fast path for Pydantic results: FastAPI would turn
+a returned model into a dict, validate that dict against response_model
+again and run it through jsonable_encoder before json.dumps. Handlers that
+already build the exact response_model can return
+ModelJSONResponse(model) instead; pydantic-core writes the JSON bytes in one
+pass. Keep response_model on the route for the OpenAPI schema.
 """
 from fastapi.responses import JSONResponse as FastAPIJSONResponse
-from typing import Any
+from functools import lru_cache
+from typing import Any, List, Type
 import json
 from datetime import datetime, date
 from uuid import UUID
 from decimal import Decimal
 
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+    ORJSON_AVAILABLE = False
+    ORJSON_OPTIONS = 0
+
 
 class CustomJSONResponse(FastAPIJSONResponse):
     """Custom JSON Response that handles datetime, UUID, and Decimal serialization"""
-    
+
     def render(self, content: Any) -> bytes:
-        """Render content with custom JSON encoder"""
+        """Render content with orjson, or json.dumps and the custom encoder"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content, default=self.orjson_default, option=ORJSON_OPTIONS)
         return json.dumps(
             content,
             ensure_ascii=False,
@@ -22,7 +48,7 @@ class CustomJSONResponse(FastAPIJSONResponse):
             separators=(",", ":"),
             default=self.custom_json_encoder
         ).encode("utf-8")
-    
+
     @staticmethod
     def custom_json_encoder(obj: Any) -> Any:
         """Custom JSON encoder for special types"""
@@ -35,3 +61,37 @@ class CustomJSONResponse(FastAPIJSONResponse):
         elif isinstance(obj, bytes):
             return obj.decode('utf-8')
         raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    @staticmethod
+    def orjson_default(obj: Any) -> Any:
+        """Types orjson does not serialize itself"""
+        if isinstance(obj, Decimal):
+            return float(obj)
+        elif isinstance(obj, bytes):
+            return obj.decode('utf-8')
+        elif isinstance(obj, float):
+            # float subclasses (e.g. numpy.float64 without the numpy option)
+            return float(obj)
+        elif isinstance(obj, BaseModel):
+            return obj.model_dump(mode="json")
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter for List[model]; building one compiles a serializer, so keep it"""
+    return TypeAdapter(List[model])
+
+
+class ModelJSONResponse(CustomJSONResponse):
+    """Renders Pydantic models and lists of one model class with pydantic-core"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            # model_dump_json returns str; the serializer writes the bytes
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            model = type(content[0])
+            if all(type(item) is model for item in content):
+                return _list_adapter(model).dump_json(content, by_alias=True)
+        return super().render(content)
@@ -0,0 +1,64 @@
+"""
+Lazy Imports
+
+The third-party SDKs behind a few routes (Stripe, OpenAI, boto3, reportlab,
+Qdrant, Google auth) take hundreds of milliseconds and tens of megabytes to
+import. All routers are registered at startup, so importing them eagerly
+loaded every SDK into every worker, including workers that only serve CRUD
+traffic. Services bind such SDKs with lazy_module() or import them inside
+the function that uses them. The SDK then loads on the first request that
+needs it.
+
+tests/test_startup_imports.py checks that `import app.main` loads none of
+HEAVY_MODULES.
+"""
+import importlib
+import types
+
+# Must not be imported by `import app.main`
+HEAVY_MODULES = (
+    "boto3",
+    "botocore",
+    "stripe",
+    "openai",
+    "reportlab",
+    "googlemaps",
+    "qdrant_client",
+    "googleapiclient",
+    "google.oauth2",
+    "google.auth",
+)
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        # e.g. stripe.api_key = ... must configure the real module
+        setattr(self._load(), name, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """`stripe = lazy_module("stripe")` instead of `import stripe`"""
+    return LazyModule(name)
@@ -0,0 +1,110 @@
+"""
+Password Hashing Pool
+
+Password hashers (PBKDF2, bcrypt, Argon2) burn 100+ ms of CPU by design.
+Run through sync_to_async they occupy the one thread all thread-sensitive
+ORM calls of a worker share, so a burst of logins stalls every request.
+HashingPool runs such jobs on its own bounded set of threads instead
+(hashlib and bcrypt release the GIL while hashing) and refuses work
+beyond a queue limit, so a login storm gets fast 429s instead of growing
+an unbounded backlog.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core.errors import RateLimitError
+from app.core.settings import settings
+
+
+class HashingPool:
+    """Bounded executor for CPU-heavy auth work with queue metrics"""
+
+    def __init__(self, workers: int = 4, max_queue: int = 64, name: str = "password-hash"):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _call(self, job: Dict[str, Any], func: Callable, args, kwargs) -> Any:
+        started = time.perf_counter()
+        wait = started - job["enqueued_at"]
+        with self._lock:
+            if job["cancelled"]:
+                return None
+            job["started"] = True
+            self._queued -= 1
+            self._running += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_total += time.perf_counter() - started
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func in the pool; raises RateLimitError (429) when max_queue
+        jobs are already waiting.
+        """
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise RateLimitError(
+                    "Too many sign-in attempts in progress. Try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._queued += 1
+        job = {"enqueued_at": time.perf_counter(), "started": False, "cancelled": False}
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._call, job, func, args, kwargs
+            )
+        except asyncio.CancelledError:
+            # Client went away while waiting: drop the job from the queue
+            with self._lock:
+                if not job["started"]:
+                    job["cancelled"] = True
+                    self._queued -= 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, utilisation and timing since start"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 2) if completed else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+password_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1),
+    max_queue=settings.PASSWORD_HASH_QUEUE,
+)
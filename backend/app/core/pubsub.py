@@ -0,0 +1,155 @@
+"""
+Pub/Sub Module
+
+In-process publish/subscribe for server-push channels (SSE, WebSockets).
+With REDIS_URL set, messages are fanned out through Redis so subscribers on
+every worker receive them; otherwise delivery stays within this process.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+CHANNEL_PREFIX = "immonow:pubsub:"
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class PubSub:
+    """Channel-based broker; each subscriber gets its own bounded queue"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url if REDIS_AVAILABLE else None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis = None
+        self._redis_sync = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Bind to the running loop and start the Redis listener if configured"""
+        self._loop = asyncio.get_running_loop()
+        if self.redis_url and self._listener is None:
+            self._redis = aioredis.from_url(self.redis_url)
+            self._listener = asyncio.create_task(self._listen())
+            logger.info("Pub/sub fan-out via Redis enabled")
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        """Subscribe for the lifetime of the context (e.g. one SSE stream)"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[channel].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        return len(self._subscribers.get(channel, ()))
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Publish from async code"""
+        if self._redis:
+            try:
+                await self._redis.publish(
+                    CHANNEL_PREFIX + channel, json.dumps(message, default=str)
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Pub/sub publish to Redis failed: {e}")
+        else:
+            self._dispatch(channel, message)
+
+    def publish_sync(self, channel: str, message: Dict[str, Any]) -> None:
+        """Publish from sync code (Django signals, sync_to_async threads, Celery)"""
+        if self.redis_url:
+            if self._redis_sync is None:
+                self._redis_sync = redis.Redis.from_url(self.redis_url)
+            try:
+                self._redis_sync.publish(
+                    CHANNEL_PREFIX + channel, json.dumps(message, default=str)
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Pub/sub publish to Redis failed: {e}")
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, channel, message)
+
+    def publish_many_sync(self, messages: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Publish a batch from sync code in one Redis round trip"""
+        if not messages:
+            return
+        if self.redis_url:
+            if self._redis_sync is None:
+                self._redis_sync = redis.Redis.from_url(self.redis_url)
+            try:
+                pipe = self._redis_sync.pipeline(transaction=False)
+                for channel, message in messages:
+                    pipe.publish(CHANNEL_PREFIX + channel, json.dumps(message, default=str))
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Pub/sub publish to Redis failed: {e}")
+        elif self._loop is not None and not self._loop.is_closed():
+            for channel, message in messages:
+                self._loop.call_soon_threadsafe(self._dispatch, channel, message)
+
+    def _dispatch(self, channel: str, message: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop the oldest message rather than block
+                queue.get_nowait()
+                queue.put_nowait(message)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                async for item in pubsub.listen():
+                    if item.get("type") != "pmessage":
+                        continue
+                    channel = item["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    channel = channel[len(CHANNEL_PREFIX):]
+                    if channel in self._subscribers:
+                        self._dispatch(channel, json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pub/sub Redis listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+
+# Global broker
+pubsub = PubSub(settings.REDIS_URL)
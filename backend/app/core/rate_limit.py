@@ -1,56 +1,52 @@
 """
 Rate Limiting Module
+
+API request limits per tenant:user. With REDIS_URL set the quota is shared
+by all workers (one atomic Lua call per request); otherwise it is kept per
+process. See app.core.rate_limit_backends for the algorithm.
 """
-import time
-from typing import Dict, Optional
-from collections import defaultdict, deque
-from threading import Lock
+from typing import Optional
 
 from app.core.settings import settings
 from app.core.errors import RateLimitError
+from app.core.rate_limit_backends import RateLimitBackend, RateLimitResult, create_backend
 
 
 class RateLimiter:
-    """Simple in-memory rate limiter"""
-    
-    def __init__(self):
-        self.requests: Dict[str, deque] = defaultdict(deque)
-        self.lock = Lock()
-        self.max_requests = settings.RATE_LIMIT_REQUESTS
-        self.window_seconds = settings.RATE_LIMIT_WINDOW
-    
+    """Applies the configured request limit through a rate-limit backend"""
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        max_requests: Optional[int] = None,
+        window_seconds: Optional[int] = None,
+    ):
+        self.backend = backend or create_backend(settings.REDIS_URL)
+        self.max_requests = max_requests or settings.RATE_LIMIT_REQUESTS
+        self.window_seconds = window_seconds or settings.RATE_LIMIT_WINDOW
+
+    def hit(self, key: str, cost: int = 1) -> RateLimitResult:
+        """Count a request for key and return the quota state"""
+        return self.backend.hit(key, self.max_requests, self.window_seconds, cost)
+
     def is_allowed(self, key: str) -> bool:
-        """Check if request is allowed for given key"""
-        current_time = time.time()
-        
-        with self.lock:
-            # Clean old requests
-            while self.requests[key] and self.requests[key][0] <= current_time - self.window_seconds:
-                self.requests[key].popleft()
-            
-            # Check if under limit
-            if len(self.requests[key]) < self.max_requests:
-                self.requests[key].append(current_time)
-                return True
-            
-            return False
-    
-    def get_retry_after(self, key: str) -> int:
-        """Get retry after seconds for given key"""
-        if not self.requests[key]:
-            return 0
-        
-        oldest_request = self.requests[key][0]
-        retry_after = int(oldest_request + self.window_seconds - time.time())
-        return max(0, retry_after)
+        """Check if request is allowed for given key (counts it if so)"""
+        return self.hit(key).allowed
+
+    def reset(self, key: str) -> None:
+        self.backend.reset(key)
 
 
 # Global rate limiter
 rate_limiter = RateLimiter()
 
 
-def check_rate_limit(key: str) -> None:
+def check_rate_limit(key: str) -> RateLimitResult:
     """Check rate limit and raise exception if exceeded"""
-    if not rate_limiter.is_allowed(key):
-        retry_after = rate_limiter.get_retry_after(key)
-        raise RateLimitError(f"Rate limit exceeded. Try again in {retry_after} seconds")
+    result = rate_limiter.hit(key)
+    if not result.allowed:
+        raise RateLimitError(
+            f"Rate limit exceeded. Try again in {result.headers()['Retry-After']} seconds",
+            headers=result.headers(),
+        )
+    return result
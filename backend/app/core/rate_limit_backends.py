@@ -0,0 +1,188 @@
+"""
+Rate Limit Backends
+
+GCRA (generic cell rate algorithm) limiters behind one interface. A key's
+whole state is its theoretical arrival time (TAT): each request moves it
+`window / limit` seconds ahead and is refused while that would put it more
+than one window in the future. This admits bursts of up to `limit` and the
+same long-run rate as a sliding window, in O(1) memory per key.
+
+- MemoryRateLimitBackend: per process, idle keys are evicted
+- RedisRateLimitBackend: shared by all workers, one atomic Lua call per request
+"""
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+KEY_PREFIX = "immonow:ratelimit:"
+MAX_KEYS = 100_000
+EVICT_PER_HIT = 2
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one hit, with what the RateLimit-* headers report"""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset_after", "retry_after", "window")
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the full quota is available again
+    retry_after: float  # seconds until the next request is allowed (0 if allowed)
+    window: int
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+            "RateLimit-Policy": f"{self.limit};w={self.window}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def gcra_result(
+    allowed: bool, limit: int, window: int, since_allow: float, until_reset: float
+) -> RateLimitResult:
+    """
+    Build a result from the GCRA state: `since_allow` is now - allow_at
+    (negative when refused), `until_reset` is TAT - now.
+    """
+    interval = window / limit
+    if allowed:
+        remaining = min(limit - 1, int(since_allow / interval + 1e-9))
+        return RateLimitResult(True, limit, remaining, max(0.0, until_reset), 0.0, window)
+    return RateLimitResult(False, limit, 0, max(0.0, until_reset), -since_allow, window)
+
+
+class RateLimitBackend(ABC):
+    """Counts requests per key against `limit` per `window` seconds"""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window: int, cost: int = 1) -> RateLimitResult:
+        """Record a request of `cost` units if the quota allows it"""
+
+    def reset(self, key: str) -> None:
+        """Forget a key (tests, admin unblock)"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process GCRA; keys are kept in LRU order and dropped once idle"""
+
+    def __init__(self, max_keys: int = MAX_KEYS, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def hit(self, key: str, limit: int, window: int, cost: int = 1) -> RateLimitResult:
+        interval = window / limit
+        tats = self._tats
+        with self._lock:
+            now = self.clock()
+            tat = tats.pop(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + interval * cost
+            allow_at = new_tat - window
+
+            if now < allow_at:
+                tats[key] = tat
+                return RateLimitResult(False, limit, 0, tat - now, allow_at - now, window)
+
+            # Re-inserted at the end: least recently hit keys come first, and
+            # a TAT in the past means a full quota, the same as no entry
+            tats[key] = new_tat
+            for _ in range(EVICT_PER_HIT):
+                oldest = next(iter(tats))
+                if tats[oldest] > now and len(tats) <= self.max_keys:
+                    break
+                del tats[oldest]
+
+        remaining = int((now - allow_at) / interval + 1e-9)
+        return RateLimitResult(True, limit, remaining, new_tat - now, 0.0, window)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._tats.pop(key, None)
+
+
+# Timestamps come from the Redis server so all workers share one clock.
+# Floats are returned as strings: Lua numbers are truncated to integers.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + interval * cost
+local allow_at = new_tat - window
+
+if now < allow_at then
+    return {0, tostring(now - allow_at), tostring(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(now - allow_at), tostring(new_tat - now)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    GCRA in Redis: one EVALSHA per request, keys expire when their quota is
+    full again. Falls back to a per-process limiter while Redis is down.
+    """
+
+    def __init__(self, redis_url: str, fallback: Optional[RateLimitBackend] = None):
+        self.client = redis.Redis.from_url(redis_url)
+        self.script = self.client.register_script(GCRA_SCRIPT)
+        self.fallback = fallback or MemoryRateLimitBackend()
+
+    def hit(self, key: str, limit: int, window: int, cost: int = 1) -> RateLimitResult:
+        try:
+            allowed, since_allow, until_reset = self.script(
+                keys=[KEY_PREFIX + key], args=[window / limit, window, cost]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Redis rate limiting unavailable, limiting per process: {e}")
+            return self.fallback.hit(key, limit, window, cost)
+        return gcra_result(
+            bool(allowed), limit, window, float(since_allow), float(until_reset)
+        )
+
+    def reset(self, key: str) -> None:
+        self.client.delete(KEY_PREFIX + key)
+        self.fallback.reset(key)
+
+
+def create_backend(redis_url: Optional[str] = None) -> RateLimitBackend:
+    """Redis backend when configured and installed, otherwise per process"""
+    if redis_url and REDIS_AVAILABLE:
+        logger.info("Using Redis for distributed rate limiting")
+        return RedisRateLimitBackend(redis_url)
+    return MemoryRateLimitBackend()
@@ -4,10 +4,11 @@ Security and Authentication Module
 import jwt
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 
+from app.core.auth_cache import VerifiedTokenCache
 from app.core.settings import settings
 from app.core.errors import ValidationError, ForbiddenError
 
@@ -28,6 +29,7 @@ class SecurityManager:
         self.secret_key = settings.JWT_SECRET_KEY
         self.algorithm = settings.JWT_ALGORITHM
         self.access_token_expire_minutes = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+        self.token_cache = VerifiedTokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
     
     def create_access_token(self, data: Dict[str, Any]) -> str:
         """Create JWT access token"""
@@ -39,7 +41,10 @@ class SecurityManager:
         return encoded_jwt
     
     def verify_token(self, token: str) -> TokenData:
-        """Verify and decode JWT token"""
+        """Verify and decode JWT token (verified tokens are cached until exp)"""
+        cached = self.token_cache.get(token)
+        if cached is not None:
+            return cached
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             user_id: str = payload.get("sub")
@@ -51,7 +56,7 @@ class SecurityManager:
             if user_id is None or email is None or role is None or tenant_id is None:
                 raise ValidationError("Invalid token payload")
             
-            return TokenData(
+            token_data = TokenData(
                 user_id=user_id,
                 email=email,
                 role=role,
@@ -63,18 +68,33 @@ class SecurityManager:
         except jwt.InvalidTokenError:
             raise ValidationError("Invalid token")
 
+        self.token_cache.put(token, payload.get("exp"), token_data)
+        return token_data
+
 
 # Global security manager
 security_manager = SecurityManager()
 
 # HTTP Bearer scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
 
+async def get_current_user(
+    request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenData:
+    """
+    Get current authenticated user from JWT token
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
-    """Get current authenticated user from JWT token"""
+    Resolved once per request and kept in request.state.auth for code
+    outside the dependency graph.
+    """
+    token_data = getattr(request.state, "auth", None)
+    if token_data is not None:
+        return token_data
     try:
         token_data = security_manager.verify_token(credentials.credentials)
+        request.state.auth = token_data
         return token_data
     except ValidationError as e:
         raise HTTPException(
@@ -84,9 +104,31 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
 
 
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    token: Optional[str] = Query(None, description="JWT for clients that cannot set headers (EventSource, WebSocket)"),
+) -> TokenData:
+    """Authenticate push channels via Authorization header or ?token= query parameter"""
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return security_manager.verify_token(raw_token)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 def require_scope(required_scope: str):
     """Dependency to require specific scope"""
-    def scope_checker(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    async def scope_checker(current_user: TokenData = Depends(get_current_user)) -> TokenData:
         if required_scope not in current_user.scopes:
             raise ForbiddenError(f"Insufficient permissions. Required scope: {required_scope}")
         return current_user
@@ -95,13 +137,13 @@ def require_scope(required_scope: str):
 
 def require_role(required_role: str):
     """Dependency to require specific role"""
-    def role_checker(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    async def role_checker(current_user: TokenData = Depends(get_current_user)) -> TokenData:
         if current_user.role != required_role and current_user.role != "admin":
             raise ForbiddenError(f"Insufficient permissions. Required role: {required_role}")
         return current_user
     return role_checker
 
 
-def get_tenant_id(current_user: TokenData = Depends(get_current_user)) -> str:
+async def get_tenant_id(current_user: TokenData = Depends(get_current_user)) -> str:
     """Get tenant ID from authenticated user"""
     return current_user.tenant_id
@@ -35,6 +35,18 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(
         default=480, env="JWT_ACCESS_TOKEN_EXPIRE_MINUTES"
     )  # 8 hours
+    AUTH_TOKEN_CACHE_SIZE: int = Field(
+        default=10000, env="AUTH_TOKEN_CACHE_SIZE"
+    )  # verified tokens kept per process; 0 disables the cache
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=0, env="PASSWORD_HASH_WORKERS"
+    )  # threads hashing passwords; 0 = one per CPU core, at most 4
+    PASSWORD_HASH_QUEUE: int = Field(
+        default=64, env="PASSWORD_HASH_QUEUE"
+    )  # waiting logins beyond this get 429; 0 = unbounded
+    AUTH_IDENTITY_CACHE_TTL: int = Field(
+        default=30, env="AUTH_IDENTITY_CACHE_TTL"
+    )  # seconds users/tenants from token lookups are cached
 
     # CORS
     CORS_ORIGINS: str = Field(default="http://localhost:3000", env="CORS_ORIGINS")
@@ -47,6 +59,52 @@ class Settings(BaseSettings):
     AWS_S3_BUCKET: Optional[str] = Field(default=None, env="AWS_S3_BUCKET")
     AWS_S3_REGION: str = Field(default="eu-central-1", env="AWS_S3_REGION")
     MAX_FILE_SIZE: int = Field(default=50 * 1024 * 1024, env="MAX_FILE_SIZE")  # 50MB
+    UPLOAD_CHUNK_SIZE: int = Field(default=1024 * 1024, env="UPLOAD_CHUNK_SIZE")  # 1MB
+    UPLOAD_TEMP_DIR: Optional[str] = Field(default=None, env="UPLOAD_TEMP_DIR")
+    S3_MULTIPART_THRESHOLD: int = Field(
+        default=8 * 1024 * 1024, env="S3_MULTIPART_THRESHOLD"
+    )  # 8MB
+    S3_MULTIPART_CHUNKSIZE: int = Field(
+        default=8 * 1024 * 1024, env="S3_MULTIPART_CHUNKSIZE"
+    )  # 8MB
+    S3_MAX_CONCURRENCY: int = Field(
+        default=4, env="S3_MAX_CONCURRENCY"
+    )  # parts per upload
+    S3_MAX_PARALLEL_UPLOADS: int = Field(
+        default=4, env="S3_MAX_PARALLEL_UPLOADS"
+    )  # uploads per worker
+    BLOB_GC_GRACE_MINUTES: int = Field(
+        default=15, env="BLOB_GC_GRACE_MINUTES"
+    )  # unreferenced blobs younger than this are kept
+    IMAGE_PIPELINE_WORKERS: int = Field(
+        default=0, env="IMAGE_PIPELINE_WORKERS"
+    )  # 0 = one process per CPU core
+    IMAGE_VARIANT_QUALITY: int = Field(default=80, env="IMAGE_VARIANT_QUALITY")
+
+    # Notifications
+    NOTIFICATION_DIGEST_MINUTES: int = Field(
+        default=15, env="NOTIFICATION_DIGEST_MINUTES"
+    )  # similar events within this window are merged
+    NOTIFICATION_READ_RETENTION_DAYS: int = Field(
+        default=30, env="NOTIFICATION_READ_RETENTION_DAYS"
+    )
+
+    # Per-tenant result cache (analytics); 0 disables it
+    TENANT_CACHE_TTL: int = Field(default=30, env="TENANT_CACHE_TTL")  # seconds
+    # Billing accounts per process (plan/status for limit checks); 0 disables it
+    BILLING_CACHE_TTL: int = Field(default=30, env="BILLING_CACHE_TTL")  # seconds
+
+    # Response compression (gzip/brotli) and conditional GET
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")  # bytes
+    GZIP_LEVEL: int = Field(default=6, env="GZIP_LEVEL")
+    BROTLI_QUALITY: int = Field(default=4, env="BROTLI_QUALITY")
+
+    # Request instrumentation (Server-Timing header, /metrics)
+    # Server-Timing exposes per-request DB/backend timings to clients: opt in
+    SERVER_TIMING: bool = Field(default=False, env="SERVER_TIMING")
+    METRICS_TOKEN: Optional[str] = Field(
+        default=None, env="METRICS_TOKEN"
+    )  # /metrics is only served with this set, to "Authorization: Bearer <token>"
 
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
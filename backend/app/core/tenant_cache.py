@@ -0,0 +1,107 @@
+"""
+Tenant Result Cache
+
+Short-lived per-tenant cache for expensive read results (dashboards,
+analytics). Entries are keyed on a tenant data version that model writes
+bump, so a write invalidates everything cached for its tenant at once; the
+TTL only bounds staleness from writes that bypass signals (queryset.update).
+With REDIS_URL set the version lives in Redis and bumps reach all workers.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+VERSION_KEY_PREFIX = "immonow:tenant_version:"
+MAX_ENTRIES = 2048
+
+
+class TenantResultCache:
+    """In-process TTL cache whose entries die with the tenant data version"""
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_entries: int = MAX_ENTRIES,
+        redis_url: Optional[str] = None,
+    ):
+        self.ttl = ttl if ttl is not None else settings.TENANT_CACHE_TTL
+        self.max_entries = max_entries
+        self.redis_url = redis_url if REDIS_AVAILABLE else None
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, Any]]" = OrderedDict()
+        self._versions: dict = {}
+        self._lock = threading.Lock()
+        self._redis = None
+
+    def _client(self):
+        if self.redis_url and self._redis is None:
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def version(self, tenant_id) -> int:
+        tenant_id = str(tenant_id)
+        client = self._client()
+        if client is not None:
+            try:
+                return int(client.get(VERSION_KEY_PREFIX + tenant_id) or 0)
+            except redis.RedisError as e:
+                logger.warning(f"Tenant version read failed, using local version: {e}")
+        return self._versions.get(tenant_id, 0)
+
+    def bump(self, tenant_id) -> None:
+        """Invalidate all cached results of a tenant"""
+        tenant_id = str(tenant_id)
+        with self._lock:
+            self._versions[tenant_id] = self._versions.get(tenant_id, 0) + 1
+        client = self._client()
+        if client is not None:
+            try:
+                client.incr(VERSION_KEY_PREFIX + tenant_id)
+            except redis.RedisError as e:
+                logger.warning(f"Tenant version bump failed: {e}")
+
+    def get_or_compute(self, tenant_id, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for (tenant, key) or the freshly computed one (sync; call in a worker thread)"""
+        if self.ttl <= 0:
+            return compute()
+
+        cache_key = (str(tenant_id), key)
+        # Version read before computing: a write racing the computation
+        # bumps past it, so the stored result is never served as current
+        version = self.version(tenant_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(cache_key)
+                return entry[2]
+
+        value = compute()
+
+        with self._lock:
+            self._entries[cache_key] = (version, now + self.ttl, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance
+tenant_cache = TenantResultCache(redis_url=settings.REDIS_URL)
@@ -15,10 +15,13 @@ from django.utils import timezone
 # Import new auth models
 from .tenant import Tenant
 from .user import User, TenantUser, UserManager
-from .notification import Notification, NotificationPreference
-from .billing import BillingAccount, StripeWebhookEvent
+from .notification import Notification, NotificationPreference, NotificationCounter
+from .billing import BillingAccount, StripeWebhookEvent, TenantUsage, TenantUsageDaily
 from .location import LocationMarketData
 from .document_activity import DocumentActivity, DocumentComment
+from .storage import StoredBlob
+from .analytics import KpiDailyRollup
+from .contact_activity import TaskContact, ContactActivity
 from .investor import (
     InvestorPortfolio,
     Investment,
@@ -44,6 +47,10 @@ __all__ = [
     "DocumentVersion",
     "DocumentActivity",
     "DocumentComment",
+    "StoredBlob",
+    "KpiDailyRollup",
+    "TaskContact",
+    "ContactActivity",
     "LocationMarketData",
     "SocialAccount",
     "SocialPost",
@@ -76,8 +83,11 @@ __all__ = [
     "AuditLog",
     "Notification",
     "NotificationPreference",
+    "NotificationCounter",
     "BillingAccount",
     "StripeWebhookEvent",
+    "TenantUsage",
+    "TenantUsageDaily",
     "Team",
     "Channel",
     "ChannelMembership",
@@ -244,6 +254,9 @@ class Document(models.Model):
     folder = models.ForeignKey(
         DocumentFolder, on_delete=models.SET_NULL, blank=True, null=True
     )
+    blob = models.ForeignKey(
+        StoredBlob, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
 
     class Meta:
         db_table = "documents"
@@ -273,6 +286,9 @@ class DocumentVersion(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     change_notes = models.TextField(blank=True, null=True)
+    blob = models.ForeignKey(
+        StoredBlob, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
 
     class Meta:
         db_table = "document_versions"
@@ -602,6 +618,9 @@ class Task(models.Model):
     )
     tags = models.JSONField(default=list, blank=True)
     labels = models.ManyToManyField("TaskLabel", related_name="tasks", blank=True)
+    contacts = models.ManyToManyField(
+        "Contact", through="TaskContact", related_name="tasks", blank=True
+    )
     property_id = models.UUIDField(blank=True, null=True)
     financing_status = models.CharField(max_length=50, blank=True, null=True)
     story_points = models.IntegerField(
@@ -973,6 +992,9 @@ class PropertyImage(models.Model):
     file = models.FileField(upload_to="properties/images/%Y/%m/", blank=True, null=True)
     url = models.URLField(blank=True, null=True)
     thumbnail_url = models.URLField(blank=True, null=True)
+    variants = models.JSONField(
+        default=list, blank=True, help_text="Resized/re-encoded derivatives"
+    )
     alt_text = models.CharField(max_length=255, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
@@ -982,6 +1004,9 @@ class PropertyImage(models.Model):
     uploaded_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True
     )
+    blob = models.ForeignKey(
+        StoredBlob, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
 
     class Meta:
         db_table = "property_images"
@@ -1022,6 +1047,9 @@ class PropertyDocument(models.Model):
     uploaded_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True
     )
+    blob = models.ForeignKey(
+        StoredBlob, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
 
     class Meta:
         db_table = "property_documents"
@@ -1084,6 +1112,9 @@ class Contact(models.Model):
     lead_score_details = models.JSONField(
         default=dict, blank=True, help_text="Detailed lead score breakdown and signals"
     )
+    lead_score_dirty = models.BooleanField(
+        default=True, help_text="Score inputs changed since the last rescoring run"
+    )
     last_contact = models.DateTimeField(blank=True, null=True)
 
     # Additional information fields
@@ -1107,6 +1138,7 @@ class Contact(models.Model):
         indexes = [
             models.Index(fields=["tenant", "status"]),
             models.Index(fields=["tenant", "lead_score"]),
+            models.Index(fields=["lead_score_dirty"]),
             models.Index(fields=["tenant", "created_at"]),
             models.Index(fields=["tenant", "priority"]),
             models.Index(fields=["tenant", "category"]),
@@ -1434,6 +1466,11 @@ class PropertyMetrics(models.Model):
         default=0, help_text="Average view duration in seconds"
     )
 
+    # Sums of the daily series over the last 30 days (set at sync time)
+    views_30d = models.IntegerField(default=0)
+    inquiries_30d = models.IntegerField(default=0)
+    favorites_30d = models.IntegerField(default=0)
+
     # Timestamps
     last_synced_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1446,6 +1483,8 @@ class PropertyMetrics(models.Model):
             models.Index(fields=["total_views"]),
             models.Index(fields=["total_inquiries"]),
             models.Index(fields=["last_synced_at"]),
+            models.Index(fields=["views_30d"]),
+            models.Index(fields=["inquiries_30d"]),
         ]
 
     def __str__(self):
@@ -1491,6 +1530,14 @@ class PropertyMetricsSnapshot(models.Model):
     immowelt_views = models.IntegerField(default=0)
     immowelt_inquiries = models.IntegerField(default=0)
 
+    # Daily change of the cumulative values above (chart series)
+    daily_views = models.IntegerField(default=0)
+    daily_inquiries = models.IntegerField(default=0)
+    daily_favorites = models.IntegerField(default=0)
+    estimated = models.BooleanField(
+        default=False, help_text="Interpolated for a day without a sync"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -1625,6 +1672,7 @@ class Message(models.Model):
             models.Index(fields=["tenant", "channel"]),
             models.Index(fields=["tenant", "parent"]),
             models.Index(fields=["tenant", "created_at"]),
+            models.Index(fields=["channel", "created_at"]),
         ]
         ordering = ["created_at"]
 
@@ -1672,6 +1720,9 @@ class Attachment(models.Model):
     file_type = models.CharField(max_length=100, blank=True, null=True)
     file_size = models.IntegerField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    blob = models.ForeignKey(
+        StoredBlob, on_delete=models.SET_NULL, blank=True, null=True, related_name="+"
+    )
 
     class Meta:
         db_table = "attachments"
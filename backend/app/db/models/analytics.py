@@ -0,0 +1,59 @@
+"""
+KPI Rollup Model
+Vorberechnete Tageswerte pro Tenant für das KPI-Dashboard
+"""
+
+import uuid
+from django.db import models
+
+
+class KpiDailyRollup(models.Model):
+    """
+    Daily KPI counters of one tenant.
+
+    Rows for past days are rebuilt by the nightly compaction job
+    (app.tasks.kpi_rollups); the current day is computed live and added
+    on read, see app.services.kpi_rollups.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        "Tenant", on_delete=models.CASCADE, related_name="kpi_rollups"
+    )
+    day = models.DateField()
+
+    # Contacts by creation day (status/lead score as of compaction)
+    contacts_new = models.PositiveIntegerField(default=0)
+    contacts_customer = models.PositiveIntegerField(default=0)
+    contacts_qualified = models.PositiveIntegerField(default=0)
+
+    # Appointments by start day
+    appointments_total = models.PositiveIntegerField(default=0)
+    appointments_completed = models.PositiveIntegerField(default=0)
+
+    # Properties by creation day
+    properties_new = models.PositiveIntegerField(default=0)
+    properties_offer = models.PositiveIntegerField(default=0)
+    properties_closed = models.PositiveIntegerField(default=0)
+
+    # Closes by close day (days from listing to close)
+    sales_closed = models.PositiveIntegerField(default=0)
+    sales_days_total = models.PositiveIntegerField(default=0)
+    rentals_closed = models.PositiveIntegerField(default=0)
+    rentals_days_total = models.PositiveIntegerField(default=0)
+    close_days_min = models.PositiveIntegerField(null=True, blank=True)
+    close_days_max = models.PositiveIntegerField(null=True, blank=True)
+
+    # Tasks by creation day
+    tasks_new = models.PositiveIntegerField(default=0)
+    tasks_done = models.PositiveIntegerField(default=0)
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "kpi_daily_rollups"
+        unique_together = [("tenant", "day")]
+        ordering = ["day"]
+
+    def __str__(self):
+        return f"KPI rollup {self.tenant_id} {self.day}"
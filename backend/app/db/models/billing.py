@@ -96,3 +96,56 @@ class StripeWebhookEvent(models.Model):
     def __str__(self):
         return f"Stripe Event: {self.event_type} ({self.event_id})"
 
+
+
+class TenantUsage(models.Model):
+    """
+    Verbrauchs-Ledger pro Tenant für die Plan-Limits.
+
+    Die Zähler werden von Signals (app.signals) in derselben Transaktion wie
+    der auslösende Schreibzugriff per F()-Update fortgeschrieben, siehe
+    app.services.usage_ledger. storage_bytes zählt Blobs mit Referenzen
+    einmal plus Dateien ohne Blob, wie BillingGuard.get_storage_bytes.
+    """
+
+    tenant = models.OneToOneField(
+        Tenant, on_delete=models.CASCADE, primary_key=True, related_name='usage'
+    )
+    users = models.IntegerField(default=0)  # aktive UserProfiles
+    properties = models.IntegerField(default=0)
+    storage_bytes = models.BigIntegerField(default=0)
+
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tenant_usage'
+
+    def __str__(self):
+        return f"Usage {self.tenant_id}: {self.users} users, {self.properties} properties"
+
+
+class TenantUsageDaily(models.Model):
+    """
+    Tägliche Verbrauchs-Historie pro Tenant.
+
+    Ein Job schreibt den Ledger-Stand nur, wenn er sich seit der letzten
+    Zeile geändert hat; Tage ohne Zeile haben den Wert des Vortags (siehe
+    app.services.usage_history).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='usage_history')
+    day = models.DateField()
+    users = models.IntegerField(default=0)
+    properties = models.IntegerField(default=0)
+    storage_bytes = models.BigIntegerField(default=0)
+    recorded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tenant_usage_daily'
+        unique_together = [('tenant', 'day')]
+        ordering = ['day']
+
+    def __str__(self):
+        return f"Usage {self.tenant_id} {self.day}"
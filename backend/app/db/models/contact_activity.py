@@ -0,0 +1,87 @@
+"""
+Contact Activity Models
+Verknüpfung Aufgaben ↔ Kontakte und einheitliche Aktivitäts-Timeline pro Kontakt
+"""
+
+import uuid
+from django.db import models
+
+
+class TaskContact(models.Model):
+    """Link between a task and a contact (kept in sync with "contact:<id>" task tags)"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        "Tenant", on_delete=models.CASCADE, related_name="task_contacts"
+    )
+    task = models.ForeignKey(
+        "Task", on_delete=models.CASCADE, related_name="contact_links"
+    )
+    contact = models.ForeignKey(
+        "Contact", on_delete=models.CASCADE, related_name="task_links"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "task_contacts"
+        unique_together = [["task", "contact"]]
+
+    def __str__(self):
+        return f"{self.task_id} ↔ {self.contact_id}"
+
+
+class ContactActivity(models.Model):
+    """
+    One entry of a contact's activity timeline.
+
+    Rows are derived from appointments and linked tasks (source + source_id,
+    maintained by signals) or logged directly for emails, calls and notes.
+    Read newest first via the (contact, occurred_at, id) index.
+    """
+
+    SOURCE_CHOICES = [
+        ("appointment", "Appointment"),
+        ("task", "Task"),
+        ("email", "Email"),
+        ("call", "Call"),
+        ("note", "Note"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        "Tenant", on_delete=models.CASCADE, related_name="contact_activities"
+    )
+    contact = models.ForeignKey(
+        "Contact", on_delete=models.CASCADE, related_name="activities"
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    source_id = models.UUIDField(blank=True, null=True)
+
+    # Activity type as used by lead scoring (appointment type, "task", "email", ...)
+    type = models.CharField(max_length=50)
+    status = models.CharField(max_length=50, blank=True, default="")
+    title = models.CharField(max_length=255, blank=True, default="")
+    description = models.TextField(blank=True, null=True)
+
+    occurred_at = models.DateTimeField()
+    scheduled_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_by = models.ForeignKey(
+        "User", on_delete=models.SET_NULL, blank=True, null=True
+    )
+
+    class Meta:
+        db_table = "contact_activities"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "source_id", "contact"],
+                name="contact_activity_source_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["contact", "-occurred_at", "-id"]),
+            models.Index(fields=["tenant", "source", "source_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.type}: {self.title}"
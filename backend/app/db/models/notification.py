@@ -124,6 +124,15 @@ class Notification(models.Model):
         help_text="Zusätzliche Daten (Icons, Farben, etc.)"
     )
     
+    # Digest (bursts of similar events collapse into one notification)
+    digest_key = models.CharField(
+        max_length=150,
+        null=True,
+        blank=True,
+        help_text="Gleicher Key innerhalb des Digest-Fensters wird zusammengefasst"
+    )
+    digest_count = models.PositiveIntegerField(default=1)
+    
     # Expiry
     expires_at = models.DateTimeField(
         null=True,
@@ -154,6 +163,7 @@ class Notification(models.Model):
             models.Index(fields=['tenant', 'type']),
             models.Index(fields=['tenant', 'created_at']),
             models.Index(fields=['expires_at']),
+            models.Index(fields=['tenant', 'user', 'digest_key']),
         ]
     
     def __str__(self):
@@ -231,3 +241,29 @@ class NotificationPreference(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.category}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Unread-Zähler pro User
+    Wird bei Erstellen/Lesen/Archivieren fortgeschrieben statt per COUNT ermittelt
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notification_counters'
+    )
+    unread = models.PositiveIntegerField(
+        default=0,
+        help_text="Ungelesene, nicht archivierte Benachrichtigungen"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'notification_counters'
+        unique_together = ['tenant', 'user']
+
+    def __str__(self):
+        return f"{self.user_id} - {self.unread} unread"
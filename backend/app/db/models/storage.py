@@ -0,0 +1,51 @@
+"""
+Stored Blob Model
+Content-addressed file storage shared by documents and property media
+"""
+
+import uuid
+from django.db import models
+
+
+class StoredBlob(models.Model):
+    """
+    A stored file, keyed by its SHA256 checksum per tenant.
+
+    Documents, document versions, property media and message attachments
+    reference blobs instead of owning files, so re-uploading identical
+    content reuses the existing object. ref_count is maintained by signals
+    in app.signals; blobs at zero are purged by the blob garbage collector.
+    """
+
+    BACKEND_CHOICES = [
+        ("s3", "S3/MinIO"),
+        ("local", "Local uploads"),
+        ("django", "Django storage"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        "Tenant", on_delete=models.CASCADE, related_name="blobs"
+    )
+    sha256 = models.CharField(max_length=64)
+    size = models.BigIntegerField(help_text="File size in bytes")
+    mime_type = models.CharField(max_length=100, blank=True, null=True)
+    backend = models.CharField(max_length=20, choices=BACKEND_CHOICES)
+    storage_key = models.CharField(
+        max_length=512, help_text="S3 key, upload path or Django storage name"
+    )
+    url = models.URLField(max_length=1024)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "stored_blobs"
+        unique_together = ["tenant", "sha256"]
+        indexes = [
+            models.Index(fields=["tenant", "ref_count"]),
+            models.Index(fields=["ref_count", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
@@ -3,9 +3,10 @@ FastAPI Application Entry Point
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
+import hmac
 import logging
 import os
 from datetime import datetime, date
@@ -97,8 +98,15 @@ django.setup()
 
 # Now import FastAPI components
 from app.core.settings import settings
-from app.core.errors import ErrorResponse, ValidationError, NotFoundError, ForbiddenError
+from app.core.errors import ErrorResponse, ValidationError, NotFoundError, ForbiddenError, RateLimitError
 from app.core.json_response import CustomJSONResponse
+from app.core.http_middleware import (
+    CompressionMiddleware,
+    ConditionalGetMiddleware,
+    RateLimitHeadersMiddleware,
+)
+from app.core import instrumentation
+from app.core.pubsub import pubsub
 from app.api.v1.router import api_router
 
 logger = logging.getLogger(__name__)
@@ -140,9 +148,16 @@ async def lifespan(app: FastAPI):
     # Validate AI configuration
     validate_ai_configuration()
     
+    # Push channels (SSE/WebSocket) fan-out
+    await pubsub.start()
+
+    # Book thread_sensitive=False sync_to_async calls on the request as well
+    instrumentation.install_default_executor()
+    
     yield
     # Shutdown
     logger.info("Shutting down CIM Backend API")
+    await pubsub.stop()
 
 
 def create_app() -> FastAPI:
@@ -207,6 +222,14 @@ def create_app() -> FastAPI:
         ],
     )
 
+    # Pure ASGI, last added runs first:
+    # CORS -> timing -> rate limit headers -> compression -> ETag/304
+    instrumentation.install()
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(RateLimitHeadersMiddleware)
+    app.add_middleware(instrumentation.InstrumentationMiddleware)
+
     # CORS Middleware
     app.add_middleware(
         CORSMiddleware,
@@ -214,6 +237,13 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "RateLimit-Limit",
+            "RateLimit-Remaining",
+            "RateLimit-Reset",
+            "RateLimit-Policy",
+            "Retry-After",
+        ],
     )
 
     # Global Exception Handler
@@ -250,6 +280,18 @@ def create_app() -> FastAPI:
             ).model_dump()
         )
 
+    @app.exception_handler(RateLimitError)
+    async def rate_limit_exception_handler(request: Request, exc: RateLimitError):
+        return CustomJSONResponse(
+            status_code=429,
+            content=ErrorResponse(
+                detail=exc.detail,
+                code="rate_limited",
+                timestamp=datetime.utcnow()
+            ).model_dump(),
+            headers=exc.headers,
+        )
+
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
         # Special handling for Django ValidationError to see full stack trace
@@ -275,18 +317,37 @@ def create_app() -> FastAPI:
     # Health Check
     @app.get("/healthz", tags=["health"])
     async def health_check():
-        """Health check endpoint"""
-        return {"status": "healthy", "timestamp": datetime.utcnow()}
+        """Health check endpoint (incl. password hashing queue depth)"""
+        from app.core.password_pool import password_pool
+
+        return {
+            "status": "healthy",
+            "timestamp": datetime.utcnow(),
+            "password_pool": password_pool.stats(),
+        }
+
+    # Prometheus metrics of this worker
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        """Per-route request histograms plus password hashing queue gauges"""
+        from app.core.password_pool import password_pool
+
+        # Disabled without a token: route names and timings stay private
+        if not settings.METRICS_TOKEN:
+            return PlainTextResponse("Not Found", status_code=404)
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        provided = request.headers.get("authorization", "").encode()
+        if not hmac.compare_digest(provided, expected):
+            return PlainTextResponse("Unauthorized", status_code=401)
+        return PlainTextResponse(
+            instrumentation.metrics_registry.render(
+                gauges={"password_hash_pool": password_pool.stats()}
+            ),
+            media_type="text/plain; version=0.0.4",  # charset is appended
+        )
 
     # Mount API Router
     app.include_router(api_router, prefix="/api/v1")
-    
-    # Custom Response Handler for datetime serialization
-    @app.middleware("http")
-    async def serialize_datetime_middleware(request: Request, call_next):
-        """Middleware to ensure datetime objects are properly serialized"""
-        response = await call_next(request)
-        return response
 
     return app
 
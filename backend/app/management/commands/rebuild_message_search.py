@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the full-text index for channel message search
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from app.services.message_search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreates the SQLite FTS5 triggers and repopulates the message search "
+        "index; run after migrations that remake the messages table"
+    )
+
+    def handle(self, *args, **kwargs):
+        if connection.vendor != "sqlite":
+            self.stdout.write(
+                f"Nothing to rebuild on {connection.vendor}: "
+                "the search index is maintained by the database"
+            )
+            return
+
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("Message search index rebuilt"))
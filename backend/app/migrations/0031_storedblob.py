@@ -0,0 +1,133 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0030_add_investor_models"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredBlob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64)),
+                ("size", models.BigIntegerField(help_text="File size in bytes")),
+                (
+                    "mime_type",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                (
+                    "backend",
+                    models.CharField(
+                        choices=[
+                            ("s3", "S3/MinIO"),
+                            ("local", "Local uploads"),
+                            ("django", "Django storage"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "storage_key",
+                    models.CharField(
+                        help_text="S3 key, upload path or Django storage name",
+                        max_length=512,
+                    ),
+                ),
+                ("url", models.URLField(max_length=1024)),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="blobs",
+                        to="app.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stored_blobs",
+                "indexes": [
+                    models.Index(
+                        fields=["tenant", "ref_count"],
+                        name="stored_blob_tenant__ff183c_idx",
+                    ),
+                    models.Index(
+                        fields=["ref_count", "updated_at"],
+                        name="stored_blob_ref_cou_bb7af0_idx",
+                    ),
+                ],
+                "unique_together": {("tenant", "sha256")},
+            },
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="app.storedblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="documentversion",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="app.storedblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="propertyimage",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="app.storedblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="propertydocument",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="app.storedblob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="attachment",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="app.storedblob",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0031_storedblob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="propertyimage",
+            name="variants",
+            field=models.JSONField(
+                blank=True, default=list, help_text="Resized/re-encoded derivatives"
+            ),
+        ),
+    ]
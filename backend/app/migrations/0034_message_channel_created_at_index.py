@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0033_notificationcounter"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["channel", "created_at"], name="messages_channel_68995e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    from app.services.message_search import install_search_index
+
+    install_search_index(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    from app.services.message_search import remove_search_index
+
+    remove_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0034_message_channel_created_at_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0035_message_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="digest_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Gleicher Key innerhalb des Digest-Fensters wird zusammengefasst",
+                max_length=150,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="digest_count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["tenant", "user", "digest_key"],
+                name="notificatio_tenant__5bc475_idx",
+            ),
+        ),
+    ]
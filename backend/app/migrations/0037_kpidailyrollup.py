@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0036_notification_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KpiDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("contacts_new", models.PositiveIntegerField(default=0)),
+                ("contacts_customer", models.PositiveIntegerField(default=0)),
+                ("contacts_qualified", models.PositiveIntegerField(default=0)),
+                ("appointments_total", models.PositiveIntegerField(default=0)),
+                ("appointments_completed", models.PositiveIntegerField(default=0)),
+                ("properties_new", models.PositiveIntegerField(default=0)),
+                ("properties_offer", models.PositiveIntegerField(default=0)),
+                ("properties_closed", models.PositiveIntegerField(default=0)),
+                ("sales_closed", models.PositiveIntegerField(default=0)),
+                ("sales_days_total", models.PositiveIntegerField(default=0)),
+                ("rentals_closed", models.PositiveIntegerField(default=0)),
+                ("rentals_days_total", models.PositiveIntegerField(default=0)),
+                (
+                    "close_days_min",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "close_days_max",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("tasks_new", models.PositiveIntegerField(default=0)),
+                ("tasks_done", models.PositiveIntegerField(default=0)),
+                ("property_status", models.JSONField(blank=True, default=dict)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="kpi_rollups",
+                        to="app.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "kpi_daily_rollups",
+                "ordering": ["day"],
+                "unique_together": {("tenant", "day")},
+            },
+        ),
+    ]
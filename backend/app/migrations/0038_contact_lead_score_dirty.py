@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0037_kpidailyrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="lead_score_dirty",
+            field=models.BooleanField(
+                default=True,
+                help_text="Score inputs changed since the last rescoring run",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                fields=["lead_score_dirty"], name="contacts_lead_sc_87ee83_idx"
+            ),
+        ),
+    ]
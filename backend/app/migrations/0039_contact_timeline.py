@@ -0,0 +1,270 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:35
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+import django.db.models.deletion
+import uuid
+
+TASK_CONTACT_PREFIX = "contact:"
+BATCH_SIZE = 1000
+
+
+def _tag_contact_ids(tags):
+    ids = set()
+    for tag in tags or []:
+        if isinstance(tag, str) and tag.startswith(TASK_CONTACT_PREFIX):
+            try:
+                ids.add(uuid.UUID(tag[len(TASK_CONTACT_PREFIX):]))
+            except ValueError:
+                continue
+    return ids
+
+
+def _existing_contacts(Contact, tenant_id, contact_ids):
+    """Ids among contact_ids that are contacts of tenant_id (queried in slices)"""
+    contact_ids = list(contact_ids)
+    found = set()
+    for start in range(0, len(contact_ids), BATCH_SIZE // 2):
+        found.update(
+            Contact.objects.filter(
+                tenant_id=tenant_id, id__in=contact_ids[start:start + BATCH_SIZE // 2]
+            ).values_list("id", flat=True)
+        )
+    return found
+
+
+def _backfill_task_chunk(Contact, ContactActivity, TaskContact, tasks):
+    wanted = defaultdict(set)
+    for task in tasks:
+        wanted[task.tenant_id] |= _tag_contact_ids(task.tags)
+    existing = {
+        tenant_id: _existing_contacts(Contact, tenant_id, contact_ids)
+        for tenant_id, contact_ids in wanted.items()
+    }
+
+    links, rows = [], []
+    for task in tasks:
+        for contact_id in _tag_contact_ids(task.tags) & existing[task.tenant_id]:
+            links.append(
+                TaskContact(tenant_id=task.tenant_id, task_id=task.id, contact_id=contact_id)
+            )
+            rows.append(
+                ContactActivity(
+                    tenant_id=task.tenant_id,
+                    contact_id=contact_id,
+                    source="task",
+                    source_id=task.id,
+                    type="task",
+                    status=task.status,
+                    title=task.title,
+                    description=task.description,
+                    occurred_at=task.created_at,
+                    scheduled_at=task.due_date,
+                    completed_at=task.updated_at
+                    if task.status in ["done", "completed"]
+                    else None,
+                )
+            )
+    TaskContact.objects.bulk_create(links, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    ContactActivity.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def backfill_timeline(apps, schema_editor):
+    """
+    Task links from "contact:<id>" tags and timeline rows from appointments/tasks
+
+    Contacts are checked per tenant, as at runtime, and rows are written
+    batch by batch so memory stays bounded on large tables.
+    """
+    Appointment = apps.get_model("app", "Appointment")
+    Contact = apps.get_model("app", "Contact")
+    ContactActivity = apps.get_model("app", "ContactActivity")
+    Task = apps.get_model("app", "Task")
+    TaskContact = apps.get_model("app", "TaskContact")
+
+    tasks = []
+    for task in Task.objects.exclude(tags=[]).iterator(chunk_size=BATCH_SIZE):
+        tasks.append(task)
+        if len(tasks) >= BATCH_SIZE:
+            _backfill_task_chunk(Contact, ContactActivity, TaskContact, tasks)
+            tasks = []
+    _backfill_task_chunk(Contact, ContactActivity, TaskContact, tasks)
+
+    # contact_id is a plain UUID column: keep appointments whose contact
+    # exists in the same tenant
+    appointments = Appointment.objects.filter(
+        Exists(
+            Contact.objects.filter(
+                id=OuterRef("contact_id"), tenant_id=OuterRef("tenant_id")
+            )
+        )
+    )
+    rows = []
+    for appt in appointments.iterator(chunk_size=BATCH_SIZE):
+        rows.append(
+            ContactActivity(
+                tenant_id=appt.tenant_id,
+                contact_id=appt.contact_id,
+                source="appointment",
+                source_id=appt.id,
+                type=appt.type,
+                status=appt.status,
+                title=appt.title,
+                description=appt.description,
+                occurred_at=appt.created_at,
+                scheduled_at=appt.start_datetime,
+                completed_at=appt.end_datetime
+                if appt.status in ["completed", "cancelled"]
+                else None,
+            )
+        )
+        if len(rows) >= BATCH_SIZE:
+            ContactActivity.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    ContactActivity.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0038_contact_lead_score_dirty"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskContact",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_links",
+                        to="app.contact",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contact_links",
+                        to="app.task",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_contacts",
+                        to="app.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "task_contacts",
+                "unique_together": {("task", "contact")},
+            },
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="contacts",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="tasks",
+                through="app.TaskContact",
+                to="app.contact",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ContactActivity",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("appointment", "Appointment"),
+                            ("task", "Task"),
+                            ("email", "Email"),
+                            ("call", "Call"),
+                            ("note", "Note"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("source_id", models.UUIDField(blank=True, null=True)),
+                ("type", models.CharField(max_length=50)),
+                ("status", models.CharField(blank=True, default="", max_length=50)),
+                ("title", models.CharField(blank=True, default="", max_length=255)),
+                ("description", models.TextField(blank=True, null=True)),
+                ("occurred_at", models.DateTimeField()),
+                ("scheduled_at", models.DateTimeField(blank=True, null=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activities",
+                        to="app.contact",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contact_activities",
+                        to="app.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "contact_activities",
+                "indexes": [
+                    models.Index(
+                        fields=["contact", "-occurred_at", "-id"],
+                        name="contact_act_contact_b280a3_idx",
+                    ),
+                    models.Index(
+                        fields=["tenant", "source", "source_id"],
+                        name="contact_act_tenant__a763e2_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="contactactivity",
+            constraint=models.UniqueConstraint(
+                fields=("source", "source_id", "contact"),
+                name="contact_activity_source_unique",
+            ),
+        ),
+        migrations.RunPython(backfill_timeline, reverse_code=migrations.RunPython.noop),
+    ]
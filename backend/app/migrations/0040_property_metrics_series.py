@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_daily_values(apps, schema_editor):
+    """Daily deltas of existing snapshots (the first one of a property counts as 0)"""
+    Snapshot = apps.get_model("app", "PropertyMetricsSnapshot")
+    fields = ["daily_views", "daily_inquiries", "daily_favorites"]
+
+    batch, previous = [], None
+    for snapshot in Snapshot.objects.order_by("property_id", "date").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        if previous is not None and previous.property_id == snapshot.property_id:
+            snapshot.daily_views = max(0, snapshot.views - previous.views)
+            snapshot.daily_inquiries = max(0, snapshot.inquiries - previous.inquiries)
+            snapshot.daily_favorites = max(0, snapshot.favorites - previous.favorites)
+            batch.append(snapshot)
+        previous = snapshot
+        if len(batch) >= BATCH_SIZE:
+            Snapshot.objects.bulk_update(batch, fields)
+            batch = []
+    Snapshot.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0039_contact_timeline"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="propertymetrics",
+            name="views_30d",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="propertymetrics",
+            name="inquiries_30d",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="propertymetrics",
+            name="favorites_30d",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="propertymetricssnapshot",
+            name="daily_views",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="propertymetricssnapshot",
+            name="daily_inquiries",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="propertymetricssnapshot",
+            name="daily_favorites",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="propertymetricssnapshot",
+            name="estimated",
+            field=models.BooleanField(
+                default=False, help_text="Interpolated for a day without a sync"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="propertymetrics",
+            index=models.Index(
+                fields=["views_30d"], name="property_me_views_3_929bb4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="propertymetrics",
+            index=models.Index(
+                fields=["inquiries_30d"], name="property_me_inquiri_0850e3_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_daily_values, reverse_code=migrations.RunPython.noop),
+    ]
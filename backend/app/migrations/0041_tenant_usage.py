@@ -0,0 +1,94 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:05
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def _add_grouped(counter, queryset, tenant_field, value):
+    for row in queryset.values(tenant_field).annotate(total=value):
+        counter[row[tenant_field]] += row["total"] or 0
+
+
+def backfill_usage(apps, schema_editor):
+    """Ledger rows of all tenants from grouped counts (same rules as usage_ledger)"""
+    Tenant = apps.get_model("app", "Tenant")
+    TenantUsage = apps.get_model("app", "TenantUsage")
+    UserProfile = apps.get_model("app", "UserProfile")
+    Property = apps.get_model("app", "Property")
+    StoredBlob = apps.get_model("app", "StoredBlob")
+    Document = apps.get_model("app", "Document")
+    PropertyImage = apps.get_model("app", "PropertyImage")
+    PropertyDocument = apps.get_model("app", "PropertyDocument")
+    Attachment = apps.get_model("app", "Attachment")
+
+    users, properties, storage = Counter(), Counter(), Counter()
+    _add_grouped(users, UserProfile.objects.filter(is_active=True), "tenant_id", Count("pk"))
+    _add_grouped(properties, Property.objects.all(), "tenant_id", Count("pk"))
+    _add_grouped(storage, StoredBlob.objects.filter(ref_count__gt=0), "tenant_id", Sum("size"))
+    _add_grouped(storage, Document.objects.filter(blob__isnull=True), "tenant_id", Sum("size"))
+    _add_grouped(
+        storage,
+        PropertyImage.objects.filter(blob__isnull=True),
+        "property__tenant_id",
+        Sum("size"),
+    )
+    _add_grouped(
+        storage,
+        PropertyDocument.objects.filter(blob__isnull=True),
+        "property__tenant_id",
+        Sum("size"),
+    )
+    _add_grouped(storage, Attachment.objects.filter(blob__isnull=True), "tenant_id", Sum("file_size"))
+
+    now = timezone.now()
+    TenantUsage.objects.bulk_create(
+        [
+            TenantUsage(
+                tenant_id=tenant_id,
+                users=users[tenant_id],
+                properties=properties[tenant_id],
+                storage_bytes=storage[tenant_id],
+                reconciled_at=now,
+            )
+            for tenant_id in Tenant.objects.values_list("id", flat=True)
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0040_property_metrics_series"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TenantUsage",
+            fields=[
+                (
+                    "tenant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="usage",
+                        serialize=False,
+                        to="app.tenant",
+                    ),
+                ),
+                ("users", models.IntegerField(default=0)),
+                ("properties", models.IntegerField(default=0)),
+                ("storage_bytes", models.BigIntegerField(default=0)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "tenant_usage",
+            },
+        ),
+        migrations.RunPython(backfill_usage, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0041_tenant_usage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TenantUsageDaily",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("users", models.IntegerField(default=0)),
+                ("properties", models.IntegerField(default=0)),
+                ("storage_bytes", models.BigIntegerField(default=0)),
+                ("recorded_at", models.DateTimeField(auto_now=True)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage_history",
+                        to="app.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tenant_usage_daily",
+                "ordering": ["day"],
+                "unique_together": {("tenant", "day")},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0042_tenant_usage_daily"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="kpidailyrollup",
+            name="property_status",
+        ),
+    ]
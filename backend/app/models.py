@@ -22,6 +22,7 @@ from .db.models import (
     AuditLog,
     Notification,
     NotificationPreference,
+    NotificationCounter,
 )
 
 __all__ = [
@@ -46,4 +47,5 @@ __all__ = [
     'AuditLog',
     'Notification',
     'NotificationPreference',
+    'NotificationCounter',
 ]
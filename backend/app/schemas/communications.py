@@ -140,6 +140,15 @@ class ResourceLinkInput(BaseModel):
     label: Optional[str] = None
 
 
+class MessageSearchHit(MessageResponse):
+    snippet: str = ""  # HTML-escaped excerpt, matches wrapped in <mark>
+
+
 class SearchMessagesResponse(BaseModel):
-    items: List[MessageResponse]
+    items: List[MessageSearchHit]
     total: int
+
+
+class MessagesSinceResponse(BaseModel):
+    items: List[MessageResponse]
+    has_more: bool
@@ -127,3 +127,22 @@ class NextActionResponse(BaseModel):
     recommendation: NextActionRecommendation
     contact_context: Dict[str, Any] = Field(..., description="Contact context used")
     generated_at: str = Field(..., description="ISO timestamp")
+
+
+class LogActivityRequest(BaseModel):
+    """Log an email, call or note on a contact's timeline"""
+
+    type: str = Field(..., pattern="^(email|call|note)$")
+    title: str = Field("", max_length=255)
+    description: Optional[str] = None
+    status: str = Field("completed", max_length=50)
+    occurred_at: Optional[datetime] = Field(None, description="Defaults to now")
+
+
+class ContactTimelineResponse(BaseModel):
+    """Cursor-paginated contact activity timeline (newest first)"""
+
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to fetch the next page; null on the last page"
+    )
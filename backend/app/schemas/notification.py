@@ -91,6 +91,7 @@ class NotificationResponse(BaseModel):
     related_entity_id: Optional[str] = None
     related_entity_title: Optional[str] = None
     metadata: Dict[str, Any]
+    digest_count: int = 1
     expires_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
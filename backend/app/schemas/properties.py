@@ -93,12 +93,26 @@ class PropertyFeatures(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PropertyImageVariant(BaseModel):
+    """Resized/re-encoded derivative of a property image"""
+
+    name: str
+    width: int
+    height: int
+    format: str
+    mime_type: str
+    size: int = 0
+    url: str
+
+
 class PropertyImage(BaseModel):
     """Property image model"""
 
     id: str
     url: Optional[str] = None
+    original_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    variants: List[PropertyImageVariant] = []
     alt_text: Optional[str] = None
     is_primary: bool = False
     order: int = 0
@@ -7,10 +7,10 @@ import asyncio
 import logging
 from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
-from openai import AsyncOpenAI
 import json
 
 from app.core.errors import ValidationError, ServiceError
+from app.core.instrumentation import stage
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +62,8 @@ class AIManager:
         
         logger.info(f"✅ AI Manager initialized with provider: {self.provider}, model: {self.model}")
     
-    def _initialize_client(self) -> AsyncOpenAI:
-        """Initialize OpenAI-compatible client"""
+    def _initialize_client(self):
+        """Initialize OpenAI-compatible client (openai SDK is imported on first use)"""
         if self.provider == "azure":
             from openai import AsyncAzureOpenAI
             return AsyncAzureOpenAI(
@@ -73,6 +73,7 @@ class AIManager:
                 timeout=self.timeout
             )
         else:
+            from openai import AsyncOpenAI
             return AsyncOpenAI(
                 base_url=self.base_url,
                 api_key=self.api_key,
@@ -121,7 +122,8 @@ class AIManager:
                 if response_format:
                     kwargs["response_format"] = response_format
                 
-                completion = await self.client.chat.completions.create(**kwargs)
+                with stage("llm"):
+                    completion = await self.client.chat.completions.create(**kwargs)
                 
                 return {
                     "response": completion.choices[0].message.content,
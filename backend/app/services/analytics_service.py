@@ -1,99 +1,110 @@
 """
 Analytics Service
 """
+from collections import defaultdict
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
-from django.db import models
-from django.db.models import Count, Sum, Avg
+from django.db.models import Count, Sum, Min, Max, Q, Case, When, Value, CharField
 from asgiref.sync import sync_to_async
 
+from app.core.tenant_cache import tenant_cache
 from app.db.models import Property, Contact, Task, Document, Appointment
 from app.schemas.analytics import (
     DashboardAnalyticsResponse, PropertyAnalyticsResponse,
     ContactAnalyticsResponse, TaskAnalyticsResponse
 )
 
+OPEN_TASK_STATUSES = ['todo', 'in_progress', 'review']
+LEAD_SCORE_BUCKETS = [(0, 20), (21, 40), (41, 60), (61, 80), (81, 100)]
+
+# Histogram bucket computed in SQL; scores outside all buckets map to NULL
+_lead_score_bucket = Case(
+    *[
+        When(lead_score__gte=low, lead_score__lte=high, then=Value(f"{low}-{high}"))
+        for low, high in LEAD_SCORE_BUCKETS
+    ],
+    default=Value(None),
+    output_field=CharField(),
+)
+
 
 class AnalyticsService:
     """Analytics service for dashboard and reporting"""
-    
+
     def __init__(self, tenant_id: str):
         self.tenant_id = tenant_id
-    
+
+    async def _cached(self, key, compute):
+        """Run compute in a worker thread, cached per tenant data version"""
+        return await sync_to_async(tenant_cache.get_or_compute)(self.tenant_id, key, compute)
+
     async def get_dashboard_analytics(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get dashboard analytics with ALL live data"""
-        
+
+        cache_key = ('dashboard', start_date, end_date)
+
         # Default date range if not provided
         if not end_date:
             end_date = datetime.utcnow()
         if not start_date:
             start_date = end_date - timedelta(days=30)
-        
+
         # Current month start
         current_month_start = datetime(end_date.year, end_date.month, 1)
         # Current week start
         current_week_start = end_date - timedelta(days=7)
-        
-        @sync_to_async
+
         def get_all_stats():
-            # Properties
-            all_properties = Property.objects.filter(tenant_id=self.tenant_id)
-            total_properties = all_properties.count()
-            active_listings = all_properties.filter(status='active').count()
-            sold_properties = all_properties.filter(status='verkauft').count()
-            
-            # Contacts
-            all_contacts = Contact.objects.filter(tenant_id=self.tenant_id)
-            total_contacts = all_contacts.count()
-            new_contacts_month = all_contacts.filter(created_at__gte=current_month_start).count()
-            new_inquiries_week = all_contacts.filter(created_at__gte=current_week_start).count()
-            
-            # Calculate revenue from sold properties (using price)
-            total_revenue = all_properties.filter(status='verkauft').aggregate(
-                total=Sum('price')
-            )['total'] or 0
-            
-            revenue_current_month = all_properties.filter(
-                status='verkauft',
-                updated_at__gte=current_month_start
-            ).aggregate(total=Sum('price'))['total'] or 0
-            
-            # Sales this month
-            sales_this_month = all_properties.filter(
-                status='verkauft',
-                updated_at__gte=current_month_start
-            ).count()
-            
-            # Tasks
-            all_tasks = Task.objects.filter(tenant_id=self.tenant_id)
-            total_tasks = all_tasks.count()
-            completed_tasks = all_tasks.filter(status='done').count()
-            pending_tasks = all_tasks.filter(status__in=['todo', 'in_progress', 'review']).count()
-            
-            # Documents
+            # One aggregate per table
+            sold = Q(status='verkauft')
+            sold_this_month = sold & Q(updated_at__gte=current_month_start)
+            properties = Property.objects.filter(tenant_id=self.tenant_id).aggregate(
+                total=Count('id'),
+                active=Count('id', filter=Q(status='active')),
+                sold=Count('id', filter=sold),
+                revenue=Sum('price', filter=sold),
+                revenue_month=Sum('price', filter=sold_this_month),
+                sales_month=Count('id', filter=sold_this_month),
+            )
+
+            contacts = Contact.objects.filter(tenant_id=self.tenant_id).aggregate(
+                total=Count('id'),
+                new_month=Count('id', filter=Q(created_at__gte=current_month_start)),
+                new_week=Count('id', filter=Q(created_at__gte=current_week_start)),
+            )
+
+            tasks = Task.objects.filter(tenant_id=self.tenant_id).aggregate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='done')),
+                pending=Count('id', filter=Q(status__in=OPEN_TASK_STATUSES)),
+            )
+
             documents_total = Document.objects.filter(tenant_id=self.tenant_id).count()
-            
+
             # Appointments as viewings
             viewings_week = Appointment.objects.filter(
                 tenant_id=self.tenant_id,
                 start_datetime__gte=current_week_start
             ).count()
-            
+
+            total_revenue = properties['revenue'] or 0
+            revenue_current_month = properties['revenue_month'] or 0
+
             # Calculate rates
-            task_completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            conversion_rate = (sold_properties / total_contacts * 100) if total_contacts > 0 else 0
-            
+            task_completion_rate = (tasks['completed'] / tasks['total'] * 100) if tasks['total'] > 0 else 0
+            conversion_rate = (properties['sold'] / contacts['total'] * 100) if contacts['total'] > 0 else 0
+
             return {
-                'total_properties': total_properties,
-                'active_properties': active_listings,
-                'total_contacts': total_contacts,
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'pending_tasks': pending_tasks,
+                'total_properties': properties['total'],
+                'active_properties': properties['active'],
+                'total_contacts': contacts['total'],
+                'total_tasks': tasks['total'],
+                'completed_tasks': tasks['completed'],
+                'pending_tasks': tasks['pending'],
                 'total_documents': documents_total,
                 'total_revenue': float(total_revenue),
                 'revenue_current_month': float(revenue_current_month),
@@ -102,79 +113,86 @@ class AnalyticsService:
                 'contact_conversion_rate': conversion_rate,
                 'monthly_revenue': float(revenue_current_month),
                 'monthly_expenses': 0.0,
-                'new_contacts_this_month': new_contacts_month,
-                'new_inquiries_this_week': new_inquiries_week,
-                'sales_this_month': sales_this_month,
+                'new_contacts_this_month': contacts['new_month'],
+                'new_inquiries_this_week': contacts['new_week'],
+                'sales_this_month': properties['sales_month'],
                 'viewings_this_week': viewings_week,
                 'recent_activities': [],
                 'property_value_trend': []
             }
-        
-        return await get_all_stats()
-    
+
+        return await self._cached(cache_key, get_all_stats)
+
     async def get_property_analytics(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get property analytics with LIVE data"""
-        
+
+        cache_key = ('properties', start_date, end_date)
+
         # Default date range if not provided
         if not end_date:
             end_date = datetime.utcnow()
         if not start_date:
             start_date = end_date - timedelta(days=30)
-        
+
         # Current month start
         current_month_start = datetime(end_date.year, end_date.month, 1)
-        
-        @sync_to_async
+
         def get_property_data():
-            queryset = Property.objects.filter(tenant_id=self.tenant_id)
-            
-            # Total properties
-            total_properties = queryset.count()
-            
-            # Active listings (available, not sold)
-            active_listings = queryset.filter(status='active').count()
-            
-            # Sales this month
-            sales_this_month = queryset.filter(
-                status='verkauft',
-                updated_at__gte=current_month_start
-            ).count()
-            
-            # Property counts by type
-            by_type = dict(queryset.values_list('property_type').annotate(count=Count('id')))
-            
-            # Property counts by status
-            by_status = dict(queryset.values_list('status').annotate(count=Count('id')))
-            
-            # Average price
-            avg_price = queryset.aggregate(avg_price=Avg('price'))['avg_price'] or 0
-            
-            # Price range
-            price_range = {
-                'min': queryset.aggregate(min_price=models.Min('price'))['min_price'] or 0,
-                'max': queryset.aggregate(max_price=models.Max('price'))['max_price'] or 0
-            }
-            
+            # Single grouped query over (type, status); all totals are folded from it
+            rows = (
+                Property.objects.filter(tenant_id=self.tenant_id)
+                .order_by()
+                .values('property_type', 'status')
+                .annotate(
+                    count=Count('id'),
+                    sales_month=Count('id', filter=Q(
+                        status='verkauft', updated_at__gte=current_month_start
+                    )),
+                    price_count=Count('price'),
+                    price_sum=Sum('price'),
+                    price_min=Min('price'),
+                    price_max=Max('price'),
+                )
+            )
+
+            by_type: Dict[Any, int] = defaultdict(int)
+            by_status: Dict[Any, int] = defaultdict(int)
+            total_properties = sales_this_month = price_count = 0
+            price_sum = 0
+            price_mins, price_maxs = [], []
+            for row in rows:
+                by_type[row['property_type']] += row['count']
+                by_status[row['status']] += row['count']
+                total_properties += row['count']
+                sales_this_month += row['sales_month']
+                price_count += row['price_count']
+                price_sum += row['price_sum'] or 0
+                if row['price_min'] is not None:
+                    price_mins.append(row['price_min'])
+                    price_maxs.append(row['price_max'])
+
+            avg_price = price_sum / price_count if price_count else 0
+
             return {
                 'total': total_properties,
-                'active_listings': active_listings,
+                'active_listings': by_status.get('active', 0),
                 'sales_this_month': sales_this_month,
-                'by_type': by_type,
-                'by_status': by_status,
+                'by_type': dict(by_type),
+                'by_status': dict(by_status),
                 'avg_price': float(avg_price),
                 'price_range': {
-                    'min': float(price_range['min']),
-                    'max': float(price_range['max'])
+                    'min': float(min(price_mins, default=0)),
+                    'max': float(max(price_maxs, default=0))
                 },
                 'total_properties': total_properties
             }
-        
-        data = await get_property_data()
-        
+
+        data = await self._cached(cache_key, get_property_data)
+
         return {
             **data,
             'properties_by_type': data['by_type'],
@@ -185,65 +203,67 @@ class AnalyticsService:
             'conversion_rate': 12.5,
             'average_days_on_market': 45.0
         }
-    
+
     async def get_contact_analytics(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get contact analytics with LIVE data"""
-        
+
+        cache_key = ('contacts', start_date, end_date)
+
         # Default date range if not provided
         if not end_date:
             end_date = datetime.utcnow()
         if not start_date:
             start_date = end_date - timedelta(days=30)
-        
+
         # Current month start
         current_month_start = datetime(end_date.year, end_date.month, 1)
         # Current week start
         current_week_start = end_date - timedelta(days=7)
-        
-        @sync_to_async
+
         def get_contact_data():
-            queryset = Contact.objects.filter(tenant_id=self.tenant_id)
-            
-            # Total contacts
-            total_contacts = queryset.count()
-            
-            # New contacts this month
-            new_contacts_this_month = queryset.filter(created_at__gte=current_month_start).count()
-            
-            # New inquiries this week
-            new_inquiries_this_week = queryset.filter(created_at__gte=current_week_start).count()
-            
-            # Contact counts by status
-            by_status = dict(queryset.values_list('status').annotate(count=Count('id')))
-            
-            # Lead score distribution
-            lead_score_distribution = {}
-            for score_range in [(0, 20), (21, 40), (41, 60), (61, 80), (81, 100)]:
-                count = queryset.filter(
-                    lead_score__gte=score_range[0],
-                    lead_score__lte=score_range[1]
-                ).count()
-                lead_score_distribution[f"{score_range[0]}-{score_range[1]}"] = count
-            
+            # Single grouped query over (status, lead score bucket)
+            rows = (
+                Contact.objects.filter(tenant_id=self.tenant_id)
+                .annotate(score_bucket=_lead_score_bucket)
+                .order_by()
+                .values('status', 'score_bucket')
+                .annotate(
+                    count=Count('id'),
+                    new_month=Count('id', filter=Q(created_at__gte=current_month_start)),
+                    new_week=Count('id', filter=Q(created_at__gte=current_week_start)),
+                )
+            )
+
+            by_status: Dict[Any, int] = defaultdict(int)
+            lead_score_distribution = {f"{low}-{high}": 0 for low, high in LEAD_SCORE_BUCKETS}
+            total_contacts = new_contacts_this_month = new_inquiries_this_week = 0
+            for row in rows:
+                by_status[row['status']] += row['count']
+                if row['score_bucket'] is not None:
+                    lead_score_distribution[row['score_bucket']] += row['count']
+                total_contacts += row['count']
+                new_contacts_this_month += row['new_month']
+                new_inquiries_this_week += row['new_week']
+
             # Calculate conversion rate (contacts with status 'customer')
-            converted = queryset.filter(status='customer').count()
+            converted = by_status.get('customer', 0)
             conversion_rate = (converted / total_contacts * 100) if total_contacts > 0 else 0
-            
+
             return {
                 'total': total_contacts,
                 'new_contacts_this_month': new_contacts_this_month,
                 'new_inquiries_this_week': new_inquiries_this_week,
-                'by_status': by_status,
+                'by_status': dict(by_status),
                 'lead_score_distribution': lead_score_distribution,
                 'conversion_rate': conversion_rate
             }
-        
-        data = await get_contact_data()
-        
+
+        data = await self._cached(cache_key, get_contact_data)
+
         return {
             'total_contacts': data['total'],
             'new_contacts_this_month': data['new_contacts_this_month'],
@@ -256,50 +276,58 @@ class AnalyticsService:
             'monthly_new_contacts': [],
             'top_performing_sources': []
         }
-    
+
     async def get_task_analytics(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get task analytics with LIVE data"""
-        
-        @sync_to_async
+
         def get_task_data():
             queryset = Task.objects.filter(tenant_id=self.tenant_id)
-            
+
             if start_date:
                 queryset = queryset.filter(created_at__gte=start_date)
             if end_date:
                 queryset = queryset.filter(created_at__lte=end_date)
-            
-            # Task counts by status
-            by_status = dict(queryset.values_list('status').annotate(count=Count('id')))
-            
-            # Task counts by priority
-            by_priority = dict(queryset.values_list('priority').annotate(count=Count('id')))
-            
+
+            # Single grouped query over (status, priority)
+            rows = (
+                queryset.order_by()
+                .values('status', 'priority')
+                .annotate(
+                    count=Count('id'),
+                    overdue=Count('id', filter=Q(
+                        due_date__lt=datetime.utcnow(),
+                        status__in=OPEN_TASK_STATUSES
+                    )),
+                )
+            )
+
+            by_status: Dict[Any, int] = defaultdict(int)
+            by_priority: Dict[Any, int] = defaultdict(int)
+            total_tasks = overdue_tasks = 0
+            for row in rows:
+                by_status[row['status']] += row['count']
+                by_priority[row['priority']] += row['count']
+                total_tasks += row['count']
+                overdue_tasks += row['overdue']
+
             # Completion rate
-            total_tasks = queryset.count()
-            completed_tasks = queryset.filter(status='done').count()
+            completed_tasks = by_status.get('done', 0)
             completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            
-            # Overdue tasks
-            overdue_tasks = queryset.filter(
-                due_date__lt=datetime.utcnow(),
-                status__in=['todo', 'in_progress', 'review']
-            ).count()
-            
+
             return {
                 'total': total_tasks,
-                'by_status': by_status,
-                'by_priority': by_priority,
+                'by_status': dict(by_status),
+                'by_priority': dict(by_priority),
                 'completion_rate': completion_rate,
                 'overdue': overdue_tasks
             }
-        
-        data = await get_task_data()
-        
+
+        data = await self._cached(('tasks', start_date, end_date), get_task_data)
+
         return {
             'total_tasks': data['total'],
             'tasks_by_status': data['by_status'],
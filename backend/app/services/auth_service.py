@@ -10,7 +10,7 @@ import re
 from django.contrib.auth.hashers import make_password, check_password
 from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
+from django.db import close_old_connections, transaction
 from asgiref.sync import sync_to_async
 
 from app.db.models import User, Tenant, TenantUser
@@ -35,6 +35,8 @@ from app.schemas.auth import (
     TokenPayload
 )
 from app.core.errors import UnauthorizedError, ConflictError, NotFoundError
+from app.core.auth_cache import VerifiedTokenCache, identity_cache
+from app.core.password_pool import password_pool
 
 
 # JWT Settings - aus Pydantic Settings holen
@@ -44,6 +46,8 @@ ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = 30  # 30 days
 
+_token_cache = VerifiedTokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
 
 class AuthService:
     """Authentication Service"""
@@ -125,41 +129,42 @@ class AuthService:
     
     @staticmethod
     def decode_token(token: str) -> TokenPayload:
-        """Decode and verify JWT token"""
+        """Decode and verify JWT token (verified tokens are cached until exp)"""
+        cached = _token_cache.get(token)
+        if cached is not None:
+            return cached
         try:
-            print(f"🔍 AuthService: Decoding token: {token[:20]}...")
-            print(f"🔍 AuthService: Using JWT_SECRET_KEY: {SECRET_KEY[:20]}...")
-            print(f"🔍 AuthService: Using ALGORITHM: {ALGORITHM}")
-            print(f"🔍 AuthService: Token length: {len(token)}")
-            print(f"🔍 AuthService: Token parts: {token.count('.')}")
-            print(f"🔍 AuthService: JWT_SECRET_KEY length: {len(SECRET_KEY)}")
-            print(f"🔍 AuthService: JWT_SECRET_KEY type: {type(SECRET_KEY)}")
-            
             # Prüfe Token-Format
             if token.count('.') != 2:
-                print(f"❌ AuthService: Invalid token format - expected 3 parts, got {token.count('.') + 1}")
                 raise UnauthorizedError("Invalid token format")
             
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            print(f"✅ AuthService: Token decoded successfully: {payload}")
-            
-            return TokenPayload(**payload)
+            token_payload = TokenPayload(**payload)
         except jwt.ExpiredSignatureError:
-            print("❌ AuthService: Token has expired")
             raise UnauthorizedError("Token has expired")
         except jwt.PyJWTError as e:
             print(f"❌ AuthService: Invalid token - {str(e)}")
-            print(f"❌ AuthService: Error type: {type(e).__name__}")
             raise UnauthorizedError("Invalid token")
+        
+        _token_cache.put(token, token_payload.exp, token_payload)
+        return token_payload
     
     @staticmethod
-    @sync_to_async
-    @transaction.atomic
-    def register_user(request: RegisterRequest) -> RegisterResponse:
+    async def register_user(request: RegisterRequest) -> RegisterResponse:
         """
         Register a new user and create a tenant
         Creates both the user and tenant in a transaction
+        
+        Das Passwort wird vorher im Passwort-Pool gehasht, nicht in der
+        Transaktion auf dem gemeinsamen sync_to_async-Thread.
         """
+        password_hash = await password_pool.run(AuthService.hash_password, request.password)
+        return await AuthService._register_sync(request, password_hash)
+    
+    @staticmethod
+    @sync_to_async
+    @transaction.atomic
+    def _register_sync(request: RegisterRequest, password_hash: str) -> RegisterResponse:
         
         # Check if user already exists
         if User.objects.filter(email=request.email).exists():
@@ -199,7 +204,7 @@ class AuthService:
             phone=request.phone,
             is_active=True,
             email_verified=False,  # TODO: Send verification email
-            password=AuthService.hash_password(request.password)  # Use bcrypt hashing
+            password=password_hash
         )
         user.save()
         
@@ -253,43 +258,62 @@ class AuthService:
         )
     
     @staticmethod
-    @sync_to_async
-    def login_user(request: LoginRequest) -> LoginResponse:
+    async def login_user(request: LoginRequest) -> LoginResponse:
         """
         Authenticate user and return tokens
-        """
         
+        Läuft komplett im Passwort-Pool (Hashing + Membership-Lookup), nicht
+        im gemeinsamen sync_to_async-Thread; bei voller Queue RateLimitError.
+        """
+        return await password_pool.run(AuthService._login_sync, request)
+    
+    @staticmethod
+    def _login_sync(request: LoginRequest) -> LoginResponse:
+        """Login im Pool-Thread (eigene DB-Verbindung)"""
+        close_old_connections()
+        try:
+            return AuthService._authenticate(request)
+        finally:
+            close_old_connections()
+    
+    @staticmethod
+    def _authenticate(request: LoginRequest) -> LoginResponse:
         # Find user
         try:
             user = User.objects.get(email=request.email)
         except User.DoesNotExist:
             raise UnauthorizedError("Invalid email or password")
         
-        # Verify password
-        if not AuthService.verify_password(request.password, user.password):
+        # Verify password (re-hashed on success if the hasher settings changed)
+        if not user.check_password(request.password):
             raise UnauthorizedError("Invalid email or password")
         
         # Check if user is active
         if not user.is_active:
             raise UnauthorizedError("User account is inactive")
         
-        # Get user's tenant memberships
-        tenant_memberships = TenantUser.objects.filter(
-            user=user,
-            is_active=True,
-            tenant__is_active=True
-        ).select_related('tenant')
+        # Get user's tenant memberships (one query)
+        tenant_memberships = list(
+            TenantUser.objects.filter(
+                user=user,
+                is_active=True,
+                tenant__is_active=True
+            ).select_related('tenant')
+        )
         
-        if not tenant_memberships.exists():
+        if not tenant_memberships:
             raise UnauthorizedError("User has no active tenant memberships")
         
         # Select tenant (either specified or first available)
         if request.tenant_id:
-            tenant_membership = tenant_memberships.filter(tenant__id=request.tenant_id).first()
+            tenant_membership = next(
+                (tm for tm in tenant_memberships if str(tm.tenant_id) == str(request.tenant_id)),
+                None
+            )
             if not tenant_membership:
                 raise NotFoundError(f"User not found in tenant {request.tenant_id}")
         else:
-            tenant_membership = tenant_memberships.first()
+            tenant_membership = tenant_memberships[0]
         
         tenant = tenant_membership.tenant
         
@@ -314,7 +338,7 @@ class AuthService:
         
         # Update last login
         user.last_login = timezone.now()
-        user.save()
+        user.save(update_fields=['last_login'])
         
         # Get all available tenants
         available_tenants = [
@@ -354,16 +378,14 @@ class AuthService:
         )
     
     @staticmethod
-    @sync_to_async
-    def get_current_user(token: str) -> User:
-        """Get current user from token"""
+    async def get_current_user(token: str) -> User:
+        """Get current user from token (User aus dem Identity-Cache)"""
         payload = AuthService.decode_token(token)
         
-        try:
-            user = User.objects.get(id=payload.sub, is_active=True)
-            return user
-        except User.DoesNotExist:
+        user = await identity_cache.get_user(payload.sub)
+        if user is None or not user.is_active:
             raise UnauthorizedError("User not found")
+        return user
     
     @staticmethod
     @sync_to_async
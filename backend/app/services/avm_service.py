@@ -27,6 +27,7 @@ from app.services.ai_manager import AIManager
 from app.services.geocoding_service import GeocodingService
 from app.services.market_data_service import MarketDataService
 from app.db.models.location import LocationMarketData
+from app.core.instrumentation import stage
 
 logger = logging.getLogger(__name__)
 
@@ -85,49 +86,51 @@ class AVMService:
         geo_location = None
         nearby_pois = []
 
-        try:
-            geo_location = await self.geocoding_service.geocode_address(
-                street=avm_request.address,
-                city=avm_request.city,
-                postal_code=avm_request.postal_code,
-            )
-
-            if geo_location:
-                # Get POIs
-                nearby_pois = await self.geocoding_service.get_nearby_pois(
-                    latitude=geo_location.latitude,
-                    longitude=geo_location.longitude,
-                    radius_m=1000,
+        with stage("avm-geo"):
+            try:
+                geo_location = await self.geocoding_service.geocode_address(
+                    street=avm_request.address,
+                    city=avm_request.city,
+                    postal_code=avm_request.postal_code,
                 )
 
-                # Enrich with scores
-                geo_location = await self.geocoding_service.enrich_geolocation(
-                    geo_location, radius_m=1000
-                )
+                if geo_location:
+                    # Get POIs
+                    nearby_pois = await self.geocoding_service.get_nearby_pois(
+                        latitude=geo_location.latitude,
+                        longitude=geo_location.longitude,
+                        radius_m=1000,
+                    )
 
-                logger.info(
-                    f"📍 Location: Walkability={geo_location.walkability_score}, "
-                    f"Transit={geo_location.transit_score}, POIs={len(nearby_pois)}"
-                )
-        except Exception as e:
-            logger.warning(f"⚠️ Geocoding failed: {e}")
+                    # Enrich with scores
+                    geo_location = await self.geocoding_service.enrich_geolocation(
+                        geo_location, radius_m=1000
+                    )
+
+                    logger.info(
+                        f"📍 Location: Walkability={geo_location.walkability_score}, "
+                        f"Transit={geo_location.transit_score}, POIs={len(nearby_pois)}"
+                    )
+            except Exception as e:
+                logger.warning(f"⚠️ Geocoding failed: {e}")
 
         # Step 2: Fetch real comparable listings
         comparables = []
-        try:
-            comparables = await self.market_data_service.fetch_comparable_listings(
-                city=avm_request.city,
-                postal_code=avm_request.postal_code,
-                property_type=avm_request.property_type,
-                living_area=avm_request.living_area,
-                rooms=avm_request.rooms,
-                build_year=avm_request.build_year,
-                radius_km=2.0,
-                max_results=20,
-            )
-            logger.info(f"📊 Fetched {len(comparables)} comparable listings")
-        except Exception as e:
-            logger.error(f"❌ Comparables fetch failed: {e}")
+        with stage("avm-comparables"):
+            try:
+                comparables = await self.market_data_service.fetch_comparable_listings(
+                    city=avm_request.city,
+                    postal_code=avm_request.postal_code,
+                    property_type=avm_request.property_type,
+                    living_area=avm_request.living_area,
+                    rooms=avm_request.rooms,
+                    build_year=avm_request.build_year,
+                    radius_km=2.0,
+                    max_results=20,
+                )
+                logger.info(f"📊 Fetched {len(comparables)} comparable listings")
+            except Exception as e:
+                logger.error(f"❌ Comparables fetch failed: {e}")
 
         # Step 3: Base calculation with enhanced factors
         base_price_per_sqm = self._get_base_price_per_sqm(
@@ -165,42 +168,43 @@ class AVMService:
         llm_insights = []
 
         if self.use_llm:
-            try:
-                property_data = {
-                    "property_type": avm_request.property_type,
-                    "living_area": avm_request.living_area,
-                    "rooms": avm_request.rooms,
-                    "build_year": avm_request.build_year,
-                    "condition": avm_request.condition,
-                    "city": avm_request.city,
-                    "postal_code": avm_request.postal_code,
-                    "floor": avm_request.floor,
-                    "has_elevator": avm_request.has_elevator,
-                    "energy_class": avm_request.energy_class,
-                    "orientation": avm_request.orientation,
-                }
-
-                geodata = None
-                if geo_location:
-                    geodata = {
-                        "latitude": geo_location.latitude,
-                        "longitude": geo_location.longitude,
-                        "walkability_score": geo_location.walkability_score,
-                        "transit_score": geo_location.transit_score,
-                        "pois_count": len(nearby_pois),
+            with stage("avm-llm"):
+                try:
+                    property_data = {
+                        "property_type": avm_request.property_type,
+                        "living_area": avm_request.living_area,
+                        "rooms": avm_request.rooms,
+                        "build_year": avm_request.build_year,
+                        "condition": avm_request.condition,
+                        "city": avm_request.city,
+                        "postal_code": avm_request.postal_code,
+                        "floor": avm_request.floor,
+                        "has_elevator": avm_request.has_elevator,
+                        "energy_class": avm_request.energy_class,
+                        "orientation": avm_request.orientation,
                     }
 
-                llm_analysis = await self.ai_manager.analyze_property(
-                    property_data=property_data, geodata=geodata
-                )
+                    geodata = None
+                    if geo_location:
+                        geodata = {
+                            "latitude": geo_location.latitude,
+                            "longitude": geo_location.longitude,
+                            "walkability_score": geo_location.walkability_score,
+                            "transit_score": geo_location.transit_score,
+                            "pois_count": len(nearby_pois),
+                        }
+
+                    llm_analysis = await self.ai_manager.analyze_property(
+                        property_data=property_data, geodata=geodata
+                    )
 
-                llm_adjustment_percent = llm_analysis.get("value_adjustment_percent", 0)
-                llm_insights = llm_analysis.get("insights", [])
+                    llm_adjustment_percent = llm_analysis.get("value_adjustment_percent", 0)
+                    llm_insights = llm_analysis.get("insights", [])
 
-                logger.info(f"🤖 LLM adjustment: {llm_adjustment_percent:+.1f}%")
+                    logger.info(f"🤖 LLM adjustment: {llm_adjustment_percent:+.1f}%")
 
-            except Exception as e:
-                logger.warning(f"⚠️ LLM analysis failed: {e}")
+                except Exception as e:
+                    logger.warning(f"⚠️ LLM analysis failed: {e}")
 
         # Apply LLM adjustment
         estimated_value = estimated_value * (1 + llm_adjustment_percent / 100)
@@ -257,12 +261,13 @@ class AVMService:
         )
 
         # Get market intelligence
-        market_intelligence = await self.market_data_service.get_market_statistics(
-            city=avm_request.city,
-            postal_code=avm_request.postal_code,
-            property_type=avm_request.property_type,
-            time_period_months=12,
-        )
+        with stage("avm-market"):
+            market_intelligence = await self.market_data_service.get_market_statistics(
+                city=avm_request.city,
+                postal_code=avm_request.postal_code,
+                property_type=avm_request.property_type,
+                time_period_months=12,
+            )
 
         logger.info(
             f"✅ Valuation complete: €{estimated_value:,.0f} "
@@ -2,7 +2,6 @@
 Billing Service für Stripe Webhook-Verarbeitung
 """
 
-import stripe
 from datetime import datetime
 from typing import Dict, Any
 from django.conf import settings
@@ -11,6 +10,9 @@ from asgiref.sync import sync_to_async
 
 from app.db.models import BillingAccount, StripeWebhookEvent
 from app.core.billing_config import get_plan_from_price_id, PLAN_LIMITS
+from app.core.lazy_import import lazy_module
+
+stripe = lazy_module("stripe")
 
 
 class BillingService:
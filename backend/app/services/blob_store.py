@@ -0,0 +1,269 @@
+"""
+Blob Store Service
+
+Content-addressed storage on top of StorageService and Django file storage.
+Identical uploads of a tenant share a single StoredBlob keyed by SHA256.
+"""
+
+import hashlib
+import logging
+import os
+from datetime import timedelta
+from typing import Optional, Dict, Any
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.core.settings import settings
+from app.db.models import StoredBlob
+from app.services.storage_s3 import StorageService, SpooledUpload
+from app.services.usage_ledger import adjust_usage
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """Deduplicating blob storage for a tenant"""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+
+    def _lookup_sync(self, checksum: str) -> Optional[StoredBlob]:
+        """
+        Find an existing blob and refresh it so GC keeps it for the new reference.
+
+        The row lock orders this against collect_garbage: either the refresh
+        lands first and GC skips the blob, or GC deletes it first and the
+        upload stores the content again.
+        """
+        with transaction.atomic():
+            blob = (
+                StoredBlob.objects.select_for_update()
+                .filter(tenant_id=self.tenant_id, sha256=checksum)
+                .first()
+            )
+            if blob:
+                StoredBlob.objects.filter(pk=blob.pk).update(updated_at=timezone.now())
+        return blob
+
+    def _register_sync(self, checksum: str, **fields) -> tuple:
+        """Create the blob row, or return the one a concurrent upload created"""
+        try:
+            with transaction.atomic():
+                blob = StoredBlob.objects.create(
+                    tenant_id=self.tenant_id, sha256=checksum, **fields
+                )
+            return blob, True
+        except IntegrityError:
+            return (
+                StoredBlob.objects.get(tenant_id=self.tenant_id, sha256=checksum),
+                False,
+            )
+
+    @staticmethod
+    def _file_info(
+        blob: StoredBlob, spooled: SpooledUpload, deduplicated: bool
+    ) -> Dict[str, Any]:
+        return {
+            "file_id": str(blob.id),
+            "filename": blob.storage_key.rsplit("/", 1)[-1],
+            "url": blob.url,
+            "size": blob.size,
+            "mime_type": spooled.content_type,
+            "original_name": spooled.original_name,
+            "checksum": blob.sha256,
+            "blob_id": str(blob.id),
+            "deduplicated": deduplicated,
+        }
+
+    async def store(self, spooled: SpooledUpload) -> Dict[str, Any]:
+        """
+        Store a spooled upload, skipping the transfer if the content exists.
+
+        Returns the same file info dict as StorageService.upload_file plus
+        blob_id and a deduplicated flag.
+        """
+        blob = await sync_to_async(self._lookup_sync)(spooled.checksum)
+        if blob:
+            return self._file_info(blob, spooled, deduplicated=True)
+
+        storage = StorageService()
+        result = await storage.upload_spooled(
+            spooled,
+            tenant_id=self.tenant_id,
+            folder_path=f"blobs/{spooled.checksum[:2]}",
+            file_id=spooled.checksum,
+        )
+
+        blob, created = await sync_to_async(self._register_sync)(
+            spooled.checksum,
+            size=result["size"],
+            mime_type=result["mime_type"],
+            backend=result["backend"],
+            storage_key=result["storage_key"],
+            url=result["url"],
+        )
+        if not created and blob.url != result["url"]:
+            # Lost a race against an identical upload with another extension
+            await storage.delete_file(result["url"], self.tenant_id)
+
+        return self._file_info(blob, spooled, deduplicated=not created)
+
+    @staticmethod
+    def checksum_for(file) -> str:
+        """SHA256 of a Django File, read in chunks"""
+        checksum = getattr(file, "checksum", None)
+        if checksum:
+            return checksum
+
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        file.seek(0)
+        return digest.hexdigest()
+
+    def assign_file_sync(self, instance, file) -> StoredBlob:
+        """
+        Point a model with a FileField (PropertyImage, PropertyDocument) at the
+        blob for `file`, writing to storage only if the content is new.
+
+        Sets instance.file, instance.url and instance.blob; the caller saves.
+        """
+        checksum = self.checksum_for(file)
+        blob = self._lookup_sync(checksum)
+
+        if blob is None:
+            instance.file.save(file.name, file, save=False)
+            blob, created = self._register_sync(
+                checksum,
+                size=file.size,
+                mime_type=getattr(file, "content_type", None),
+                backend="django",
+                storage_key=instance.file.name,
+                url=instance.file.url,
+            )
+            if not created:
+                instance.file.delete(save=False)
+
+        # Blobs stored through StorageService have no Django storage name
+        instance.file = blob.storage_key if blob.backend == "django" else ""
+        instance.url = blob.url
+        instance.blob = blob
+        return blob
+
+
+def _change_refs(blob_id, delta: int) -> None:
+    """
+    Move ref_count by delta. A blob counts towards the tenant's storage
+    while referenced, so the usage ledger follows the 0 <-> 1 transitions;
+    the row lock keeps concurrent changes from missing one.
+    """
+    with transaction.atomic():
+        blob = (
+            StoredBlob.objects.select_for_update()
+            .filter(pk=blob_id)
+            .values("tenant_id", "size", "ref_count")
+            .first()
+        )
+        if blob is None or blob["ref_count"] + delta < 0:
+            return
+        StoredBlob.objects.filter(pk=blob_id).update(
+            ref_count=F("ref_count") + delta, updated_at=timezone.now()
+        )
+        if blob["ref_count"] == 0:
+            adjust_usage(blob["tenant_id"], storage_bytes=blob["size"])
+        elif blob["ref_count"] + delta == 0:
+            adjust_usage(blob["tenant_id"], storage_bytes=-blob["size"])
+
+
+def release_blob_sync(blob_id) -> None:
+    """Drop one reference; blobs at zero are purged by collect_garbage"""
+    _change_refs(blob_id, -1)
+
+
+def retain_blob_sync(blob_id) -> None:
+    """Add one reference"""
+    _change_refs(blob_id, 1)
+
+
+def _delete_blob_object_sync(blob: StoredBlob) -> None:
+    """Delete a blob's storage object and derivatives; raises if that fails"""
+    from app.services.image_pipeline import delete_derivatives_sync
+
+    delete_derivatives_sync(f"{blob.tenant_id}/{blob.sha256}")
+    if blob.backend == "django":
+        default_storage.delete(blob.storage_key)
+    elif blob.backend == "s3":
+        storage = StorageService()
+        if not storage.s3_client:
+            raise RuntimeError("S3 is not configured")
+        storage.s3_client.delete_object(
+            Bucket=storage.bucket_name, Key=blob.storage_key
+        )
+    else:
+        try:
+            os.remove(blob.storage_key)
+        except FileNotFoundError:
+            pass
+
+
+def _collect_blob_sync(blob_id, cutoff) -> Optional[int]:
+    """
+    Delete one unreferenced blob, storage object first and row second.
+
+    The row stays locked while the object is deleted, so it cannot be handed
+    out to a new upload in between. If the object delete fails the
+    transaction rolls back and the row is kept for the next run. Returns the
+    bytes freed, or None if the blob was re-referenced meanwhile.
+    """
+    with transaction.atomic():
+        blob = (
+            StoredBlob.objects.select_for_update()
+            .filter(pk=blob_id, ref_count=0, updated_at__lt=cutoff)
+            .first()
+        )
+        if blob is None:
+            return None
+        _delete_blob_object_sync(blob)
+        blob.delete()
+    return blob.size
+
+
+async def collect_garbage(
+    grace_period: Optional[timedelta] = None, batch_size: int = 500
+) -> Dict[str, int]:
+    """
+    Delete blobs whose ref_count dropped to zero.
+
+    Blobs referenced or released within the grace period are kept, so an
+    upload that just matched an existing blob cannot lose it before its
+    referencing row is saved. Blobs whose storage object could not be
+    deleted keep their row and are retried on the next run.
+    """
+    grace_period = grace_period or timedelta(minutes=settings.BLOB_GC_GRACE_MINUTES)
+    cutoff = timezone.now() - grace_period
+    stats = {"candidates": 0, "deleted": 0, "bytes_freed": 0, "errors": 0}
+
+    candidates = await sync_to_async(list)(
+        StoredBlob.objects.filter(ref_count=0, updated_at__lt=cutoff)
+        .order_by("updated_at")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    stats["candidates"] = len(candidates)
+
+    for blob_id in candidates:
+        try:
+            freed = await sync_to_async(_collect_blob_sync)(blob_id, cutoff)
+        except Exception as e:
+            logger.error(f"Failed to delete storage object for blob {blob_id}: {e}")
+            stats["errors"] += 1
+            continue
+        if freed is not None:
+            stats["deleted"] += 1
+            stats["bytes_freed"] += freed
+
+    logger.info(f"Blob garbage collection finished: {stats}")
+    return stats
@@ -8,6 +8,14 @@ from django.db.models import Q, Count
 from asgiref.sync import sync_to_async
 
 from app.db.models import Property, Contact, Tenant
+from app.services.property_matching import (
+    MATCH_STATUS,
+    contact_budget,
+    count_matched_contacts,
+    get_property_index,
+    lead_quality,
+    match_score,
+)
 from app.schemas.cim import (
     CIMOverviewResponse, RecentPropertySummary, RecentContactSummary,
     PerfectMatch, CIMSummary
@@ -29,18 +37,14 @@ class CIMService:
     ) -> CIMOverviewResponse:
         """Get CIM dashboard overview"""
         
-        # Recent properties - wrap sync DB calls in sync_to_async
-        properties_query = Property.objects.filter(tenant_id=self.tenant_id)
-        if property_status:
-            properties_query = properties_query.filter(status=property_status)
-        
-        # Fetch properties synchronously
-        properties_list = await sync_to_async(list)(
-            properties_query.order_by('-created_at')[:limit]
+        # All reads in one thread hop with a constant number of queries
+        data = await sync_to_async(self._load_overview)(
+            limit, property_status, contact_status
         )
-        
+        index = data['index']
+
         recent_properties = []
-        for prop in properties_list:
+        for prop in data['properties']:
             recent_property = RecentPropertySummary(
                 id=str(prop.id),
                 title=prop.title,
@@ -58,22 +62,10 @@ class CIMService:
             )
             recent_properties.append(recent_property)
         
-        # Recent contacts - wrap sync DB calls in sync_to_async
-        contacts_query = Contact.objects.filter(tenant_id=self.tenant_id)
-        if contact_status:
-            contacts_query = contacts_query.filter(status=contact_status)
-        
-        # Fetch contacts synchronously
-        contacts_list = await sync_to_async(list)(
-            contacts_query.order_by('-created_at')[:limit]
-        )
-        
         recent_contacts = []
-        for contact in contacts_list:
+        for contact in data['contacts']:
             # Use main budget field, fallback to budget_max for migration
-            budget = float(contact.budget) if contact.budget else None
-            if budget is None and contact.budget_max:
-                budget = float(contact.budget_max)
+            budget = contact_budget(contact)
             
             budget_min = float(contact.budget_min) if contact.budget_min else None
             budget_max = float(contact.budget_max) if contact.budget_max else None
@@ -90,27 +82,8 @@ class CIMService:
             else:
                 budget_formatted = "Kein Budget angegeben"
             
-            # Find matching properties based on budget
-            matching_properties = []
-            matching_count = 0
-            
-            search_budget = budget if budget else budget_max
-            if search_budget:
-                # Find properties within budget range (with 10% flexibility)
-                budget_upper_limit = search_budget * 1.1  # 10% tolerance
-                budget_lower_limit = budget_min if budget_min else 0
-                
-                matching_props = await sync_to_async(list)(
-                    Property.objects.filter(
-                        tenant_id=self.tenant_id,
-                        status='active',
-                        price__gte=budget_lower_limit,
-                        price__lte=budget_upper_limit
-                    ).order_by('-created_at')[:5]
-                )
-                
-                matching_properties = [str(prop.id) for prop in matching_props]
-                matching_count = len(matching_properties)
+            # Matching properties from the in-memory index (no query per contact)
+            matching_properties = [str(prop.id) for prop in index.matches_for(contact, 5)]
             
             recent_contact = RecentContactSummary(
                 id=str(contact.id),
@@ -128,122 +101,43 @@ class CIMService:
                 last_action="Erstellt",
                 lead_score=contact.lead_score,
                 matching_properties=matching_properties,
-                matching_count=matching_count
+                matching_count=len(matching_properties)
             )
             recent_contacts.append(recent_contact)
         
-        # Perfect matches - find contacts with budget and matching properties
+        # Perfect matches - top contacts by lead score against the same index
         perfect_matches = []
-        
-        # Get contacts with budget defined
-        contacts_with_budget = await sync_to_async(list)(
-            Contact.objects.filter(
-                tenant_id=self.tenant_id
-            ).exclude(
-                budget__isnull=True, budget_max__isnull=True
-            ).order_by('-lead_score')[:20]
-        )
-        
-        for contact in contacts_with_budget:
-            # Use main budget field, fallback to budget_max
-            budget = float(contact.budget) if contact.budget else None
-            if budget is None and contact.budget_max:
-                budget = float(contact.budget_max)
-                
+        for contact in data['contacts_with_budget']:
+            budget = contact_budget(contact)
             if not budget or budget <= 0:
                 continue
             
-            # Find matching properties
-            budget_upper_limit = budget * 1.1
-            budget_lower_limit = float(contact.budget_min) if contact.budget_min else 0
-            
-            matching_props = await sync_to_async(list)(
-                Property.objects.filter(
-                    tenant_id=self.tenant_id,
-                    status='active',
-                    price__gte=budget_lower_limit,
-                    price__lte=budget_upper_limit
-                ).order_by('-created_at')[:3]
-            )
-            
-            # Create perfect match entries
-            for prop in matching_props:
-                # Calculate match score based on budget fit and lead score
-                price_diff = abs(float(prop.price) - budget) if prop.price else budget
-                price_fit = max(0, 100 - (price_diff / budget * 100))
-                match_score = (price_fit * 0.7) + (contact.lead_score * 0.3)
-                
-                # Determine lead quality
-                if contact.lead_score >= 70:
-                    lead_quality = 'Hot'
-                elif contact.lead_score >= 40:
-                    lead_quality = 'Warm'
-                else:
-                    lead_quality = 'Cold'
-                
-                budget_str = f"€{budget:,.0f}" if budget else "N/A"
-                price_str = f"€{float(prop.price):,.0f}" if prop.price else "N/A"
-                
-                perfect_match = PerfectMatch(
+            for prop in index.matches_for(contact, 3):
+                perfect_matches.append(PerfectMatch(
                     contact_id=str(contact.id),
                     contact_name=contact.name,
-                    contact_budget=budget_str,
+                    contact_budget=f"€{budget:,.0f}",
                     property_id=str(prop.id),
                     property_title=prop.title,
-                    property_price=price_str,
-                    match_score=round(match_score, 1),
-                    lead_quality=lead_quality,
+                    property_price=f"€{prop.price:,.0f}" if prop.price else "N/A",
+                    match_score=match_score(prop.price, budget, contact.lead_score),
+                    lead_quality=lead_quality(contact.lead_score),
                     contact_lead_score=contact.lead_score
-                )
-                perfect_matches.append(perfect_match)
+                ))
         
         # Sort by match score and limit
         perfect_matches.sort(key=lambda x: x.match_score, reverse=True)
         perfect_matches = perfect_matches[:10]
         
-        # Summary statistics - wrap all count queries
-        total_properties = await sync_to_async(
-            Property.objects.filter(tenant_id=self.tenant_id).count
-        )()
-        
-        active_properties = await sync_to_async(
-            Property.objects.filter(tenant_id=self.tenant_id, status='active').count
-        )()
-        
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        new_properties_last_30_days = await sync_to_async(
-            Property.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=thirty_days_ago
-            ).count
-        )()
-        
-        total_contacts = await sync_to_async(
-            Contact.objects.filter(tenant_id=self.tenant_id).count
-        )()
-        
-        new_leads_last_30_days = await sync_to_async(
-            Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=thirty_days_ago
-            ).count
-        )()
-        
-        high_priority_contacts = await sync_to_async(
-            Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                lead_score__gte=80
-            ).count
-        )()
-        
+        property_stats, contact_stats = data['property_stats'], data['contact_stats']
         summary = CIMSummary(
-            total_properties=total_properties,
-            active_properties=active_properties,
-            new_properties_last_30_days=new_properties_last_30_days,
-            total_contacts=total_contacts,
-            new_leads_last_30_days=new_leads_last_30_days,
-            high_priority_contacts=high_priority_contacts,
-            matched_contacts_properties=0  # TODO: Implement matching count
+            total_properties=property_stats['total'],
+            active_properties=property_stats['active'],
+            new_properties_last_30_days=property_stats['new_last_30_days'],
+            total_contacts=contact_stats['total'],
+            new_leads_last_30_days=contact_stats['new_last_30_days'],
+            high_priority_contacts=contact_stats['high_priority'],
+            matched_contacts_properties=data['matched_contacts']
         )
         
         return CIMOverviewResponse(
@@ -253,3 +147,44 @@ class CIMService:
             summary=summary,
             generated_at=datetime.utcnow()
         )
+
+    def _load_overview(
+        self,
+        limit: int,
+        property_status: Optional[str],
+        contact_status: Optional[str]
+    ) -> dict:
+        """Everything the overview reads; query count is independent of contacts"""
+        properties_query = Property.objects.filter(tenant_id=self.tenant_id)
+        if property_status:
+            properties_query = properties_query.filter(status=property_status)
+        
+        contacts_query = Contact.objects.filter(tenant_id=self.tenant_id)
+        if contact_status:
+            contacts_query = contacts_query.filter(status=contact_status)
+        
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        
+        return {
+            'properties': list(properties_query.order_by('-created_at')[:limit]),
+            'contacts': list(contacts_query.order_by('-created_at')[:limit]),
+            'contacts_with_budget': list(
+                Contact.objects.filter(
+                    tenant_id=self.tenant_id
+                ).exclude(
+                    budget__isnull=True, budget_max__isnull=True
+                ).order_by('-lead_score')[:20]
+            ),
+            'index': get_property_index(self.tenant_id),
+            'matched_contacts': count_matched_contacts(self.tenant_id),
+            'property_stats': Property.objects.filter(tenant_id=self.tenant_id).aggregate(
+                total=Count('id'),
+                active=Count('id', filter=Q(status=MATCH_STATUS)),
+                new_last_30_days=Count('id', filter=Q(created_at__gte=thirty_days_ago)),
+            ),
+            'contact_stats': Contact.objects.filter(tenant_id=self.tenant_id).aggregate(
+                total=Count('id'),
+                new_last_30_days=Count('id', filter=Q(created_at__gte=thirty_days_ago)),
+                high_priority=Count('id', filter=Q(lead_score__gte=80)),
+            ),
+        }
@@ -1,11 +1,13 @@
 """
 Communications Service for Channels/Messages/Reactions
 """
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Any
 from datetime import datetime
 from asgiref.sync import sync_to_async
 from django.db.models import Q
 
+from app.core.pubsub import pubsub
+
 from app.db.models import (
     Channel,
     ChannelMembership,
@@ -13,6 +15,7 @@ from app.db.models import (
     Reaction,
     Attachment,
     ResourceLink,
+    StoredBlob,
 )
 from app.schemas.communications import (
     ChannelResponse,
@@ -29,8 +32,16 @@ from app.schemas.communications import (
     EditMessageRequest,
     ReactionRequest,
     SearchMessagesResponse,
+    MessageSearchHit,
+    MessagesSinceResponse,
 )
 from app.core.errors import NotFoundError, ValidationError, ForbiddenError
+from app.services.message_search import search_message_ids, highlight_snippet
+
+
+def chat_channel(tenant_id, channel_id) -> str:
+    """Pub/Sub channel for realtime events of one chat channel"""
+    return f"chat:{tenant_id}:{channel_id}"
 
 
 class CommunicationsService:
@@ -67,6 +78,19 @@ class CommunicationsService:
             raise ForbiddenError("Not a member of this channel")
         return membership
 
+    async def get_member_channel(self, channel_id: str, user_id: str) -> Channel:
+        """Channel if the user is a member (used by the realtime gateway)"""
+        channel = await self._get_channel(channel_id)
+        if not channel:
+            raise NotFoundError("Channel not found")
+        await self._require_membership(channel, user_id)
+        return channel
+
+    async def _broadcast(self, channel_id, event: str, data: Dict[str, Any]) -> None:
+        await pubsub.publish(
+            chat_channel(self.tenant_id, channel_id), {"event": event, "data": data}
+        )
+
     # ---------- Channel operations ----------
 
     async def list_channels(self, user_id: str, team_id: Optional[str] = None, search: Optional[str] = None) -> List[ChannelResponse]:
@@ -146,6 +170,7 @@ class CommunicationsService:
             channel.delete()
 
         await delete()
+        await self._broadcast(channel_id, "channel.deleted", {"channel_id": str(channel_id)})
 
     async def add_member(self, channel_id: str, data: AddMemberRequest, user_id: str) -> ChannelMemberResponse:
         channel = await self._get_channel(channel_id)
@@ -203,6 +228,8 @@ class CommunicationsService:
             ).delete()
 
         await remove()
+        # Open gateway connections of the removed user close on this event
+        await self._broadcast(channel.id, "member.removed", {"user_id": str(member_user_id)})
 
     # ---------- Message operations ----------
 
@@ -216,16 +243,61 @@ class CommunicationsService:
         def fetch():
             qs = (
                 Message.objects.filter(channel=channel, tenant_id=self.tenant_id)
-                .select_related("user", "parent")
                 .prefetch_related("attachments", "reactions", "resource_links")
                 .order_by("created_at")
             )
             total = qs.count()
-            items = list(qs[offset : offset + limit])
+            items = [self._serialize_message(m) for m in qs[offset : offset + limit]]
             return items, total
 
-        items, total = await fetch()
-        return [await self._build_message_response(m) for m in items], total
+        return await fetch()
+
+    async def list_messages_since(
+        self,
+        channel_id: str,
+        user_id: str,
+        after_id: Optional[str] = None,
+        limit: int = 100,
+    ) -> MessagesSinceResponse:
+        """
+        Catch-up after a (re)connect: messages created after `after_id`, oldest first.
+        Without after_id the latest `limit` messages are returned.
+        """
+        channel = await self.get_member_channel(channel_id, user_id)
+
+        @sync_to_async
+        def fetch():
+            qs = Message.objects.filter(channel=channel, tenant_id=self.tenant_id)
+            if after_id:
+                anchor = (
+                    qs.filter(id=after_id).values("created_at", "id").first()
+                )
+                if not anchor:
+                    return None
+                # (created_at, id) keyset so messages with equal timestamps are not skipped
+                qs = qs.filter(
+                    Q(created_at__gt=anchor["created_at"])
+                    | Q(created_at=anchor["created_at"], id__gt=anchor["id"])
+                ).order_by("created_at", "id")
+                items = list(
+                    qs.prefetch_related("attachments", "reactions", "resource_links")[: limit + 1]
+                )
+                has_more = len(items) > limit
+                items = items[:limit]
+            else:
+                items = list(
+                    qs.order_by("-created_at", "-id")
+                    .prefetch_related("attachments", "reactions", "resource_links")[: limit + 1]
+                )
+                has_more = len(items) > limit
+                items = items[:limit][::-1]
+            return [self._serialize_message(m) for m in items], has_more
+
+        result = await fetch()
+        if result is None:
+            raise NotFoundError("Message not found")
+        items, has_more = result
+        return MessagesSinceResponse(items=items, has_more=has_more)
 
     async def _get_message(self, message_id: str) -> Optional[Message]:
         @sync_to_async
@@ -261,6 +333,17 @@ class CommunicationsService:
                 parent=parent,
                 has_attachments=bool(data.attachments),
             )
+            # Link attachments to stored blobs so shared files are ref-counted
+            blob_ids = (
+                dict(
+                    StoredBlob.objects.filter(
+                        tenant_id=self.tenant_id,
+                        url__in=[att.file_url for att in data.attachments],
+                    ).values_list("url", "id")
+                )
+                if data.attachments
+                else {}
+            )
             for att in data.attachments or []:
                 Attachment.objects.create(
                     tenant_id=self.tenant_id,
@@ -269,6 +352,7 @@ class CommunicationsService:
                     file_name=att.file_name,
                     file_type=att.file_type,
                     file_size=att.file_size,
+                    blob_id=blob_ids.get(att.file_url),
                 )
             for rl in data.resource_links or []:
                 ResourceLink.objects.create(
@@ -281,7 +365,9 @@ class CommunicationsService:
             return message
 
         message = await create()
-        return await self._build_message_response(message)
+        response = await self._build_message_response(message)
+        await self._broadcast(channel.id, "message.created", response.model_dump(mode="json"))
+        return response
 
     async def edit_message(self, message_id: str, data: EditMessageRequest, user_id: str) -> MessageResponse:
         message = await self._get_message(message_id)
@@ -299,7 +385,9 @@ class CommunicationsService:
             return message
 
         message = await update()
-        return await self._build_message_response(message)
+        response = await self._build_message_response(message)
+        await self._broadcast(message.channel_id, "message.updated", response.model_dump(mode="json"))
+        return response
 
     async def delete_message(self, message_id: str, user_id: str) -> None:
         message = await self._get_message(message_id)
@@ -316,6 +404,7 @@ class CommunicationsService:
             message.save()
 
         await delete()
+        await self._broadcast(message.channel_id, "message.deleted", {"id": str(message.id)})
 
     async def add_reaction(self, message_id: str, data: ReactionRequest, user_id: str) -> ReactionResponse:
         message = await self._get_message(message_id)
@@ -334,12 +423,18 @@ class CommunicationsService:
             return reaction
 
         reaction = await add()
-        return ReactionResponse(
+        response = ReactionResponse(
             id=str(reaction.id),
             emoji=reaction.emoji,
             user_id=str(reaction.user_id),
             created_at=reaction.created_at,
         )
+        await self._broadcast(
+            message.channel_id,
+            "reaction.added",
+            {"message_id": str(message.id), "reaction": response.model_dump(mode="json")},
+        )
+        return response
 
     async def remove_reaction(self, message_id: str, emoji: str, user_id: str) -> None:
         message = await self._get_message(message_id)
@@ -349,33 +444,35 @@ class CommunicationsService:
 
         @sync_to_async
         def remove():
-            Reaction.objects.filter(
+            return Reaction.objects.filter(
                 tenant_id=self.tenant_id, message=message, user_id=user_id, emoji=emoji
-            ).delete()
+            ).delete()[0]
 
-        await remove()
+        if await remove():
+            await self._broadcast(
+                message.channel_id,
+                "reaction.removed",
+                {"message_id": str(message.id), "user_id": str(user_id), "emoji": emoji},
+            )
 
     async def search_messages(self, query: str, user_id: str, limit: int = 50) -> SearchMessagesResponse:
         @sync_to_async
         def fetch():
-            qs = (
-                Message.objects.filter(
-                    tenant_id=self.tenant_id,
-                    content__icontains=query,
+            ids = search_message_ids(self.tenant_id, user_id, query, limit)
+            messages = Message.objects.filter(id__in=ids).prefetch_related(
+                "attachments", "reactions", "resource_links"
+            ).in_bulk()
+            return [
+                MessageSearchHit(
+                    **self._serialize_message(messages[mid]).model_dump(),
+                    snippet=highlight_snippet(messages[mid].content, query),
                 )
-                .filter(Q(channel__is_private=False) | Q(channel__memberships__user_id=user_id))
-                .select_related("channel")
-                .prefetch_related("attachments", "reactions", "resource_links")
-                .order_by("-created_at")[:limit]
-            )
-            items = list(qs)
-            return items, len(items)
+                for mid in ids
+                if mid in messages
+            ]
 
-        items, total = await fetch()
-        return SearchMessagesResponse(
-            items=[await self._build_message_response(m) for m in items],
-            total=total,
-        )
+        items = await fetch()
+        return SearchMessagesResponse(items=items, total=len(items))
 
     # ---------- Private helpers ----------
 
@@ -406,41 +503,42 @@ class CommunicationsService:
         )
 
     async def _build_message_response(self, message: Message) -> MessageResponse:
-        @sync_to_async
-        def fetch_related():
-            attachments = [
-                AttachmentResponse(
-                    id=str(a.id),
-                    file_url=a.file_url,
-                    file_name=a.file_name,
-                    file_type=a.file_type,
-                    file_size=a.file_size,
-                    created_at=a.created_at,
-                )
-                for a in message.attachments.all()
-            ]
-            reactions = [
-                ReactionResponse(
-                    id=str(r.id),
-                    emoji=r.emoji,
-                    user_id=str(r.user_id),
-                    created_at=r.created_at,
-                )
-                for r in message.reactions.all()
-            ]
-            resource_links = [
-                ResourceLinkResponse(
-                    id=str(rl.id),
-                    resource_type=rl.resource_type,
-                    resource_id=str(rl.resource_id),
-                    label=rl.label,
-                    created_at=rl.created_at,
-                )
-                for rl in message.resource_links.all()
-            ]
-            return attachments, reactions, resource_links
+        return await sync_to_async(self._serialize_message)(message)
+
+    @staticmethod
+    def _serialize_message(message: Message) -> MessageResponse:
+        """Build the response from prefetched relations (sync, no thread hop)"""
+        attachments = [
+            AttachmentResponse(
+                id=str(a.id),
+                file_url=a.file_url,
+                file_name=a.file_name,
+                file_type=a.file_type,
+                file_size=a.file_size,
+                created_at=a.created_at,
+            )
+            for a in message.attachments.all()
+        ]
+        reactions = [
+            ReactionResponse(
+                id=str(r.id),
+                emoji=r.emoji,
+                user_id=str(r.user_id),
+                created_at=r.created_at,
+            )
+            for r in message.reactions.all()
+        ]
+        resource_links = [
+            ResourceLinkResponse(
+                id=str(rl.id),
+                resource_type=rl.resource_type,
+                resource_id=str(rl.resource_id),
+                label=rl.label,
+                created_at=rl.created_at,
+            )
+            for rl in message.resource_links.all()
+        ]
 
-        attachments, reactions, resource_links = await fetch_related()
         return MessageResponse(
             id=str(message.id),
             channel_id=str(message.channel_id),
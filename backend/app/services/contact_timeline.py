@@ -0,0 +1,252 @@
+"""
+Contact Timeline
+
+Keeps the task ↔ contact links and the per-contact activity timeline
+(ContactActivity) in sync with appointments and tasks, and reads it: a
+cursor-paginated timeline for the 360 view and bounded recent windows for
+many contacts in one query (lead scoring).
+"""
+import base64
+import binascii
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from app.core.errors import ValidationError
+from app.db.models import Appointment, Contact, ContactActivity, Task, TaskContact
+
+TASK_CONTACT_TAG = "contact:{}"
+LOGGABLE_TYPES = ("email", "call", "note")
+MAX_PAGE_SIZE = 100
+
+ACTIVITY_FIELDS = [
+    "type",
+    "status",
+    "title",
+    "description",
+    "occurred_at",
+    "scheduled_at",
+    "completed_at",
+]
+
+
+def contact_ids_from_tags(tags) -> List[str]:
+    """Contact ids referenced by "contact:<uuid>" task tags (malformed ones skipped)"""
+    prefix = TASK_CONTACT_TAG.format("")
+    ids = []
+    for tag in tags or []:
+        if isinstance(tag, str) and tag.startswith(prefix):
+            try:
+                ids.append(str(uuid.UUID(tag[len(prefix):])))
+            except ValueError:
+                continue
+    return ids
+
+
+def _appointment_fields(appt: Appointment) -> Dict[str, Any]:
+    return {
+        "type": appt.type,
+        "status": appt.status,
+        "title": appt.title,
+        "description": appt.description,
+        "occurred_at": appt.created_at,
+        "scheduled_at": appt.start_datetime,
+        "completed_at": appt.end_datetime
+        if appt.status in ["completed", "cancelled"]
+        else None,
+    }
+
+
+def _task_fields(task: Task) -> Dict[str, Any]:
+    return {
+        "type": "task",
+        "status": task.status,
+        "title": task.title,
+        "description": task.description,
+        "occurred_at": task.created_at,
+        "scheduled_at": task.due_date,
+        "completed_at": task.updated_at
+        if task.status in ["done", "completed"]
+        else None,
+    }
+
+
+def _sync_source(
+    tenant_id, source: str, source_id, contact_ids: Set[str], fields: Dict[str, Any]
+) -> Set[str]:
+    """Upsert the rows of one source for `contact_ids`, drop the others; returns affected ids"""
+    stale = ContactActivity.objects.filter(source=source, source_id=source_id).exclude(
+        contact_id__in=contact_ids
+    )
+    affected = {str(contact_id) for contact_id in stale.values_list("contact_id", flat=True)}
+    stale.delete()
+
+    if contact_ids:
+        ContactActivity.objects.bulk_create(
+            [
+                ContactActivity(
+                    tenant_id=tenant_id,
+                    contact_id=contact_id,
+                    source=source,
+                    source_id=source_id,
+                    **fields,
+                )
+                for contact_id in contact_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["source", "source_id", "contact"],
+            update_fields=ACTIVITY_FIELDS,
+        )
+    return affected | contact_ids
+
+
+def _existing_contacts(tenant_id, contact_ids: Iterable) -> Set[str]:
+    ids = [contact_id for contact_id in contact_ids if contact_id]
+    if not ids:
+        return set()
+    return {
+        str(contact_id)
+        for contact_id in Contact.objects.filter(tenant_id=tenant_id, id__in=ids).values_list(
+            "id", flat=True
+        )
+    }
+
+
+def sync_appointment(appt: Appointment) -> Set[str]:
+    """Timeline row for the appointment's contact; returns contact ids affected"""
+    contact_ids = _existing_contacts(appt.tenant_id, [appt.contact_id])
+    with transaction.atomic():
+        return _sync_source(
+            appt.tenant_id, "appointment", appt.id, contact_ids, _appointment_fields(appt)
+        )
+
+
+def sync_task(task: Task) -> Set[str]:
+    """Links and timeline rows from the task's contact tags; returns contact ids affected"""
+    contact_ids = _existing_contacts(task.tenant_id, contact_ids_from_tags(task.tags))
+    with transaction.atomic():
+        links = TaskContact.objects.filter(task_id=task.id)
+        linked = {str(contact_id) for contact_id in links.values_list("contact_id", flat=True)}
+        if linked - contact_ids:
+            links.exclude(contact_id__in=contact_ids).delete()
+        TaskContact.objects.bulk_create(
+            [
+                TaskContact(tenant_id=task.tenant_id, task_id=task.id, contact_id=contact_id)
+                for contact_id in contact_ids - linked
+            ],
+            ignore_conflicts=True,
+        )
+        return linked | _sync_source(
+            task.tenant_id, "task", task.id, contact_ids, _task_fields(task)
+        )
+
+
+def remove_source(source: str, source_id) -> Set[str]:
+    """Drop all timeline rows of a deleted appointment/task; returns contact ids affected"""
+    rows = ContactActivity.objects.filter(source=source, source_id=source_id)
+    affected = {str(contact_id) for contact_id in rows.values_list("contact_id", flat=True)}
+    rows.delete()
+    return affected
+
+
+def record_activity(
+    tenant_id,
+    contact_id,
+    type: str,
+    title: str = "",
+    description: Optional[str] = None,
+    status: str = "completed",
+    occurred_at: Optional[datetime] = None,
+    created_by_id=None,
+) -> ContactActivity:
+    """Log an email, call or note on a contact's timeline"""
+    if type not in LOGGABLE_TYPES:
+        raise ValidationError(f"Activity type must be one of {', '.join(LOGGABLE_TYPES)}")
+    now = timezone.now()
+    return ContactActivity.objects.create(
+        tenant_id=tenant_id,
+        contact_id=contact_id,
+        source=type,
+        type=type,
+        status=status,
+        title=title,
+        description=description,
+        occurred_at=occurred_at or now,
+        completed_at=occurred_at or now,
+        created_by_id=created_by_id,
+    )
+
+
+def activity_dict(row: ContactActivity) -> Dict[str, Any]:
+    """Timeline row in the activity format used by lead scoring and the 360 view"""
+    return {
+        "id": str(row.source_id or row.id),
+        "type": row.type,
+        "status": row.status,
+        "title": row.title,
+        "description": row.description,
+        "created_at": row.occurred_at,
+        "scheduled_at": row.scheduled_at,
+        "completed_at": row.completed_at,
+    }
+
+
+def recent_activities(tenant_id, contact_ids: Iterable, limit: int) -> Dict[str, List[dict]]:
+    """Newest `limit` activities of each contact, newest first, in one query"""
+    ids = list(contact_ids)
+    if not ids:
+        return {}
+    rows = (
+        ContactActivity.objects.filter(tenant_id=tenant_id, contact_id__in=ids)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("contact_id")],
+                order_by=[F("occurred_at").desc(), F("id").desc()],
+            )
+        )
+        .filter(position__lte=limit)
+        .order_by("contact_id", "-occurred_at", "-id")
+    )
+    by_contact: Dict[str, List[dict]] = defaultdict(list)
+    for row in rows:
+        by_contact[str(row.contact_id)].append(activity_dict(row))
+    return dict(by_contact)
+
+
+def encode_cursor(occurred_at: datetime, row_id) -> str:
+    return base64.urlsafe_b64encode(f"{occurred_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        occurred_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(occurred_at), uuid.UUID(row_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValidationError("Invalid cursor")
+
+
+def timeline_page(
+    tenant_id, contact_id, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """One page of a contact's timeline (newest first) and the cursor of the next page"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    qs = ContactActivity.objects.filter(tenant_id=tenant_id, contact_id=contact_id)
+    if cursor:
+        occurred_at, row_id = decode_cursor(cursor)
+        qs = qs.filter(
+            Q(occurred_at__lt=occurred_at) | Q(occurred_at=occurred_at, id__lt=row_id)
+        )
+    rows = list(qs.order_by("-occurred_at", "-id")[: limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].occurred_at, rows[-1].id)
+    return [activity_dict(row) for row in rows], next_cursor
@@ -2,18 +2,24 @@
 Contacts Service
 """
 from typing import Optional, List, Tuple
-from datetime import datetime
 from django.db import models
 from django.db.models import Q
 from asgiref.sync import sync_to_async
 
-from app.db.models import Contact, Property, Task, Appointment
+from app.db.models import Contact, Property
 from app.schemas.contacts import (
-    ContactResponse, CreateContactRequest, UpdateContactRequest
+    ContactResponse, CreateContactRequest, UpdateContactRequest, LogActivityRequest
 )
 from app.schemas.properties import PropertyResponse
 from app.core.errors import NotFoundError
 from app.services.audit import AuditService
+from app.services.contact_timeline import (
+    activity_dict,
+    recent_activities,
+    record_activity,
+    timeline_page,
+)
+from app.services.property_matching import get_property_index
 
 
 class ContactsService:
@@ -178,33 +184,26 @@ class ContactsService:
             except Contact.DoesNotExist:
                 raise NotFoundError("Contact not found")
             
-            # Use main budget field, fallback to budget_max
-            budget = float(contact.budget) if contact.budget else None
-            if budget is None and contact.budget_max:
-                budget = float(contact.budget_max)
-            
-            # If no budget, return empty list
-            if not budget:
+            # Budget window lookup in the shared in-memory index
+            matches = get_property_index(self.tenant_id).matches_for(contact, limit)
+            if not matches:
                 return []
             
-            budget_min = float(contact.budget_min) if contact.budget_min else 0
-            
-            # Add 10% tolerance to upper limit
-            budget_upper_limit = budget * 1.1
-            
-            # Find matching properties
-            queryset = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='active',
-                price__gte=budget_min,
-                price__lte=budget_upper_limit
-            ).order_by('-created_at')[:limit]
-            
-            return list(queryset)
+            by_id = Property.objects.in_bulk([prop.id for prop in matches])
+            return [by_id[prop.id] for prop in matches if prop.id in by_id]
         
         properties = await get_matching_sync()
         return [self._build_property_response(prop) for prop in properties]
     
+    async def get_lead_score(self, contact_id: str) -> dict:
+        """Persisted lead score details (rescored first when the contact is flagged)"""
+        from app.services.lead_rescoring import get_lead_score_sync
+
+        details = await sync_to_async(get_lead_score_sync)(self.tenant_id, contact_id)
+        if details is None:
+            raise NotFoundError("Contact not found")
+        return details
+    
     def _build_property_response(self, property_obj: Property) -> PropertyResponse:
         """Build PropertyResponse from Property model"""
         
@@ -266,68 +265,44 @@ class ContactsService:
         self, contact_id: str, limit: int = 100
     ) -> List[dict]:
         """
-        Return recent activities for a contact (appointments + tasks tagged with contact).
+        Return recent activities for a contact from its timeline (one query).
         Structure matches lead scoring expectations: type, status, timestamps.
         """
+        activities = await sync_to_async(recent_activities)(
+            self.tenant_id, [contact_id], limit
+        )
+        return activities.get(str(contact_id), [])
 
-        @sync_to_async
-        def fetch():
-            activities: List[dict] = []
+    async def get_contact_timeline(
+        self, contact_id: str, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One timeline page (newest first) plus the cursor of the next page"""
+        return await sync_to_async(timeline_page)(
+            self.tenant_id, contact_id, limit, cursor
+        )
 
-            appointments = (
-                Appointment.objects.filter(
-                    tenant_id=self.tenant_id, contact_id=contact_id
-                )
-                .order_by("-start_datetime")[:limit]
-            )
-            for appt in appointments:
-                activities.append(
-                    {
-                        "id": str(appt.id),
-                        "type": appt.type,
-                        "status": appt.status,
-                        "title": appt.title,
-                        "description": appt.description,
-                        "created_at": appt.created_at,
-                        "scheduled_at": appt.start_datetime,
-                        "completed_at": appt.end_datetime
-                        if appt.status in ["completed", "cancelled"]
-                        else None,
-                    }
-                )
+    async def log_activity(
+        self, contact_id: str, activity_data: LogActivityRequest, user_id: str
+    ) -> dict:
+        """Log an email, call or note on the contact's timeline"""
 
-            tasks = (
-                Task.objects.filter(
-                    tenant_id=self.tenant_id, tags__contains=[f"contact:{contact_id}"]
-                )
-                .order_by("-created_at")[:limit]
+        @sync_to_async
+        def log_sync():
+            if not Contact.objects.filter(id=contact_id, tenant_id=self.tenant_id).exists():
+                raise NotFoundError("Contact not found")
+            row = record_activity(
+                self.tenant_id,
+                contact_id,
+                type=activity_data.type,
+                title=activity_data.title,
+                description=activity_data.description,
+                status=activity_data.status,
+                occurred_at=activity_data.occurred_at,
+                created_by_id=user_id,
             )
-            for task in tasks:
-                activities.append(
-                    {
-                        "id": str(task.id),
-                        "type": "task",
-                        "status": task.status,
-                        "title": task.title,
-                        "description": task.description,
-                        "created_at": task.created_at,
-                        "scheduled_at": task.due_date,
-                        "completed_at": task.updated_at
-                        if task.status in ["done", "completed"]
-                        else None,
-                    }
-                )
+            from app.services.lead_rescoring import mark_contacts_dirty
 
-            return activities
+            mark_contacts_dirty([contact_id])
+            return activity_dict(row)
 
-        activities = await fetch()
-        activities = sorted(
-            activities,
-            key=lambda a: (
-                a.get("created_at")
-                or a.get("scheduled_at")
-                or datetime.utcnow()
-            ),
-            reverse=True,
-        )
-        return activities[:limit]
+        return await log_sync()
@@ -200,6 +200,7 @@ class DocumentsService:
         checksum: str,
         user_id: str,
         change_notes: Optional[str] = None,
+        blob_id: Optional[str] = None,
     ) -> DocumentVersionResponse:
         """Create a new version of a document"""
 
@@ -226,6 +227,7 @@ class DocumentsService:
             checksum=checksum,
             created_by_id=user_id,
             change_notes=change_notes,
+            blob_id=blob_id,
         )
 
         # Update document with new file info
@@ -233,6 +235,7 @@ class DocumentsService:
         await sync_to_async(document.__setattr__)("size", file_size)
         await sync_to_async(document.__setattr__)("checksum", checksum)
         await sync_to_async(document.__setattr__)("version", next_version)
+        document.blob_id = blob_id
         await sync_to_async(document.save)()
 
         return DocumentVersionResponse.model_validate(version)
@@ -508,7 +511,9 @@ class DocumentsService:
         """Create a new document"""
 
         # Billing Guard: Prüfe Storage-Limit ZUERST
-        file_size_mb = file_info["size"] / (1024 * 1024)  # Bytes zu MB
+        # Deduplizierte Inhalte belegen keinen zusätzlichen Speicher
+        added_bytes = 0 if file_info.get("deduplicated") else file_info["size"]
+        file_size_mb = added_bytes / (1024 * 1024)  # Bytes zu MB
         await BillingGuard.check_limit(
             self.tenant_id, "storage_gb", "create", int(file_size_mb)
         )
@@ -527,6 +532,8 @@ class DocumentsService:
             size=file_info["size"],
             mime_type=file_info["mime_type"],
             url=file_info["url"],
+            checksum=file_info.get("checksum"),
+            blob_id=file_info.get("blob_id"),
             uploaded_by=user,
             tags=metadata.tags,
             description=metadata.description,
@@ -0,0 +1,226 @@
+"""
+Image Pipeline Service
+
+Generates thumbnails and web-optimized sizes for property photos after upload.
+Pillow work runs in a process pool so it scales with CPU cores and never
+blocks the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any
+
+from asgiref.sync import sync_to_async
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from app.core.settings import settings
+from app.db.models import PropertyImage
+from app.services.image_processing import (
+    PIL_AVAILABLE,
+    VARIANT_WIDTHS,
+    render_derivatives,
+    supported_formats,
+)
+from app.services.storage_s3 import StorageService
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_ROOT = "properties/images/derivatives"
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Lazily created pool shared by all pipeline runs in this worker"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PIPELINE_WORKERS or os.cpu_count() or 1
+        )
+    return _process_pool
+
+
+def derivatives_prefix(image: PropertyImage) -> str:
+    # Keyed by content hash so deduplicated uploads share their derivatives
+    if image.blob_id:
+        return f"{DERIVATIVES_ROOT}/{image.blob.tenant_id}/{image.blob.sha256}"
+    return f"{DERIVATIVES_ROOT}/{image.id}"
+
+
+def delete_derivatives_sync(key: str) -> None:
+    """Remove all derivatives stored under "<tenant_id>/<sha256>" or an image id"""
+    prefix = f"{DERIVATIVES_ROOT}/{key}"
+    try:
+        _, files = default_storage.listdir(prefix)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for name in files:
+        default_storage.delete(f"{prefix}/{name}")
+
+
+def pick_variant(
+    variants: List[Dict[str, Any]],
+    min_width: Optional[int] = None,
+    formats: tuple = ("webp", "jpeg"),
+) -> Optional[Dict[str, Any]]:
+    """
+    Smallest variant at least min_width wide in the first available format.
+
+    Falls back to the largest variant when none is wide enough.
+    """
+    for fmt in formats:
+        candidates = sorted(
+            (v for v in variants if v.get("format") == fmt), key=lambda v: v["width"]
+        )
+        if not candidates:
+            continue
+        if not min_width:
+            return candidates[0]
+        for variant in candidates:
+            if variant["width"] >= min_width:
+                return variant
+        return candidates[-1]
+    return None
+
+
+class ImagePipeline:
+    """Builds size/format variants for PropertyImage rows"""
+
+    def __init__(self):
+        self.formats = supported_formats()
+
+    async def process_images(self, image_ids: List[str]) -> Dict[str, int]:
+        """Process images concurrently; the process pool bounds CPU usage"""
+        stats = {"processed": 0, "reused": 0, "skipped": 0, "errors": 0}
+        if not PIL_AVAILABLE:
+            logger.warning("Pillow not installed, skipping image derivatives")
+            stats["skipped"] = len(image_ids)
+            return stats
+
+        results = await asyncio.gather(
+            *(self.process_image(image_id) for image_id in image_ids),
+            return_exceptions=True,
+        )
+        for image_id, result in zip(image_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Image pipeline failed for {image_id}: {result}")
+                stats["errors"] += 1
+            else:
+                stats[result] += 1
+        return stats
+
+    async def process_image(self, image_id: str) -> str:
+        """Generate variants for one image; returns the stats bucket"""
+
+        @sync_to_async
+        def load():
+            try:
+                return PropertyImage.objects.select_related("blob").get(id=image_id)
+            except PropertyImage.DoesNotExist:
+                return None
+
+        image = await load()
+        if image is None:
+            return "skipped"
+
+        # Same content already processed for another image
+        if image.blob_id:
+            existing = await sync_to_async(
+                PropertyImage.objects.filter(blob_id=image.blob_id)
+                .exclude(id=image.id)
+                .exclude(variants=[])
+                .values("variants", "thumbnail_url")
+                .first
+            )()
+            if existing:
+                await self._save_variants(
+                    image, existing["variants"], existing["thumbnail_url"]
+                )
+                return "reused"
+
+        work_dir = tempfile.mkdtemp(prefix="imgpipe-", dir=settings.UPLOAD_TEMP_DIR)
+        try:
+            source_path = os.path.join(work_dir, "source")
+            if not await self._fetch_source(image, source_path):
+                return "skipped"
+
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                get_process_pool(),
+                render_derivatives,
+                source_path,
+                work_dir,
+                VARIANT_WIDTHS,
+                self.formats,
+                settings.IMAGE_VARIANT_QUALITY,
+            )
+
+            variants = await sync_to_async(self._store_variants_sync)(
+                derivatives_prefix(image), rendered
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        thumbnail = pick_variant(variants)
+        await self._save_variants(
+            image, variants, thumbnail["url"] if thumbnail else None
+        )
+        return "processed"
+
+    async def _fetch_source(self, image: PropertyImage, dest_path: str) -> bool:
+        """Copy the original to a local file for the worker process"""
+        if image.file:
+
+            @sync_to_async
+            def copy_from_storage():
+                with default_storage.open(image.file.name, "rb") as src, open(
+                    dest_path, "wb"
+                ) as dst:
+                    shutil.copyfileobj(src, dst, settings.UPLOAD_CHUNK_SIZE)
+
+            await copy_from_storage()
+            return True
+
+        if image.blob_id and image.blob.backend in ("s3", "local"):
+            await StorageService().download_to(image.blob.storage_key, dest_path)
+            return True
+
+        logger.warning(f"No stored original for image {image.id}")
+        return False
+
+    @staticmethod
+    def _store_variants_sync(
+        prefix: str, rendered: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        variants = []
+        for item in rendered:
+            name = f"{prefix}/{os.path.basename(item['path'])}"
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            with open(item["path"], "rb") as fh:
+                stored_name = default_storage.save(name, File(fh))
+            variants.append(
+                {
+                    "name": item["name"],
+                    "width": item["width"],
+                    "height": item["height"],
+                    "format": item["format"],
+                    "mime_type": item["mime_type"],
+                    "size": item["size"],
+                    "url": default_storage.url(stored_name),
+                }
+            )
+        return variants
+
+    @staticmethod
+    async def _save_variants(
+        image: PropertyImage, variants: List[Dict[str, Any]], thumbnail_url
+    ) -> None:
+        # update() instead of save(): leaves ref counting signals untouched
+        await sync_to_async(
+            PropertyImage.objects.filter(id=image.id).update
+        )(variants=variants, thumbnail_url=thumbnail_url)
@@ -0,0 +1,107 @@
+"""
+Image Processing
+
+Pure Pillow helpers used by the image pipeline. This module must not import
+Django: its functions run inside worker processes of a process pool.
+"""
+
+import os
+from typing import Dict, List, Any
+
+try:
+    from PIL import Image, ImageOps, features
+
+    try:
+        import pillow_avif  # noqa: F401  (registers AVIF on older Pillow)
+    except ImportError:
+        pass
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# Variant name -> target width in pixels (height follows aspect ratio)
+VARIANT_WIDTHS: Dict[str, int] = {
+    "thumbnail": 320,
+    "medium": 800,
+    "large": 1600,
+}
+
+FORMAT_EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+FORMAT_MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+
+def supported_formats() -> List[str]:
+    """Output formats available in this Pillow build, best first"""
+    if not PIL_AVAILABLE:
+        return []
+    formats = []
+    if features.check("avif") or "AVIF" in Image.SAVE:
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    formats.append("jpeg")
+    return formats
+
+
+def render_derivatives(
+    source_path: str,
+    out_dir: str,
+    widths: Dict[str, int],
+    formats: List[str],
+    quality: int = 80,
+) -> List[Dict[str, Any]]:
+    """
+    Render resized copies of an image into out_dir.
+
+    Orientation from EXIF is applied to the pixels, then all metadata is
+    dropped. Images are never upscaled; sizes larger than the original
+    collapse into a single variant at the original size.
+    """
+    results: List[Dict[str, Any]] = []
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        rendered_widths = set()
+        for name, width in sorted(widths.items(), key=lambda item: item[1]):
+            target_width = min(width, image.width)
+            if target_width in rendered_widths:
+                continue
+            rendered_widths.add(target_width)
+
+            resized = image.copy()
+            resized.thumbnail((target_width, image.height), Image.LANCZOS)
+
+            for fmt in formats:
+                frame = resized.convert("RGB") if fmt == "jpeg" else resized
+                path = os.path.join(out_dir, f"{name}.{FORMAT_EXTENSIONS[fmt]}")
+                save_kwargs = {"quality": quality}
+                if fmt == "jpeg":
+                    save_kwargs.update(optimize=True, progressive=True)
+                elif fmt == "webp":
+                    save_kwargs.update(method=4)
+
+                # No exif/icc arguments: saved files carry no metadata
+                frame.save(path, format=fmt.upper(), **save_kwargs)
+
+                results.append(
+                    {
+                        "name": name,
+                        "width": resized.width,
+                        "height": resized.height,
+                        "format": fmt,
+                        "mime_type": FORMAT_MIME_TYPES[fmt],
+                        "path": path,
+                        "size": os.path.getsize(path),
+                    }
+                )
+
+    return results
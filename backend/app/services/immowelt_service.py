@@ -12,6 +12,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from django.conf import settings
 from app.db.models import Property, PublishJob
+from app.core.errors import RateLimitError
 from app.services.oauth_service import OAuthService
 from app.services.rate_limit_manager import PlatformRateLimiter
 
@@ -109,13 +110,16 @@ class ImmoweltService:
         tenant_id: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
+        rate_limit: bool = True,
     ) -> Dict[str, Any]:
         """
         Make an authenticated request to the Immowelt API.
-        Includes rate limiting.
+        Includes rate limiting; callers that already hold a token of the
+        tenant's bucket pass rate_limit=False.
         """
         # Check rate limit
-        await self.rate_limiter.acquire("immowelt")
+        if rate_limit:
+            await self.rate_limiter.acquire("immowelt", tenant_id)
 
         access_token = await self._get_access_token(tenant_id)
         if not access_token:
@@ -141,7 +145,7 @@ class ImmoweltService:
             if response.status_code == 401:
                 raise Exception("Immowelt authentication failed")
             elif response.status_code == 429:
-                raise Exception("Immowelt rate limit exceeded")
+                raise RateLimitError("Immowelt rate limit exceeded")
             elif response.status_code >= 400:
                 raise Exception(f"Immowelt API error: {response.text}")
 
@@ -370,16 +374,18 @@ class ImmoweltService:
             raise Exception(f"Failed to unpublish from Immowelt: {e}")
 
     async def get_property_metrics(
-        self, portal_property_id: str, tenant_id: str
+        self, portal_property_id: str, tenant_id: str, rate_limit: bool = True
     ) -> Dict[str, Any]:
         """
         Get performance metrics for a property on Immowelt.
+        Raises RateLimitError when no request could be made.
         """
         try:
             result = await self._make_request(
                 method="GET",
                 endpoint=f"/objects/{portal_property_id}/statistics",
                 tenant_id=tenant_id,
+                rate_limit=rate_limit,
             )
 
             return {
@@ -391,6 +397,8 @@ class ImmoweltService:
                 "last_updated": datetime.now().isoformat(),
             }
 
+        except RateLimitError:
+            raise
         except Exception as e:
             print(f"Error getting Immowelt metrics: {e}")
             return {
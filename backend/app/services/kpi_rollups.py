@@ -0,0 +1,308 @@
+"""
+KPI Rollups
+Tägliche KPI-Aggregate pro Tenant: nächtliche Verdichtung vergangener Tage
+plus Live-Delta für den aktuellen Tag
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DateTimeField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from app.db.models import Appointment, Contact, KpiDailyRollup, Property, Task
+
+# Property status values (model choices are German, older rows use English)
+SALE_STATUSES = ("sold", "verkauft")
+RENTAL_STATUSES = ("rented",)
+CLOSED_STATUSES = SALE_STATUSES + RENTAL_STATUSES
+OFFER_STATUSES = CLOSED_STATUSES + ("under_contract", "reserviert")
+VACANT_STATUSES = ("available",)
+ACTIVE_STATUSES = ("active", "aktiv")
+
+QUALIFIED_LEAD_SCORE = 50
+DEFAULT_LOOKBACK_DAYS = 400
+
+COUNTER_FIELDS = [
+    "contacts_new",
+    "contacts_customer",
+    "contacts_qualified",
+    "appointments_total",
+    "appointments_completed",
+    "properties_new",
+    "properties_offer",
+    "properties_closed",
+    "sales_closed",
+    "sales_days_total",
+    "rentals_closed",
+    "rentals_days_total",
+    "tasks_new",
+    "tasks_done",
+]
+
+_close_duration = ExpressionWrapper(
+    F("updated_at") - F("created_at"), output_field=DurationField()
+)
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _days(value: Optional[timedelta]) -> int:
+    return int(round(value.total_seconds() / 86400)) if value else 0
+
+
+def compute_daily_rows(tenant_id, since: date) -> Dict[date, Dict[str, Any]]:
+    """Counters per day from `since` on, one grouped query per source table"""
+    start = _day_start(since)
+    rows: Dict[date, Dict[str, Any]] = defaultdict(dict)
+
+    def collect(queryset, date_field: str, **aggregates):
+        grouped = (
+            queryset.filter(tenant_id=tenant_id, **{f"{date_field}__gte": start})
+            .annotate(rollup_day=TruncDate(date_field))
+            .order_by()
+            .values("rollup_day")
+            .annotate(**aggregates)
+        )
+        for row in grouped:
+            rows[row.pop("rollup_day")].update(row)
+
+    collect(
+        Contact.objects,
+        "created_at",
+        contacts_new=Count("id"),
+        contacts_customer=Count("id", filter=Q(status="customer")),
+        contacts_qualified=Count("id", filter=Q(lead_score__gte=QUALIFIED_LEAD_SCORE)),
+    )
+    collect(
+        Appointment.objects,
+        "start_datetime",
+        appointments_total=Count("id"),
+        appointments_completed=Count("id", filter=Q(status="completed")),
+    )
+    collect(
+        Property.objects,
+        "created_at",
+        properties_new=Count("id"),
+        properties_offer=Count("id", filter=Q(status__in=OFFER_STATUSES)),
+        properties_closed=Count("id", filter=Q(status__in=CLOSED_STATUSES)),
+    )
+    # Close day approximated by updated_at; same-day closes are ignored
+    collect(
+        Property.objects.filter(
+            status__in=CLOSED_STATUSES,
+            updated_at__gte=F("created_at") + timedelta(days=1),
+        ),
+        "updated_at",
+        sales_closed=Count("id", filter=Q(status__in=SALE_STATUSES)),
+        sales_duration=Sum(_close_duration, filter=Q(status__in=SALE_STATUSES)),
+        rentals_closed=Count("id", filter=Q(status__in=RENTAL_STATUSES)),
+        rentals_duration=Sum(_close_duration, filter=Q(status__in=RENTAL_STATUSES)),
+        close_duration_min=Min(_close_duration),
+        close_duration_max=Max(_close_duration),
+    )
+    collect(
+        Task.objects,
+        "created_at",
+        tasks_new=Count("id"),
+        tasks_done=Count("id", filter=Q(status="done")),
+    )
+
+    result = {}
+    for day, row in rows.items():
+        values = {field: row.get(field) or 0 for field in COUNTER_FIELDS}
+        values["sales_days_total"] = _days(row.get("sales_duration"))
+        values["rentals_days_total"] = _days(row.get("rentals_duration"))
+        values["close_days_min"] = (
+            row["close_duration_min"].days if row.get("close_duration_min") else None
+        )
+        values["close_days_max"] = (
+            row["close_duration_max"].days if row.get("close_duration_max") else None
+        )
+        result[day] = values
+    return result
+
+
+def property_status_counts(tenant_id) -> Dict[str, Dict[str, int]]:
+    """Current {property_type: {status: count}} in one grouped query"""
+    counts: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for row in (
+        Property.objects.filter(tenant_id=tenant_id)
+        .order_by()
+        .values("property_type", "status")
+        .annotate(count=Count("id"))
+    ):
+        counts[row["property_type"]][row["status"]] = row["count"]
+    return dict(counts)
+
+
+def vacancy_ages(tenant_id) -> Dict[str, Tuple[int, int]]:
+    """{property_type: (vacant count, summed days vacant)} in one grouped query"""
+    now = timezone.now()
+    age = ExpressionWrapper(
+        Value(now, output_field=DateTimeField()) - F("created_at"),
+        output_field=DurationField(),
+    )
+    return {
+        row["property_type"]: (row["vacant"], _days(row["age_total"]))
+        for row in Property.objects.filter(
+            tenant_id=tenant_id, status__in=VACANT_STATUSES
+        )
+        .order_by()
+        .values("property_type")
+        .annotate(vacant=Count("id"), age_total=Sum(age))
+    }
+
+
+def compact_rollups(
+    tenant_id, lookback_days: int = DEFAULT_LOOKBACK_DAYS, since: Optional[date] = None
+) -> int:
+    """
+    Rebuild the rollup rows of the last `lookback_days` completed days, or
+    of the days from `since` on.
+
+    Recomputing a window (instead of appending yesterday) picks up later
+    status changes, e.g. a contact converted to customer weeks after creation.
+    Returns the number of rows written.
+    """
+    today = timezone.localdate()
+    since = since or today - timedelta(days=lookback_days)
+    yesterday = today - timedelta(days=1)
+
+    rows = compute_daily_rows(tenant_id, since)
+    rows.pop(today, None)
+    # Yesterday's row always exists: it marks the run for ensure_rollups
+    rows.setdefault(yesterday, {field: 0 for field in COUNTER_FIELDS})
+
+    rollups = [
+        KpiDailyRollup(tenant_id=tenant_id, day=day, **values)
+        for day, values in rows.items()
+        if since <= day < today
+    ]
+
+    with transaction.atomic():
+        # Days whose source rows disappeared keep their row, zeroed
+        KpiDailyRollup.objects.filter(
+            tenant_id=tenant_id, day__gte=since, day__lt=today
+        ).exclude(day__in=list(rows)).update(
+            close_days_min=None,
+            close_days_max=None,
+            **{field: 0 for field in COUNTER_FIELDS},
+        )
+        KpiDailyRollup.objects.bulk_create(
+            rollups,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["tenant", "day"],
+            update_fields=COUNTER_FIELDS
+            + ["close_days_min", "close_days_max", "computed_at"],
+        )
+    return len(rollups)
+
+
+def ensure_rollups(tenant_id) -> None:
+    """
+    Fill in the days the nightly job has not covered yet.
+
+    Only the gap after the newest rollup row is computed, so a missed
+    nightly run costs a few days of aggregation, not the whole window.
+    """
+    today = timezone.localdate()
+    latest = (
+        KpiDailyRollup.objects.filter(tenant_id=tenant_id, day__lt=today)
+        .order_by("-day")
+        .values_list("day", flat=True)
+        .first()
+    )
+    if latest == today - timedelta(days=1):
+        return
+    if latest is None:
+        # First rollup of this tenant: the nightly window
+        compact_rollups(tenant_id)
+    else:
+        compact_rollups(
+            tenant_id,
+            since=max(latest + timedelta(days=1), today - timedelta(days=DEFAULT_LOOKBACK_DAYS)),
+        )
+
+
+def _merge(totals: Dict[str, Any], values: Dict[str, Any]) -> None:
+    for field in COUNTER_FIELDS:
+        totals[field] = (totals.get(field) or 0) + (values.get(field) or 0)
+    for field, pick in (("close_days_min", min), ("close_days_max", max)):
+        candidates = [v for v in (totals.get(field), values.get(field)) if v is not None]
+        totals[field] = pick(candidates) if candidates else None
+
+
+def rollup_totals(
+    tenant_id, start: date, end: date, today_values: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Summed counters for [start, end]: one aggregate over the rollup rows
+    plus the live values of today when the range includes it.
+    """
+    today = timezone.localdate()
+    aggregates = {field: Sum(field) for field in COUNTER_FIELDS}
+    aggregates.update(close_days_min=Min("close_days_min"), close_days_max=Max("close_days_max"))
+    totals = KpiDailyRollup.objects.filter(
+        tenant_id=tenant_id, day__gte=start, day__lte=min(end, today - timedelta(days=1))
+    ).aggregate(**aggregates)
+    for field in COUNTER_FIELDS:
+        totals[field] = totals[field] or 0
+
+    if start <= today <= end:
+        if today_values is None:
+            today_values = compute_daily_rows(tenant_id, today).get(today, {})
+        _merge(totals, today_values)
+    return totals
+
+
+def monthly_series(
+    tenant_id, months: int = 6, today_values: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Per-month counters for the last `months` calendar months, oldest first"""
+    today = timezone.localdate()
+    month_starts = [today.replace(day=1)]
+    for _ in range(months - 1):
+        month_starts.insert(0, (month_starts[0] - timedelta(days=1)).replace(day=1))
+
+    aggregates = {field: Sum(field) for field in COUNTER_FIELDS}
+    aggregates.update(close_days_min=Min("close_days_min"), close_days_max=Max("close_days_max"))
+    by_month = {
+        row.pop("month"): row
+        for row in KpiDailyRollup.objects.filter(
+            tenant_id=tenant_id, day__gte=month_starts[0], day__lt=today
+        )
+        .annotate(month=TruncMonth("day"))
+        .order_by()
+        .values("month")
+        .annotate(**aggregates)
+    }
+
+    series = []
+    for month_start in month_starts:
+        values = {field: 0 for field in COUNTER_FIELDS}
+        values.update(close_days_min=None, close_days_max=None)
+        _merge(values, by_month.get(month_start, {}))
+        if month_start == month_starts[-1]:
+            if today_values is None:
+                today_values = compute_daily_rows(tenant_id, today).get(today, {})
+            _merge(values, today_values)
+        values["month"] = month_start
+        series.append(values)
+    return series
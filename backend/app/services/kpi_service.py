@@ -1,564 +1,302 @@
 """
-KPI Service - Berechnet Live-KPIs aus echten Daten
+KPI Service - Berechnet KPIs aus vorberechneten Tages-Rollups
 """
-from typing import Optional, List
-from datetime import datetime, timedelta
-from django.db.models import Count, Avg, Sum, F, Q
+from typing import Optional, List, Dict, Any
+from datetime import date, timedelta
 from asgiref.sync import sync_to_async
+from django.utils import timezone
 
-from app.db.models import Property, Contact, Task, Appointment
 from app.schemas.kpi import (
     KPIDashboardResponse, KPIMetricResponse, ConversionFunnelStage,
     TimeToCloseData, VacancyData, PerformanceRadar
 )
+from app.services.kpi_rollups import (
+    ACTIVE_STATUSES,
+    VACANT_STATUSES,
+    compute_daily_rows,
+    ensure_rollups,
+    monthly_series,
+    property_status_counts,
+    rollup_totals,
+    vacancy_ages,
+)
+
+MONTH_LABELS = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+
+TIMEFRAME_DAYS = {'week': 7, 'month': 30, 'quarter': 90, 'year': 365}
+
+
+def _rate(part: float, whole: float, default: float = 0) -> float:
+    return (part / whole * 100) if whole > 0 else default
 
 
 class KPIService:
     """KPI Service für Live-Daten"""
-    
+
     def __init__(self, tenant_id: str):
         self.tenant_id = tenant_id
-    
+
     async def get_kpi_dashboard(
         self,
         timeframe: str = 'month'
     ) -> KPIDashboardResponse:
-        """Get complete KPI dashboard with live data"""
-        
+        """Get complete KPI dashboard (a few rollup reads plus today's live delta)"""
+
         # Calculate date ranges based on timeframe
-        end_date = datetime.utcnow()
-        
-        if timeframe == 'week':
-            start_date = end_date - timedelta(days=7)
-            previous_start = start_date - timedelta(days=7)
-        elif timeframe == 'quarter':
-            start_date = end_date - timedelta(days=90)
-            previous_start = start_date - timedelta(days=90)
-        elif timeframe == 'year':
-            start_date = end_date - timedelta(days=365)
-            previous_start = start_date - timedelta(days=365)
-        else:  # month (default)
-            start_date = end_date - timedelta(days=30)
-            previous_start = start_date - timedelta(days=30)
-        
-        # Get all KPI data
-        kpi_metrics = await self._calculate_kpi_metrics(start_date, previous_start, end_date)
-        conversion_funnel = await self._calculate_conversion_funnel(start_date, end_date)
-        time_to_close = await self._calculate_time_to_close()
-        vacancy_analysis = await self._calculate_vacancy_analysis()
-        performance_radar = await self._calculate_performance_radar(start_date, end_date)
-        
+        days = TIMEFRAME_DAYS.get(timeframe, 30)
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=days)
+        previous_start = start_date - timedelta(days=days)
+
+        data = await sync_to_async(self._load)(start_date, previous_start, end_date)
+
         return KPIDashboardResponse(
-            kpi_metrics=kpi_metrics,
-            conversion_funnel=conversion_funnel,
-            time_to_close=time_to_close,
-            vacancy_analysis=vacancy_analysis,
-            performance_radar=performance_radar
+            kpi_metrics=self._calculate_kpi_metrics(data),
+            conversion_funnel=self._calculate_conversion_funnel(data['current']),
+            time_to_close=self._calculate_time_to_close(data['months']),
+            vacancy_analysis=self._calculate_vacancy_analysis(data),
+            performance_radar=self._calculate_performance_radar(data)
         )
-    
-    async def _calculate_kpi_metrics(
-        self, 
-        start_date: datetime, 
-        previous_start: datetime, 
-        end_date: datetime
-    ) -> List[KPIMetricResponse]:
+
+    def _load(self, start_date: date, previous_start: date, end_date: date) -> Dict[str, Any]:
+        """All reads for the dashboard in one thread hop"""
+        ensure_rollups(self.tenant_id)
+        today = timezone.localdate()
+        today_values = compute_daily_rows(self.tenant_id, today).get(today, {})
+
+        return {
+            'current': rollup_totals(self.tenant_id, start_date, end_date, today_values),
+            'previous': rollup_totals(
+                self.tenant_id, previous_start, start_date - timedelta(days=1), today_values
+            ),
+            'months': monthly_series(self.tenant_id, 6, today_values),
+            'status_counts': property_status_counts(self.tenant_id),
+            'vacancy_ages': vacancy_ages(self.tenant_id),
+        }
+
+    @staticmethod
+    def _status_total(status_counts: Dict[str, Dict[str, int]], statuses: Optional[tuple] = None) -> int:
+        return sum(
+            count
+            for by_status in status_counts.values()
+            for status, count in by_status.items()
+            if statuses is None or status in statuses
+        )
+
+    @staticmethod
+    def _trend(current: float, previous: float, lower_is_better: bool = False) -> str:
+        if lower_is_better:
+            return 'up' if current < previous else 'down'
+        return 'up' if current > previous else 'down' if current < previous else 'stable'
+
+    def _calculate_kpi_metrics(self, data: Dict[str, Any]) -> List[KPIMetricResponse]:
         """Calculate main KPI metrics"""
-        
-        @sync_to_async
-        def get_kpi_data():
-            metrics = []
-            
-            # 1. Lead-to-Customer Conversion
-            current_contacts = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).count()
-            
-            current_customers = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                status='customer'
-            ).count()
-            
-            previous_contacts = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=previous_start,
-                created_at__lt=start_date
-            ).count()
-            
-            previous_customers = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=previous_start,
-                created_at__lt=start_date,
-                status='customer'
-            ).count()
-            
-            current_conversion = (current_customers / current_contacts * 100) if current_contacts > 0 else 0
-            previous_conversion = (previous_customers / previous_contacts * 100) if previous_contacts > 0 else 0
-            
-            metrics.append(KPIMetricResponse(
-                metric='Lead-to-Customer Conversion',
-                current=current_conversion,
-                previous=previous_conversion,
-                target=25.0,
-                trend='up' if current_conversion > previous_conversion else 'down' if current_conversion < previous_conversion else 'stable',
-                unit='percentage'
-            ))
-            
-            # 2. Besichtigung-to-Angebot (Appointments to Offers)
-            appointments = Appointment.objects.filter(
-                tenant_id=self.tenant_id,
-                start_time__gte=start_date,
-                start_time__lte=end_date,
-                status='completed'
-            ).count()
-            
-            properties_with_offers = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                status__in=['sold', 'rented', 'under_contract']
-            ).count()
-            
-            prev_appointments = Appointment.objects.filter(
-                tenant_id=self.tenant_id,
-                start_time__gte=previous_start,
-                start_time__lt=start_date,
-                status='completed'
-            ).count()
-            
-            current_viewing_conversion = (properties_with_offers / appointments * 100) if appointments > 0 else 0
-            previous_viewing_conversion = 65.2  # Fallback wenn keine historischen Daten
-            
-            metrics.append(KPIMetricResponse(
-                metric='Besichtigung-to-Angebot',
-                current=current_viewing_conversion,
-                previous=previous_viewing_conversion,
-                target=70.0,
-                trend='up' if current_viewing_conversion > previous_viewing_conversion else 'down',
-                unit='percentage'
-            ))
-            
-            # 3. Angebot-to-Vertragsabschluss
-            offers = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                status__in=['under_contract', 'sold', 'rented']
-            ).count()
-            
-            closed_deals = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                status__in=['sold', 'rented']
-            ).count()
-            
-            current_close_rate = (closed_deals / offers * 100) if offers > 0 else 0
-            previous_close_rate = 44.1  # Fallback
-            
-            metrics.append(KPIMetricResponse(
-                metric='Angebot-to-Vertragsabschluss',
-                current=current_close_rate,
-                previous=previous_close_rate,
-                target=45.0,
-                trend='up' if current_close_rate > previous_close_rate else 'down',
-                unit='percentage'
-            ))
-            
-            # 4. Time-to-Close (Verkauf)
-            sold_properties = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='sold',
-                updated_at__gte=start_date,
-                updated_at__lte=end_date
-            )
-            
-            current_time_to_close_sale = 35  # Default
-            if sold_properties.exists():
-                time_diffs = []
-                for prop in sold_properties:
-                    if prop.created_at and prop.updated_at:
-                        days = (prop.updated_at - prop.created_at).days
-                        if days > 0:
-                            time_diffs.append(days)
-                if time_diffs:
-                    current_time_to_close_sale = sum(time_diffs) / len(time_diffs)
-            
-            metrics.append(KPIMetricResponse(
-                metric='Time-to-Close (Verkauf)',
-                current=current_time_to_close_sale,
-                previous=38,
-                target=30,
-                trend='up' if current_time_to_close_sale < 38 else 'down',
-                unit='days'
-            ))
-            
-            # 5. Time-to-Close (Vermietung)
-            rented_properties = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='rented',
-                updated_at__gte=start_date,
-                updated_at__lte=end_date
-            )
-            
-            current_time_to_close_rent = 18  # Default
-            if rented_properties.exists():
-                time_diffs = []
-                for prop in rented_properties:
-                    if prop.created_at and prop.updated_at:
-                        days = (prop.updated_at - prop.created_at).days
-                        if days > 0:
-                            time_diffs.append(days)
-                if time_diffs:
-                    current_time_to_close_rent = sum(time_diffs) / len(time_diffs)
-            
-            metrics.append(KPIMetricResponse(
-                metric='Time-to-Close (Vermietung)',
-                current=current_time_to_close_rent,
-                previous=20,
-                target=15,
-                trend='up' if current_time_to_close_rent < 20 else 'down',
-                unit='days'
-            ))
-            
-            # 6. Durchschnittliche Leerstandsquote
-            total_properties = Property.objects.filter(tenant_id=self.tenant_id).count()
-            vacant_properties = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='available'
-            ).count()
-            
-            current_vacancy_rate = (vacant_properties / total_properties * 100) if total_properties > 0 else 0
-            
-            metrics.append(KPIMetricResponse(
-                metric='Durchschnittliche Leerstandsquote',
-                current=current_vacancy_rate,
-                previous=3.8,
-                target=2.5,
-                trend='up' if current_vacancy_rate < 3.8 else 'down',
-                unit='percentage'
+        current, previous = data['current'], data['previous']
+        metrics = []
+
+        # 1. Lead-to-Customer Conversion
+        current_conversion = _rate(current['contacts_customer'], current['contacts_new'])
+        previous_conversion = _rate(previous['contacts_customer'], previous['contacts_new'])
+        metrics.append(KPIMetricResponse(
+            metric='Lead-to-Customer Conversion',
+            current=current_conversion,
+            previous=previous_conversion,
+            target=25.0,
+            trend=self._trend(current_conversion, previous_conversion),
+            unit='percentage'
+        ))
+
+        # 2. Besichtigung-to-Angebot (Appointments to Offers)
+        current_viewing_conversion = _rate(current['properties_offer'], current['appointments_completed'])
+        previous_viewing_conversion = 65.2  # Fallback wenn keine historischen Daten
+        metrics.append(KPIMetricResponse(
+            metric='Besichtigung-to-Angebot',
+            current=current_viewing_conversion,
+            previous=previous_viewing_conversion,
+            target=70.0,
+            trend='up' if current_viewing_conversion > previous_viewing_conversion else 'down',
+            unit='percentage'
+        ))
+
+        # 3. Angebot-to-Vertragsabschluss
+        current_close_rate = _rate(current['properties_closed'], current['properties_offer'])
+        previous_close_rate = 44.1  # Fallback
+        metrics.append(KPIMetricResponse(
+            metric='Angebot-to-Vertragsabschluss',
+            current=current_close_rate,
+            previous=previous_close_rate,
+            target=45.0,
+            trend='up' if current_close_rate > previous_close_rate else 'down',
+            unit='percentage'
+        ))
+
+        # 4. Time-to-Close (Verkauf)
+        time_to_close_sale = (
+            current['sales_days_total'] / current['sales_closed'] if current['sales_closed'] else 35
+        )
+        metrics.append(KPIMetricResponse(
+            metric='Time-to-Close (Verkauf)',
+            current=time_to_close_sale,
+            previous=38,
+            target=30,
+            trend=self._trend(time_to_close_sale, 38, lower_is_better=True),
+            unit='days'
+        ))
+
+        # 5. Time-to-Close (Vermietung)
+        time_to_close_rent = (
+            current['rentals_days_total'] / current['rentals_closed'] if current['rentals_closed'] else 18
+        )
+        metrics.append(KPIMetricResponse(
+            metric='Time-to-Close (Vermietung)',
+            current=time_to_close_rent,
+            previous=20,
+            target=15,
+            trend=self._trend(time_to_close_rent, 20, lower_is_better=True),
+            unit='days'
+        ))
+
+        # 6. Durchschnittliche Leerstandsquote
+        total_properties = self._status_total(data['status_counts'])
+        vacant_properties = self._status_total(data['status_counts'], VACANT_STATUSES)
+        vacancy_rate = _rate(vacant_properties, total_properties)
+        metrics.append(KPIMetricResponse(
+            metric='Durchschnittliche Leerstandsquote',
+            current=vacancy_rate,
+            previous=3.8,
+            target=2.5,
+            trend=self._trend(vacancy_rate, 3.8, lower_is_better=True),
+            unit='percentage'
+        ))
+
+        # 7. Leerstandsdauer
+        vacant_count = sum(count for count, _ in data['vacancy_ages'].values())
+        vacant_days = sum(days for _, days in data['vacancy_ages'].values())
+        vacancy_duration = vacant_days / vacant_count if vacant_count and vacant_days else 45
+        metrics.append(KPIMetricResponse(
+            metric='Leerstandsdauer',
+            current=vacancy_duration,
+            previous=52,
+            target=30,
+            trend=self._trend(vacancy_duration, 52, lower_is_better=True),
+            unit='days'
+        ))
+
+        return metrics
+
+    def _calculate_conversion_funnel(self, totals: Dict[str, Any]) -> List[ConversionFunnelStage]:
+        """Calculate conversion funnel stages"""
+        total_contacts = totals['contacts_new']
+        website_visitors = max(total_contacts * 8, 1000)  # Estimate based on contacts
+
+        stages = [
+            ('Website Besucher', website_visitors),
+            ('Anfragen', total_contacts),
+            ('Qualifizierte Leads', totals['contacts_qualified']),
+            ('Besichtigungen', totals['appointments_total']),
+            ('Angebote', totals['properties_offer']),
+            ('Verträge', totals['properties_closed']),
+        ]
+
+        funnel = [ConversionFunnelStage(stage=stages[0][0], count=website_visitors, conversion_rate=100.0, dropoff=0.0)]
+        for (_, previous_count), (stage, count) in zip(stages, stages[1:]):
+            funnel.append(ConversionFunnelStage(
+                stage=stage,
+                count=count,
+                conversion_rate=_rate(count, previous_count),
+                dropoff=_rate(previous_count - count, previous_count)
             ))
-            
-            # 7. Leerstandsdauer
-            vacant_props = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='available'
-            )
-            
-            vacancy_duration = 45  # Default
-            if vacant_props.exists():
-                durations = []
-                for prop in vacant_props:
-                    if prop.created_at:
-                        days = (datetime.utcnow().replace(tzinfo=None) - prop.created_at.replace(tzinfo=None)).days
-                        if days > 0:
-                            durations.append(days)
-                if durations:
-                    vacancy_duration = sum(durations) / len(durations)
-            
-            metrics.append(KPIMetricResponse(
-                metric='Leerstandsdauer',
-                current=vacancy_duration,
-                previous=52,
+        return funnel
+
+    def _calculate_time_to_close(self, months: List[Dict[str, Any]]) -> List[TimeToCloseData]:
+        """Time-to-close per calendar month for the last 6 months, from rollups"""
+        data = []
+        for month in months:
+            closed = month['sales_closed'] + month['rentals_closed']
+            if closed:
+                avg_days = (month['sales_days_total'] + month['rentals_days_total']) / closed
+                fastest = month['close_days_min'] or 0
+                slowest = month['close_days_max'] or 0
+            else:
+                avg_days, fastest, slowest = 35, 15, 60
+
+            data.append(TimeToCloseData(
+                month=MONTH_LABELS[month['month'].month - 1],
+                avg_days=avg_days,
                 target=30,
-                trend='up' if vacancy_duration < 52 else 'down',
-                unit='days'
+                fastest=fastest,
+                slowest=slowest,
+                properties=closed
             ))
-            
-            return metrics
-        
-        return await get_kpi_data()
-    
-    async def _calculate_conversion_funnel(
-        self,
-        start_date: datetime,
-        end_date: datetime
-    ) -> List[ConversionFunnelStage]:
-        """Calculate conversion funnel stages"""
-        
-        @sync_to_async
-        def get_funnel_data():
-            # Get real data from database
-            total_contacts = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).count()
-            
-            qualified_leads = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                lead_score__gte=50
-            ).count()
-            
-            appointments_count = Appointment.objects.filter(
-                tenant_id=self.tenant_id,
-                start_time__gte=start_date,
-                start_time__lte=end_date
-            ).count()
-            
-            properties_with_interest = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                status__in=['under_contract', 'sold', 'rented']
-            ).count()
-            
-            closed_deals = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                created_at__lte=end_date,
-                status__in=['sold', 'rented']
-            ).count()
-            
-            # Build funnel with real data
-            website_visitors = max(total_contacts * 8, 1000)  # Estimate based on contacts
-            
-            funnel = [
-                ConversionFunnelStage(
-                    stage='Website Besucher',
-                    count=website_visitors,
-                    conversion_rate=100.0,
-                    dropoff=0.0
-                ),
-                ConversionFunnelStage(
-                    stage='Anfragen',
-                    count=total_contacts,
-                    conversion_rate=(total_contacts / website_visitors * 100) if website_visitors > 0 else 0,
-                    dropoff=((website_visitors - total_contacts) / website_visitors * 100) if website_visitors > 0 else 0
-                ),
-                ConversionFunnelStage(
-                    stage='Qualifizierte Leads',
-                    count=qualified_leads,
-                    conversion_rate=(qualified_leads / total_contacts * 100) if total_contacts > 0 else 0,
-                    dropoff=((total_contacts - qualified_leads) / total_contacts * 100) if total_contacts > 0 else 0
-                ),
-                ConversionFunnelStage(
-                    stage='Besichtigungen',
-                    count=appointments_count,
-                    conversion_rate=(appointments_count / qualified_leads * 100) if qualified_leads > 0 else 0,
-                    dropoff=((qualified_leads - appointments_count) / qualified_leads * 100) if qualified_leads > 0 else 0
-                ),
-                ConversionFunnelStage(
-                    stage='Angebote',
-                    count=properties_with_interest,
-                    conversion_rate=(properties_with_interest / appointments_count * 100) if appointments_count > 0 else 0,
-                    dropoff=((appointments_count - properties_with_interest) / appointments_count * 100) if appointments_count > 0 else 0
-                ),
-                ConversionFunnelStage(
-                    stage='Verträge',
-                    count=closed_deals,
-                    conversion_rate=(closed_deals / properties_with_interest * 100) if properties_with_interest > 0 else 0,
-                    dropoff=((properties_with_interest - closed_deals) / properties_with_interest * 100) if properties_with_interest > 0 else 0
-                )
-            ]
-            
-            return funnel
-        
-        return await get_funnel_data()
-    
-    async def _calculate_time_to_close(self) -> List[TimeToCloseData]:
-        """Calculate time-to-close data for last 6 months"""
-        
-        @sync_to_async
-        def get_time_data():
-            data = []
-            months = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun']
-            
-            # Get last 6 months of data
-            end_date = datetime.utcnow()
-            
-            for i in range(6):
-                month_end = end_date - timedelta(days=30 * i)
-                month_start = month_end - timedelta(days=30)
-                
-                closed_props = Property.objects.filter(
-                    tenant_id=self.tenant_id,
-                    status__in=['sold', 'rented'],
-                    updated_at__gte=month_start,
-                    updated_at__lte=month_end
-                )
-                
-                if closed_props.exists():
-                    time_diffs = []
-                    for prop in closed_props:
-                        if prop.created_at and prop.updated_at:
-                            days = (prop.updated_at - prop.created_at).days
-                            if days > 0:
-                                time_diffs.append(days)
-                    
-                    if time_diffs:
-                        avg_days = sum(time_diffs) / len(time_diffs)
-                        fastest = min(time_diffs)
-                        slowest = max(time_diffs)
-                        prop_count = len(time_diffs)
-                    else:
-                        avg_days, fastest, slowest, prop_count = 35, 15, 60, 0
-                else:
-                    avg_days, fastest, slowest, prop_count = 35, 15, 60, 0
-                
-                data.insert(0, TimeToCloseData(
-                    month=months[5 - i] if (5 - i) < len(months) else months[0],
-                    avg_days=avg_days,
-                    target=30,
-                    fastest=fastest,
-                    slowest=slowest,
-                    properties=prop_count
-                ))
-            
-            return data
-        
-        return await get_time_data()
-    
-    async def _calculate_vacancy_analysis(self) -> List[VacancyData]:
+        return data
+
+    def _calculate_vacancy_analysis(self, data: Dict[str, Any]) -> List[VacancyData]:
         """Calculate vacancy analysis by property type"""
-        
-        @sync_to_async
-        def get_vacancy_data():
-            property_types = {
-                'apartment': 'Wohnungen',
-                'house': 'Häuser',
-                'commercial': 'Gewerbe',
-                'office': 'Büros'
-            }
-            
-            vacancy_data = []
-            
-            for prop_type, display_name in property_types.items():
-                total = Property.objects.filter(
-                    tenant_id=self.tenant_id,
-                    property_type=prop_type
-                ).count()
-                
-                vacant = Property.objects.filter(
-                    tenant_id=self.tenant_id,
-                    property_type=prop_type,
-                    status='available'
-                ).count()
-                
-                vacant_props = Property.objects.filter(
-                    tenant_id=self.tenant_id,
-                    property_type=prop_type,
-                    status='available'
-                )
-                
-                avg_vacancy_time = 45  # Default
-                if vacant_props.exists():
-                    durations = []
-                    for prop in vacant_props:
-                        if prop.created_at:
-                            days = (datetime.utcnow().replace(tzinfo=None) - prop.created_at.replace(tzinfo=None)).days
-                            if days > 0:
-                                durations.append(days)
-                    if durations:
-                        avg_vacancy_time = int(sum(durations) / len(durations))
-                
-                vacancy_rate = (vacant / total * 100) if total > 0 else 0
-                
-                # Estimate rent loss (assuming average rent per unit)
-                avg_rent_per_unit = 1200 if prop_type in ['apartment', 'office'] else 2000
-                rent_loss = vacant * avg_rent_per_unit * (avg_vacancy_time / 30)
-                
-                vacancy_data.append(VacancyData(
-                    property_type=display_name,
-                    total_units=total if total > 0 else 50,  # Fallback
-                    vacant_units=vacant,
-                    vacancy_rate=vacancy_rate,
-                    avg_vacancy_time=avg_vacancy_time,
-                    rent_loss=rent_loss
-                ))
-            
-            return vacancy_data
-        
-        return await get_vacancy_data()
-    
-    async def _calculate_performance_radar(
-        self,
-        start_date: datetime,
-        end_date: datetime
-    ) -> List[PerformanceRadar]:
+        property_types = {
+            'apartment': 'Wohnungen',
+            'house': 'Häuser',
+            'commercial': 'Gewerbe',
+            'office': 'Büros'
+        }
+
+        vacancy_data = []
+        for prop_type, display_name in property_types.items():
+            total = sum(data['status_counts'].get(prop_type, {}).values())
+            vacant, vacant_days = data['vacancy_ages'].get(prop_type, (0, 0))
+            avg_vacancy_time = int(vacant_days / vacant) if vacant and vacant_days else 45  # Default
+
+            vacancy_rate = _rate(vacant, total)
+
+            # Estimate rent loss (assuming average rent per unit)
+            avg_rent_per_unit = 1200 if prop_type in ['apartment', 'office'] else 2000
+            rent_loss = vacant * avg_rent_per_unit * (avg_vacancy_time / 30)
+
+            vacancy_data.append(VacancyData(
+                property_type=display_name,
+                total_units=total if total > 0 else 50,  # Fallback
+                vacant_units=vacant,
+                vacancy_rate=vacancy_rate,
+                avg_vacancy_time=avg_vacancy_time,
+                rent_loss=rent_loss
+            ))
+
+        return vacancy_data
+
+    def _calculate_performance_radar(self, data: Dict[str, Any]) -> List[PerformanceRadar]:
         """Calculate performance radar metrics"""
-        
-        @sync_to_async
-        def get_performance_data():
-            # Calculate scores based on real data
-            
-            # 1. Lead Conversion
-            contacts = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date
-            ).count()
-            customers = Contact.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                status='customer'
-            ).count()
-            lead_conversion_score = min((customers / contacts * 100 / 25 * 100), 100) if contacts > 0 else 70
-            
-            # 2. Verkaufsgeschwindigkeit (based on time-to-close)
-            sold_props = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='sold',
-                updated_at__gte=start_date
-            )
-            avg_days = 35
-            if sold_props.exists():
-                time_diffs = []
-                for prop in sold_props:
-                    if prop.created_at and prop.updated_at:
-                        days = (prop.updated_at - prop.created_at).days
-                        if days > 0:
-                            time_diffs.append(days)
-                if time_diffs:
-                    avg_days = sum(time_diffs) / len(time_diffs)
-            sales_speed_score = max(100 - (avg_days - 30) * 2, 0)
-            
-            # 3. Kundenzufriedenheit (based on completed appointments)
-            total_appt = Appointment.objects.filter(
-                tenant_id=self.tenant_id,
-                start_time__gte=start_date
-            ).count()
-            completed_appt = Appointment.objects.filter(
-                tenant_id=self.tenant_id,
-                start_time__gte=start_date,
-                status='completed'
-            ).count()
-            satisfaction_score = (completed_appt / total_appt * 100) if total_appt > 0 else 85
-            
-            # 4. Vermarktungseffizienz
-            active_props = Property.objects.filter(
-                tenant_id=self.tenant_id,
-                status='active'
-            ).count()
-            total_props = Property.objects.filter(tenant_id=self.tenant_id).count()
-            marketing_efficiency = (active_props / total_props * 100) if total_props > 0 else 75
-            
-            # 5. Preis-Performance (based on properties near target price)
-            price_performance = 83  # Default score
-            
-            # 6. Service-Qualität (based on task completion)
-            total_tasks = Task.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date
-            ).count()
-            completed_tasks = Task.objects.filter(
-                tenant_id=self.tenant_id,
-                created_at__gte=start_date,
-                status='done'
-            ).count()
-            service_quality = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 88
-            
-            return [
-                PerformanceRadar(metric='Lead Conversion', score=lead_conversion_score, max_score=100),
-                PerformanceRadar(metric='Verkaufsgeschwindigkeit', score=sales_speed_score, max_score=100),
-                PerformanceRadar(metric='Kundenzufriedenheit', score=satisfaction_score, max_score=100),
-                PerformanceRadar(metric='Vermarktungseffizienz', score=marketing_efficiency, max_score=100),
-                PerformanceRadar(metric='Preis-Performance', score=price_performance, max_score=100),
-                PerformanceRadar(metric='Service-Qualität', score=service_quality, max_score=100)
-            ]
-        
-        return await get_performance_data()
+        current = data['current']
+
+        # 1. Lead Conversion
+        contacts = current['contacts_new']
+        lead_conversion_score = (
+            min(current['contacts_customer'] / contacts * 100 / 25 * 100, 100) if contacts > 0 else 70
+        )
+
+        # 2. Verkaufsgeschwindigkeit (based on time-to-close)
+        avg_days = current['sales_days_total'] / current['sales_closed'] if current['sales_closed'] else 35
+        sales_speed_score = max(100 - (avg_days - 30) * 2, 0)
+
+        # 3. Kundenzufriedenheit (based on completed appointments)
+        satisfaction_score = _rate(current['appointments_completed'], current['appointments_total'], 85)
+
+        # 4. Vermarktungseffizienz
+        marketing_efficiency = _rate(
+            self._status_total(data['status_counts'], ACTIVE_STATUSES),
+            self._status_total(data['status_counts']),
+            75,
+        )
+
+        # 5. Preis-Performance (based on properties near target price)
+        price_performance = 83  # Default score
+
+        # 6. Service-Qualität (based on task completion)
+        service_quality = _rate(current['tasks_done'], current['tasks_new'], 88)
+
+        return [
+            PerformanceRadar(metric='Lead Conversion', score=lead_conversion_score, max_score=100),
+            PerformanceRadar(metric='Verkaufsgeschwindigkeit', score=sales_speed_score, max_score=100),
+            PerformanceRadar(metric='Kundenzufriedenheit', score=satisfaction_score, max_score=100),
+            PerformanceRadar(metric='Vermarktungseffizienz', score=marketing_efficiency, max_score=100),
+            PerformanceRadar(metric='Preis-Performance', score=price_performance, max_score=100),
+            PerformanceRadar(metric='Service-Qualität', score=service_quality, max_score=100)
+        ]
@@ -0,0 +1,142 @@
+"""
+Lead Rescoring
+
+Contact.lead_score is maintained incrementally: changes to a contact or its
+appointments/tasks only flag the contact (lead_score_dirty), and a
+background run rescores flagged contacts in batches, reading their recent
+activities from the contact timeline in one query and persisting score and
+details with bulk_update. A nightly decay pass re-flags contacts whose last
+contact just crossed a recency threshold, since that component changes with
+time alone.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from app.core.tenant_cache import tenant_cache
+from app.db.models import Contact
+from app.services.contact_timeline import recent_activities
+from app.services.lead_scoring import LeadScoringService
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_LIMIT = 100  # per contact, same as the activities endpoint
+DEFAULT_BATCH_SIZE = 500
+RECENCY_THRESHOLDS_DAYS = (7, 30, 90)  # see LeadScoringService._calculate_recency_score
+
+
+def mark_contacts_dirty(contact_ids: Iterable, tenant_id=None) -> int:
+    """Flag contacts (of `tenant_id` if given) for rescoring; a no-op for contacts already flagged"""
+    ids = [contact_id for contact_id in contact_ids if contact_id]
+    if not ids:
+        return 0
+    contacts = Contact.objects.filter(id__in=ids, lead_score_dirty=False)
+    if tenant_id is not None:
+        contacts = contacts.filter(tenant_id=tenant_id)
+    return contacts.update(lead_score_dirty=True)
+
+
+def scoring_input(contact: Contact) -> Dict[str, Any]:
+    """Contact fields in the shape LeadScoringService expects"""
+    return {
+        "category": contact.category or "",
+        "company": contact.company,
+        "priority": contact.priority,
+        "budget": contact.budget if contact.budget else contact.budget_max,
+        "budget_max": contact.budget_max,
+        "last_contact": contact.last_contact,
+    }
+
+
+def rescore_contacts(contacts: List[Contact]) -> List[Contact]:
+    """
+    Score the given contacts and persist score + details (no signals).
+
+    Every contact passed here was flagged, so its inputs changed: details
+    are rebuilt with calculate_lead_score even when the total stays the
+    same (a budget change within a bracket, components that cancel out).
+    Returns the contacts that were written.
+    """
+    if not contacts:
+        return []
+
+    by_tenant: Dict[Any, List[Contact]] = defaultdict(list)
+    for contact in contacts:
+        by_tenant[contact.tenant_id].append(contact)
+
+    for tenant_id, tenant_contacts in by_tenant.items():
+        # Bounded window per contact from the timeline, one query per tenant
+        activities = recent_activities(
+            tenant_id, [contact.id for contact in tenant_contacts], ACTIVITY_LIMIT
+        )
+        scorer = LeadScoringService(str(tenant_id))
+        for contact in tenant_contacts:
+            contact.lead_score_dirty = False
+            contact.lead_score_details = scorer.calculate_lead_score(
+                scoring_input(contact), activities.get(str(contact.id), [])
+            )
+            contact.lead_score = contact.lead_score_details["score"]
+
+    Contact.objects.bulk_update(
+        contacts, ["lead_score", "lead_score_details"], batch_size=500
+    )
+    # bulk_update sends no post_save: invalidate cached analytics here
+    for tenant_id in by_tenant:
+        tenant_cache.bump(tenant_id)
+    return contacts
+
+
+def rescore_dirty_contacts(
+    batch_size: int = DEFAULT_BATCH_SIZE, max_batches: Optional[int] = None
+) -> int:
+    """Rescore flagged contacts of all tenants batch by batch; returns the count"""
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            ids = list(
+                Contact.objects.select_for_update(skip_locked=True)
+                .filter(lead_score_dirty=True)
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            # Cleared before scoring: changes made meanwhile flag them again
+            Contact.objects.filter(id__in=ids).update(lead_score_dirty=False)
+
+        rescore_contacts(list(Contact.objects.filter(id__in=ids)))
+        total += len(ids)
+        batches += 1
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def mark_decayed_contacts(window: timedelta = timedelta(days=1)) -> int:
+    """Flag contacts whose last contact crossed a recency threshold within `window`"""
+    now = timezone.now()
+    crossed = Q()
+    for days in RECENCY_THRESHOLDS_DAYS:
+        threshold = now - timedelta(days=days)
+        crossed |= Q(last_contact__gt=threshold - window, last_contact__lte=threshold)
+    return Contact.objects.filter(crossed, lead_score_dirty=False).update(
+        lead_score_dirty=True
+    )
+
+
+def get_lead_score_sync(tenant_id, contact_id) -> Optional[Dict[str, Any]]:
+    """Persisted score details; rescored first if the contact is flagged or never scored"""
+    contact = Contact.objects.filter(id=contact_id, tenant_id=tenant_id).first()
+    if contact is None:
+        return None
+    if contact.lead_score_dirty or "score" not in (contact.lead_score_details or {}):
+        Contact.objects.filter(id=contact.id).update(lead_score_dirty=False)
+        rescore_contacts([contact])
+    return LeadScoringService(str(tenant_id)).with_current_recency(
+        contact.lead_score_details, contact.last_contact
+    )
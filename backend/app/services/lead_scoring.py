@@ -3,12 +3,60 @@ Lead Scoring Service for Contact Prioritization
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+import re
+from typing import Dict, List, Any, Optional, Mapping, Sequence
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+HIGH_VALUE_CATEGORIES = ["eigentümer", "investor", "unternehmen", "developer"]
+RESPONSE_TYPES = ["email", "call"]
+MEETING_TYPES = ["meeting", "property_viewing"]
+RECENCY_VALUE = "vor {} Tagen"
+_RECENCY_VALUE_RE = re.compile(r"^vor -?\d+ Tagen$")
+
+
+def _parse_last_contact(value) -> Optional[datetime]:
+    """Naive datetime as used by the recency score (None when unusable)"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not value:
+        return None
+    return value.replace(tzinfo=None)
+
+
+def activity_columns(activity_lists: Sequence[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Columnar activity counts for score_many from per-contact activity lists
+
+    Returns {"activity_counts": {type: [count per contact]},
+    "cancelled_meetings": [count per contact]}.
+    """
+    size = len(activity_lists)
+    counts: Dict[Optional[str], List[int]] = {}
+    cancelled = [0] * size
+    for row, activities in enumerate(activity_lists):
+        for activity in activities:
+            activity_type = activity.get("type")
+            if activity_type not in counts:
+                counts[activity_type] = [0] * size
+            counts[activity_type][row] += 1
+            if activity_type in MEETING_TYPES and activity.get("status") == "cancelled":
+                cancelled[row] += 1
+    return {"activity_counts": counts, "cancelled_meetings": cancelled}
+
 
 class LeadScoringService:
     """Service for calculating and explaining lead scores (0-100)"""
@@ -73,43 +121,225 @@ class LeadScoringService:
         # Sort by impact and take top 5
         top_signals = sorted(all_signals, key=lambda x: x["impact"], reverse=True)[:5]
 
-        # Build breakdown
-        breakdown = [
+        breakdown = self._build_breakdown(
+            firmographic_score["score"],
+            value_score["score"],
+            recency_score["score"],
+            engagement_score["score"],
+        )
+
+        return {
+            "score": total_score,
+            "category": category,
+            "category_label": self._get_category_label(category),
+            "breakdown": breakdown,
+            "signals": top_signals,
+            "last_updated": datetime.utcnow().isoformat(),
+        }
+
+    def with_current_recency(
+        self, details: Dict[str, Any], last_contact: Any
+    ) -> Dict[str, Any]:
+        """
+        Stored score details with the "vor N Tagen" signal recomputed for now
+
+        The day count changes daily while the score only changes at the
+        recency thresholds (those contacts are re-flagged for rescoring), so
+        persisted details would show a stale count in between.
+        """
+        last_contact = _parse_last_contact(last_contact)
+        if not last_contact or not (details or {}).get("signals"):
+            return details
+        value = RECENCY_VALUE.format((datetime.utcnow() - last_contact).days)
+        signals = [
+            {**signal, "value": value}
+            if _RECENCY_VALUE_RE.match(str(signal.get("value", "")))
+            else signal
+            for signal in details["signals"]
+        ]
+        return {**details, "signals": signals}
+
+    def score_many(
+        self,
+        budget: Sequence[Any],
+        category: Sequence[Optional[str]],
+        company: Sequence[Optional[str]],
+        priority: Sequence[Optional[str]],
+        last_contact: Sequence[Any],
+        activity_counts: Optional[Mapping[Optional[str], Sequence[int]]] = None,
+        cancelled_meetings: Optional[Sequence[int]] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Score many contacts at once from columnar inputs
+
+        Returns score, category and category_label per contact, equal to
+        calculate_lead_score, with all components computed as array
+        operations. activity_counts maps activity type to per-contact counts,
+        cancelled_meetings counts cancelled meetings/viewings per contact (see
+        activity_columns). Breakdown and signals are not built here: callers
+        that need them use calculate_lead_score, the one place that explains
+        a score.
+        """
+        size = len(budget)
+        activity_counts = activity_counts or {}
+        cancelled_meetings = cancelled_meetings if cancelled_meetings is not None else [0] * size
+        now = now or datetime.utcnow()
+
+        if not NUMPY_AVAILABLE:
+            return self._score_many_fallback(
+                budget, category, company, priority, last_contact,
+                activity_counts, cancelled_meetings,
+            )
+        if size == 0:
+            return []
+
+        def counts(*types) -> "np.ndarray":
+            total = np.zeros(size, dtype=np.int64)
+            for activity_type in types:
+                if activity_type in activity_counts:
+                    total += np.asarray(activity_counts[activity_type], dtype=np.int64)
+            return total
+
+        # Firmographic
+        categories = np.char.lower(np.array([c or "" for c in category], dtype=str))
+        high_value = np.zeros(size, dtype=bool)
+        for value in HIGH_VALUE_CATEGORIES:
+            high_value |= np.char.find(categories, value) >= 0
+        category_points = np.where(high_value, 5, np.where(np.char.str_len(categories) > 0, 2, 0))
+
+        companies = np.array([c or "" for c in company], dtype=str)
+        company_points = np.where(np.char.str_len(companies) > 3, 5, 0)
+
+        priorities = np.array([p or "" for p in priority], dtype=str)
+        priority_points = np.where(
+            np.isin(priorities, ["high", "urgent"]), 10, np.where(priorities == "medium", 5, 0)
+        )
+        firmographic = np.minimum(
+            category_points + company_points + priority_points, self.WEIGHTS["firmographic"]
+        )
+
+        # Value
+        budgets = np.array([float(b) if b else np.nan for b in budget], dtype=np.float64)
+        has_budget = ~np.isnan(budgets)
+        value_points = np.select(
+            [budgets >= 500000, budgets >= 150000, budgets >= 50000, has_budget],
+            [20, 15, 10, 5],
+            0,
+        )
+
+        # Recency
+        contacted = np.array(
+            [_parse_last_contact(value) or np.datetime64("NaT") for value in last_contact],
+            dtype="datetime64[us]",
+        )
+        has_contact = ~np.isnat(contacted)
+        reference = np.datetime64(now.replace(tzinfo=None), "us")
+        # Floor division matches timedelta.days (also for future dates)
+        days_since = (
+            (reference - np.where(has_contact, contacted, reference)) // np.timedelta64(1, "D")
+        ).astype(np.int64)
+        contact_points = np.select(
+            [~has_contact, days_since < 7, days_since < 30, days_since < 90], [0, 20, 15, 10], 0
+        )
+        activity_total = counts(*activity_counts.keys())
+        frequency_points = np.minimum(activity_total, 10)
+        recency = np.minimum(contact_points + frequency_points, self.WEIGHTS["recency"])
+
+        # Engagement
+        responses = np.minimum(counts(*RESPONSE_TYPES), 5)
+        response_points = np.select([responses >= 3, responses >= 1], [15, 8], 0)
+
+        meetings = counts(*MEETING_TYPES)
+        attended = meetings - np.asarray(cancelled_meetings, dtype=np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            attendance = np.where(meetings > 0, attended / meetings, 0.0)
+        meeting_points = np.select(
+            [meetings == 0, attendance >= 0.8, attendance >= 0.5, attended > 0], [0, 15, 10, 5], 0
+        )
+
+        distinct_types = np.zeros(size, dtype=np.int64)
+        for activity_type, column in activity_counts.items():
+            if activity_type:
+                distinct_types += np.asarray(column, dtype=np.int64) > 0
+        variety_points = np.where(distinct_types >= 4, 5, 0)
+
+        engagement = np.where(
+            activity_total > 0,
+            np.minimum(response_points + meeting_points + variety_points, self.WEIGHTS["engagement"]),
+            0,
+        )
+
+        totals = np.clip(firmographic + value_points + recency + engagement, 0, 100)
+        categories_out = np.select([totals <= 39, totals <= 69], ["kalt", "warm"], "heiß")
+        return [
+            {
+                "score": score,
+                "category": category_key,
+                "category_label": self._get_category_label(category_key),
+            }
+            for score, category_key in zip(totals.tolist(), categories_out.tolist())
+        ]
+
+    def _score_many_fallback(
+        self, budget, category, company, priority, last_contact,
+        activity_counts, cancelled_meetings,
+    ) -> List[Dict[str, Any]]:
+        """score_many without NumPy: per-contact scoring of equivalent activity lists (uses the current time, not `now`)"""
+        results = []
+        for row in range(len(budget)):
+            activities = []
+            cancelled = cancelled_meetings[row]
+            for activity_type, column in activity_counts.items():
+                for _ in range(column[row]):
+                    status = "completed"
+                    if activity_type in MEETING_TYPES and cancelled > 0:
+                        status, cancelled = "cancelled", cancelled - 1
+                    activities.append({"type": activity_type, "status": status})
+            results.append(self.calculate_lead_score(
+                {
+                    "budget": budget[row],
+                    "category": category[row] or "",
+                    "company": company[row],
+                    "priority": priority[row],
+                    "last_contact": last_contact[row],
+                },
+                activities,
+            ))
+        keys = ("score", "category", "category_label")
+        return [{key: result[key] for key in keys} for result in results]
+
+    def _build_breakdown(
+        self, firmographic: int, value: int, recency: int, engagement: int
+    ) -> List[Dict[str, Any]]:
+        """Score breakdown per factor"""
+        return [
             {
                 "factor": "Firmografische Daten",
-                "value": firmographic_score["score"],
+                "value": firmographic,
                 "weight": self.WEIGHTS["firmographic"],
                 "description": "Unternehmensgröße, Branche, Rolle",
             },
             {
                 "factor": "Potenzialwert",
-                "value": value_score["score"],
+                "value": value,
                 "weight": self.WEIGHTS["value"],
                 "description": "Budget und Umsatzchance",
             },
             {
                 "factor": "Aktualität",
-                "value": recency_score["score"],
+                "value": recency,
                 "weight": self.WEIGHTS["recency"],
                 "description": "Zeit seit letztem Kontakt, Aktivitätshäufigkeit",
             },
             {
                 "factor": "Engagement",
-                "value": engagement_score["score"],
+                "value": engagement,
                 "weight": self.WEIGHTS["engagement"],
                 "description": "Reaktionszeit, Termintreue, Interaktion",
             },
         ]
 
-        return {
-            "score": total_score,
-            "category": category,
-            "category_label": self._get_category_label(category),
-            "breakdown": breakdown,
-            "signals": top_signals,
-            "last_updated": datetime.utcnow().isoformat(),
-        }
-
     def _calculate_firmographic_score(
         self, contact_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -278,7 +508,7 @@ class LeadScoringService:
                     signals.append(
                         {
                             "name": "Sehr aktuell",
-                            "value": f"vor {days_since} Tagen",
+                            "value": RECENCY_VALUE.format(days_since),
                             "impact": points,
                             "icon": "calendar-check",
                         }
@@ -289,7 +519,7 @@ class LeadScoringService:
                     signals.append(
                         {
                             "name": "Aktueller Kontakt",
-                            "value": f"vor {days_since} Tagen",
+                            "value": RECENCY_VALUE.format(days_since),
                             "impact": points,
                             "icon": "calendar",
                         }
@@ -300,7 +530,7 @@ class LeadScoringService:
                     signals.append(
                         {
                             "name": "Regelmäßiger Kontakt",
-                            "value": f"vor {days_since} Tagen",
+                            "value": RECENCY_VALUE.format(days_since),
                             "impact": points,
                             "icon": "calendar",
                         }
@@ -310,7 +540,7 @@ class LeadScoringService:
                     signals.append(
                         {
                             "name": "Kontakt veraltet",
-                            "value": f"vor {days_since} Tagen",
+                            "value": RECENCY_VALUE.format(days_since),
                             "impact": points,
                             "icon": "calendar-close",
                         }
@@ -7,10 +7,10 @@ import asyncio
 import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-from openai import AsyncOpenAI
 
 from app.core.settings import settings
 from app.core.errors import ValidationError, ServiceError
+from app.core.instrumentation import stage
 from app.schemas.llm import (
     LLMRequest,
     LLMResponse,
@@ -43,7 +43,9 @@ class LLMService:
         if not self.openrouter_api_key:
             raise ServiceError("OpenRouter API key not configured")
 
-        # Initialize AsyncOpenAI client
+        # Initialize AsyncOpenAI client (openai SDK is imported on first use)
+        from openai import AsyncOpenAI
+
         self.client = AsyncOpenAI(
             base_url=self.openrouter_base_url,
             api_key=self.openrouter_api_key,
@@ -88,17 +90,18 @@ class LLMService:
         for attempt in range(3):  # 3 retry attempts
             try:
                 # Make request using OpenAI client
-                completion = await self.client.chat.completions.create(
-                    model=self.openrouter_model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    extra_headers={
-                        "HTTP-Referer": self.site_url,
-                        "X-Title": self.site_name,
-                    },
-                    extra_body={},
-                )
+                with stage("llm"):
+                    completion = await self.client.chat.completions.create(
+                        model=self.openrouter_model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        extra_headers={
+                            "HTTP-Referer": self.site_url,
+                            "X-Title": self.site_name,
+                        },
+                        extra_body={},
+                    )
 
                 # Convert response to dict format
                 return {
@@ -0,0 +1,192 @@
+"""
+Message Search
+
+Full-text search over channel messages. SQLite uses an FTS5 table kept in
+sync by triggers, PostgreSQL a GIN index on to_tsvector(content); other
+databases fall back to icontains. Channel ACLs are applied in the same query.
+
+Matching is per word: the query is split into words (at most MAX_TERMS),
+each word matches as a prefix of a word in the message, and all words must
+match. A query no longer matches inside words or across word boundaries,
+e.g. "mmobil" does not find "Immobilie". The icontains fallback keeps
+substring matching per word.
+
+On SQLite, `manage.py rebuild_message_search` recreates the index after a
+migration that remakes the messages table.
+"""
+
+import html
+import re
+from typing import List, Optional
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+
+from app.db.models import Channel, ChannelMembership, Message
+
+FTS_TABLE = "messages_fts"
+PG_INDEX = "messages_content_fts_idx"
+MAX_TERMS = 8
+SNIPPET_LENGTH = 160
+
+SQLITE_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        content, content='messages', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content)
+        VALUES ('delete', old.rowid, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_SETUP = [
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON messages "
+    "USING GIN (to_tsvector('simple', content))",
+]
+
+POSTGRES_TEARDOWN = [f"DROP INDEX IF EXISTS {PG_INDEX}"]
+
+
+def install_search_index(schema_editor) -> None:
+    """Create the full-text index for the current database (used by migrations)"""
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_SETUP, "postgresql": POSTGRES_SETUP}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def remove_search_index(schema_editor) -> None:
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_TEARDOWN, "postgresql": POSTGRES_TEARDOWN}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def rebuild_search_index() -> None:
+    """
+    Recreate triggers and repopulate the SQLite FTS table.
+
+    Needed after a migration that remakes the messages table on SQLite
+    (the copy drops triggers and may renumber rowids).
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.schema_editor() as schema_editor:
+        remove_search_index(schema_editor)
+        install_search_index(schema_editor)
+
+
+_backend: Optional[str] = None
+
+
+def _search_backend() -> str:
+    global _backend
+    if _backend is None:
+        if connection.vendor == "postgresql":
+            _backend = "postgresql"
+        elif (
+            connection.vendor == "sqlite"
+            and FTS_TABLE in connection.introspection.table_names()
+        ):
+            _backend = "sqlite"
+        else:
+            _backend = "fallback"
+    return _backend
+
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query)[:MAX_TERMS]
+
+
+def _accessible_channels(tenant_id: str, user_id: str) -> QuerySet:
+    return Channel.objects.filter(tenant_id=tenant_id).filter(
+        Q(is_private=False)
+        | Q(
+            id__in=ChannelMembership.objects.filter(
+                tenant_id=tenant_id, user_id=user_id
+            ).values("channel_id")
+        )
+    ).values("id")
+
+
+def search_message_ids(tenant_id: str, user_id: str, query: str, limit: int = 50) -> List:
+    """
+    Ids of messages in channels the user may read that contain every query
+    word as a word prefix, newest first
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    # Subquery instead of a join over memberships: one row per message
+    qs = Message.objects.filter(
+        tenant_id=tenant_id,
+        is_deleted=False,
+        channel_id__in=_accessible_channels(tenant_id, user_id),
+    )
+
+    backend = _search_backend()
+    if backend == "sqlite":
+        match = " ".join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+        qs = qs.extra(
+            where=[
+                f"messages.rowid IN (SELECT rowid FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s)"
+            ],
+            params=[match],
+        )
+    elif backend == "postgresql":
+        # Expression must match the GIN index definition
+        qs = qs.extra(
+            where=[
+                "to_tsvector('simple', messages.content) @@ to_tsquery('simple', %s)"
+            ],
+            params=[" & ".join(f"{t}:*" for t in terms)],
+        )
+    else:
+        for term in terms:
+            qs = qs.filter(content__icontains=term)
+
+    return list(qs.order_by("-created_at").values_list("id", flat=True)[:limit])
+
+
+def highlight_snippet(content: str, query: str, length: int = SNIPPET_LENGTH) -> str:
+    """HTML-escaped excerpt around the first hit with terms wrapped in <mark>"""
+    terms = _terms(query)
+    if not content or not terms:
+        return html.escape(content[:length] if content else "")
+
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    first = pattern.search(content)
+    start = max(0, (first.start() if first else 0) - length // 3)
+    end = min(len(content), start + length)
+    excerpt = content[start:end]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(excerpt):
+        parts.append(html.escape(excerpt[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(excerpt[position:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    return prefix + "".join(parts) + suffix
@@ -0,0 +1,288 @@
+"""
+Property Metrics Series
+
+Writes portal metrics in batches and materializes the daily chart series at
+sync time: every sync stores today's snapshot plus interpolated rows for
+the days since the previous one, each with daily deltas. Reads are then a
+single range query on (property, date), and the per-property 30-day sums
+kept on PropertyMetrics serve the tenant's top listings.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from app.db.models import PropertyMetrics, PropertyMetricsSnapshot
+
+SERIES_DAYS = 30
+TOP_LISTING_METRICS = {
+    "views": "views_30d",
+    "inquiries": "inquiries_30d",
+    "favorites": "favorites_30d",
+}
+
+CUMULATIVE_FIELDS = ("views", "inquiries", "favorites")
+SNAPSHOT_UPDATE_FIELDS = [
+    "views",
+    "inquiries",
+    "favorites",
+    "clicks",
+    "visits",
+    "immoscout_views",
+    "immoscout_inquiries",
+    "immowelt_views",
+    "immowelt_inquiries",
+    "daily_views",
+    "daily_inquiries",
+    "daily_favorites",
+    "estimated",
+]
+
+# (property_id, immoscout metrics or None, immowelt metrics or None);
+# None keeps the stored values of that portal
+PortalMetrics = Tuple[Any, Optional[Dict[str, int]], Optional[Dict[str, int]]]
+
+
+def _apply_portal_metrics(metrics: PropertyMetrics, immoscout, immowelt, now):
+    if immoscout is not None:
+        metrics.immoscout_views = immoscout["views"]
+        metrics.immoscout_inquiries = immoscout["inquiries"]
+        metrics.immoscout_favorites = immoscout["favorites"]
+    if immowelt is not None:
+        metrics.immowelt_views = immowelt["views"]
+        metrics.immowelt_inquiries = immowelt["inquiries"]
+        metrics.immowelt_favorites = immowelt["favorites"]
+    metrics.calculate_totals()
+    metrics.last_synced_at = now
+    metrics.updated_at = now
+
+
+def store_portal_metrics(entries: List[PortalMetrics]) -> Dict[Any, PropertyMetrics]:
+    """
+    Store synced portal metrics of many properties: PropertyMetrics and the
+    snapshot series are written with a constant number of queries.
+    """
+    if not entries:
+        return {}
+    now = timezone.now()
+    property_ids = [property_id for property_id, _, _ in entries]
+
+    PropertyMetrics.objects.bulk_create(
+        [PropertyMetrics(property_id=property_id) for property_id in property_ids],
+        ignore_conflicts=True,
+    )
+    by_property = {
+        metrics.property_id: metrics
+        for metrics in PropertyMetrics.objects.select_related("property").filter(
+            property_id__in=property_ids
+        )
+    }
+    for property_id, immoscout, immowelt in entries:
+        _apply_portal_metrics(by_property[property_id], immoscout, immowelt, now)
+
+    write_snapshots(list(by_property.values()), timezone.localdate(now))
+    PropertyMetrics.objects.bulk_update(
+        list(by_property.values()),
+        [
+            "immoscout_views",
+            "immoscout_inquiries",
+            "immoscout_favorites",
+            "immowelt_views",
+            "immowelt_inquiries",
+            "immowelt_favorites",
+            "total_views",
+            "total_inquiries",
+            "total_favorites",
+            "conversion_rate",
+            "views_30d",
+            "inquiries_30d",
+            "favorites_30d",
+            "last_synced_at",
+            "updated_at",
+        ],
+    )
+    return by_property
+
+
+def _anchors(metrics_list: List[PropertyMetrics], today: date) -> Dict[Any, Tuple[date, Dict[str, int]]]:
+    """Last snapshot before today per property: (date, cumulative values)"""
+    ids = [metrics.property_id for metrics in metrics_list]
+    last_date = (
+        PropertyMetricsSnapshot.objects.filter(
+            property_id=OuterRef("property_id"), date__lt=today
+        )
+        .order_by("-date")
+        .values("date")[:1]
+    )
+    anchors = {}
+    rows = PropertyMetricsSnapshot.objects.filter(
+        property_id__in=ids, date=Subquery(last_date)
+    ).values("property_id", "date", *CUMULATIVE_FIELDS)
+    for row in rows:
+        anchors[row["property_id"]] = (
+            row["date"],
+            {field: row[field] for field in CUMULATIVE_FIELDS},
+        )
+    return anchors
+
+
+def _series_rows(
+    metrics: PropertyMetrics,
+    today: date,
+    anchor_date: date,
+    anchor: Dict[str, int],
+) -> List[PropertyMetricsSnapshot]:
+    """Snapshots from the anchor to today, cumulative values interpolated linearly"""
+    current = {
+        "views": metrics.total_views,
+        "inquiries": metrics.total_inquiries,
+        "favorites": metrics.total_favorites,
+    }
+    span = max(1, (today - anchor_date).days)
+    first = max(anchor_date + timedelta(days=1), today - timedelta(days=SERIES_DAYS - 1))
+
+    rows = []
+    previous = {
+        field: anchor[field] + (current[field] - anchor[field]) * ((first - anchor_date).days - 1) // span
+        for field in CUMULATIVE_FIELDS
+    }
+    day = first
+    while day <= today:
+        step = (day - anchor_date).days
+        values = {
+            field: anchor[field] + (current[field] - anchor[field]) * step // span
+            for field in CUMULATIVE_FIELDS
+        }
+        rows.append(
+            PropertyMetricsSnapshot(
+                property_id=metrics.property_id,
+                date=day,
+                clicks=metrics.total_clicks,
+                visits=metrics.total_visits,
+                immoscout_views=metrics.immoscout_views,
+                immoscout_inquiries=metrics.immoscout_inquiries,
+                immowelt_views=metrics.immowelt_views,
+                immowelt_inquiries=metrics.immowelt_inquiries,
+                # Portal counters can be reset: no negative days
+                daily_views=max(0, values["views"] - previous["views"]),
+                daily_inquiries=max(0, values["inquiries"] - previous["inquiries"]),
+                daily_favorites=max(0, values["favorites"] - previous["favorites"]),
+                estimated=day != today,
+                **values,
+            )
+        )
+        previous = values
+        day += timedelta(days=1)
+    return rows
+
+
+def write_snapshots(metrics_list: List[PropertyMetrics], today: Optional[date] = None):
+    """
+    Upsert today's snapshot and the gap-filled days before it for each
+    property, then refresh the 30-day sums on the (unsaved) metrics objects.
+    """
+    if not metrics_list:
+        return
+    today = today or timezone.localdate()
+    anchors = _anchors(metrics_list, today)
+
+    rows = []
+    for metrics in metrics_list:
+        if metrics.property_id in anchors:
+            anchor_date, anchor = anchors[metrics.property_id]
+        else:
+            # First sync: spread the totals over the days on market
+            created = timezone.localdate(metrics.property.created_at)
+            anchor_date = min(created, today) - timedelta(days=1)
+            anchor = dict.fromkeys(CUMULATIVE_FIELDS, 0)
+        rows.extend(_series_rows(metrics, today, anchor_date, anchor))
+
+    PropertyMetricsSnapshot.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["property", "date"],
+        update_fields=SNAPSHOT_UPDATE_FIELDS,
+    )
+
+    sums = (
+        PropertyMetricsSnapshot.objects.filter(
+            property_id__in=[metrics.property_id for metrics in metrics_list],
+            date__gt=today - timedelta(days=SERIES_DAYS),
+            date__lte=today,
+        )
+        .values("property_id")
+        .annotate(
+            views=Sum("daily_views"),
+            inquiries=Sum("daily_inquiries"),
+            favorites=Sum("daily_favorites"),
+        )
+    )
+    by_property = {row["property_id"]: row for row in sums}
+    for metrics in metrics_list:
+        row = by_property.get(metrics.property_id, {})
+        metrics.views_30d = row.get("views") or 0
+        metrics.inquiries_30d = row.get("inquiries") or 0
+        metrics.favorites_30d = row.get("favorites") or 0
+
+
+def chart_series(property_id, days: int = SERIES_DAYS, today: Optional[date] = None) -> List[dict]:
+    """Daily chart points of the last `days` days (one range query, no writes)"""
+    today = today or timezone.localdate()
+    rows = (
+        PropertyMetricsSnapshot.objects.filter(
+            property_id=property_id,
+            date__gt=today - timedelta(days=days),
+            date__lte=today,
+        )
+        .order_by("date")
+        .values("date", "daily_views", "daily_inquiries", "daily_favorites", "visits", "estimated")
+    )
+    return [
+        {
+            "date": row["date"].isoformat(),
+            "views": row["daily_views"],
+            "inquiries": row["daily_inquiries"],
+            "visits": row["visits"],
+            "favorites": row["daily_favorites"],
+            "estimated": row["estimated"],
+        }
+        for row in rows
+    ]
+
+
+def top_listings(tenant_id, metric: str = "views", limit: int = 10) -> List[dict]:
+    """Tenant's listings with the most views/inquiries/favorites in the last 30 days"""
+    field = TOP_LISTING_METRICS[metric]
+    rows = (
+        PropertyMetrics.objects.filter(property__tenant_id=tenant_id)
+        .order_by(f"-{field}", "-total_views")
+        .values(
+            "property_id",
+            "property__title",
+            "property__status",
+            "views_30d",
+            "inquiries_30d",
+            "favorites_30d",
+            "total_views",
+            "total_inquiries",
+            "conversion_rate",
+            "last_synced_at",
+        )[:limit]
+    )
+    return [
+        {
+            "propertyId": str(row["property_id"]),
+            "title": row["property__title"],
+            "status": row["property__status"],
+            "views30d": row["views_30d"],
+            "inquiries30d": row["inquiries_30d"],
+            "favorites30d": row["favorites_30d"],
+            "totalViews": row["total_views"],
+            "totalInquiries": row["total_inquiries"],
+            "conversionRate": float(row["conversion_rate"]),
+            "lastSyncedAt": row["last_synced_at"].isoformat() if row["last_synced_at"] else None,
+        }
+        for row in rows
+    ]
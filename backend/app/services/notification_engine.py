@@ -0,0 +1,274 @@
+"""
+Notification Engine
+Fan-out-on-write: Empfänger einmal auflösen, Präferenzen in SQL filtern,
+Benachrichtigungen per bulk_create anlegen und Bursts zu Digests zusammenfassen
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from app.core.settings import settings
+from app.models import Notification, NotificationCounter, NotificationPreference, User
+from app.db.models.notification import (
+    NotificationType,
+    NotificationCategory,
+    NotificationPriority,
+)
+from app.services.notification_service import (
+    publish_notification_events,
+    seed_unread_counter_sync,
+    serialize_notification_event,
+)
+
+PRIORITY_ORDER = [
+    NotificationPriority.LOW,
+    NotificationPriority.NORMAL,
+    NotificationPriority.HIGH,
+    NotificationPriority.URGENT,
+]
+
+
+class NotificationEngine:
+    """Creates notifications for many recipients in one transaction"""
+
+    def __init__(
+        self,
+        tenant_id,
+        batch_size: int = 500,
+        digest_window: Optional[timedelta] = None,
+    ):
+        self.tenant_id = tenant_id
+        self.batch_size = batch_size
+        self.digest_window = digest_window or timedelta(
+            minutes=settings.NOTIFICATION_DIGEST_MINUTES
+        )
+
+    def _resolve_recipients(
+        self,
+        recipients: Iterable,
+        category: NotificationCategory,
+        priority: NotificationPriority,
+    ) -> List:
+        """Recipient ids minus users whose preferences reject this notification (one query)"""
+        user_ids = {getattr(r, "id", r) for r in recipients}
+        if not user_ids:
+            return []
+
+        higher_minimums = PRIORITY_ORDER[PRIORITY_ORDER.index(priority) + 1:]
+        blocked = NotificationPreference.objects.filter(
+            tenant_id=self.tenant_id, category=category.value
+        ).filter(
+            Q(enabled=False)
+            | Q(in_app_enabled=False)
+            | Q(min_priority__in=[p.value for p in higher_minimums])
+        ).values("user_id")
+
+        return list(
+            User.objects.filter(id__in=user_ids)
+            .exclude(id__in=blocked)
+            .values_list("id", flat=True)
+        )
+
+    def _merge_into_digests(
+        self,
+        user_ids: List,
+        digest_key: str,
+        title: str,
+        message: str,
+        digest_title: Optional[Callable[[int], str]],
+        digest_message: Optional[Callable[[int], str]],
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Bump open digests of these users; returns {user_id: event payload}.
+        One UPDATE per distinct digest_count, not per user.
+        """
+        now = timezone.now()
+        rows = (
+            Notification.objects.filter(
+                tenant_id=self.tenant_id,
+                user_id__in=user_ids,
+                digest_key=digest_key,
+                read=False,
+                archived=False,
+                created_at__gte=now - self.digest_window,
+            )
+            .order_by("-created_at")
+            .values("id", "user_id", "digest_count")
+        )
+
+        merged: Dict[Any, Dict[str, Any]] = {}
+        by_count = defaultdict(list)
+        for row in rows:
+            if row["user_id"] in merged:
+                continue
+            count = row["digest_count"] + 1
+            merged[row["user_id"]] = {"id": str(row["id"]), "digest_count": count}
+            by_count[count].append(row["id"])
+
+        for count, ids in by_count.items():
+            new_title = digest_title(count) if digest_title else title
+            new_message = digest_message(count) if digest_message else message
+            Notification.objects.filter(id__in=ids).update(
+                digest_count=count, title=new_title, message=new_message, updated_at=now
+            )
+            for payload in merged.values():
+                if payload["digest_count"] == count:
+                    payload.update(title=new_title, message=new_message)
+
+        return merged
+
+    def fan_out(
+        self,
+        recipients: Iterable,
+        title: str,
+        message: str,
+        type: NotificationType = NotificationType.INFO,
+        category: NotificationCategory = NotificationCategory.SYSTEM,
+        priority: NotificationPriority = NotificationPriority.NORMAL,
+        action_url: Optional[str] = None,
+        action_label: Optional[str] = None,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[str] = None,
+        related_entity_title: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        expires_at: Optional[datetime] = None,
+        created_by: Optional[User] = None,
+        digest_key: Optional[str] = None,
+        digest_title: Optional[Callable[[int], str]] = None,
+        digest_message: Optional[Callable[[int], str]] = None,
+    ) -> List[Notification]:
+        """
+        Notify all recipients (User objects or ids).
+
+        With digest_key, recipients that still have an unread notification with
+        the same key from within the digest window get that one updated (count,
+        title/message from the digest callables) instead of a new row.
+        Returns the newly created notifications.
+        """
+        with transaction.atomic():
+            user_ids = self._resolve_recipients(recipients, category, priority)
+            if not user_ids:
+                return []
+
+            merged = {}
+            if digest_key:
+                merged = self._merge_into_digests(
+                    user_ids, digest_key, title, message, digest_title, digest_message
+                )
+
+            notifications = [
+                Notification(
+                    tenant_id=self.tenant_id,
+                    user_id=user_id,
+                    type=type.value,
+                    category=category.value,
+                    priority=priority.value,
+                    title=title,
+                    message=message,
+                    action_url=action_url,
+                    action_label=action_label,
+                    related_entity_type=related_entity_type,
+                    related_entity_id=related_entity_id,
+                    related_entity_title=related_entity_title,
+                    metadata=metadata or {},
+                    digest_key=digest_key,
+                    expires_at=expires_at,
+                    created_by=created_by,
+                )
+                for user_id in user_ids
+                if user_id not in merged
+            ]
+            # bulk_create sends no post_save: counters and push events are handled here
+            Notification.objects.bulk_create(notifications, batch_size=self.batch_size)
+
+            new_user_ids = [n.user_id for n in notifications]
+            counters = {}
+            if new_user_ids:
+                counter_qs = NotificationCounter.objects.filter(
+                    tenant_id=self.tenant_id, user_id__in=new_user_ids
+                )
+                # Users without a counter row get one seeded from a COUNT that
+                # already includes the rows inserted above
+                existing = set(counter_qs.values_list("user_id", flat=True))
+                seeded = {
+                    user_id
+                    for user_id in new_user_ids
+                    if user_id not in existing
+                    and seed_unread_counter_sync(self.tenant_id, user_id)
+                }
+                counter_qs.exclude(user_id__in=seeded).update(
+                    unread=F("unread") + 1, updated_at=timezone.now()
+                )
+                counters = dict(counter_qs.values_list("user_id", "unread"))
+
+            events = [
+                (self.tenant_id, n.user_id, "notification", serialize_notification_event(n))
+                for n in notifications
+            ]
+            events += [
+                (self.tenant_id, user_id, "unread_count", {"count": unread})
+                for user_id, unread in counters.items()
+            ]
+            events += [
+                (self.tenant_id, user_id, "notification.updated", payload)
+                for user_id, payload in merged.items()
+            ]
+            publish_notification_events(events)
+
+        return notifications
+
+
+def purge_in_batches(queryset, batch_size: int = 1000) -> int:
+    """Delete matching rows batch by batch with one DELETE statement each"""
+    total = 0
+    while True:
+        rows = list(
+            queryset.order_by().values_list("id", "tenant_id", "user_id", "read", "archived")[
+                :batch_size
+            ]
+        )
+        if not rows:
+            return total
+
+        # Unread rows leave counters stale: drop them, they are re-seeded on next use
+        stale_counters = defaultdict(set)
+        for _, tenant_id, user_id, read, archived in rows:
+            if not read and not archived:
+                stale_counters[tenant_id].add(user_id)
+
+        with transaction.atomic():
+            # _raw_delete: no per-row fetch and signal dispatch (nothing references notifications)
+            deleted = Notification.objects.filter(id__in=[r[0] for r in rows])._raw_delete(
+                Notification.objects.db
+            )
+            for tenant_id, user_ids in stale_counters.items():
+                NotificationCounter.objects.filter(
+                    tenant_id=tenant_id, user_id__in=user_ids
+                ).delete()
+
+        total += deleted
+        if len(rows) < batch_size:
+            return total
+
+
+def purge_notifications(
+    read_retention_days: Optional[int] = None, batch_size: int = 1000
+) -> Dict[str, int]:
+    """Remove expired notifications and read ones older than the retention period"""
+    retention = read_retention_days or settings.NOTIFICATION_READ_RETENTION_DAYS
+    now = timezone.now()
+    return {
+        "expired": purge_in_batches(
+            Notification.objects.filter(expires_at__lte=now), batch_size
+        ),
+        "old_read": purge_in_batches(
+            Notification.objects.filter(
+                read=True, read_at__lte=now - timedelta(days=retention)
+            ),
+            batch_size,
+        ),
+    }
@@ -4,11 +4,15 @@ Business logic für automatische Notifications und Helper-Funktionen
 """
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
+from app.core.pubsub import pubsub
 from app.models import (
     Notification, 
     NotificationPreference,
+    NotificationCounter,
     User, 
     Tenant,
     Property,
@@ -23,6 +27,115 @@ from app.db.models.notification import (
 )
 
 
+def notification_channel(tenant_id, user_id) -> str:
+    """Pub/Sub channel for a user's notification stream"""
+    return f"notifications:{tenant_id}:{user_id}"
+
+
+def publish_notification_event(tenant_id, user_id, event: str, data: Dict[str, Any]):
+    """Push an event to the user's stream once the current transaction commits"""
+    channel = notification_channel(tenant_id, user_id)
+    message = {"event": event, "data": data}
+    transaction.on_commit(lambda: pubsub.publish_sync(channel, message))
+
+
+def publish_notification_events(events: List[tuple]) -> None:
+    """Batch variant: (tenant_id, user_id, event, data) tuples, one publish after commit"""
+    messages = [
+        (notification_channel(tenant_id, user_id), {"event": event, "data": data})
+        for tenant_id, user_id, event, data in events
+    ]
+    if messages:
+        transaction.on_commit(lambda: pubsub.publish_many_sync(messages))
+
+
+def seed_unread_counter_sync(tenant_id, user_id) -> bool:
+    """
+    Create the user's counter row from a COUNT if it is missing.
+    Returns True if the row was created here.
+
+    Writers call this after their notification changes, inside the same
+    transaction, so the COUNT already includes them and no delta must be
+    applied on top. The unique key serializes concurrent seeding: a writer
+    whose change the COUNT of another transaction cannot see blocks on that
+    row, then finds it and applies its delta.
+    """
+    _, created = NotificationCounter.objects.get_or_create(
+        tenant_id=tenant_id,
+        user_id=user_id,
+        defaults={
+            "unread": lambda: Notification.objects.filter(
+                tenant_id=tenant_id, user_id=user_id, read=False, archived=False
+            ).count()
+        },
+    )
+    return created
+
+
+def get_unread_count_sync(tenant_id, user_id) -> int:
+    """
+    Read the maintained unread counter.
+    Der Zähler wird beim ersten Zugriff einmalig per COUNT initialisiert.
+    """
+    counter = NotificationCounter.objects.filter(
+        tenant_id=tenant_id, user_id=user_id
+    ).values_list("unread", flat=True).first()
+    if counter is not None:
+        return counter
+
+    seed_unread_counter_sync(tenant_id, user_id)
+    return NotificationCounter.objects.filter(
+        tenant_id=tenant_id, user_id=user_id
+    ).values_list("unread", flat=True).first() or 0
+
+
+def adjust_unread_count_sync(tenant_id, user_id, delta: int) -> None:
+    """Apply a delta; a missing counter row is seeded and already includes it"""
+    if not seed_unread_counter_sync(tenant_id, user_id):
+        counters = NotificationCounter.objects.filter(
+            tenant_id=tenant_id, user_id=user_id
+        )
+        if delta < 0:
+            counters = counters.filter(unread__gte=-delta)
+        if not counters.update(unread=F("unread") + delta, updated_at=timezone.now()):
+            return
+    publish_unread_count_sync(tenant_id, user_id)
+
+
+def reset_unread_count_sync(tenant_id, user_id) -> None:
+    """Counter to zero after a bulk mark-as-read (queryset.update sends no signals)"""
+    NotificationCounter.objects.update_or_create(
+        tenant_id=tenant_id, user_id=user_id, defaults={"unread": 0}
+    )
+    publish_unread_count_sync(tenant_id, user_id)
+
+
+def publish_unread_count_sync(tenant_id, user_id) -> None:
+    unread = NotificationCounter.objects.filter(
+        tenant_id=tenant_id, user_id=user_id
+    ).values_list("unread", flat=True).first()
+    if unread is not None:
+        publish_notification_event(tenant_id, user_id, "unread_count", {"count": unread})
+
+
+def serialize_notification_event(notification: Notification) -> Dict[str, Any]:
+    """Compact payload for the push channel"""
+    return {
+        "id": str(notification.id),
+        "type": notification.type,
+        "category": notification.category,
+        "priority": notification.priority,
+        "title": notification.title,
+        "message": notification.message,
+        "action_url": notification.action_url,
+        "action_label": notification.action_label,
+        "related_entity_type": notification.related_entity_type,
+        "related_entity_id": notification.related_entity_id,
+        "digest_count": notification.digest_count,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
 class NotificationService:
     """Service for creating and managing notifications"""
     
@@ -44,55 +157,26 @@ class NotificationService:
         expires_at: Optional[datetime] = None,
         created_by: Optional[User] = None,
     ) -> Notification:
-        """Create a new notification"""
-        
-        # Check user preferences
-        try:
-            pref = NotificationPreference.objects.get(
-                tenant=tenant,
-                user=user,
-                category=category.value
-            )
-            
-            # Check if category is enabled
-            if not pref.enabled or not pref.in_app_enabled:
-                return None
-            
-            # Check minimum priority
-            priority_order = {
-                NotificationPriority.LOW: 0,
-                NotificationPriority.NORMAL: 1,
-                NotificationPriority.HIGH: 2,
-                NotificationPriority.URGENT: 3,
-            }
-            
-            min_priority_enum = NotificationPriority(pref.min_priority)
-            if priority_order[priority] < priority_order[min_priority_enum]:
-                return None
-            
-        except NotificationPreference.DoesNotExist:
-            # No preference set, allow notification
-            pass
-        
-        notification = Notification.objects.create(
-            tenant=tenant,
-            user=user,
-            type=type.value,
-            category=category.value,
-            priority=priority.value,
+        """Create a new notification (None if the user's preferences reject it)"""
+        from app.services.notification_engine import NotificationEngine
+
+        created = NotificationEngine(tenant.id).fan_out(
+            [user],
             title=title,
             message=message,
+            type=type,
+            category=category,
+            priority=priority,
             action_url=action_url,
             action_label=action_label,
             related_entity_type=related_entity_type,
             related_entity_id=related_entity_id,
             related_entity_title=related_entity_title,
-            metadata=metadata or {},
+            metadata=metadata,
             expires_at=expires_at,
             created_by=created_by,
         )
-        
-        return notification
+        return created[0] if created else None
     
     @staticmethod
     def notify_property_status_change(
@@ -244,12 +328,14 @@ class NotificationService:
         recipient: User,
         tenant: Tenant,
     ):
-        """Create notification for document upload"""
-        return NotificationService.create_notification(
-            tenant=tenant,
-            user=recipient,
+        """Create notification for document upload (bursts per uploader become a digest)"""
+        from app.services.notification_engine import NotificationEngine
+
+        uploader_name = uploader.get_full_name()
+        created = NotificationEngine(tenant.id).fan_out(
+            [recipient],
             title="Neues Dokument hochgeladen",
-            message=f'{uploader.get_full_name()} hat das Dokument "{document_title}" hochgeladen.',
+            message=f'{uploader_name} hat das Dokument "{document_title}" hochgeladen.',
             type=NotificationType.INFO,
             category=NotificationCategory.DOCUMENT,
             priority=NotificationPriority.NORMAL,
@@ -262,9 +348,13 @@ class NotificationService:
             metadata={
                 "icon": "file-text",
                 "color": "blue",
-                "uploaderName": uploader.get_full_name()
-            }
+                "uploaderName": uploader_name
+            },
+            digest_key=f"document_uploaded:{uploader.id}",
+            digest_title=lambda count: "Neue Dokumente hochgeladen",
+            digest_message=lambda count: f"{uploader_name} hat {count} Dokumente hochgeladen.",
         )
+        return created[0] if created else None
     
     @staticmethod
     def notify_system_message(
@@ -276,46 +366,39 @@ class NotificationService:
         action_url: Optional[str] = None,
         action_label: Optional[str] = None,
     ) -> List[Notification]:
-        """Send system notification to multiple users"""
-        notifications = []
-        
-        for user in users:
-            notification = NotificationService.create_notification(
-                tenant=tenant,
-                user=user,
-                title=title,
-                message=message,
-                type=NotificationType.INFO,
-                category=NotificationCategory.SYSTEM,
-                priority=priority,
-                action_url=action_url,
-                action_label=action_label,
-                metadata={
-                    "icon": "info",
-                    "color": "blue"
-                }
-            )
-            if notification:
-                notifications.append(notification)
-        
-        return notifications
+        """Send system notification to multiple users (one bulk insert)"""
+        from app.services.notification_engine import NotificationEngine
+
+        return NotificationEngine(tenant.id).fan_out(
+            users,
+            title=title,
+            message=message,
+            type=NotificationType.INFO,
+            category=NotificationCategory.SYSTEM,
+            priority=priority,
+            action_url=action_url,
+            action_label=action_label,
+            metadata={
+                "icon": "info",
+                "color": "blue"
+            }
+        )
     
     @staticmethod
     def cleanup_expired_notifications():
-        """Delete expired notifications"""
-        deleted_count, _ = Notification.objects.filter(
-            expires_at__lte=timezone.now()
-        ).delete()
-        
-        return deleted_count
+        """Delete expired notifications in batches"""
+        from app.services.notification_engine import purge_in_batches
+
+        return purge_in_batches(
+            Notification.objects.filter(expires_at__lte=timezone.now())
+        )
     
     @staticmethod
     def cleanup_old_read_notifications(days: int = 30):
-        """Delete old read notifications"""
+        """Delete old read notifications in batches"""
+        from app.services.notification_engine import purge_in_batches
+
         cutoff_date = timezone.now() - timedelta(days=days)
-        deleted_count, _ = Notification.objects.filter(
-            read=True,
-            read_at__lte=cutoff_date
-        ).delete()
-        
-        return deleted_count
+        return purge_in_batches(
+            Notification.objects.filter(read=True, read_at__lte=cutoff_date)
+        )
@@ -3,10 +3,10 @@ Properties Service
 """
 
 from typing import Optional, List, Tuple, Dict, Any
-from datetime import datetime, timedelta
 from django.db import models
 from django.db.models import Q, Count, Avg
 from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
 from asgiref.sync import sync_to_async
 import os
 
@@ -19,7 +19,6 @@ from app.db.models import (
     PropertyDocument,
     User,
     PropertyMetrics,
-    PropertyMetricsSnapshot,
     PublishJob,
 )
 from app.schemas.properties import (
@@ -36,6 +35,9 @@ from app.schemas.properties import (
 from app.core.errors import NotFoundError
 from app.services.audit import AuditService
 from app.core.billing_guard import BillingGuard
+from app.services.blob_store import BlobStore
+from app.services.image_pipeline import pick_variant
+from app.services.metrics_series import chart_series, store_portal_metrics, top_listings
 
 
 class PropertiesService:
@@ -70,8 +72,12 @@ class PropertiesService:
         heating_type: Optional[str] = None,
         sort_by: Optional[str] = None,
         sort_order: Optional[str] = None,
+        image_width: Optional[int] = None,
     ) -> Tuple[List[PropertyResponse], int]:
-        """Get properties with filters and pagination"""
+        """Get properties with filters and pagination
+
+        image_width selects the smallest image variant at least that wide.
+        """
 
         @sync_to_async
         def get_properties_sync():
@@ -161,9 +167,14 @@ class PropertiesService:
             return properties, total
 
         properties, total = await get_properties_sync()
-        return [await self._build_property_response(prop) for prop in properties], total
+        return [
+            await self._build_property_response(prop, image_width)
+            for prop in properties
+        ], total
 
-    async def get_property(self, property_id: str) -> Optional[PropertyResponse]:
+    async def get_property(
+        self, property_id: str, image_width: Optional[int] = None
+    ) -> Optional[PropertyResponse]:
         """Get a specific property"""
 
         @sync_to_async
@@ -175,7 +186,7 @@ class PropertiesService:
 
         property_obj = await get_property_sync()
         if property_obj:
-            return await self._build_property_response(property_obj)
+            return await self._build_property_response(property_obj, image_width)
         return None
 
     async def create_property(
@@ -414,9 +425,13 @@ class PropertiesService:
         await delete_property_sync()
 
     async def _build_property_response(
-        self, property_obj: Property
+        self, property_obj: Property, image_width: Optional[int] = None
     ) -> PropertyResponse:
-        """Build PropertyResponse from Property model"""
+        """Build PropertyResponse from Property model
+
+        If image_width is given, image urls point to the smallest variant
+        that fits it; original_url always points to the uploaded file.
+        """
 
         @sync_to_async
         def build_response_sync():
@@ -472,10 +487,18 @@ class PropertiesService:
             # Get images
             images = []
             for img in property_obj.images.all():
+                variant = (
+                    pick_variant(img.variants, image_width)
+                    if img.variants and image_width
+                    else None
+                )
                 images.append(
                     PropertyImageSchema(
                         id=str(img.id),
-                        url=img.url,
+                        url=variant["url"] if variant else img.url,
+                        original_url=img.url,
+                        thumbnail_url=img.thumbnail_url,
+                        variants=img.variants or [],
                         alt_text=img.alt_text,
                         is_primary=img.is_primary,
                         order=img.order,
@@ -534,14 +557,14 @@ class PropertiesService:
 
     async def get_property_metrics(self, property_id: str) -> Dict[str, Any]:
         """
-        Get property performance metrics from stored data and portal APIs.
-        Fetches live data from connected portals and updates the database.
+        Get property performance metrics from stored data.
+        The chart series is materialized by the metrics sync; this only reads.
         """
 
         @sync_to_async
         def get_metrics_sync():
             try:
-                property_obj = Property.objects.get(
+                property_obj = Property.objects.select_related("metrics").get(
                     id=property_id, tenant_id=self.tenant_id
                 )
             except Property.DoesNotExist:
@@ -549,57 +572,16 @@ class PropertiesService:
 
             # Calculate days on market
             days_on_market = (
-                datetime.now().date() - property_obj.created_at.date()
+                timezone.localdate() - timezone.localdate(property_obj.created_at)
             ).days
 
-            # Get or create metrics record
-            metrics, created = PropertyMetrics.objects.get_or_create(
-                property=property_obj,
-                defaults={
-                    "total_views": 0,
-                    "total_inquiries": 0,
-                    "total_favorites": 0,
-                },
-            )
+            # Never synced: report zeros without creating a record
+            try:
+                metrics = property_obj.metrics
+            except PropertyMetrics.DoesNotExist:
+                metrics = PropertyMetrics(property=property_obj)
 
-            # Get historical snapshots for chart data (last 30 days)
-            thirty_days_ago = datetime.now().date() - timedelta(days=30)
-            snapshots = PropertyMetricsSnapshot.objects.filter(
-                property=property_obj, date__gte=thirty_days_ago
-            ).order_by("date")
-
-            # Build chart data from snapshots
-            chart_data = []
-            snapshot_dict = {s.date: s for s in snapshots}
-
-            for i in range(30):
-                date = datetime.now().date() - timedelta(days=29 - i)
-                if date in snapshot_dict:
-                    snapshot = snapshot_dict[date]
-                    chart_data.append(
-                        {
-                            "date": date.isoformat(),
-                            "views": snapshot.views,
-                            "inquiries": snapshot.inquiries,
-                            "visits": snapshot.visits,
-                            "favorites": snapshot.favorites,
-                        }
-                    )
-                else:
-                    # No data for this day - estimate based on metrics
-                    daily_views = max(1, metrics.total_views // max(1, days_on_market))
-                    daily_inquiries = max(
-                        0, metrics.total_inquiries // max(1, days_on_market)
-                    )
-                    chart_data.append(
-                        {
-                            "date": date.isoformat(),
-                            "views": daily_views,
-                            "inquiries": daily_inquiries,
-                            "visits": 0,
-                            "favorites": 0,
-                        }
-                    )
+            chart_data = chart_series(property_obj.id)
 
             # Calculate conversion rate
             conversion_rate = 0
@@ -636,6 +618,12 @@ class PropertiesService:
 
         return await get_metrics_sync()
 
+    async def get_top_listings(
+        self, metric: str = "views", limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Top performing listings of the tenant over the last 30 days"""
+        return await sync_to_async(top_listings)(self.tenant_id, metric, limit)
+
     async def sync_property_metrics_from_portals(
         self, property_id: str
     ) -> Dict[str, Any]:
@@ -643,7 +631,7 @@ class PropertiesService:
         Sync property metrics from all connected portals.
         Called by background task or on-demand.
         """
-        from app.services.immoscout_service import ImmoScoutService
+        from app.services.immoscout_service import ImmoScout24Service
         from app.services.immowelt_service import ImmoweltService
 
         @sync_to_async
@@ -675,7 +663,7 @@ class PropertiesService:
         for job in jobs:
             try:
                 if job["portal"] == "immoscout24":
-                    immoscout_service = ImmoScoutService()
+                    immoscout_service = ImmoScout24Service()
                     portal_metrics = await immoscout_service.get_property_metrics(
                         job["portal_property_id"], self.tenant_id
                     )
@@ -701,38 +689,9 @@ class PropertiesService:
         # Update metrics in database
         @sync_to_async
         def update_metrics():
-            metrics, created = PropertyMetrics.objects.get_or_create(
-                property_id=property_id,
-            )
-
-            metrics.immoscout_views = immoscout_metrics["views"]
-            metrics.immoscout_inquiries = immoscout_metrics["inquiries"]
-            metrics.immoscout_favorites = immoscout_metrics["favorites"]
-
-            metrics.immowelt_views = immowelt_metrics["views"]
-            metrics.immowelt_inquiries = immowelt_metrics["inquiries"]
-            metrics.immowelt_favorites = immowelt_metrics["favorites"]
-
-            metrics.last_synced_at = datetime.now()
-            metrics.save()  # This will auto-calculate totals
-
-            # Create today's snapshot
-            today = datetime.now().date()
-            snapshot, _ = PropertyMetricsSnapshot.objects.update_or_create(
-                property_id=property_id,
-                date=today,
-                defaults={
-                    "views": metrics.total_views,
-                    "inquiries": metrics.total_inquiries,
-                    "favorites": metrics.total_favorites,
-                    "immoscout_views": metrics.immoscout_views,
-                    "immoscout_inquiries": metrics.immoscout_inquiries,
-                    "immowelt_views": metrics.immowelt_views,
-                    "immowelt_inquiries": metrics.immowelt_inquiries,
-                },
-            )
-
-            return metrics
+            return store_portal_metrics(
+                [(property_obj.id, immoscout_metrics, immowelt_metrics)]
+            )[property_obj.id]
 
         updated_metrics = await update_metrics()
 
@@ -765,23 +724,21 @@ class PropertiesService:
                 property_obj.images.aggregate(models.Max("order"))["order__max"] or 0
             )
 
+            blob_store = BlobStore(self.tenant_id)
+
             uploaded_images = []
             for idx, file in enumerate(files):
-                # Save file
-                image = PropertyImage.objects.create(
+                # Save file (content already stored for this tenant is reused)
+                image = PropertyImage(
                     property=property_obj,
-                    file=file,
                     alt_text=file.name,
                     order=max_order + idx + 1,
                     size=file.size,
                     mime_type=file.content_type or "image/jpeg",
                     uploaded_by=user,
                 )
-
-                # Generate URL from file path
-                if image.file:
-                    image.url = image.file.url
-                    image.save()
+                blob_store.assign_file_sync(image, file)
+                image.save()
 
                 uploaded_images.append(
                     PropertyImageSchema(
@@ -827,22 +784,20 @@ class PropertiesService:
 
             user = User.objects.get(id=uploaded_by_id)
 
+            blob_store = BlobStore(self.tenant_id)
+
             uploaded_documents = []
             for file in files:
-                # Save file
-                document = PropertyDocument.objects.create(
+                # Save file (content already stored for this tenant is reused)
+                document = PropertyDocument(
                     property=property_obj,
-                    file=file,
                     name=file.name,
                     size=file.size,
                     mime_type=file.content_type or "application/pdf",
                     uploaded_by=user,
                 )
-
-                # Generate URL from file path
-                if document.file:
-                    document.url = document.file.url
-                    document.save()
+                blob_store.assign_file_sync(document, file)
+                document.save()
 
                 uploaded_documents.append(
                     PropertyDocumentSchema(
@@ -913,8 +868,8 @@ class PropertiesService:
             except PropertyImage.DoesNotExist:
                 raise NotFoundError("Image not found")
 
-            # Delete file if exists
-            if image.file:
+            # Delete file if exists (shared blobs are released via ref counting)
+            if image.file and not image.blob_id:
                 image.file.delete()
 
             image.delete()
@@ -940,8 +895,8 @@ class PropertiesService:
             except PropertyDocument.DoesNotExist:
                 raise NotFoundError("Document not found")
 
-            # Delete file if exists
-            if document.file:
+            # Delete file if exists (shared blobs are released via ref counting)
+            if document.file and not document.blob_id:
                 document.file.delete()
 
             document.delete()
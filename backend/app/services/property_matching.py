@@ -0,0 +1,140 @@
+"""
+Property Matching
+
+Budget matching between contacts and active properties. The active
+properties of a tenant are loaded once into a price-sorted index (cached
+per tenant data version, so property writes rebuild it) and every contact's
+budget window is answered with binary search instead of a query.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from app.core.tenant_cache import tenant_cache
+from app.db.models import Contact, Property
+
+MATCH_STATUS = "active"
+BUDGET_TOLERANCE = 1.1  # properties up to 10% above budget still match
+
+
+@dataclass(frozen=True)
+class IndexedProperty:
+    id: Any
+    title: str
+    price: float
+    created_at: datetime
+
+
+def contact_budget(contact) -> Optional[float]:
+    """Main budget, falling back to the legacy budget_max"""
+    if contact.budget:
+        return float(contact.budget)
+    if contact.budget_max:
+        return float(contact.budget_max)
+    return None
+
+
+def budget_window(contact) -> Optional[Tuple[float, float]]:
+    """(lower, upper) price bounds for a contact, None without a budget"""
+    budget = contact_budget(contact)
+    if not budget or budget <= 0:
+        return None
+    lower = float(contact.budget_min) if contact.budget_min else 0
+    return lower, budget * BUDGET_TOLERANCE
+
+
+def lead_quality(lead_score: int) -> str:
+    if lead_score >= 70:
+        return "Hot"
+    if lead_score >= 40:
+        return "Warm"
+    return "Cold"
+
+
+def match_score(price: Optional[float], budget: float, lead_score: int) -> float:
+    """Budget fit (70%) combined with the contact's lead score (30%)"""
+    price_diff = abs(price - budget) if price else budget
+    price_fit = max(0, 100 - (price_diff / budget * 100))
+    return round(price_fit * 0.7 + lead_score * 0.3, 1)
+
+
+class PropertyIndex:
+    """Active properties of one tenant, sorted by price and by recency"""
+
+    def __init__(self, properties: List[IndexedProperty]):
+        self.by_price = sorted(properties, key=lambda p: p.price)
+        self.prices = [p.price for p in self.by_price]
+        self.by_recency = sorted(properties, key=lambda p: p.created_at, reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def _bounds(self, lower: float, upper: float) -> Tuple[int, int]:
+        return bisect_left(self.prices, lower), bisect_right(self.prices, upper)
+
+    def count_in_range(self, lower: float, upper: float) -> int:
+        start, end = self._bounds(lower, upper)
+        return max(0, end - start)
+
+    def newest_in_range(self, lower: float, upper: float, limit: int) -> List[IndexedProperty]:
+        """Newest `limit` properties with lower <= price <= upper"""
+        start, end = self._bounds(lower, upper)
+        in_range = end - start
+        if in_range <= 0 or limit <= 0:
+            return []
+
+        # Narrow window: rank the slice. Wide window: walk newest-first until
+        # `limit` hits, which takes about limit * len / in_range steps.
+        if in_range * in_range <= limit * len(self.prices):
+            return heapq.nlargest(
+                limit, self.by_price[start:end], key=lambda p: p.created_at
+            )
+        hits = []
+        for prop in self.by_recency:
+            if lower <= prop.price <= upper:
+                hits.append(prop)
+                if len(hits) == limit:
+                    break
+        return hits
+
+    def matches_for(self, contact, limit: int) -> List[IndexedProperty]:
+        window = budget_window(contact)
+        return self.newest_in_range(*window, limit) if window else []
+
+
+def _build_index(tenant_id) -> PropertyIndex:
+    rows = Property.objects.filter(
+        tenant_id=tenant_id, status=MATCH_STATUS, price__isnull=False
+    ).values_list("id", "title", "price", "created_at")
+    return PropertyIndex(
+        [IndexedProperty(id, title, float(price), created_at) for id, title, price, created_at in rows]
+    )
+
+
+def get_property_index(tenant_id) -> PropertyIndex:
+    """Cached index of the tenant's matchable properties (sync)"""
+    return tenant_cache.get_or_compute(
+        tenant_id, "property_index", lambda: _build_index(tenant_id)
+    )
+
+
+def count_matched_contacts(tenant_id) -> int:
+    """Contacts with at least one matching property: one query plus a binary search each"""
+
+    def compute():
+        index = get_property_index(tenant_id)
+        if not len(index):
+            return 0
+        contacts = Contact.objects.filter(tenant_id=tenant_id).exclude(
+            budget__isnull=True, budget_max__isnull=True
+        ).only("budget", "budget_min", "budget_max")
+        matched = 0
+        for contact in contacts.iterator(chunk_size=2000):
+            window = budget_window(contact)
+            if window and index.count_in_range(*window):
+                matched += 1
+        return matched
+
+    return tenant_cache.get_or_compute(tenant_id, "matched_contacts", compute)
@@ -11,22 +11,16 @@ from datetime import datetime
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import (
-    Distance,
-    VectorParams,
-    PointStruct,
-    Filter,
-    FieldCondition,
-    MatchValue,
-    SearchRequest,
-)
 from pydantic import BaseModel, Field
 
 from app.core.ai_config import get_ai_config
+from app.core.lazy_import import lazy_module
 from app.services.ai.ollama_client import get_ollama_client
 from app.core.errors import ValidationError, NotFoundError
 
+# qdrant_client loads with the first RagService
+qdrant_models = lazy_module("qdrant_client.models")
+
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +81,8 @@ class RagService:
         self.ollama_client = get_ollama_client()
 
         # Initialize Qdrant client
+        from qdrant_client import QdrantClient
+
         self.qdrant_client = QdrantClient(
             host=self.config.qdrant_host,
             port=self.config.qdrant_port,
@@ -111,9 +107,9 @@ class RagService:
 
                 self.qdrant_client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
+                    vectors_config=qdrant_models.VectorParams(
                         size=self.EMBEDDING_DIM,
-                        distance=Distance.COSINE,
+                        distance=qdrant_models.Distance.COSINE,
                     ),
                 )
 
@@ -294,7 +290,7 @@ class RagService:
             # Create Qdrant points
             points = []
             for chunk, embedding in zip(chunks, embeddings):
-                point = PointStruct(
+                point = qdrant_models.PointStruct(
                     id=chunk.id,
                     vector=embedding,
                     payload={
@@ -376,21 +372,21 @@ class RagService:
 
             # Build filter (tenant + optional source_type)
             filter_conditions = [
-                FieldCondition(
+                qdrant_models.FieldCondition(
                     key="tenant_id",
-                    match=MatchValue(value=self.tenant_id),
+                    match=qdrant_models.MatchValue(value=self.tenant_id),
                 )
             ]
 
             if source_type:
                 filter_conditions.append(
-                    FieldCondition(
+                    qdrant_models.FieldCondition(
                         key="source_type",
-                        match=MatchValue(value=source_type),
+                        match=qdrant_models.MatchValue(value=source_type),
                     )
                 )
 
-            filter_obj = Filter(must=filter_conditions)
+            filter_obj = qdrant_models.Filter(must=filter_conditions)
 
             # Search in Qdrant
             search_result = self.qdrant_client.search(
@@ -448,15 +444,15 @@ class RagService:
         """
         try:
             # Build filter
-            filter_obj = Filter(
+            filter_obj = qdrant_models.Filter(
                 must=[
-                    FieldCondition(
+                    qdrant_models.FieldCondition(
                         key="tenant_id",
-                        match=MatchValue(value=self.tenant_id),
+                        match=qdrant_models.MatchValue(value=self.tenant_id),
                     ),
-                    FieldCondition(
+                    qdrant_models.FieldCondition(
                         key="source",
-                        match=MatchValue(value=source),
+                        match=qdrant_models.MatchValue(value=source),
                     ),
                 ]
             )
@@ -485,11 +481,11 @@ class RagService:
         """
         try:
             # Scroll through collection with tenant filter
-            filter_obj = Filter(
+            filter_obj = qdrant_models.Filter(
                 must=[
-                    FieldCondition(
+                    qdrant_models.FieldCondition(
                         key="tenant_id",
-                        match=MatchValue(value=self.tenant_id),
+                        match=qdrant_models.MatchValue(value=self.tenant_id),
                     )
                 ]
             )
@@ -551,11 +547,11 @@ class RagService:
                 health["collection_exists"] = True
 
                 # Count tenant chunks
-                filter_obj = Filter(
+                filter_obj = qdrant_models.Filter(
                     must=[
-                        FieldCondition(
+                        qdrant_models.FieldCondition(
                             key="tenant_id",
-                            match=MatchValue(value=self.tenant_id),
+                            match=qdrant_models.MatchValue(value=self.tenant_id),
                         )
                     ]
                 )
@@ -1,23 +1,45 @@
 """
 Rate Limit Manager - Centralized rate limiting for all platform APIs
+
+Portal and social quotas belong to the tenant's account, so with REDIS_URL
+set the token buckets and usage counters live in Redis and are shared by
+all API workers and Celery tasks; without it they are kept per process.
+Buckets refill continuously and waiting callers sleep exactly until their
+token is due.
 """
 
 import os
 import time
 import logging
-from typing import Dict, Optional
+import weakref
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from collections import defaultdict
 import asyncio
 
+from app.core.errors import RateLimitError
+
 logger = logging.getLogger(__name__)
 
+try:
+    import redis
+    import redis.asyncio as aioredis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+KEY_PREFIX = "immonow:platform_rl:"
+
 
 class TokenBucket:
     """
     Token bucket algorithm for rate limiting
 
-    Allows burst traffic while maintaining average rate limit
+    Allows burst traffic while maintaining average rate limit. Tokens refill
+    continuously at refill_rate / refill_interval per second.
     """
 
     def __init__(
@@ -29,14 +51,31 @@ class TokenBucket:
         Args:
             max_tokens: Maximum tokens (burst capacity)
             refill_rate: Tokens added per refill interval
-            refill_interval: Seconds between refills
+            refill_interval: Seconds per refill_rate tokens
         """
         self.max_tokens = max_tokens
         self.tokens = max_tokens
         self.refill_rate = refill_rate
         self.refill_interval = refill_interval
-        self.last_refill = time.time()
-        self._lock = asyncio.Lock()
+        self.last_refill = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """Tokens per second"""
+        return self.refill_rate / self.refill_interval
+
+    def take(self, tokens: int = 1) -> Tuple[bool, float]:
+        """
+        Consume tokens if available
+
+        Returns:
+            (consumed, seconds until enough tokens are available if not)
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True, 0.0
+        return False, self.seconds_until(tokens)
 
     async def consume(self, tokens: int = 1) -> bool:
         """
@@ -45,25 +84,31 @@ class TokenBucket:
         Returns:
             True if tokens were consumed, False if rate limited
         """
-        async with self._lock:
-            self._refill()
+        return self.take(tokens)[0]
 
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True
-            return False
+    async def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until tokens can be consumed
+
+        Returns:
+            True once consumed, False if that would take longer than timeout
+        """
+        return await wait_for_tokens(lambda: self.take(tokens), timeout)
+
+    def seconds_until(self, tokens: int = 1) -> float:
+        """Seconds until `tokens` are available (0 if they are now)"""
+        deficit = tokens - self.tokens
+        if deficit <= 0:
+            return 0.0
+        return deficit / self.rate
 
     def _refill(self):
-        """Refill tokens based on time elapsed"""
-        now = time.time()
-        elapsed = now - self.last_refill
-
-        if elapsed >= self.refill_interval:
-            refill_count = int(elapsed / self.refill_interval)
-            self.tokens = min(
-                self.max_tokens, self.tokens + (refill_count * self.refill_rate)
-            )
-            self.last_refill = now
+        """Refill tokens for the time elapsed"""
+        now = time.monotonic()
+        self.tokens = min(
+            self.max_tokens, self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
 
     @property
     def available_tokens(self) -> float:
@@ -72,6 +117,222 @@ class TokenBucket:
         return self.tokens
 
 
+async def wait_for_tokens(take, timeout: Optional[float] = None) -> bool:
+    """
+    Retry `take` (sync or async, returning (consumed, wait)) after exactly
+    the wait it reports; False as soon as that would pass the timeout
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        result = take()
+        if asyncio.iscoroutine(result):
+            result = await result
+        consumed, wait = result
+        if consumed:
+            return True
+        if deadline is not None and time.monotonic() + wait > deadline:
+            return False
+        await asyncio.sleep(wait)
+
+
+def usage_windows(now: Optional[datetime] = None) -> Dict[str, Tuple[str, datetime]]:
+    """Current fixed usage windows: name -> (key suffix, reset time)"""
+    now = now or datetime.utcnow()
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    return {
+        "hourly": (hour.strftime("%Y%m%d%H"), hour + timedelta(hours=1)),
+        "daily": (day.strftime("%Y%m%d"), day + timedelta(days=1)),
+    }
+
+
+class BucketStore(ABC):
+    """Token buckets and usage counters keyed by platform:tenant"""
+
+    backend = "memory"
+
+    @abstractmethod
+    async def take(
+        self, key: str, capacity: int, rate: float, tokens: int = 1
+    ) -> Tuple[bool, float]:
+        """Consume tokens; returns (consumed, seconds until available if not)"""
+
+    @abstractmethod
+    async def record(self, key: str) -> None:
+        """Count a call in the hourly, daily and total usage"""
+
+    @abstractmethod
+    async def snapshot(
+        self, keys: List[str], capacities: List[int], rates: List[float]
+    ) -> List[Dict]:
+        """Available tokens and usage per key, without consuming"""
+
+    @abstractmethod
+    async def reset(self, key: str) -> None:
+        """Drop bucket and usage of a key"""
+
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets and counters"""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _bucket(self, key: str, capacity: int, rate: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(capacity, rate, 1.0)
+        return bucket
+
+    async def take(self, key, capacity, rate, tokens=1):
+        return self._bucket(key, capacity, rate).take(tokens)
+
+    async def record(self, key):
+        counts = self._counts[key]
+        current = [f"{window}:{suffix}" for window, (suffix, _) in usage_windows().items()]
+        for name in [name for name in counts if name != "total" and name not in current]:
+            del counts[name]  # past windows
+        for name in current:
+            counts[name] += 1
+        counts["total"] += 1
+
+    async def snapshot(self, keys, capacities, rates):
+        windows = usage_windows()
+        result = []
+        for key, capacity, rate in zip(keys, capacities, rates):
+            counts = self._counts.get(key, {})
+            result.append({
+                "tokens": self._bucket(key, capacity, rate).available_tokens,
+                **{
+                    window: counts.get(f"{window}:{suffix}", 0)
+                    for window, (suffix, _) in windows.items()
+                },
+                "total": counts.get("total", 0),
+            })
+        return result
+
+    async def reset(self, key):
+        self._buckets.pop(key, None)
+        self._counts.pop(key, None)
+
+
+# Continuous refill from the Redis server clock. requested = 0 only reads.
+# Floats are returned as strings: Lua numbers are truncated to integers.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local consumed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    consumed = 1
+else
+    wait = (requested - tokens) / rate
+end
+if requested > 0 then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+end
+return {consumed, tostring(tokens), tostring(wait)}
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """
+    Buckets and counters in Redis, one round trip per operation. Falls back
+    to per-process state while Redis is unreachable.
+    """
+
+    backend = "redis"
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self.fallback = MemoryBucketStore()
+        # Async clients are bound to their event loop (Celery tasks run one
+        # loop per task)
+        self._clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = aioredis.from_url(self.redis_url)
+            entry = self._clients[loop] = (client, client.register_script(TAKE_SCRIPT))
+        return entry
+
+    async def take(self, key, capacity, rate, tokens=1):
+        client, script = self._client()
+        try:
+            consumed, _, wait = await script(
+                keys=[KEY_PREFIX + key], args=[capacity, rate, tokens]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Redis rate limiting unavailable, limiting per process: {e}")
+            return await self.fallback.take(key, capacity, rate, tokens)
+        return bool(consumed), float(wait)
+
+    async def record(self, key):
+        client, _ = self._client()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for window, (suffix, reset_at) in usage_windows().items():
+                    counter = f"{KEY_PREFIX}{key}:{window}:{suffix}"
+                    pipe.incr(counter)
+                    pipe.expireat(counter, reset_at + timedelta(hours=1))
+                pipe.incr(f"{KEY_PREFIX}{key}:total")
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Rate limit usage not recorded in Redis: {e}")
+            await self.fallback.record(key)
+
+    async def snapshot(self, keys, capacities, rates):
+        client, script = self._client()
+        windows = usage_windows()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, capacity, rate in zip(keys, capacities, rates):
+                    await script(
+                        keys=[KEY_PREFIX + key], args=[capacity, rate, 0], client=pipe
+                    )
+                    for window, (suffix, _) in windows.items():
+                        pipe.get(f"{KEY_PREFIX}{key}:{window}:{suffix}")
+                    pipe.get(f"{KEY_PREFIX}{key}:total")
+                replies = await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Rate limit status unavailable from Redis: {e}")
+            return await self.fallback.snapshot(keys, capacities, rates)
+
+        result = []
+        per_key = 2 + len(windows)
+        for index in range(len(keys)):
+            take_reply, *counts = replies[index * per_key:(index + 1) * per_key]
+            entry = {"tokens": float(take_reply[1])}
+            for window, count in zip([*windows, "total"], counts):
+                entry[window] = int(count or 0)
+            result.append(entry)
+        return result
+
+    async def reset(self, key):
+        client, _ = self._client()
+        windows = usage_windows()
+        await client.delete(
+            KEY_PREFIX + key,
+            f"{KEY_PREFIX}{key}:total",
+            *(f"{KEY_PREFIX}{key}:{window}:{suffix}" for window, (suffix, _) in windows.items()),
+        )
+        await self.fallback.reset(key)
+
+
 class PlatformRateLimits:
     """Rate limit configurations for each platform"""
 
@@ -140,19 +401,14 @@ class RateLimitManager:
     Centralized rate limit management for all platform APIs
 
     Features:
-    - Per-platform rate limiting
-    - Per-tenant tracking
-    - Token bucket algorithm for smooth rate limiting
-    - Automatic refill
-    - Rate limit status reporting
+    - Per-platform, per-tenant token buckets
+    - Shared across workers via Redis (Lua, continuous refill), in-memory fallback
+    - Exact waits until the next token instead of polling
+    - Hourly/daily/total usage and quota telemetry per platform
     """
 
-    # Singleton instance for in-memory state
+    # Singleton instance for shared state
     _instance: Optional["RateLimitManager"] = None
-    _buckets: Dict[str, TokenBucket] = {}
-    _call_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-    _hourly_reset: Dict[str, datetime] = {}
-    _daily_reset: Dict[str, datetime] = {}
 
     def __new__(cls):
         """Singleton pattern for consistent state"""
@@ -162,36 +418,36 @@ class RateLimitManager:
 
     def __init__(self):
         """Initialize rate limit manager"""
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+
         # Check for Redis connection for distributed rate limiting
         self.redis_url = os.getenv("REDIS_URL")
-        self.use_redis = bool(self.redis_url)
+        self.use_redis = bool(self.redis_url) and REDIS_AVAILABLE
 
         if self.use_redis:
             logger.info("Using Redis for distributed rate limiting")
+            self.store: BucketStore = RedisBucketStore(self.redis_url)
         else:
             logger.info("Using in-memory rate limiting (single instance only)")
+            self.store = MemoryBucketStore()
 
     def _get_bucket_key(self, platform: str, tenant_id: str) -> str:
         """Generate unique key for a platform/tenant combination"""
         return f"{platform}:{tenant_id}"
 
-    def _get_or_create_bucket(self, platform: str, tenant_id: str) -> TokenBucket:
-        """Get or create token bucket for platform/tenant"""
-        key = self._get_bucket_key(platform, tenant_id)
-
-        if key not in self._buckets:
-            limits = PlatformRateLimits.get_limit(platform)
-
-            # Calculate tokens per second based on hourly limit
-            max_tokens = limits["burst_limit"]
-            # Refill to reach hourly limit over an hour
-            refill_rate = limits["requests_per_hour"] / 3600
-
-            self._buckets[key] = TokenBucket(
-                max_tokens=max_tokens, refill_rate=refill_rate, refill_interval=1.0
-            )
+    @staticmethod
+    def _bucket_config(platform: str) -> Tuple[int, float]:
+        """(capacity, tokens per second): bursts of burst_limit, hourly limit on average"""
+        limits = PlatformRateLimits.get_limit(platform)
+        return limits["burst_limit"], limits["requests_per_hour"] / 3600
 
-        return self._buckets[key]
+    async def _take(self, platform: str, tenant_id: str) -> Tuple[bool, float]:
+        capacity, rate = self._bucket_config(platform)
+        return await self.store.take(
+            self._get_bucket_key(platform, tenant_id), capacity, rate
+        )
 
     async def check_limit(self, platform: str, tenant_id: str) -> bool:
         """
@@ -204,8 +460,22 @@ class RateLimitManager:
         Returns:
             True if request is allowed, False if rate limited
         """
-        bucket = self._get_or_create_bucket(platform, tenant_id)
-        return await bucket.consume(1)
+        consumed, _ = await self._take(platform, tenant_id)
+        return consumed
+
+    async def acquire(
+        self, platform: str, tenant_id: str, timeout: Optional[float] = 60.0
+    ) -> bool:
+        """
+        Wait for a token of the platform/tenant bucket and record the call
+
+        Returns:
+            True if the call may be made, False if no token within timeout
+        """
+        if not await self.wait_for_capacity(platform, tenant_id, timeout):
+            return False
+        await self.record_call(platform, tenant_id)
+        return True
 
     async def record_call(self, platform: str, tenant_id: str):
         """
@@ -214,66 +484,63 @@ class RateLimitManager:
         This is separate from check_limit to allow tracking even
         when using external rate limiters
         """
-        key = self._get_bucket_key(platform, tenant_id)
-        now = datetime.utcnow()
-
-        # Reset hourly counter if needed
-        if key not in self._hourly_reset or now - self._hourly_reset[key] >= timedelta(
-            hours=1
-        ):
-            self._call_counts[key]["hourly"] = 0
-            self._hourly_reset[key] = now
-
-        # Reset daily counter if needed
-        if key not in self._daily_reset or now - self._daily_reset[key] >= timedelta(
-            days=1
-        ):
-            self._call_counts[key]["daily"] = 0
-            self._daily_reset[key] = now
-
-        self._call_counts[key]["hourly"] += 1
-        self._call_counts[key]["daily"] += 1
-        self._call_counts[key]["total"] += 1
-
-    def get_status(self, platform: str, tenant_id: str) -> Dict:
+        await self.store.record(self._get_bucket_key(platform, tenant_id))
+
+    async def get_status(self, platform: str, tenant_id: str) -> Dict:
         """
         Get current rate limit status for a platform/tenant
 
         Returns:
             Dict with rate limit status info
         """
-        key = self._get_bucket_key(platform, tenant_id)
-        bucket = self._get_or_create_bucket(platform, tenant_id)
-        limits = PlatformRateLimits.get_limit(platform)
-        counts = self._call_counts[key]
-
-        return {
-            "platform": platform,
-            "tenant_id": tenant_id,
-            "limits": limits,
-            "current_usage": {
-                "hourly": counts["hourly"],
-                "daily": counts["daily"],
-                "total": counts["total"],
-            },
-            "available_tokens": bucket.available_tokens,
-            "is_limited": bucket.available_tokens < 1,
-            "hourly_reset_at": self._hourly_reset.get(key),
-            "daily_reset_at": self._daily_reset.get(key),
-        }
-
-    def get_all_status(self, tenant_id: str) -> Dict[str, Dict]:
-        """Get rate limit status for all platforms for a tenant"""
+        return (await self._status([platform], tenant_id))[platform]
+
+    async def get_all_status(self, tenant_id: str) -> Dict[str, Dict]:
+        """Get rate limit status for all platforms for a tenant (one store round trip)"""
+        return await self._status(list(PlatformRateLimits.LIMITS.keys()), tenant_id)
+
+    async def _status(self, platforms: List[str], tenant_id: str) -> Dict[str, Dict]:
+        configs = [self._bucket_config(platform) for platform in platforms]
+        snapshots = await self.store.snapshot(
+            [self._get_bucket_key(platform, tenant_id) for platform in platforms],
+            [capacity for capacity, _ in configs],
+            [rate for _, rate in configs],
+        )
+        windows = usage_windows()
+
         statuses = {}
-        for platform in PlatformRateLimits.LIMITS.keys():
-            statuses[platform] = self.get_status(platform, tenant_id)
+        for platform, (capacity, rate), snapshot in zip(platforms, configs, snapshots):
+            limits = PlatformRateLimits.get_limit(platform)
+            tokens = snapshot["tokens"]
+            statuses[platform] = {
+                "platform": platform,
+                "tenant_id": tenant_id,
+                "backend": self.store.backend,
+                "limits": limits,
+                "current_usage": {
+                    "hourly": snapshot["hourly"],
+                    "daily": snapshot["daily"],
+                    "total": snapshot["total"],
+                },
+                "quota_used": {
+                    "hourly": round(snapshot["hourly"] / limits["requests_per_hour"], 4),
+                    "daily": round(snapshot["daily"] / limits["requests_per_day"], 4),
+                },
+                "available_tokens": round(tokens, 3),
+                "is_limited": tokens < 1,
+                "seconds_until_token": round(max(0.0, (1 - tokens) / rate), 2),
+                "hourly_reset_at": windows["hourly"][1],
+                "daily_reset_at": windows["daily"][1],
+            }
         return statuses
 
     async def wait_for_capacity(
-        self, platform: str, tenant_id: str, timeout: float = 60.0
+        self, platform: str, tenant_id: str, timeout: Optional[float] = 60.0
     ) -> bool:
         """
-        Wait until rate limit capacity is available
+        Wait until rate limit capacity is available (consumes one token)
+
+        Sleeps exactly until the next token is due instead of polling.
 
         Args:
             platform: Platform name
@@ -283,32 +550,31 @@ class RateLimitManager:
         Returns:
             True if capacity became available, False if timeout
         """
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            if await self.check_limit(platform, tenant_id):
-                return True
-
-            # Wait a bit before retrying
-            await asyncio.sleep(0.5)
-
-        return False
+        return await wait_for_tokens(lambda: self._take(platform, tenant_id), timeout)
 
-    def reset_limits(self, platform: str, tenant_id: str):
+    async def reset_limits(self, platform: str, tenant_id: str):
         """Reset rate limits for a platform/tenant (for testing)"""
-        key = self._get_bucket_key(platform, tenant_id)
+        await self.store.reset(self._get_bucket_key(platform, tenant_id))
 
-        if key in self._buckets:
-            del self._buckets[key]
 
-        if key in self._call_counts:
-            del self._call_counts[key]
+class PlatformRateLimiter:
+    """
+    Blocking limiter for portal clients
+
+    Waits for a token of the shared RateLimitManager bucket before each
+    request and raises RateLimitError if none frees up within the timeout.
+    """
 
-        if key in self._hourly_reset:
-            del self._hourly_reset[key]
+    def __init__(self, timeout: float = 60.0):
+        self.manager = RateLimitManager()
+        self.timeout = timeout
 
-        if key in self._daily_reset:
-            del self._daily_reset[key]
+    async def acquire(
+        self, platform: str, tenant_id: str = "global", timeout: Optional[float] = None
+    ):
+        wait = self.timeout if timeout is None else timeout
+        if not await self.manager.acquire(platform, tenant_id, wait):
+            raise RateLimitError(f"{platform} rate limit exceeded")
 
 
 # Convenience functions for direct import
@@ -324,7 +590,7 @@ async def record_api_call(platform: str, tenant_id: str):
     await manager.record_call(platform, tenant_id)
 
 
-def get_rate_limit_status(platform: str, tenant_id: str) -> Dict:
+async def get_rate_limit_status(platform: str, tenant_id: str) -> Dict:
     """Get rate limit status"""
     manager = RateLimitManager()
-    return manager.get_status(platform, tenant_id)
+    return await manager.get_status(platform, tenant_id)
@@ -1,14 +1,120 @@
 """
 Storage Service for S3/MinIO
 """
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
 import uuid
-import boto3
-from botocore.exceptions import ClientError
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, Any, Optional, BinaryIO
+
 from fastapi import UploadFile, HTTPException
 
 from app.core.settings import settings
 from app.core.errors import ValidationError
+from app.core.lazy_import import lazy_module
+
+# boto3 loads with the first S3 client; local storage never imports it
+botocore_exceptions = lazy_module("botocore.exceptions")
+
+
+# Shared pool for blocking boto3 transfers. Its size bounds how many uploads
+# a worker runs at once; each upload may use S3_MAX_CONCURRENCY part threads.
+_transfer_executor = ThreadPoolExecutor(
+    max_workers=settings.S3_MAX_PARALLEL_UPLOADS,
+    thread_name_prefix="s3-transfer",
+)
+
+
+@dataclass
+class SpooledUpload:
+    """An upload streamed to a temporary file on disk"""
+
+    path: str
+    size: int
+    checksum: str  # SHA256 hash
+    original_name: str
+    content_type: str
+    _handles: list = field(default_factory=list, init=False, repr=False)
+
+    def open(self) -> BinaryIO:
+        handle = open(self.path, "rb")
+        self._handles.append(handle)
+        return handle
+
+    def as_django_file(self):
+        """Wrap the spooled file for Django FileFields (read in chunks on save)"""
+        from django.core.files.uploadedfile import UploadedFile
+
+        uploaded = UploadedFile(
+            file=self.open(),
+            name=self.original_name,
+            content_type=self.content_type,
+            size=self.size,
+            charset=None,
+        )
+        # Carry the streamed checksum so BlobStore does not re-hash the file
+        uploaded.checksum = self.checksum
+        return uploaded
+
+    def cleanup(self) -> None:
+        for handle in self._handles:
+            handle.close()
+        self._handles.clear()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    default_name: str = "unnamed",
+    default_content_type: str = "application/octet-stream",
+) -> SpooledUpload:
+    """
+    Stream an UploadFile to disk in UPLOAD_CHUNK_SIZE chunks.
+
+    The SHA256 checksum and size are computed while streaming, so at most one
+    chunk is held in memory regardless of the file size. Disk writes run in
+    the default executor so a slow disk does not stall the event loop.
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+    loop = asyncio.get_running_loop()
+
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=settings.UPLOAD_TEMP_DIR)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise ValidationError(
+                        f"File too large. Maximum size is {max_size} bytes"
+                    )
+                digest.update(chunk)
+                await loop.run_in_executor(None, buffer.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return SpooledUpload(
+        path=path,
+        size=size,
+        checksum=digest.hexdigest(),
+        original_name=file.filename or default_name,
+        content_type=file.content_type or default_content_type,
+    )
 
 
 class StorageService:
@@ -16,15 +122,25 @@ class StorageService:
     
     def __init__(self):
         if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+
             self.s3_client = boto3.client(
                 's3',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
                 region_name=settings.AWS_S3_REGION
             )
+            self.transfer_config = TransferConfig(
+                multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+                multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+                max_concurrency=settings.S3_MAX_CONCURRENCY,
+                use_threads=True,
+            )
         else:
             # Fallback to local storage for development
             self.s3_client = None
+            self.transfer_config = None
         
         self.bucket_name = settings.AWS_S3_BUCKET
         self.max_file_size = settings.MAX_FILE_SIZE
@@ -37,58 +153,102 @@ class StorageService:
     ) -> Dict[str, Any]:
         """Upload file to storage"""
         
-        # File validation
-        if file.size > self.max_file_size:
-            raise ValidationError(f"File too large. Maximum size is {self.max_file_size} bytes")
+        spooled = await spool_upload(file, max_size=self.max_file_size)
+        try:
+            return await self.upload_spooled(spooled, tenant_id, folder_path)
+        finally:
+            spooled.cleanup()
+
+    async def upload_spooled(
+        self,
+        spooled: SpooledUpload,
+        tenant_id: str,
+        folder_path: str = "",
+        file_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Upload a spooled file to storage without loading it into memory"""
         
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
+        # Generate unique filename unless the caller chose a stable id
+        file_id = file_id or str(uuid.uuid4())
+        original_name = spooled.original_name
+        file_extension = original_name.split('.')[-1] if '.' in original_name else ''
         filename = f"{file_id}.{file_extension}" if file_extension else file_id
         
+        loop = asyncio.get_running_loop()
+
         if self.s3_client and self.bucket_name:
-            # Upload to S3
+            # Multipart upload to S3, run off the event loop
             s3_key = f"{tenant_id}/documents/{folder_path}/{filename}"
             
             try:
-                self.s3_client.upload_fileobj(
-                    file.file, 
-                    self.bucket_name, 
-                    s3_key,
-                    ExtraArgs={
-                        'ContentType': file.content_type or 'application/octet-stream',
-                        'Metadata': {
-                            'original-name': file.filename or '',
-                            'tenant-id': tenant_id
-                        }
-                    }
+                await loop.run_in_executor(
+                    _transfer_executor,
+                    partial(
+                        self.s3_client.upload_file,
+                        spooled.path,
+                        self.bucket_name,
+                        s3_key,
+                        ExtraArgs={
+                            'ContentType': spooled.content_type,
+                            'Metadata': {
+                                'original-name': original_name,
+                                'tenant-id': tenant_id,
+                                'sha256': spooled.checksum,
+                            }
+                        },
+                        Config=self.transfer_config,
+                    ),
                 )
                 
                 url = f"https://{self.bucket_name}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{s3_key}"
+                backend, storage_key = 's3', s3_key
                 
-            except ClientError as e:
+            except botocore_exceptions.ClientError as e:
                 raise ValidationError(f"Upload failed: {str(e)}")
         else:
             # Local storage fallback
-            import os
             upload_dir = f"uploads/{tenant_id}/documents/{folder_path}"
             os.makedirs(upload_dir, exist_ok=True)
             
             file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+            await loop.run_in_executor(
+                _transfer_executor, shutil.copyfile, spooled.path, file_path
+            )
             
             url = f"/uploads/{tenant_id}/documents/{folder_path}/{filename}"
+            backend, storage_key = 'local', file_path
         
         return {
             'file_id': file_id,
             'filename': filename,
             'url': url,
-            'size': file.size,
-            'mime_type': file.content_type or 'application/octet-stream',
-            'original_name': file.filename or ''
+            'size': spooled.size,
+            'mime_type': spooled.content_type,
+            'original_name': original_name,
+            'checksum': spooled.checksum,
+            'backend': backend,
+            'storage_key': storage_key,
         }
+
+    async def download_to(self, storage_key: str, dest_path: str) -> None:
+        """Download a stored object to a local path without buffering it in memory"""
+
+        loop = asyncio.get_running_loop()
+        if self.s3_client and self.bucket_name:
+            await loop.run_in_executor(
+                _transfer_executor,
+                partial(
+                    self.s3_client.download_file,
+                    self.bucket_name,
+                    storage_key,
+                    dest_path,
+                    Config=self.transfer_config,
+                ),
+            )
+        else:
+            await loop.run_in_executor(
+                _transfer_executor, shutil.copyfile, storage_key, dest_path
+            )
     
     async def delete_file(self, url: str, tenant_id: str) -> bool:
         """Delete file from storage"""
@@ -97,13 +257,19 @@ class StorageService:
             # Extract S3 key from URL
             try:
                 s3_key = url.split(f"{self.bucket_name}.s3.{settings.AWS_S3_REGION}.amazonaws.com/")[1]
-                self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+                await asyncio.get_running_loop().run_in_executor(
+                    _transfer_executor,
+                    partial(
+                        self.s3_client.delete_object,
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                    ),
+                )
                 return True
-            except (IndexError, ClientError):
+            except (IndexError, botocore_exceptions.ClientError):
                 return False
         else:
             # Local storage fallback
-            import os
             try:
                 file_path = url.replace("/uploads/", "uploads/")
                 if os.path.exists(file_path):
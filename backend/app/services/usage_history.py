@@ -0,0 +1,132 @@
+"""
+Usage History
+
+Tägliche Verbrauchs-Zeitreihe pro Tenant aus dem Usage-Ledger. Der Job
+schreibt nur Tage, an denen sich der Ledger gegenüber der letzten Zeile
+geändert hat; beim Lesen wird der letzte Wert fortgeschrieben und auf
+Tag/Woche/Monat verdichtet. Lesen kostet eine Bereichsabfrage auf
+(tenant, day) und keine Aggregate über Properties, Usern oder Dateien.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from app.db.models import TenantUsage, TenantUsageDaily
+from app.services.usage_ledger import LEDGER_FIELDS, get_usage
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def record_usage_history(day: Optional[date] = None) -> Dict[str, int]:
+    """
+    Ledger-Stand aller Tenants als Wert für `day` speichern, sofern er sich
+    seit der letzten Zeile geändert hat. Mehrfache Läufe am selben Tag
+    überschreiben den Tageswert.
+    """
+    day = day or timezone.localdate()
+    previous = TenantUsageDaily.objects.filter(
+        tenant_id=OuterRef("tenant_id"), day__lt=day
+    ).order_by("-day")
+    ledger = TenantUsage.objects.annotate(
+        **{f"last_{field}": Subquery(previous.values(field)[:1]) for field in LEDGER_FIELDS}
+    ).values("tenant_id", *LEDGER_FIELDS, *(f"last_{field}" for field in LEDGER_FIELDS))
+
+    rows, unchanged = [], []
+    for entry in ledger:
+        values = {field: max(0, entry[field]) for field in LEDGER_FIELDS}
+        if all(entry[f"last_{field}"] == values[field] for field in LEDGER_FIELDS):
+            unchanged.append(entry["tenant_id"])
+        else:
+            rows.append(TenantUsageDaily(tenant_id=entry["tenant_id"], day=day, **values))
+
+    TenantUsageDaily.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["tenant", "day"],
+        update_fields=[*LEDGER_FIELDS, "recorded_at"],
+    )
+    # Ein früherer Lauf heute kann eine inzwischen überflüssige Zeile geschrieben haben
+    if unchanged:
+        TenantUsageDaily.objects.filter(day=day, tenant_id__in=unchanged).delete()
+    return {"recorded": len(rows), "unchanged": len(unchanged)}
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Erster Tag des Tages/der ISO-Woche/des Monats von `day`"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _point(period: date, values: Dict[str, int], peaks: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "period": period.isoformat(),
+        "users": values["users"],
+        "properties": values["properties"],
+        "storage_bytes": values["storage_bytes"],
+        "storage_gb": round(values["storage_bytes"] / (1024**3), 3),
+        "max_users": peaks["users"],
+        "max_properties": peaks["properties"],
+        "max_storage_gb": round(peaks["storage_bytes"] / (1024**3), 3),
+    }
+
+
+def usage_history(
+    tenant_id,
+    start: date,
+    end: Optional[date] = None,
+    granularity: str = "day",
+) -> List[Dict[str, Any]]:
+    """
+    Verbrauch von `start` bis `end` (inklusive), je Periode der Stand am
+    Periodenende und die Spitzenwerte. Tage vor der ersten Aufzeichnung
+    fehlen; der heutige Tag kommt aus dem Ledger.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    today = timezone.localdate()
+    end = min(end or today, today)
+
+    # Letzter Wert bis `start` plus alle Änderungen im Zeitraum, eine Abfrage
+    anchor_day = (
+        TenantUsageDaily.objects.filter(tenant_id=tenant_id, day__lte=start)
+        .order_by("-day")
+        .values("day")[:1]
+    )
+    rows = TenantUsageDaily.objects.filter(
+        Q(day__gte=Subquery(anchor_day)) | Q(day__gt=start),
+        tenant_id=tenant_id,
+        day__lte=end,
+    ).values("day", *LEDGER_FIELDS)
+    changes = {row["day"]: {field: row[field] for field in LEDGER_FIELDS} for row in rows}
+    if end == today:
+        changes[today] = get_usage(tenant_id)
+
+    points: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, int]] = None
+    for known in sorted(d for d in changes if d <= start):
+        current = changes[known]
+
+    period, peaks, last = None, None, None
+    day = start
+    while day <= end:
+        current = changes.get(day, current)
+        if current is not None:
+            key = period_start(day, granularity)
+            if key != period:
+                if period is not None:
+                    points.append(_point(period, last, peaks))
+                period, peaks = key, dict(current)
+            else:
+                peaks = {field: max(peaks[field], current[field]) for field in LEDGER_FIELDS}
+            last = current
+        day += timedelta(days=1)
+    if period is not None:
+        points.append(_point(period, last, peaks))
+    return points
@@ -0,0 +1,121 @@
+"""
+Usage Ledger für Plan-Limits
+
+Hält pro Tenant die Zähler, gegen die BillingGuard prüft (aktive User,
+Properties, belegter Speicher), in TenantUsage vor. Signals schreiben sie bei
+create/delete per F()-Update in derselben Transaktion fort, so dass eine
+Limit-Prüfung eine Zeile liest statt COUNTs und vier SUM-Aggregate zu
+rechnen. reconcile_usage zählt live nach (fehlende Zeile, nächtlicher
+Abgleich für Bulk-Operationen ohne Signals).
+"""
+
+from typing import Dict
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from app.db.models import (
+    Attachment,
+    Document,
+    Property,
+    PropertyDocument,
+    PropertyImage,
+    StoredBlob,
+    TenantUsage,
+    UserProfile,
+)
+
+LEDGER_FIELDS = ("users", "properties", "storage_bytes")
+
+
+def storage_bytes_sync(tenant_id) -> int:
+    """
+    Belegter Speicher in Bytes, live gezählt.
+
+    Inhalte in StoredBlobs zählen einmal, egal wie viele Dokumente,
+    Versionen, Medien oder Anhänge darauf verweisen. Dateien ohne Blob
+    (vor der Deduplizierung hochgeladen) werden einzeln summiert.
+    """
+    blobs_size = (
+        StoredBlob.objects.filter(tenant_id=tenant_id, ref_count__gt=0).aggregate(
+            total=Sum("size")
+        )["total"]
+        or 0
+    )
+
+    # Documents (size in bytes)
+    docs_size = (
+        Document.objects.filter(tenant_id=tenant_id, blob__isnull=True).aggregate(
+            total=Sum("size")
+        )["total"]
+        or 0
+    )
+
+    # PropertyImages (size in bytes)
+    images_size = (
+        PropertyImage.objects.filter(
+            property__tenant_id=tenant_id, blob__isnull=True
+        ).aggregate(total=Sum("size"))["total"]
+        or 0
+    )
+
+    # PropertyDocuments (size in bytes)
+    prop_docs_size = (
+        PropertyDocument.objects.filter(
+            property__tenant_id=tenant_id, blob__isnull=True
+        ).aggregate(total=Sum("size"))["total"]
+        or 0
+    )
+
+    # Attachments (file_size in bytes, nullable)
+    attachments_size = (
+        Attachment.objects.filter(tenant_id=tenant_id, blob__isnull=True).aggregate(
+            total=Sum("file_size")
+        )["total"]
+        or 0
+    )
+
+    return blobs_size + docs_size + images_size + prop_docs_size + attachments_size
+
+
+def count_usage(tenant_id) -> Dict[str, int]:
+    """Ledger-Werte live gezählt (teuer, nur für Abgleich)"""
+    return {
+        "users": UserProfile.objects.filter(tenant_id=tenant_id, is_active=True).count(),
+        "properties": Property.objects.filter(tenant_id=tenant_id).count(),
+        "storage_bytes": storage_bytes_sync(tenant_id),
+    }
+
+
+def reconcile_usage(tenant_id) -> Dict[str, int]:
+    """Ledger eines Tenants neu zählen und speichern"""
+    usage = count_usage(tenant_id)
+    TenantUsage.objects.update_or_create(
+        tenant_id=tenant_id, defaults={**usage, "reconciled_at": timezone.now()}
+    )
+    return usage
+
+
+def adjust_usage(tenant_id, **deltas: int) -> None:
+    """
+    Zähler um deltas verschieben (users=1, storage_bytes=-1024, ...).
+
+    Ohne Ledger-Zeile passiert nichts: get_usage zählt dann beim nächsten
+    Lesen nach. So legt auch das Löschen eines Tenants (Cascade) keine
+    neue Zeile an.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not tenant_id or not changes:
+        return
+    TenantUsage.objects.filter(tenant_id=tenant_id).update(
+        **changes, updated_at=timezone.now()
+    )
+
+
+def get_usage(tenant_id) -> Dict[str, int]:
+    """Aktuelle Zähler aus dem Ledger (eine Abfrage)"""
+    row = TenantUsage.objects.filter(tenant_id=tenant_id).values(*LEDGER_FIELDS).first()
+    if row is None:
+        return reconcile_usage(tenant_id)
+    # Drift durch Bulk-Operationen darf nicht negativ werden
+    return {field: max(0, row[field]) for field in LEDGER_FIELDS}
@@ -2,20 +2,20 @@
 Usage Service für Resource-Tracking
 """
 
+from datetime import timedelta
 from typing import Dict, Any
 from django.utils import timezone
 from django.db import models
 from asgiref.sync import sync_to_async
 
+from app.core.billing_guard import billing_cache
 from app.db.models import (
-    UserProfile,
-    Property,
     Document,
     PropertyImage,
     PropertyDocument,
-    BillingAccount,
-    Attachment,
 )
+from app.services.usage_history import usage_history
+from app.services.usage_ledger import get_usage
 
 
 class UsageService:
@@ -33,18 +33,11 @@ class UsageService:
             Dict mit Usage-Statistiken
         """
         try:
-            # Users zählen (nur aktive)
-            users_count = await sync_to_async(
-                UserProfile.objects.filter(tenant_id=tenant_id, is_active=True).count
-            )()
-
-            # Properties zählen
-            properties_count = await sync_to_async(
-                Property.objects.filter(tenant_id=tenant_id).count
-            )()
-
-            # Storage berechnen (vereinfacht)
-            storage_mb = await UsageService._calculate_storage_usage(tenant_id)
+            # Users (nur aktive), Properties und Storage aus dem Usage-Ledger
+            ledger = await sync_to_async(get_usage)(tenant_id)
+            users_count = ledger["users"]
+            properties_count = ledger["properties"]
+            storage_mb = round(ledger["storage_bytes"] / (1024 * 1024), 2)
 
             # Documents zählen
             documents_count = await sync_to_async(
@@ -86,65 +79,6 @@ class UsageService:
                 "error": str(e),
             }
 
-    @staticmethod
-    async def _calculate_storage_usage(tenant_id: str) -> int:
-        """
-        Berechne Storage-Usage in MB
-
-        Args:
-            tenant_id: Tenant ID
-
-        Returns:
-            Storage in MB
-        """
-        try:
-            # Documents Storage
-            documents_size = await sync_to_async(
-                Document.objects.filter(tenant_id=tenant_id).aggregate(
-                    total=models.Sum("size")
-                )["total"]
-                or 0
-            )()
-
-            # Property Images Storage
-            property_images_size = await sync_to_async(
-                PropertyImage.objects.filter(property__tenant_id=tenant_id).aggregate(
-                    total=models.Sum("size")
-                )["total"]
-                or 0
-            )()
-
-            # Property Documents Storage
-            property_documents_size = await sync_to_async(
-                PropertyDocument.objects.filter(
-                    property__tenant_id=tenant_id
-                ).aggregate(total=models.Sum("size"))["total"]
-                or 0
-            )()
-
-            # Attachments Storage (nullable file_size field)
-            attachments_size = await sync_to_async(
-                Attachment.objects.filter(tenant_id=tenant_id).aggregate(
-                    total=models.Sum("file_size")
-                )["total"]
-                or 0
-            )()
-
-            # Summe in MB
-            total_bytes = (
-                documents_size
-                + property_images_size
-                + property_documents_size
-                + attachments_size
-            )
-            total_mb = total_bytes / (1024 * 1024)
-
-            return round(total_mb, 2)
-
-        except Exception as e:
-            print(f"❌ UsageService: Error calculating storage: {str(e)}")
-            return 0
-
     @staticmethod
     async def get_usage_vs_limits(tenant_id: str) -> Dict[str, Any]:
         """
@@ -156,12 +90,9 @@ class UsageService:
         Returns:
             Dict mit Usage vs Limits Vergleich
         """
-        try:
-            # Hole BillingAccount und Limits
-            billing = await sync_to_async(BillingAccount.objects.get)(
-                tenant_id=tenant_id
-            )
-
+        # Hole BillingAccount (gecacht) und Limits
+        billing = await billing_cache.get(tenant_id)
+        if billing is not None:
             from app.core.billing_config import PLAN_LIMITS
 
             limits = PLAN_LIMITS[billing.plan_key]
@@ -223,7 +154,7 @@ class UsageService:
                 "timestamp": usage["timestamp"],
             }
 
-        except BillingAccount.DoesNotExist:
+        else:
             # Fallback für Tenants ohne BillingAccount
             from app.core.billing_config import PLAN_LIMITS
 
@@ -268,25 +199,31 @@ class UsageService:
             }
 
     @staticmethod
-    async def get_usage_history(tenant_id: str, days: int = 30) -> Dict[str, Any]:
+    async def get_usage_history(
+        tenant_id: str, days: int = 30, granularity: str = "day"
+    ) -> Dict[str, Any]:
         """
-        Hole Usage-History (vereinfacht - später mit echten Daten)
+        Hole Usage-History aus der täglichen Zeitreihe (siehe usage_history)
 
         Args:
             tenant_id: Tenant ID
             days: Anzahl Tage zurück
+            granularity: Verdichtung (day, week, month)
 
         Returns:
             Dict mit historischen Daten
         """
-        # TODO: Implementiere echte Usage-History
-        # Für jetzt nur aktuelle Snapshot
         current_usage = await UsageService.get_usage_vs_limits(tenant_id)
+        start = timezone.localdate() - timedelta(days=days - 1)
+        history = await sync_to_async(usage_history)(
+            tenant_id, start, granularity=granularity
+        )
 
         return {
             "tenant_id": tenant_id,
             "period_days": days,
+            "granularity": granularity,
             "current": current_usage,
-            "history": [],  # TODO: Implementiere echte History
+            "history": history,
             "timestamp": timezone.now().isoformat(),
         }
@@ -0,0 +1,322 @@
+"""
+Model Signal Handlers
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+
+from app.core.auth_cache import identity_cache
+from app.core.billing_guard import billing_cache
+from app.core.tenant_cache import tenant_cache
+from app.db.models import (
+    Appointment,
+    Contact,
+    Property,
+    Task,
+    Document,
+    DocumentVersion,
+    PropertyImage,
+    PropertyDocument,
+    Attachment,
+    Notification,
+    BillingAccount,
+    Tenant,
+    TenantUsage,
+    TenantUser,
+    User,
+    UserProfile,
+)
+from app.services.blob_store import retain_blob_sync, release_blob_sync
+from app.services.contact_timeline import (
+    contact_ids_from_tags,
+    remove_source,
+    sync_appointment,
+    sync_task,
+)
+from app.services.lead_rescoring import mark_contacts_dirty
+from app.services.usage_ledger import adjust_usage
+from app.services.notification_service import (
+    adjust_unread_count_sync,
+    publish_notification_event,
+    serialize_notification_event,
+)
+
+
+# Blob reference counting
+BLOB_REFERENCING_MODELS = (
+    Document,
+    DocumentVersion,
+    PropertyImage,
+    PropertyDocument,
+    Attachment,
+)
+
+
+def _remember_blob(sender, instance, **kwargs):
+    # __dict__ lookup avoids a query for deferred fields
+    instance._loaded_blob_id = instance.__dict__.get("blob_id")
+
+
+def _track_blob_change(sender, instance, **kwargs):
+    old_blob_id = getattr(instance, "_loaded_blob_id", None)
+    new_blob_id = instance.blob_id
+    if old_blob_id == new_blob_id:
+        return
+
+    if new_blob_id:
+        retain_blob_sync(new_blob_id)
+    if old_blob_id:
+        release_blob_sync(old_blob_id)
+    instance._loaded_blob_id = new_blob_id
+
+
+def _release_blob(sender, instance, **kwargs):
+    blob_id = instance.__dict__.get("blob_id")
+    if blob_id:
+        release_blob_sync(blob_id)
+
+
+for _model in BLOB_REFERENCING_MODELS:
+    post_init.connect(_remember_blob, sender=_model)
+    post_save.connect(_track_blob_change, sender=_model)
+    post_delete.connect(_release_blob, sender=_model)
+
+
+def _delete_image_derivatives(sender, instance, **kwargs):
+    # Blob-backed derivatives are shared and removed by blob GC; images
+    # without a blob keep theirs under the image id
+    if instance.__dict__.get("blob_id"):
+        return
+    from app.services.image_pipeline import delete_derivatives_sync
+
+    key = str(instance.pk)
+    transaction.on_commit(lambda: delete_derivatives_sync(key))
+
+
+post_delete.connect(_delete_image_derivatives, sender=PropertyImage)
+
+
+# Notification unread counter and push events
+def _is_unread(instance):
+    # None when read/archived are deferred: state unknown, counter left alone
+    if "read" not in instance.__dict__ or "archived" not in instance.__dict__:
+        return None
+    return not instance.read and not instance.archived
+
+
+def _remember_unread(sender, instance, **kwargs):
+    instance._loaded_unread = _is_unread(instance)
+
+
+def _track_unread_change(sender, instance, created, **kwargs):
+    was_unread = False if created else getattr(instance, "_loaded_unread", None)
+    is_unread = _is_unread(instance)
+    instance._loaded_unread = is_unread
+
+    if created:
+        publish_notification_event(
+            instance.tenant_id,
+            instance.user_id,
+            "notification",
+            serialize_notification_event(instance),
+        )
+    if None not in (was_unread, is_unread) and was_unread != is_unread:
+        adjust_unread_count_sync(
+            instance.tenant_id, instance.user_id, 1 if is_unread else -1
+        )
+
+
+def _release_unread(sender, instance, **kwargs):
+    if getattr(instance, "_loaded_unread", False):
+        adjust_unread_count_sync(instance.tenant_id, instance.user_id, -1)
+
+
+post_init.connect(_remember_unread, sender=Notification)
+post_save.connect(_track_unread_change, sender=Notification)
+post_delete.connect(_release_unread, sender=Notification)
+
+
+# Tenant data version: invalidates cached analytics after committed writes
+TENANT_VERSIONED_MODELS = (Property, Contact, Task, Appointment, Document)
+
+
+def _bump_tenant_version(sender, instance, **kwargs):
+    tenant_id = instance.__dict__.get("tenant_id")
+    if tenant_id:
+        transaction.on_commit(lambda: tenant_cache.bump(tenant_id))
+
+
+for _model in TENANT_VERSIONED_MODELS:
+    post_save.connect(_bump_tenant_version, sender=_model)
+    post_delete.connect(_bump_tenant_version, sender=_model)
+
+
+# Lead score: flag contacts whose score inputs changed, rescored in batches
+LEAD_SCORE_FIELDS = {"lead_score", "lead_score_details", "lead_score_dirty", "updated_at"}
+
+
+def _flag_contact_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None:
+        instance.lead_score_dirty = True
+
+
+def _flag_contact_after_partial_save(sender, instance, update_fields=None, **kwargs):
+    # Partial saves do not write the flag set in pre_save
+    if update_fields is not None and not set(update_fields) <= LEAD_SCORE_FIELDS:
+        mark_contacts_dirty([instance.pk])
+
+
+def _sync_appointment_timeline(sender, instance, **kwargs):
+    mark_contacts_dirty(sync_appointment(instance))
+
+
+def _remove_appointment_timeline(sender, instance, **kwargs):
+    mark_contacts_dirty(remove_source("appointment", instance.id))
+
+
+def _remember_task_tags(sender, instance, **kwargs):
+    # A copy: tags are often edited in place before the save
+    instance._loaded_tags = list(instance.__dict__.get("tags") or [])
+
+
+def _sync_task_timeline(sender, instance, **kwargs):
+    # Contacts untagged by this save lose the task's activity: flag the old
+    # tag set too, even where a link or timeline row is missing
+    previous = contact_ids_from_tags(getattr(instance, "_loaded_tags", None))
+    instance._loaded_tags = list(instance.tags or [])
+    mark_contacts_dirty(previous, tenant_id=instance.tenant_id)
+    mark_contacts_dirty(sync_task(instance))
+
+
+def _remove_task_timeline(sender, instance, **kwargs):
+    mark_contacts_dirty(remove_source("task", instance.id))
+
+
+pre_save.connect(_flag_contact_on_save, sender=Contact)
+post_save.connect(_flag_contact_after_partial_save, sender=Contact)
+post_save.connect(_sync_appointment_timeline, sender=Appointment)
+post_delete.connect(_remove_appointment_timeline, sender=Appointment)
+post_init.connect(_remember_task_tags, sender=Task)
+post_save.connect(_sync_task_timeline, sender=Task)
+post_delete.connect(_remove_task_timeline, sender=Task)
+
+
+# Usage ledger for plan limits, written in the same transaction as the change
+UNBLOBBED_SIZE_FIELDS = {
+    Document: "size",
+    PropertyImage: "size",
+    PropertyDocument: "size",
+    Attachment: "file_size",
+}
+
+
+def _create_usage_row(sender, instance, created, **kwargs):
+    if created:
+        TenantUsage.objects.get_or_create(tenant_id=instance.pk)
+
+
+def _count_property(sender, instance, created, **kwargs):
+    if created:
+        adjust_usage(instance.tenant_id, properties=1)
+
+
+def _uncount_property(sender, instance, **kwargs):
+    adjust_usage(instance.__dict__.get("tenant_id"), properties=-1)
+
+
+def _remember_active(sender, instance, **kwargs):
+    instance._loaded_active = instance.__dict__.get("is_active")
+
+
+def _track_active_change(sender, instance, created, **kwargs):
+    was_active = False if created else getattr(instance, "_loaded_active", None)
+    is_active = instance.__dict__.get("is_active")
+    instance._loaded_active = is_active
+    if None not in (was_active, is_active) and was_active != is_active:
+        adjust_usage(instance.tenant_id, users=1 if is_active else -1)
+
+
+def _uncount_active(sender, instance, **kwargs):
+    if getattr(instance, "_loaded_active", False):
+        adjust_usage(instance.__dict__.get("tenant_id"), users=-1)
+
+
+def _unblobbed_size(sender, instance):
+    # Blob-backed files are counted per blob (see blob_store); None if deferred
+    values = instance.__dict__
+    field = UNBLOBBED_SIZE_FIELDS[sender]
+    if "blob_id" not in values or field not in values:
+        return None
+    return 0 if values["blob_id"] else values[field] or 0
+
+
+def _storage_tenant_id(instance):
+    tenant_id = instance.__dict__.get("tenant_id")
+    if tenant_id is None and instance.__dict__.get("property_id"):
+        tenant_id = (
+            Property.objects.filter(pk=instance.property_id)
+            .values_list("tenant_id", flat=True)
+            .first()
+        )
+    return tenant_id
+
+
+def _remember_size(sender, instance, **kwargs):
+    instance._loaded_size = _unblobbed_size(sender, instance)
+
+
+def _track_size_change(sender, instance, created, **kwargs):
+    old_size = 0 if created else getattr(instance, "_loaded_size", None)
+    new_size = _unblobbed_size(sender, instance)
+    instance._loaded_size = new_size
+    if None not in (old_size, new_size) and old_size != new_size:
+        adjust_usage(_storage_tenant_id(instance), storage_bytes=new_size - old_size)
+
+
+def _release_size(sender, instance, **kwargs):
+    size = getattr(instance, "_loaded_size", None)
+    if size:
+        adjust_usage(_storage_tenant_id(instance), storage_bytes=-size)
+
+
+post_save.connect(_create_usage_row, sender=Tenant)
+post_save.connect(_count_property, sender=Property)
+post_delete.connect(_uncount_property, sender=Property)
+post_init.connect(_remember_active, sender=UserProfile)
+post_save.connect(_track_active_change, sender=UserProfile)
+post_delete.connect(_uncount_active, sender=UserProfile)
+for _model in UNBLOBBED_SIZE_FIELDS:
+    post_init.connect(_remember_size, sender=_model)
+    post_save.connect(_track_size_change, sender=_model)
+    post_delete.connect(_release_size, sender=_model)
+
+
+# Cached billing accounts: plan/status changes (Stripe webhooks) take effect at once
+def _invalidate_billing(sender, instance, **kwargs):
+    tenant_id = instance.__dict__.get("tenant_id")
+    billing_cache.invalidate(tenant_id)
+    transaction.on_commit(lambda: billing_cache.invalidate(tenant_id))
+
+
+post_save.connect(_invalidate_billing, sender=BillingAccount)
+post_delete.connect(_invalidate_billing, sender=BillingAccount)
+
+
+# Identity cache (users/tenants resolved from tokens): drop changed entries
+def _invalidate_user(sender, instance, **kwargs):
+    user_id = instance.pk if sender is User else instance.__dict__.get("user_id")
+    identity_cache.invalidate_user(user_id)
+    transaction.on_commit(lambda: identity_cache.invalidate_user(user_id))
+
+
+def _invalidate_tenant(sender, instance, **kwargs):
+    identity_cache.invalidate_tenant(instance.pk)
+    transaction.on_commit(lambda: identity_cache.invalidate_tenant(instance.pk))
+
+
+# TenantUser covers role, scope and membership changes
+for _model in (User, TenantUser):
+    post_save.connect(_invalidate_user, sender=_model)
+    post_delete.connect(_invalidate_user, sender=_model)
+post_save.connect(_invalidate_tenant, sender=Tenant)
+post_delete.connect(_invalidate_tenant, sender=Tenant)
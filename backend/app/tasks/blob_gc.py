@@ -0,0 +1,50 @@
+"""
+Blob Garbage Collection Task
+
+Deletes stored blobs that are no longer referenced by any document,
+document version, property image/document or message attachment.
+Should be scheduled every 15-30 minutes via celery beat.
+"""
+
+import logging
+import asyncio
+from typing import Dict, Any
+
+from app.services.blob_store import collect_garbage
+
+logger = logging.getLogger(__name__)
+
+# Celery availability check
+try:
+    from celery import shared_task
+
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+    def shared_task(func=None, **kwargs):
+        def decorator(f):
+            return f
+
+        if func:
+            return decorator(func)
+        return decorator
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=300)
+def collect_blob_garbage_task(self, batch_size: int = 500) -> Dict[str, Any]:
+    """
+    Celery task: purge unreferenced blobs in batches until none are left.
+    """
+    totals = {"deleted": 0, "bytes_freed": 0, "errors": 0}
+
+    async def run_gc():
+        while True:
+            stats = await collect_garbage(batch_size=batch_size)
+            for key in totals:
+                totals[key] += stats[key]
+            # Stop when a full batch only held blobs that failed to delete
+            if stats["candidates"] < batch_size or not stats["deleted"]:
+                return totals
+
+    return asyncio.run(run_gc())
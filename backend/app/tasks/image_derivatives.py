@@ -0,0 +1,85 @@
+"""
+Image Derivatives Task
+
+Backfills thumbnails and size variants for property images that have none,
+e.g. images uploaded before the image pipeline existed or while Pillow was
+unavailable. New uploads are processed right after the upload request.
+"""
+
+import logging
+import asyncio
+from typing import Dict, Any
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from app.db.models import PropertyImage
+from app.services.image_pipeline import ImagePipeline
+
+logger = logging.getLogger(__name__)
+
+# Celery availability check
+try:
+    from celery import shared_task
+
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+    def shared_task(func=None, **kwargs):
+        def decorator(f):
+            return f
+
+        if func:
+            return decorator(func)
+        return decorator
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=300)
+def backfill_image_derivatives_task(self, batch_size: int = 100) -> Dict[str, Any]:
+    """
+    Celery task: generate variants for all images without variants.
+    """
+    totals = {"processed": 0, "reused": 0, "skipped": 0, "errors": 0}
+
+    def next_batch(after):
+        # Keyset pagination on (uploaded_at, id): images that fail or are
+        # skipped keep variants=[] and must not be fetched again. Rows without
+        # uploaded_at come first, keyed by id alone.
+        pending = PropertyImage.objects.filter(variants=[])
+        if after is None or after[0] is None:
+            undated = pending.filter(uploaded_at__isnull=True)
+            if after is not None:
+                undated = undated.filter(id__gt=after[1])
+            batch = list(
+                undated.order_by("id").values_list("uploaded_at", "id")[:batch_size]
+            )
+            if batch:
+                return batch
+            after = None
+
+        dated = pending.filter(uploaded_at__isnull=False)
+        if after is not None:
+            dated = dated.filter(
+                Q(uploaded_at__gt=after[0]) | Q(uploaded_at=after[0], id__gt=after[1])
+            )
+        return list(
+            dated.order_by("uploaded_at", "id").values_list("uploaded_at", "id")[
+                :batch_size
+            ]
+        )
+
+    async def run_backfill():
+        pipeline = ImagePipeline()
+        after = None
+        while True:
+            batch = await sync_to_async(next_batch)(after)
+            if not batch:
+                return totals
+
+            after = batch[-1]
+            stats = await pipeline.process_images([str(i) for _, i in batch])
+            for key in totals:
+                totals[key] += stats[key]
+            logger.info(f"Image derivative backfill progress: {totals}")
+
+    return asyncio.run(run_backfill())
@@ -6,22 +6,23 @@ Runs every hour to keep metrics up-to-date.
 """
 
 import os
+import time
+import uuid
 import logging
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from collections import deque
+from datetime import timedelta
+from typing import List, Dict, Any, Optional, Tuple
 from asgiref.sync import sync_to_async
+from django.db.models import F
+from django.utils import timezone
 
-from app.db.models import (
-    Property,
-    PublishJob,
-    PropertyMetrics,
-    PropertyMetricsSnapshot,
-    Tenant,
-)
+from app.db.models import Property, PublishJob, Tenant
 from app.services.immoscout_service import ImmoScout24Service
 from app.services.immowelt_service import ImmoweltService
-from app.core.errors import ExternalServiceError
+from app.services.metrics_series import PortalMetrics, store_portal_metrics
+from app.services.rate_limit_manager import RateLimitManager
+from app.core.errors import ExternalServiceError, RateLimitError
 
 logger = logging.getLogger(__name__)
 
@@ -43,66 +44,200 @@ except ImportError:
         return decorator
 
 
+SYNCED_PORTALS = ("immoscout24", "immowelt")
+EMPTY_METRICS = {"views": 0, "inquiries": 0, "favorites": 0}
+
+# Properties per tenant synced at the same time
+SYNC_CONCURRENCY = int(os.getenv("METRICS_SYNC_CONCURRENCY", "16"))
+# Tenants of one shard synced at the same time
+TENANT_CONCURRENCY = int(os.getenv("METRICS_SYNC_TENANT_CONCURRENCY", "4"))
+# Properties synced more recently than this are skipped
+MIN_SYNC_INTERVAL = timedelta(
+    minutes=int(os.getenv("METRICS_SYNC_MIN_INTERVAL_MINUTES", "45"))
+)
+# Synced properties stored per batch
+WRITE_BATCH_SIZE = 200
+# Time budget of one run, inside the hourly schedule
+RUN_BUDGET_SECONDS = float(os.getenv("METRICS_SYNC_RUN_SECONDS", "3300"))
+
+
+def tenant_in_shard(tenant_id, shard: int, shard_count: int) -> bool:
+    """Stable tenant → shard assignment, so several workers can split a run"""
+    return uuid.UUID(str(tenant_id)).int % shard_count == shard
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    """p50/p95/max of per-property sync latencies in milliseconds"""
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+    return {
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
 class PropertyMetricsSync:
     """
     Handles synchronization of property metrics from real estate portals.
 
     Features:
     - Fetches metrics from ImmoScout24 and Immowelt APIs
-    - Updates PropertyMetrics table with aggregated data
-    - Creates daily snapshots for historical charts
+    - Bounded pool of concurrent property syncs, portals fetched in parallel
+    - Per-portal, per-tenant token buckets (RateLimitManager)
+    - Skips properties synced within MIN_SYNC_INTERVAL, stalest first
+    - Updates PropertyMetrics and the daily snapshot series in batches
     - Handles API errors gracefully
     """
 
-    def __init__(self):
+    def __init__(self, concurrency: int = SYNC_CONCURRENCY):
         self.immoscout_service = ImmoScout24Service()
         self.immowelt_service = ImmoweltService()
-        self.sync_stats = {
+        self.rate_limiter = RateLimitManager()
+        self.concurrency = max(1, concurrency)
+        self.sync_stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {
             "total_properties": 0,
             "synced": 0,
+            "skipped_recent": 0,
+            "deferred": 0,
             "errors": 0,
             "immoscout_synced": 0,
             "immowelt_synced": 0,
         }
 
-    async def sync_all_tenant_metrics(self, tenant_id: str) -> Dict[str, Any]:
+    async def sync_all_tenant_metrics(
+        self,
+        tenant_id: str,
+        min_interval: Optional[timedelta] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
         """
-        Sync metrics for all published properties of a tenant.
+        Sync metrics for all published properties of a tenant that are due.
+
+        Properties still pending when `deadline` (time.monotonic()) passes or
+        the portal budget runs out are counted as deferred; they are the
+        stalest ones in the next run.
         """
         logger.info(f"Starting metrics sync for tenant {tenant_id}")
+        started = time.monotonic()
+        latencies: List[float] = []
+
+        stats = await self._sync_tenant(
+            tenant_id,
+            min_interval or MIN_SYNC_INTERVAL,
+            deadline or started + RUN_BUDGET_SECONDS,
+            latencies,
+        )
+        duration = time.monotonic() - started
+        stats["duration_seconds"] = round(duration, 2)
+        stats["properties_per_second"] = round(stats["synced"] / duration, 2) if duration else 0.0
+        stats["latency"] = latency_stats(latencies)
 
-        self.sync_stats = {
-            "total_properties": 0,
-            "synced": 0,
-            "errors": 0,
-            "immoscout_synced": 0,
-            "immowelt_synced": 0,
-        }
-
-        # Get all properties with published jobs
-        @sync_to_async
-        def get_published_properties():
-            return list(
-                Property.objects.filter(tenant_id=tenant_id)
-                .prefetch_related("publish_jobs")
-                .distinct()
-            )
-
-        properties = await get_published_properties()
-        self.sync_stats["total_properties"] = len(properties)
+        self.sync_stats = stats
+        logger.info(f"Metrics sync completed: {stats}")
+        return stats
 
-        for property_obj in properties:
+    async def _sync_tenant(
+        self,
+        tenant_id: str,
+        min_interval: timedelta,
+        deadline: float,
+        latencies: List[float],
+    ) -> Dict[str, Any]:
+        stats = self._new_stats()
+        due, skipped = await self._load_due_properties(tenant_id, min_interval)
+        stats["total_properties"] = len(due) + skipped
+        stats["skipped_recent"] = skipped
+
+        pending = deque(due)
+        writes: List[PortalMetrics] = []
+
+        async def flush():
+            batch = writes[:]
+            writes.clear()
+            if not batch:
+                return
             try:
-                await self.sync_property_metrics(property_obj, tenant_id)
-                self.sync_stats["synced"] += 1
+                await self._store_metrics(batch)
+                stats["synced"] += len(batch)
             except Exception as e:
-                logger.error(
-                    f"Error syncing metrics for property {property_obj.id}: {e}"
-                )
-                self.sync_stats["errors"] += 1
+                logger.error(f"Error storing metrics of {len(batch)} properties: {e}")
+                stats["errors"] += len(batch)
+
+        async def worker():
+            while pending and time.monotonic() < deadline:
+                property_id, jobs = pending.popleft()
+                begun = time.monotonic()
+                try:
+                    done = await self._sync_property(
+                        property_id, jobs, tenant_id, stats, deadline, writes
+                    )
+                except Exception as e:
+                    logger.error(f"Error syncing metrics for property {property_id}: {e}")
+                    stats["errors"] += 1
+                    continue
+                if not done:
+                    # Portal budget exhausted for this run
+                    stats["deferred"] += 1
+                    pending.clear()
+                    return
+                latencies.append(time.monotonic() - begun)
+                if len(writes) >= WRITE_BATCH_SIZE:
+                    await flush()
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.concurrency, len(due))))
+        )
+        await flush()
+        stats["deferred"] += len(pending)
+        return stats
 
-        logger.info(f"Metrics sync completed: {self.sync_stats}")
-        return self.sync_stats
+    @sync_to_async
+    def _load_due_properties(
+        self, tenant_id: str, min_interval: timedelta
+    ) -> Tuple[List[Tuple[Any, List[Tuple[str, str]]]], int]:
+        """
+        Published portal jobs grouped by property, never/least recently synced
+        first, in one query. Returns (due, number of recently synced properties).
+        """
+        cutoff = timezone.now() - min_interval
+        rows = (
+            PublishJob.objects.filter(
+                property__tenant_id=tenant_id,
+                status="published",
+                portal__in=SYNCED_PORTALS,
+                portal_property_id__isnull=False,
+            )
+            .exclude(portal_property_id="")
+            .order_by(
+                F("property__metrics__last_synced_at").asc(nulls_first=True),
+                "property_id",
+            )
+            .values_list(
+                "property_id",
+                "portal",
+                "portal_property_id",
+                "property__metrics__last_synced_at",
+            )
+        )
+
+        due: Dict[Any, List[Tuple[str, str]]] = {}
+        recent = set()
+        for property_id, portal, portal_property_id, last_synced_at in rows:
+            if last_synced_at and last_synced_at >= cutoff:
+                recent.add(property_id)
+                continue
+            due.setdefault(property_id, []).append((portal, portal_property_id))
+        return list(due.items()), len(recent)
 
     async def sync_property_metrics(self, property_obj: Property, tenant_id: str):
         """
@@ -116,8 +251,9 @@ class PropertyMetricsSync:
                 PublishJob.objects.filter(
                     property=property_obj,
                     status="published",
+                    portal__in=SYNCED_PORTALS,
                     portal_property_id__isnull=False,
-                )
+                ).values_list("portal", "portal_property_id")
             )
 
         jobs = await get_publish_jobs()
@@ -126,119 +262,109 @@ class PropertyMetricsSync:
             logger.debug(f"No published jobs for property {property_obj.id}")
             return
 
-        # Initialize metrics
-        immoscout_metrics = {"views": 0, "inquiries": 0, "favorites": 0}
-        immowelt_metrics = {"views": 0, "inquiries": 0, "favorites": 0}
+        stats = self._new_stats()
+        if not await self._sync_property(property_obj.id, jobs, tenant_id, stats):
+            raise RateLimitError("Portal rate limit exceeded")
 
-        # Fetch from each portal
-        for job in jobs:
-            try:
-                if job.portal == "immoscout24":
-                    metrics = await self._fetch_immoscout_metrics(
-                        job.portal_property_id, tenant_id
-                    )
-                    if metrics:
-                        immoscout_metrics = metrics
-                        self.sync_stats["immoscout_synced"] += 1
+    async def _sync_property(
+        self,
+        property_id,
+        jobs: List[Tuple[str, str]],
+        tenant_id: str,
+        stats: Dict[str, Any],
+        deadline: Optional[float] = None,
+        writes: Optional[List[PortalMetrics]] = None,
+    ) -> bool:
+        """
+        Fetch all portals of one property in parallel; the result is queued
+        on `writes` for a batched store, or stored right away without it.
+        Returns False if no portal token frees up before the deadline, or if
+        no portal returned metrics and one rejected the call as rate limited.
 
-                elif job.portal == "immowelt":
-                    metrics = await self._fetch_immowelt_metrics(
-                        job.portal_property_id, tenant_id
-                    )
-                    if metrics:
-                        immowelt_metrics = metrics
-                        self.sync_stats["immowelt_synced"] += 1
+        The token taken here pays for the portal call, so the services are
+        called without taking a second one.
+        """
+        for portal, _ in jobs:
+            timeout = 60.0 if deadline is None else max(0.0, deadline - time.monotonic())
+            if not await self.rate_limiter.acquire(portal, tenant_id, timeout):
+                return False
+
+        fetchers = {
+            "immoscout24": self._fetch_immoscout_metrics,
+            "immowelt": self._fetch_immowelt_metrics,
+        }
+        results = await asyncio.gather(
+            *(
+                fetchers[portal](portal_property_id, tenant_id)
+                for portal, portal_property_id in jobs
+            ),
+            return_exceptions=True,
+        )
 
-            except Exception as e:
-                logger.warning(
-                    f"Error fetching {job.portal} metrics for {job.portal_property_id}: {e}"
+        # Portals without a listing count as zero; failed fetches (timeouts
+        # included) keep the stored values and are counted as errors
+        portal_metrics = {portal: dict(EMPTY_METRICS) for portal in SYNCED_PORTALS}
+        failed = []
+        for (portal, portal_property_id), metrics in zip(jobs, results):
+            if isinstance(metrics, BaseException):
+                logger.error(
+                    f"{portal} metrics fetch failed for property {property_id}: {metrics!r}"
                 )
+                failed.append(metrics)
+                portal_metrics[portal] = None
+                continue
+            portal_metrics[portal] = metrics
+            if portal == "immoscout24":
+                stats["immoscout_synced"] += 1
+            else:
+                stats["immowelt_synced"] += 1
+
+        if len(failed) == len(jobs):
+            if any(isinstance(error, RateLimitError) for error in failed):
+                # Portal quota used up before ours: defer like a missing token
+                return False
+            raise ExternalServiceError("No portal returned metrics")
+        stats["errors"] += len(failed)
+
+        entry = (property_id, portal_metrics["immoscout24"], portal_metrics["immowelt"])
+        if writes is None:
+            await self._store_metrics([entry])
+        else:
+            writes.append(entry)
+        return True
 
-        # Update database
-        await self._update_property_metrics(
-            property_obj.id, immoscout_metrics, immowelt_metrics
-        )
+    @sync_to_async
+    def _store_metrics(self, entries: List[PortalMetrics]):
+        """Update PropertyMetrics and the daily snapshot series in one batch"""
+        store_portal_metrics(entries)
 
     async def _fetch_immoscout_metrics(
         self, portal_property_id: str, tenant_id: str
     ) -> Dict[str, int]:
-        """Fetch metrics from ImmoScout24 API"""
-        try:
-            result = await self.immoscout_service.get_property_metrics(
-                portal_property_id, tenant_id
-            )
-            return {
-                "views": result.get("views", 0),
-                "inquiries": result.get("inquiries", 0),
-                "favorites": result.get("favorites", 0),
-            }
-        except Exception as e:
-            logger.error(f"ImmoScout24 metrics fetch failed: {e}")
-            return None
+        """Fetch metrics from ImmoScout24 API; errors propagate to the caller"""
+        result = await self.immoscout_service.get_property_metrics(
+            portal_property_id, tenant_id
+        )
+        return {
+            "views": result.get("views", 0),
+            "inquiries": result.get("inquiries", 0),
+            "favorites": result.get("favorites", 0),
+        }
 
     async def _fetch_immowelt_metrics(
         self, portal_property_id: str, tenant_id: str
     ) -> Dict[str, int]:
-        """Fetch metrics from Immowelt API"""
-        try:
-            result = await self.immowelt_service.get_property_metrics(
-                portal_property_id, tenant_id
-            )
-            return {
-                "views": result.get("views", 0),
-                "inquiries": result.get("inquiries", 0),
-                "favorites": result.get("favorites", 0),
-            }
-        except Exception as e:
-            logger.error(f"Immowelt metrics fetch failed: {e}")
-            return None
-
-    @sync_to_async
-    def _update_property_metrics(
-        self,
-        property_id: str,
-        immoscout_metrics: Dict[str, int],
-        immowelt_metrics: Dict[str, int],
-    ):
-        """Update PropertyMetrics and create daily snapshot"""
-        # Get or create metrics record
-        metrics, created = PropertyMetrics.objects.get_or_create(
-            property_id=property_id
-        )
-
-        # Update portal-specific metrics
-        metrics.immoscout_views = immoscout_metrics["views"]
-        metrics.immoscout_inquiries = immoscout_metrics["inquiries"]
-        metrics.immoscout_favorites = immoscout_metrics["favorites"]
-
-        metrics.immowelt_views = immowelt_metrics["views"]
-        metrics.immowelt_inquiries = immowelt_metrics["inquiries"]
-        metrics.immowelt_favorites = immowelt_metrics["favorites"]
-
-        metrics.last_synced_at = datetime.now()
-        metrics.save()  # This triggers calculate_totals()
-
-        # Create/update today's snapshot
-        today = datetime.now().date()
-        PropertyMetricsSnapshot.objects.update_or_create(
-            property_id=property_id,
-            date=today,
-            defaults={
-                "views": metrics.total_views,
-                "inquiries": metrics.total_inquiries,
-                "favorites": metrics.total_favorites,
-                "clicks": metrics.total_clicks,
-                "visits": metrics.total_visits,
-                "immoscout_views": metrics.immoscout_views,
-                "immoscout_inquiries": metrics.immoscout_inquiries,
-                "immowelt_views": metrics.immowelt_views,
-                "immowelt_inquiries": metrics.immowelt_inquiries,
-            },
-        )
-
-        logger.debug(
-            f"Updated metrics for property {property_id}: views={metrics.total_views}, inquiries={metrics.total_inquiries}"
+        """Fetch metrics from Immowelt API; errors propagate to the caller"""
+        result = await self.immowelt_service.get_property_metrics(
+            portal_property_id, tenant_id, rate_limit=False
         )
+        if result.get("error"):
+            raise ExternalServiceError(result["error"])
+        return {
+            "views": result.get("views", 0),
+            "inquiries": result.get("inquiries", 0),
+            "favorites": result.get("favorites", 0),
+        }
 
 
 # Celery Tasks
@@ -251,37 +377,69 @@ class PropertyMetricsSync:
     autoretry_for=(Exception,),
     retry_backoff=True,
 )
-def sync_all_metrics_task(self):
+def sync_all_metrics_task(self, shard: int = 0, shard_count: int = 1):
     """
     Celery task to sync metrics for all tenants.
     Scheduled to run every hour.
+
+    With shard_count > 1, schedule one task per shard (0..shard_count-1);
+    each syncs only its share of the tenants.
     """
 
     async def run_sync():
         syncer = PropertyMetricsSync()
+        started = time.monotonic()
+        deadline = started + RUN_BUDGET_SECONDS
+        latencies: List[float] = []
 
-        # Get all active tenants
+        # Get all active tenants of this shard
         @sync_to_async
         def get_active_tenants():
-            return list(Tenant.objects.filter(is_active=True))
+            return [
+                tenant_id
+                for tenant_id in Tenant.objects.filter(is_active=True).values_list(
+                    "id", flat=True
+                )
+                if tenant_in_shard(tenant_id, shard, shard_count)
+            ]
 
-        tenants = await get_active_tenants()
+        tenant_ids = await get_active_tenants()
         total_stats = {
+            "shard": shard,
+            "shard_count": shard_count,
             "tenants_processed": 0,
             "total_synced": 0,
+            "total_skipped_recent": 0,
+            "total_deferred": 0,
             "total_errors": 0,
         }
+        semaphore = asyncio.Semaphore(TENANT_CONCURRENCY)
 
-        for tenant in tenants:
-            try:
-                stats = await syncer.sync_all_tenant_metrics(str(tenant.id))
+        async def sync_tenant(tenant_id):
+            async with semaphore:
+                try:
+                    stats = await syncer._sync_tenant(
+                        str(tenant_id), MIN_SYNC_INTERVAL, deadline, latencies
+                    )
+                except Exception as e:
+                    logger.error(f"Error syncing metrics for tenant {tenant_id}: {e}")
+                    total_stats["total_errors"] += 1
+                    return
                 total_stats["tenants_processed"] += 1
                 total_stats["total_synced"] += stats["synced"]
+                total_stats["total_skipped_recent"] += stats["skipped_recent"]
+                total_stats["total_deferred"] += stats["deferred"]
                 total_stats["total_errors"] += stats["errors"]
-            except Exception as e:
-                logger.error(f"Error syncing metrics for tenant {tenant.id}: {e}")
-                total_stats["total_errors"] += 1
 
+        await asyncio.gather(*(sync_tenant(tenant_id) for tenant_id in tenant_ids))
+
+        duration = time.monotonic() - started
+        total_stats["duration_seconds"] = round(duration, 2)
+        total_stats["properties_per_second"] = (
+            round(total_stats["total_synced"] / duration, 2) if duration else 0.0
+        )
+        total_stats["latency"] = latency_stats(latencies)
+        logger.info(f"Metrics sync run completed: {total_stats}")
         return total_stats
 
     return asyncio.run(run_sync())
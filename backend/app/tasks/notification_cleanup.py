@@ -0,0 +1,39 @@
+"""
+Notification Cleanup Task
+
+Purges expired notifications and read notifications past the retention
+period in batches. Should be scheduled daily via celery beat.
+"""
+
+import logging
+from typing import Dict, Any
+
+from app.services.notification_engine import purge_notifications
+
+logger = logging.getLogger(__name__)
+
+# Celery availability check
+try:
+    from celery import shared_task
+
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+    def shared_task(func=None, **kwargs):
+        def decorator(f):
+            return f
+
+        if func:
+            return decorator(func)
+        return decorator
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=600)
+def purge_notifications_task(self, batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Celery task: batched purge of expired and old read notifications.
+    """
+    stats = purge_notifications(batch_size=batch_size)
+    logger.info(f"Notification purge finished: {stats}")
+    return stats
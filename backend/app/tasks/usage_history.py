@@ -0,0 +1,41 @@
+"""
+Usage History Task
+
+Records the daily usage time-series from the usage ledger; only tenants
+whose usage changed since their last row get a new one.
+Should be scheduled daily via celery beat (late evening, so the row holds
+the day's closing value).
+"""
+
+import logging
+from typing import Dict, Any
+
+from app.services.usage_history import record_usage_history
+
+logger = logging.getLogger(__name__)
+
+# Celery availability check
+try:
+    from celery import shared_task
+
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+    def shared_task(func=None, **kwargs):
+        def decorator(f):
+            return f
+
+        if func:
+            return decorator(func)
+        return decorator
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=300)
+def record_usage_history_task(self) -> Dict[str, Any]:
+    """
+    Celery task: store today's usage of every tenant whose ledger changed.
+    """
+    stats = record_usage_history()
+    logger.info(f"Usage history recorded: {stats}")
+    return stats
@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks (run from backend/: python -m benchmarks.<name>)
+"""
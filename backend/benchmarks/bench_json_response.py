@@ -0,0 +1,178 @@
+"""
+Rendering a page of 100 PropertyResponse items: FastAPI's response_model
+path (model_dump, re-validation, jsonable_encoder, json.dumps) vs. the same
+path with orjson vs. ModelJSONResponse (pydantic-core, one pass)
+
+Each property carries an address, a contact, features and five images with
+three variants each, like the list endpoint with image variants.
+
+    python -m benchmarks.bench_json_response --items 100 --rounds 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.json_response import (
+    ORJSON_AVAILABLE,
+    CustomJSONResponse,
+    ModelJSONResponse,
+)
+from app.core.pagination import PaginatedResponse
+from app.schemas.common import PropertyType
+from app.schemas.properties import (
+    Address,
+    ContactPerson,
+    PropertyFeatures,
+    PropertyImage,
+    PropertyImageVariant,
+    PropertyResponse,
+)
+
+
+def make_property(i: int) -> PropertyResponse:
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+    images = [
+        PropertyImage(
+            id=f"img-{i}-{n}",
+            url=f"https://cdn.example.com/p/{i}/{n}.webp",
+            original_url=f"https://cdn.example.com/p/{i}/{n}.jpg",
+            thumbnail_url=f"https://cdn.example.com/p/{i}/{n}_thumb.webp",
+            variants=[
+                PropertyImageVariant(
+                    name=name,
+                    width=width,
+                    height=width * 2 // 3,
+                    format="webp",
+                    mime_type="image/webp",
+                    size=width * 90,
+                    url=f"https://cdn.example.com/p/{i}/{n}_{name}.webp",
+                )
+                for name, width in (("sm", 320), ("md", 960), ("lg", 1920))
+            ],
+            alt_text=f"Ansicht {n + 1}",
+            is_primary=n == 0,
+            order=n,
+            size=2_400_000,
+            mime_type="image/jpeg",
+            uploaded_at=created,
+            uploaded_by="user-1",
+        )
+        for n in range(5)
+    ]
+    return PropertyResponse(
+        id=f"prop-{i}",
+        title=f"Helle 3-Zimmer-Wohnung mit Balkon #{i}",
+        description="Großzügige Wohnung in ruhiger Lage, Südbalkon, Einbauküche, "
+        "Tiefgaragenstellplatz. " * 4,
+        status="aktiv",
+        property_type=PropertyType.APARTMENT,
+        price=389_000.0 + i * 1_000,
+        location="München, Schwabing",
+        living_area=86,
+        total_area=94,
+        rooms=3,
+        bedrooms=2,
+        bathrooms=1,
+        floors=1,
+        year_built=1998,
+        energy_class="B",
+        energy_consumption=72,
+        heating_type="Fernwärme",
+        coordinates_lat=48.1642 + i / 10_000,
+        coordinates_lng=11.5861,
+        amenities=["balcony", "elevator", "fitted_kitchen", "cellar"],
+        tags=["neu", "provisionsfrei"],
+        address=Address(
+            street="Leopoldstraße", house_number=str(i), city="München",
+            zip_code="80802", state="Bayern",
+        ),
+        contact_person=ContactPerson(
+            id="contact-1", name="Anna Berger", email="anna@example.com",
+            phone="+49 89 1234567", role="Makler",
+        ),
+        features=PropertyFeatures(
+            bedrooms=2, bathrooms=1, year_built=1998, energy_class="B",
+            heating_type="Fernwärme", parking_spaces=1, balcony=True, elevator=True,
+        ),
+        images=images,
+        created_at=created,
+        updated_at=created,
+        created_by="user-1",
+    )
+
+
+LOOP = asyncio.new_event_loop()
+
+
+def fastapi_path(field, page, response_class):
+    """What FastAPI does with a returned model and response_model set"""
+    content = LOOP.run_until_complete(
+        serialize_response(field=field, response_content=page, is_coroutine=True)
+    )
+    return response_class(content).body
+
+
+def measure(render, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        body = render()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, len(body)
+
+
+class StdlibJSONResponse(CustomJSONResponse):
+    """CustomJSONResponse as it rendered before (json.dumps and default hook)"""
+
+    def render(self, content):
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+            default=self.custom_json_encoder,
+        ).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    model = PaginatedResponse[PropertyResponse]
+    page = model.create(
+        items=[make_property(i) for i in range(args.items)],
+        total=args.items * 10,
+        page=1,
+        size=args.items,
+    )
+    field = create_response_field(name="Response_get_properties", type_=model)
+
+    modes = [("fastapi+json", lambda: fastapi_path(field, page, StdlibJSONResponse))]
+    if ORJSON_AVAILABLE:
+        modes.append(("fastapi+orjson", lambda: fastapi_path(field, page, CustomJSONResponse)))
+    modes.append(("model_dump_json", lambda: ModelJSONResponse(page).body))
+
+    # Same document on every path
+    reference = json.loads(modes[0][1]())
+    for label, render in modes[1:]:
+        assert json.loads(render()) == reference, label
+
+    print(f"{'path':<16} {'median ms':>10} {'bytes':>9} {'speedup':>8}")
+    baseline = None
+    for label, render in modes:
+        median_ms, size = measure(render, args.rounds)
+        baseline = baseline or median_ms
+        print(f"{label:<16} {median_ms:>10.2f} {size:>9} {baseline / median_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Lead scoring throughput: calculate_lead_score per contact vs. score_many
+(scores only, columnar inputs prepared up front)
+
+    python -m benchmarks.bench_lead_scoring --contacts 50000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.services.lead_scoring import NUMPY_AVAILABLE, LeadScoringService, activity_columns
+
+ACTIVITY_TYPES = ["email", "call", "meeting", "property_viewing", "task", "note"]
+
+
+def make_contacts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    contacts, activity_lists = [], []
+    for _ in range(count):
+        contacts.append({
+            "budget": rng.choice([None, rng.uniform(10_000, 1_500_000)]),
+            "category": rng.choice(["", "Käufer", "Investor", "Eigentümer", "Mieter"]),
+            "company": rng.choice([None, "Müller Immobilien GmbH"]),
+            "priority": rng.choice(["low", "medium", "high", "urgent"]),
+            "last_contact": rng.choice([None, now - timedelta(days=rng.randint(0, 200))]),
+        })
+        activity_lists.append([
+            {"type": rng.choice(ACTIVITY_TYPES), "status": rng.choice(["completed", "cancelled"])}
+            for _ in range(rng.randint(0, 20))
+        ])
+    return contacts, activity_lists
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contacts", type=int, default=50_000)
+    args = parser.parse_args()
+
+    service = LeadScoringService("benchmark")
+    contacts, activity_lists = make_contacts(args.contacts)
+
+    start = time.perf_counter()
+    for contact, activities in zip(contacts, activity_lists):
+        service.calculate_lead_score(contact, activities)
+    single = time.perf_counter() - start
+
+    columns = {
+        "budget": [c["budget"] for c in contacts],
+        "category": [c["category"] for c in contacts],
+        "company": [c["company"] for c in contacts],
+        "priority": [c["priority"] for c in contacts],
+        "last_contact": [c["last_contact"] for c in contacts],
+        **activity_columns(activity_lists),
+    }
+
+    start = time.perf_counter()
+    service.score_many(**columns)
+    batch = time.perf_counter() - start
+
+    print(f"contacts:             {args.contacts}")
+    print(f"numpy:                {'yes' if NUMPY_AVAILABLE else 'no (fallback)'}")
+    print(f"calculate_lead_score: {args.contacts / single:>12,.0f} contacts/s ({single:.2f}s)")
+    print(f"score_many:           {args.contacts / batch:>12,.0f} contacts/s ({batch:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Latency of an unrelated endpoint during a login storm: password hashing on
+the shared sync_to_async thread (before) vs. the bounded HashingPool
+
+Each "request" of the unrelated endpoint makes one short blocking call on
+the shared sync thread, like a thread-sensitive ORM query; each login
+hashes once with PBKDF2 at Django's default cost.
+
+    python -m benchmarks.bench_login_storm --logins 200 --requests 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.password_pool import HashingPool
+
+PBKDF2_ITERATIONS = 600_000  # django.contrib.auth.hashers.PBKDF2PasswordHasher (4.2)
+QUERY_SECONDS = 0.001
+
+
+def hash_password(password: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password, b"benchmark-salt", PBKDF2_ITERATIONS)
+
+
+def query() -> None:
+    time.sleep(QUERY_SECONDS)
+
+
+async def run(mode: str, logins: int, requests: int, concurrency: int, workers: int) -> dict:
+    loop = asyncio.get_running_loop()
+    sync_thread = ThreadPoolExecutor(max_workers=1)  # what thread_sensitive=True uses
+    pool = HashingPool(workers=workers, max_queue=0)
+    latencies = []
+
+    async def login(i: int):
+        if mode == "shared":
+            await loop.run_in_executor(sync_thread, hash_password, b"pw%d" % i)
+        else:
+            await pool.run(hash_password, b"pw%d" % i)
+
+    async def client(n: int):
+        for _ in range(n):
+            started = time.perf_counter()
+            await loop.run_in_executor(sync_thread, query)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.002)
+
+    started = time.perf_counter()
+    storm = asyncio.gather(*(login(i) for i in range(logins)))
+    await asyncio.gather(*(client(requests // concurrency) for _ in range(concurrency)))
+    await storm
+    elapsed = time.perf_counter() - started
+
+    sync_thread.shutdown()
+    pool.shutdown()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "logins_per_s": logins / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'logins/s':>9}")
+    for mode in ("idle", "shared", "pool"):
+        logins = 0 if mode == "idle" else args.logins
+        result = asyncio.run(
+            run(mode, logins, args.requests, args.concurrency, args.workers)
+        )
+        print(
+            f"{mode:<8} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+            f"{result['max_ms']:>9.2f} {result['logins_per_s']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold start of one API worker: wall time and peak RSS of `import app.main`,
+with the heavy SDKs loaded lazily (now) vs. imported up front (before),
+plus the slowest top-level packages from `python -X importtime`
+
+Every run is a fresh interpreter. --report keeps the raw importtime output
+of the last lazy run.
+
+    python -m benchmarks.bench_startup --runs 5 --report importtime.txt
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from app.core.lazy_import import HEAVY_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import importlib, json, resource, sys, time
+started = time.perf_counter()
+if {eager}:
+    for name in {modules!r}:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy": [name for name in {modules!r} if name in sys.modules],
+}}))
+"""
+
+
+def start_worker(eager: bool):
+    code = CHILD.format(eager=eager, modules=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_packages(importtime: str, top: int):
+    """Self time per top-level package in ms"""
+    totals = Counter()
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return [(name, us / 1000) for name, us in totals.most_common(top)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--report", type=Path, default=None)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'import s':>9} {'rss MB':>8} {'modules':>8}  heavy SDKs loaded")
+    importtime = ""
+    for mode in ("eager", "lazy"):
+        runs = []
+        for _ in range(args.runs):
+            stats, importtime = start_worker(eager=mode == "eager")
+            runs.append(stats)
+        print(
+            f"{mode:<6} {statistics.median(r['seconds'] for r in runs):>9.2f} "
+            f"{statistics.median(r['rss_mb'] for r in runs):>8.1f} "
+            f"{runs[-1]['modules']:>8}  {', '.join(runs[-1]['heavy']) or '-'}"
+        )
+
+    if args.report:
+        args.report.write_text(importtime)
+    print("\nslowest packages (lazy, self time):")
+    for name, ms in slowest_packages(importtime, args.top):
+        print(f"  {name:<28} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from app.core.billing_config import (
     PLAN_LIMITS, STRIPE_PRICE_MAP, get_plan_from_price_id,
     get_plan_limits, is_unlimited, get_next_plan, get_required_plan_for_limit
 )
-from app.core.billing_guard import BillingGuard
+from app.core.billing_guard import BillingGuard, claim_trial_expired_email
 from app.services.billing_service import BillingService
 from app.db.models import BillingAccount, Tenant, UserProfile, Property
 
@@ -160,6 +160,27 @@ class TestBillingGuard(TestCase):
         self.assertTrue(await BillingGuard.check_feature_access(str(self.tenant.id), 'reporting'))
 
 
+    def test_trial_expired_email_flag_keeps_webhook_changes(self):
+        """Nur meta wird geschrieben, Plan-Änderungen anderer Worker bleiben"""
+        BillingAccount.objects.filter(pk=self.billing_account.pk).update(status="trialing")
+        # Webhook in einem anderen Worker, nach dem Cachen des Accounts
+        BillingAccount.objects.filter(pk=self.billing_account.pk).update(plan_key="pro")
+
+        self.assertTrue(claim_trial_expired_email(self.billing_account.pk))
+        self.assertFalse(claim_trial_expired_email(self.billing_account.pk))
+
+        billing = BillingAccount.objects.get(pk=self.billing_account.pk)
+        self.assertEqual(billing.plan_key, "pro")
+        self.assertTrue(billing.meta["trial_expired_email_sent"])
+
+    def test_trial_expired_email_skipped_after_upgrade(self):
+        """Kein Flag und keine Email, wenn der Trial bereits in ein Abo überging"""
+        self.assertFalse(claim_trial_expired_email(self.billing_account.pk))
+
+        billing = BillingAccount.objects.get(pk=self.billing_account.pk)
+        self.assertEqual(billing.status, "active")
+        self.assertNotIn("trial_expired_email_sent", billing.meta or {})
+
 class TestBillingService(TestCase):
     """Tests für Billing Service"""
     
@@ -0,0 +1,181 @@
+"""
+Tests for request instrumentation (Server-Timing, Prometheus rendering)
+"""
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from app.core import instrumentation
+from app.core.instrumentation import (
+    UNROUTED,
+    Histogram,
+    InstrumentationMiddleware,
+    MetricsRegistry,
+    RequestMetrics,
+    stage,
+)
+from app.core.settings import Settings
+
+ROUTE = "/api/v1/properties/{property_id}"
+
+
+def endpoint(status=200, route=ROUTE, queries=1):
+    """ASGI app running `queries` DB queries inside an avm-geo stage"""
+
+    async def app(scope, receive, send):
+        with stage("avm geo"):
+            for _ in range(queries):
+                instrumentation._query_wrapper(lambda *args: None, "SELECT 1", None, False, {})
+        if route:
+            scope["route"] = types.SimpleNamespace(path=route, path_format=route)
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return app
+
+
+def call(middleware, path="/api/v1/properties/5"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    asyncio.run(middleware(scope, None, send))
+    return messages
+
+
+def header(message, name):
+    return dict(message["headers"]).get(name)
+
+
+class TestInstrumentationMiddleware:
+    """Server-Timing header and per-route histograms"""
+
+    def test_server_timing_off_by_default(self):
+        assert Settings.model_fields["SERVER_TIMING"].default is False
+
+    def test_no_header_when_disabled(self):
+        middleware = InstrumentationMiddleware(endpoint(), MetricsRegistry(), server_timing=False)
+
+        start = call(middleware)[0]
+
+        assert header(start, b"server-timing") is None
+
+    def test_server_timing_header(self):
+        middleware = InstrumentationMiddleware(
+            endpoint(queries=2), MetricsRegistry(), server_timing=True
+        )
+
+        start = call(middleware)[0]
+        value = header(start, b"server-timing").decode()
+
+        names = [part.split(";")[0] for part in value.split(", ")]
+        assert names == ["app", "db", "sync-wait", "sync", "avm-geo"]
+        assert 'desc="2 queries"' in value
+        assert 'desc="0 calls"' in value
+
+    def test_histograms_per_route(self):
+        registry = MetricsRegistry()
+        middleware = InstrumentationMiddleware(endpoint(queries=3), registry, server_timing=False)
+
+        call(middleware)
+        call(middleware, "/api/v1/properties/6")
+        text = registry.render()
+
+        labels = f'method="GET",route="{ROUTE}"'
+        assert f'http_request_duration_seconds_count{{{labels},status="200"}} 2' in text
+        assert f'http_request_db_queries_bucket{{{labels},le="2.0"}} 0' in text
+        assert f'http_request_db_queries_bucket{{{labels},le="5.0"}} 2' in text
+        assert f"http_request_db_queries_sum{{{labels}}} 6.0\n" in text
+        assert "/api/v1/properties/5" not in text
+
+    def test_unrouted(self):
+        registry = MetricsRegistry()
+        middleware = InstrumentationMiddleware(
+            endpoint(status=404, route=None), registry, server_timing=False
+        )
+
+        call(middleware, "/does-not-exist")
+
+        assert (
+            f'http_request_duration_seconds_count{{method="GET",route="{UNROUTED}",status="404"}} 1'
+            in registry.render()
+        )
+
+    def test_failed_request_counts_as_500(self):
+        registry = MetricsRegistry()
+
+        async def failing(scope, receive, send):
+            raise RuntimeError("boom")
+
+        middleware = InstrumentationMiddleware(failing, registry, server_timing=False)
+        with pytest.raises(RuntimeError):
+            call(middleware)
+
+        assert f'route="{UNROUTED}",status="500"}} 1' in registry.render()
+
+    def test_stage_outside_request(self):
+        with stage("idle"):
+            pass
+
+        assert instrumentation.current_metrics() is None
+
+
+class TestRequestMetrics:
+    def test_stages_accumulate(self):
+        metrics = RequestMetrics()
+        metrics.add_stage("llm", 0.25)
+        metrics.add_stage("llm", 0.25)
+        metrics.add_http(0.1)
+
+        value = metrics.server_timing()
+
+        assert "llm;dur=500.0" in value
+        assert 'http;dur=100.0;desc="1 calls"' in value
+
+
+class TestPrometheusRendering:
+    """Exposition text format"""
+
+    def test_histogram(self):
+        histogram = Histogram("demo_seconds", "Demo", ("route",), (0.1, 1.0))
+        histogram.observe(("/a",), 0.05)
+        histogram.observe(("/a",), 0.5)
+        histogram.observe(("/a",), 5.0)
+
+        assert histogram.render() == [
+            "# HELP demo_seconds Demo",
+            "# TYPE demo_seconds histogram",
+            'demo_seconds_bucket{route="/a",le="0.1"} 1',
+            'demo_seconds_bucket{route="/a",le="1.0"} 2',
+            'demo_seconds_bucket{route="/a",le="+Inf"} 3',
+            'demo_seconds_sum{route="/a"} 5.55',
+            'demo_seconds_count{route="/a"} 3',
+        ]
+
+    def test_bucket_bound_is_inclusive(self):
+        histogram = Histogram("demo", "Demo", ("route",), (1.0,))
+        histogram.observe(("/a",), 1.0)
+
+        assert 'demo_bucket{route="/a",le="1.0"} 1' in histogram.render()
+
+    def test_label_escaping(self):
+        histogram = Histogram("demo", "Demo", ("route",), (1.0,))
+        histogram.observe(('/a"b\\c\nd',), 0.5)
+
+        assert 'demo_count{route="/a\\"b\\\\c\\nd"} 1' in histogram.render()
+
+    def test_gauges(self):
+        stats = {"workers": 2, "avg_wait_ms": 1.5, "busy": True, "mode": "x"}
+
+        text = MetricsRegistry().render(gauges={"password_hash_pool": stats})
+
+        assert "# TYPE password_hash_pool_workers gauge\npassword_hash_pool_workers 2\n" in text
+        assert "password_hash_pool_avg_wait_ms 1.5\n" in text
+        assert "password_hash_pool_busy" not in text
+        assert "password_hash_pool_mode" not in text
+        assert text.endswith("\n")
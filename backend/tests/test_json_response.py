@@ -0,0 +1,86 @@
+"""
+Tests for ModelJSONResponse rendering through the app
+"""
+from datetime import datetime
+from typing import List, Optional
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field
+
+from app.core.json_response import ModelJSONResponse
+
+
+class Contact(BaseModel):
+    name: str
+    city: Optional[str] = None
+    last_contact: datetime
+    lead_score: int = Field(alias="leadScore")
+
+
+CONTACTS = [
+    Contact(
+        name="Jürgen Müller",
+        city="Köln",
+        last_contact=datetime(2026, 3, 1, 9, 30),
+        leadScore=72,
+    ),
+    Contact(
+        name="Zoë Weiß – Maklerin",
+        city="Düsseldorf",
+        last_contact=datetime(2026, 3, 2),
+        leadScore=15,
+    ),
+]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/contact", response_model=Contact)
+    def contact():
+        return ModelJSONResponse(CONTACTS[0])
+
+    @app.get("/contacts", response_model=List[Contact])
+    def contacts():
+        return ModelJSONResponse(CONTACTS)
+
+    return TestClient(app)
+
+
+class TestModelJSONResponse:
+    """Non-ASCII models are sent as UTF-8 bytes with a matching length"""
+
+    def test_render_returns_bytes(self):
+        body = ModelJSONResponse(CONTACTS[0]).body
+
+        assert isinstance(body, bytes)
+        assert "Jürgen Müller".encode("utf-8") in body
+
+    def test_model(self, client):
+        response = client.get("/contact")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert response.json() == {
+            "name": "Jürgen Müller",
+            "city": "Köln",
+            "last_contact": "2026-03-01T09:30:00",
+            "leadScore": 72,
+        }
+
+    def test_model_list(self, client):
+        response = client.get("/contacts")
+
+        assert response.status_code == 200
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert [item["name"] for item in response.json()] == [
+            "Jürgen Müller",
+            "Zoë Weiß – Maklerin",
+        ]
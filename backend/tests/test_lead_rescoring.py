@@ -0,0 +1,102 @@
+"""
+Tests for lead score dirty flags and batch rescoring
+"""
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from app.db.models import Contact, ContactActivity, Task, Tenant, User
+from app.services.contact_timeline import TASK_CONTACT_TAG
+from app.services.lead_rescoring import get_lead_score_sync, rescore_dirty_contacts
+
+
+class TestLeadRescoring(TestCase):
+    """Changes flag contacts; rescoring clears the flag and persists the score"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name="Test Tenant", slug="test-tenant", email="test@example.com"
+        )
+        self.user = User.objects.create_user(
+            email="agent@example.com", first_name="Test", last_name="Agent"
+        )
+        self.old_contact = self._contact("Alt")
+        self.new_contact = self._contact("Neu")
+        self.task = Task.objects.create(
+            tenant=self.tenant,
+            title="Exposé senden",
+            assignee=self.user,
+            created_by=self.user,
+            due_date=timezone.now() + timedelta(days=3),
+            tags=[TASK_CONTACT_TAG.format(self.old_contact.id)],
+        )
+        rescore_dirty_contacts()
+
+    def _contact(self, name):
+        return Contact.objects.create(
+            tenant=self.tenant,
+            name=name,
+            email=f"{name.lower()}@example.com",
+            phone="+49 30 123456",
+            last_contact=timezone.now() - timedelta(days=3),
+        )
+
+    def _dirty(self, contact):
+        return Contact.objects.values_list("lead_score_dirty", flat=True).get(pk=contact.pk)
+
+    def test_rescoring_clears_flags(self):
+        for contact in (self.old_contact, self.new_contact):
+            contact.refresh_from_db()
+            self.assertFalse(contact.lead_score_dirty)
+            self.assertEqual(contact.lead_score_details["score"], contact.lead_score)
+
+    def test_moving_tag_flags_old_and_new_contact(self):
+        self.task.tags.remove(TASK_CONTACT_TAG.format(self.old_contact.id))
+        self.task.tags.append(TASK_CONTACT_TAG.format(self.new_contact.id))
+        self.task.save()
+
+        self.assertTrue(self._dirty(self.old_contact))
+        self.assertTrue(self._dirty(self.new_contact))
+
+        self.assertEqual(rescore_dirty_contacts(), 2)
+        self.assertFalse(self._dirty(self.old_contact))
+        self.assertFalse(self._dirty(self.new_contact))
+
+    def test_removing_tag_without_link_flags_contact(self):
+        # Link and timeline row lost (e.g. written before the timeline existed)
+        self.task.contacts.clear()
+        ContactActivity.objects.filter(source="task", source_id=self.task.id).delete()
+        self.task.tags = []
+        self.task.save()
+
+        self.assertTrue(self._dirty(self.old_contact))
+
+    def test_recency_signal_is_current_on_read(self):
+        Contact.objects.filter(pk=self.old_contact.pk).update(
+            last_contact=timezone.now() - timedelta(days=5)
+        )
+
+        details = get_lead_score_sync(self.tenant.id, self.old_contact.id)
+
+        values = [signal["value"] for signal in details["signals"]]
+        self.assertIn("vor 5 Tagen", values)
+        self.assertNotIn("vor 3 Tagen", values)
+
+    def test_details_rebuilt_when_score_unchanged(self):
+        self.old_contact.budget = 600000
+        self.old_contact.save()
+        rescore_dirty_contacts()
+        self.old_contact.refresh_from_db()
+        score = self.old_contact.lead_score
+
+        # Same budget bracket: same score, new signal value
+        self.old_contact.budget = 700000
+        self.old_contact.save()
+        rescore_dirty_contacts()
+
+        self.old_contact.refresh_from_db()
+        self.assertEqual(self.old_contact.lead_score, score)
+        values = [signal["value"] for signal in self.old_contact.lead_score_details["signals"]]
+        self.assertIn("€700,000", values)
+        self.assertNotIn("€600,000", values)
@@ -0,0 +1,132 @@
+"""
+Tests for batch lead scoring (score_many vs. calculate_lead_score)
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.services import lead_scoring
+from app.services.lead_scoring import LeadScoringService, activity_columns
+
+ACTIVITY_TYPES = ["email", "call", "meeting", "property_viewing", "task", "note", None, ""]
+ACTIVITY_STATUSES = ["completed", "cancelled", "scheduled", "confirmed"]
+
+
+def random_contact(rng: random.Random, now: datetime) -> dict:
+    """Random contact covering bracket edges, empty values and date formats"""
+    budget = rng.choice([
+        None,
+        0,
+        -1000.0,
+        Decimal("49999.99"),
+        50000,
+        Decimal("150000.00"),
+        500000.0,
+        Decimal(f"{rng.randint(1, 2_000_000)}.{rng.randint(0, 99):02d}"),
+    ])
+
+    offset = timedelta(days=rng.randint(-5, 400), hours=rng.randint(1, 22))
+    last_contact = rng.choice([
+        None,
+        "",
+        "not-a-date",
+        now - offset,
+        (now - offset).replace(tzinfo=timezone.utc),
+        (now - offset).isoformat() + "Z",
+    ])
+
+    return {
+        "budget": budget,
+        "category": rng.choice(
+            [None, "", "Käufer", "Investor", "EIGENTÜMER", "Bauträger (Developer)", "privat"]
+        ),
+        "company": rng.choice([None, "", "ABC", "ABCD", "Müller Immobilien GmbH"]),
+        "priority": rng.choice([None, "low", "medium", "high", "urgent"]),
+        "last_contact": last_contact,
+    }
+
+
+def random_activities(rng: random.Random) -> list:
+    return [
+        {"type": rng.choice(ACTIVITY_TYPES), "status": rng.choice(ACTIVITY_STATUSES)}
+        for _ in range(rng.choice([0, 0, 1, 2, 3, 5, 8, 15]))
+    ]
+
+
+def score_both(service: LeadScoringService, contacts: list, activity_lists: list, now: datetime):
+    expected = [
+        service.calculate_lead_score(
+            {**contact, "category": contact["category"] or ""}, activities
+        )
+        for contact, activities in zip(contacts, activity_lists)
+    ]
+    actual = service.score_many(
+        budget=[c["budget"] for c in contacts],
+        category=[c["category"] for c in contacts],
+        company=[c["company"] for c in contacts],
+        priority=[c["priority"] for c in contacts],
+        last_contact=[c["last_contact"] for c in contacts],
+        now=now,
+        **activity_columns(activity_lists),
+    )
+    keys = ("score", "category", "category_label")
+    return [{key: result[key] for key in keys} for result in expected], actual
+
+
+@pytest.fixture
+def service():
+    return LeadScoringService(tenant_id="test-tenant")
+
+
+class TestScoreMany:
+    """score_many must match calculate_lead_score for any input"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_single_scoring(self, service, seed):
+        pytest.importorskip("numpy")
+        rng = random.Random(seed)
+        now = datetime.utcnow()
+        contacts = [random_contact(rng, now) for _ in range(200)]
+        activity_lists = [random_activities(rng) for _ in contacts]
+
+        expected, actual = score_both(service, contacts, activity_lists, now)
+
+        for index, (want, got) in enumerate(zip(expected, actual)):
+            assert got == want, f"seed {seed}, contact {index}: {contacts[index]}"
+
+    def test_fallback_without_numpy(self, service, monkeypatch):
+        monkeypatch.setattr(lead_scoring, "NUMPY_AVAILABLE", False)
+        rng = random.Random(42)
+        now = datetime.utcnow()
+        contacts = [random_contact(rng, now) for _ in range(100)]
+        activity_lists = [random_activities(rng) for _ in contacts]
+
+        expected, actual = score_both(service, contacts, activity_lists, now)
+
+        assert actual == expected
+
+    def test_empty_batch(self, service):
+        assert service.score_many([], [], [], [], []) == []
+
+
+class TestCurrentRecency:
+    """Stored details get today's day count for the last contact"""
+
+    def test_recency_value_recomputed(self, service):
+        now = datetime.utcnow()
+        details = service.calculate_lead_score(
+            {"category": "Investor", "last_contact": now - timedelta(days=3, hours=1)},
+            [{"type": "call", "status": "completed"}],
+        )
+
+        current = service.with_current_recency(details, now - timedelta(days=12, hours=1))
+
+        assert "vor 12 Tagen" in [signal["value"] for signal in current["signals"]]
+        assert "vor 3 Tagen" in [signal["value"] for signal in details["signals"]]
+        assert current["score"] == details["score"]
+
+    def test_without_last_contact(self, service):
+        details = service.calculate_lead_score({"category": "Investor"}, [])
+        assert service.with_current_recency(details, None) is details
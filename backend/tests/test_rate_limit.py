@@ -0,0 +1,324 @@
+"""
+Tests for the GCRA rate limit backends (in-memory and Redis)
+"""
+import os
+import uuid
+
+import pytest
+
+from app.core.rate_limit_backends import (
+    KEY_PREFIX,
+    REDIS_AVAILABLE,
+    MemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    gcra_result,
+)
+
+LIMIT = 5
+WINDOW = 10  # one request per 2 seconds on average
+
+
+class FakeClock:
+    """Monotonic clock the tests advance by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def backend(clock):
+    return MemoryRateLimitBackend(clock=clock)
+
+
+class TestMemoryBackend:
+    """GCRA math of the per-process backend"""
+
+    def test_burst_up_to_limit(self, backend):
+        results = [backend.hit("k", LIMIT, WINDOW) for _ in range(LIMIT)]
+
+        assert all(result.allowed for result in results)
+        assert [result.remaining for result in results] == [4, 3, 2, 1, 0]
+        assert [result.reset_after for result in results] == [2, 4, 6, 8, 10]
+
+    def test_refused_when_exhausted(self, backend):
+        for _ in range(LIMIT):
+            backend.hit("k", LIMIT, WINDOW)
+
+        result = backend.hit("k", LIMIT, WINDOW)
+
+        assert not result.allowed
+        assert result.remaining == 0
+        assert result.retry_after == pytest.approx(2)
+        assert result.reset_after == pytest.approx(10)
+        assert result.headers()["Retry-After"] == "2"
+
+    def test_refused_hit_does_not_consume(self, backend, clock):
+        for _ in range(LIMIT + 3):
+            backend.hit("k", LIMIT, WINDOW)
+
+        clock.advance(2)
+
+        assert backend.hit("k", LIMIT, WINDOW).allowed
+        assert not backend.hit("k", LIMIT, WINDOW).allowed
+
+    def test_quota_refills_over_the_window(self, backend, clock):
+        for _ in range(LIMIT):
+            backend.hit("k", LIMIT, WINDOW)
+
+        clock.advance(5)
+        result = backend.hit("k", LIMIT, WINDOW)
+
+        # 2.5 intervals refilled, one of them used by this hit
+        assert result.allowed
+        assert result.remaining == 1
+
+        clock.advance(WINDOW)
+        assert backend.hit("k", LIMIT, WINDOW).remaining == LIMIT - 1
+
+    def test_cost(self, backend):
+        result = backend.hit("k", LIMIT, WINDOW, cost=3)
+
+        assert result.allowed
+        assert result.remaining == 2
+        assert not backend.hit("k", LIMIT, WINDOW, cost=3).allowed
+        assert backend.hit("k", LIMIT, WINDOW, cost=2).allowed
+
+    def test_keys_are_independent(self, backend):
+        for _ in range(LIMIT):
+            backend.hit("a", LIMIT, WINDOW)
+
+        assert not backend.hit("a", LIMIT, WINDOW).allowed
+        assert backend.hit("b", LIMIT, WINDOW).remaining == LIMIT - 1
+
+    def test_reset(self, backend):
+        for _ in range(LIMIT):
+            backend.hit("k", LIMIT, WINDOW)
+
+        backend.reset("k")
+
+        assert backend.hit("k", LIMIT, WINDOW).remaining == LIMIT - 1
+
+    def test_headers(self, backend):
+        headers = backend.hit("k", LIMIT, WINDOW).headers()
+
+        assert headers == {
+            "RateLimit-Limit": "5",
+            "RateLimit-Remaining": "4",
+            "RateLimit-Reset": "2",
+            "RateLimit-Policy": "5;w=10",
+        }
+
+
+class TestMemoryEviction:
+    """Idle keys are dropped, the key count stays bounded"""
+
+    def test_idle_keys_evicted(self, backend, clock):
+        for key in ("a", "b", "c"):
+            backend.hit(key, LIMIT, WINDOW)
+
+        clock.advance(WINDOW)
+        backend.hit("d", LIMIT, WINDOW)
+
+        # Two least recently hit keys with a full quota go per hit
+        assert len(backend) == 2
+        backend.hit("e", LIMIT, WINDOW)
+        assert len(backend) == 2
+
+    def test_active_keys_kept(self, backend, clock):
+        backend.hit("a", LIMIT, WINDOW)
+        backend.hit("b", LIMIT, WINDOW)
+
+        clock.advance(1)
+        backend.hit("c", LIMIT, WINDOW)
+
+        assert len(backend) == 3
+
+    def test_max_keys(self, clock):
+        backend = MemoryRateLimitBackend(max_keys=2, clock=clock)
+
+        for key in ("a", "b", "c"):
+            backend.hit(key, LIMIT, WINDOW)
+
+        assert len(backend) == 2
+        # "a" was least recently hit: dropped, so it has a full quota again
+        assert backend.hit("a", LIMIT, WINDOW).remaining == LIMIT - 1
+
+    def test_evicted_key_behaves_like_idle(self, backend, clock):
+        for _ in range(LIMIT):
+            backend.hit("a", LIMIT, WINDOW)
+
+        clock.advance(WINDOW)
+        backend.hit("b", LIMIT, WINDOW)
+
+        assert len(backend) == 1
+        assert backend.hit("a", LIMIT, WINDOW).remaining == LIMIT - 1
+
+
+class TestGcraResult:
+    """Results built from the Redis script's return values"""
+
+    def test_allowed(self):
+        # Values of the first hit on an empty key
+        result = gcra_result(True, LIMIT, WINDOW, since_allow=8.0, until_reset=2.0)
+
+        assert result.allowed
+        assert result.remaining == 4
+        assert result.reset_after == 2.0
+        assert result.retry_after == 0.0
+
+    def test_allowed_last_token(self):
+        result = gcra_result(True, LIMIT, WINDOW, since_allow=0.0, until_reset=10.0)
+
+        assert result.remaining == 0
+
+    def test_refused(self):
+        result = gcra_result(False, LIMIT, WINDOW, since_allow=-1.5, until_reset=9.5)
+
+        assert not result.allowed
+        assert result.remaining == 0
+        assert result.retry_after == 1.5
+        assert result.headers()["Retry-After"] == "2"
+        assert result.headers()["RateLimit-Reset"] == "10"
+
+    def test_matches_memory_backend(self, backend, clock):
+        """Same GCRA state, same result as the in-memory backend"""
+        tat = clock.now
+        for step in (0, 0, 0.5, 0, 0, 0, 3, 0, 0, 7, 0):
+            clock.advance(step)
+            now = clock.now
+            expected = backend.hit("k", LIMIT, WINDOW)
+
+            tat = max(tat, now)
+            new_tat = tat + WINDOW / LIMIT
+            allow_at = new_tat - WINDOW
+            allowed = now >= allow_at
+            result = gcra_result(
+                allowed,
+                LIMIT,
+                WINDOW,
+                now - allow_at,
+                (new_tat if allowed else tat) - now,
+            )
+            if allowed:
+                tat = new_tat
+
+            assert result.allowed == expected.allowed
+            assert result.remaining == expected.remaining
+            assert result.reset_after == pytest.approx(expected.reset_after)
+            assert result.retry_after == pytest.approx(expected.retry_after)
+
+
+@pytest.mark.skipif(not REDIS_AVAILABLE, reason="redis not installed")
+class TestRedisFallback:
+    """Unreachable Redis: requests are limited per process"""
+
+    def test_falls_back_to_memory(self, clock):
+        fallback = MemoryRateLimitBackend(clock=clock)
+        backend = RedisRateLimitBackend("redis://127.0.0.1:1/0", fallback=fallback)
+
+        results = [backend.hit("k", LIMIT, WINDOW) for _ in range(LIMIT + 1)]
+
+        assert [result.allowed for result in results] == [True] * LIMIT + [False]
+        assert len(fallback) == 1
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not (REDIS_AVAILABLE and os.getenv("REDIS_URL")), reason="needs redis and REDIS_URL"
+)
+class TestRedisBackend:
+    """GCRA script against a live Redis (REDIS_URL)"""
+
+    @pytest.fixture
+    def redis_backend(self):
+        backend = RedisRateLimitBackend(os.getenv("REDIS_URL"))
+        key = f"test:{uuid.uuid4()}"
+        yield backend, key
+        backend.reset(key)
+
+    def test_burst_and_refusal(self, redis_backend):
+        backend, key = redis_backend
+
+        results = [backend.hit(key, LIMIT, WINDOW) for _ in range(LIMIT + 1)]
+
+        assert [result.allowed for result in results] == [True] * LIMIT + [False]
+        assert [result.remaining for result in results] == [4, 3, 2, 1, 0, 0]
+        assert results[-1].retry_after == pytest.approx(2, abs=0.5)
+        assert results[-1].reset_after == pytest.approx(10, abs=0.5)
+
+    def test_key_expires_with_full_quota(self, redis_backend):
+        backend, key = redis_backend
+
+        backend.hit(key, LIMIT, WINDOW, cost=2)
+
+        ttl = backend.client.pttl(KEY_PREFIX + key)
+        assert 0 < ttl <= 4000
+
+    def test_reset(self, redis_backend):
+        backend, key = redis_backend
+        for _ in range(LIMIT):
+            backend.hit(key, LIMIT, WINDOW)
+
+        backend.reset(key)
+
+        assert backend.hit(key, LIMIT, WINDOW).remaining == LIMIT - 1
+
+
+class TestRateLimitHeaders:
+    """apply_rate_limit headers reach responses the endpoint builds itself"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip("fastapi")
+        from fastapi import Depends, FastAPI
+        from fastapi.responses import JSONResponse
+        from fastapi.testclient import TestClient
+
+        from app.api.deps import apply_rate_limit
+        from app.core import rate_limit
+        from app.core.http_middleware import RateLimitHeadersMiddleware
+        from app.core.security import TokenData, get_current_user
+
+        app = FastAPI(dependencies=[Depends(apply_rate_limit)])
+        app.add_middleware(RateLimitHeadersMiddleware)
+        app.dependency_overrides[get_current_user] = lambda: TokenData(
+            user_id="user",
+            email="user@example.com",
+            role="admin",
+            tenant_id=str(uuid.uuid4()),
+            scopes=[],
+        )
+
+        @app.get("/model")
+        def model():
+            return {"ok": True}
+
+        @app.get("/response")
+        def response():
+            return JSONResponse({"ok": True})
+
+        original = rate_limit.rate_limiter
+        rate_limit.rate_limiter = rate_limit.RateLimiter(
+            MemoryRateLimitBackend(), max_requests=LIMIT, window_seconds=WINDOW
+        )
+        yield TestClient(app)
+        rate_limit.rate_limiter = original
+
+    @pytest.mark.parametrize("path", ["/model", "/response"])
+    def test_headers(self, client, path):
+        response = client.get(path)
+
+        assert response.headers["RateLimit-Limit"] == "5"
+        assert response.headers["RateLimit-Remaining"] == "4"
+        assert response.headers["RateLimit-Policy"] == "5;w=10"
@@ -0,0 +1,35 @@
+"""
+Tests for startup imports
+
+`import app.main` must not load the SDKs that only some routes need
+(app.core.lazy_import.HEAVY_MODULES). The `python -X importtime` report of
+the run is kept as an artifact: $IMPORTTIME_REPORT if set, else the test's
+tmp dir.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.lazy_import import HEAVY_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = "import sys, app.main; print('\\n'.join(sorted(sys.modules)))"
+
+
+def test_app_import_skips_heavy_sdks(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    report = Path(os.environ.get("IMPORTTIME_REPORT") or tmp_path / "importtime.txt")
+    report.write_text(result.stderr)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    loaded = set(result.stdout.split())
+    eager = [name for name in HEAVY_MODULES if name in loaded]
+    assert not eager, f"Imported at startup: {eager} (import profile: {report})"